@@ -0,0 +1,2 @@
+from . import plist_template  # noqa: F401
+from . import setup  # noqa: F401
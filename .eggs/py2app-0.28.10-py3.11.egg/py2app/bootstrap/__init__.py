@@ -0,0 +1 @@
+"""py2app bootstrap files"""
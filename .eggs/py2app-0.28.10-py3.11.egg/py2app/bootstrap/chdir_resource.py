@@ -0,0 +1,7 @@
+def _chdir_resource():
+    import os
+
+    os.chdir(os.environ["RESOURCEPATH"])
+
+
+_chdir_resource()
@@ -0,0 +1,3 @@
+"""
+Resource data converters
+"""
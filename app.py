@@ -7,6 +7,7 @@ Main entry point for the macOS GUI app
 import sys
 import logging
 import threading
+import time
 from pathlib import Path
 
 # Configure logging
@@ -40,6 +41,9 @@ class DiscordSendGuardApp:
         self.guard = None
         self.guard_thread = None
         self.app = None
+        self.control = None
+        # Serializes starting/stopping the guard thread (menu, control commands, reloads)
+        self._enable_lock = threading.RLock()
 
         # Set debug level if configured
         if self.config.debug:
@@ -47,7 +51,18 @@ class DiscordSendGuardApp:
             logger.debug("Debug mode enabled")
 
         # Initialize Discord Send Guard
-        self.guard = DiscordSendGuard(debug=self.config.debug)
+        if self.config.isolate_hook:
+            # Keyboard hook in a child process; this process only controls it
+            from utils.hook_process import HookProcess
+            self.guard = HookProcess(self.config)
+            logger.info("Keyboard hook isolated in a separate process")
+        else:
+            self.guard = DiscordSendGuard(debug=self.config.debug)
+            self.guard.apply_config(self.config)
+            # rumps runs the main run loop, so workspace notifications arrive here
+            self.guard.has_main_run_loop = True
+            # Shared with the GUI: leave the process-wide GC settings alone
+            self.guard.owns_process = False
 
         # Check for first run
         if self.config.first_run:
@@ -89,10 +104,47 @@ class DiscordSendGuardApp:
             if self.config.enabled:
                 self._start_guard()
 
+            self._start_control_server()
+
         except Exception as e:
             logger.error(f"Failed to create menu bar app: {e}")
             raise
 
+    def _start_control_server(self):
+        """Start the local control socket"""
+        from utils.control import ControlServer, guard_handlers
+
+        # Commands arrive on the control server's thread, but the handlers
+        # update the menu and open windows, which AppKit allows only on the main thread
+        handlers = guard_handlers(
+            self.guard,
+            reload_config=lambda: self._on_main_thread(self._reload_config),
+            set_enabled=lambda enabled: self._on_main_thread(self._set_enabled, enabled),
+            get_enabled=lambda: self.config.enabled,
+        )
+        handlers['show-settings'] = self._handle_show_settings
+        self.control = ControlServer(handlers)
+        self.control.start()
+
+    def _on_main_thread(self, func, *args):
+        """Queue func(*args) on the main run loop (returns without waiting for it)"""
+        from PyObjCTools import AppHelper
+        AppHelper.callAfter(func, *args)
+
+    def _handle_show_settings(self, args):
+        """Control command: open the settings window (sent by a second launch)"""
+        self._on_main_thread(self._show_settings, None)
+        return {"shown": True}
+
+    def _reload_config(self):
+        """Reload configuration from disk and apply it to the guard"""
+        with self._enable_lock:
+            self.config.load()
+            self.guard.apply_config(self.config)
+            if self.config.enabled != self._guard_running():
+                self._set_enabled(self.config.enabled)
+        logger.info("Configuration reloaded")
+
     def _get_base_dir(self) -> Path:
         """Get base directory (handles PyInstaller bundle)"""
         if getattr(sys, 'frozen', False):
@@ -186,29 +238,48 @@ class DiscordSendGuardApp:
             return
 
         logger.info("Stopping Discord Send Guard...")
-        self.guard.stop()
-
-        # Wait for thread to finish (with timeout)
-        self.guard_thread.join(timeout=2)
+        # A thread started just before may not be inside guard.start() yet and
+        # would miss a single stop(): repeat it until the thread ends (with timeout)
+        thread = self.guard_thread
+        deadline = time.monotonic() + 2
+        while thread.is_alive() and time.monotonic() < deadline:
+            self.guard.stop()
+            thread.join(timeout=0.05)
 
         logger.info("Discord Send Guard stopped")
 
-    def _toggle_guard(self, sender):
-        """Toggle guard on/off"""
-        try:
-            if self.config.enabled:
-                # Disable
-                self._stop_guard()
-                self.config.enabled = False
-                logger.info("Guard disabled")
-            else:
-                # Enable
+    def _guard_running(self) -> bool:
+        """Whether the guard thread is alive"""
+        return bool(self.guard_thread and self.guard_thread.is_alive())
+
+    def _set_enabled(self, enabled: bool):
+        """
+        Enable or disable the guard
+
+        Args:
+            enabled: New enabled state
+        """
+        # Two unserialized calls could both start a thread; the extra one would
+        # wait in guard.start() and keep the hook running after a later disable
+        with self._enable_lock:
+            if enabled:
                 self.config.enabled = True
-                self._start_guard()
+                if not self._guard_running():
+                    self._start_guard()
                 logger.info("Guard enabled")
+            else:
+                if self._guard_running():
+                    self._stop_guard()
+                self.config.enabled = False
+                logger.info("Guard disabled")
 
             self._update_status()
 
+    def _toggle_guard(self, sender):
+        """Toggle guard on/off"""
+        try:
+            self._set_enabled(not self.config.enabled)
+
         except Exception as e:
             logger.error(f"Failed to toggle guard: {e}")
             import rumps
@@ -306,12 +377,37 @@ class DiscordSendGuardApp:
 
 def main():
     """Main entry point"""
+    import argparse
+    import multiprocessing
+    from utils.single_instance import acquire_or_hand_off
+
+    # Required for the isolated hook process in frozen builds
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="Discord Send Guard menu bar app")
+    parser.add_argument(
+        '--toggle',
+        action='store_true',
+        help='Toggle the guard (forwarded to the running instance if any)'
+    )
+    # Ignore extra arguments passed by Finder/launchd
+    args, _ = parser.parse_known_args()
+
+    # Only one keyboard hook may run; a second launch hands off and exits
+    # A CLI guard has no settings window; it is at least switched on
+    intent = 'toggle' if args.toggle else 'show-settings'
+    instance_lock = acquire_or_hand_off(intent, fallback=None if args.toggle else 'enable')
+    if instance_lock is None:
+        sys.exit(0)
+
     try:
         app = DiscordSendGuardApp()
         app.run()
     except Exception as e:
         logger.error(f"Failed to start application: {e}")
         sys.exit(1)
+    finally:
+        instance_lock.release()
 
 
 if __name__ == '__main__':
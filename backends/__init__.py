@@ -0,0 +1 @@
+"""Platform-specific guard backends for Discord Send Guard"""
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Linux evdev/uinput backend for Discord Send Guard
+
+Grabs the physical keyboards through evdev, applies the Enter ->
+Shift+Enter transformation at input-event level and re-emits everything
+through a uinput virtual keyboard. Works under X11 and Wayland because it
+sits below the display server.
+
+Requires read access to /dev/input/event* and write access to /dev/uinput
+(root, or membership in the "input" group plus a uinput udev rule).
+"""
+
+import os
+import selectors
+import threading
+import time
+import logging
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from backends.x11_backend import (
+    ActiveWindowTracker, process_name, watch_properties, window_info, window_title,
+)
+from utils.config import ignored_settings
+from utils.scheduling import raise_thread_priority
+from utils.stats import GuardStats
+
+logger = logging.getLogger(__name__)
+
+try:
+    import evdev
+    from evdev import ecodes
+    HAS_EVDEV = True
+except ImportError:
+    evdev = None
+    ecodes = None
+    HAS_EVDEV = False
+
+# Linux input-event-codes (stable kernel ABI)
+EV_SYN = 0x00
+EV_KEY = 0x01
+SYN_REPORT = 0
+KEY_ENTER = 28
+KEY_KPENTER = 96
+KEY_LEFTCTRL = 29
+KEY_RIGHTCTRL = 97
+KEY_LEFTSHIFT = 42
+KEY_RIGHTSHIFT = 54
+KEY_A = 30
+
+KEY_UP, KEY_DOWN, KEY_REPEAT = 0, 1, 2
+
+ENTER_KEYS = frozenset((KEY_ENTER, KEY_KPENTER))
+SEND_MODIFIERS = frozenset((KEY_LEFTCTRL, KEY_RIGHTCTRL))
+SHIFT_KEYS = frozenset((KEY_LEFTSHIFT, KEY_RIGHTSHIFT))
+
+# Name of the virtual output device (also used to avoid grabbing ourselves)
+VIRTUAL_DEVICE_NAME = 'discord-send-guard'
+
+Event = Tuple[int, int, int]
+
+
+class EvdevTransformer:
+    """
+    Pure event transformation: (type, code, value) in, events to emit out
+
+    Enter pressed without Ctrl while the target is frontmost is rewritten to
+    Shift+Enter; the matching repeat and release events follow the same
+    rewrite so the virtual keyboard never sees an unbalanced Shift.
+    """
+
+    def __init__(self, is_target_active: Callable[[], bool], stats: Optional[GuardStats] = None):
+        """
+        Initialize transformer
+
+        Args:
+            is_target_active: Returns True if Discord is frontmost
+            stats: GuardStats for decision counters
+        """
+        self.is_target_active = is_target_active
+        self.stats = stats or GuardStats()
+        self.enabled = True
+        self.held_modifiers = set()
+        self.held_shift = set()
+        self.converted = set()  # Enter keycodes currently rewritten to Shift+Enter
+
+    def process(self, etype: int, code: int, value: int) -> List[Event]:
+        """
+        Transform one input event
+
+        Args:
+            etype: Event type
+            code: Event code
+            value: Event value (0 up, 1 down, 2 repeat for EV_KEY)
+
+        Returns:
+            Events to write to the virtual device
+        """
+        if etype != EV_KEY:
+            return [(etype, code, value)]
+
+        if code in SEND_MODIFIERS:
+            if value == KEY_UP:
+                self.held_modifiers.discard(code)
+            else:
+                self.held_modifiers.add(code)
+        elif code in SHIFT_KEYS:
+            if value == KEY_UP:
+                self.held_shift.discard(code)
+            else:
+                self.held_shift.add(code)
+        elif code in ENTER_KEYS:
+            return self._process_enter(code, value)
+
+        return [(etype, code, value)]
+
+    def _process_enter(self, code: int, value: int) -> List[Event]:
+        if value == KEY_DOWN:
+            action = self._decide()
+            self.stats.incr(f'enter_{action}')
+            self.stats.trace('enter', action=action, modifier=bool(self.held_modifiers))
+            if action == 'converted':
+                self.converted.add(code)
+                return [
+                    (EV_KEY, KEY_LEFTSHIFT, KEY_DOWN),
+                    (EV_SYN, SYN_REPORT, 0),
+                    (EV_KEY, code, KEY_DOWN),
+                ]
+            return [(EV_KEY, code, KEY_DOWN)]
+
+        if code in self.converted:
+            if value == KEY_REPEAT:
+                return [(EV_KEY, code, KEY_REPEAT)]
+            self.converted.discard(code)
+            events = [(EV_KEY, code, KEY_UP)]
+            if not self.held_shift:
+                events += [(EV_SYN, SYN_REPORT, 0), (EV_KEY, KEY_LEFTSHIFT, KEY_UP)]
+            return events
+
+        return [(EV_KEY, code, value)]
+
+    def _decide(self) -> str:
+        if not self.enabled or self.held_shift:
+            # Shift+Enter is already a newline
+            return 'passthrough'
+        if not self.is_target_active():
+            return 'passthrough'
+        if self.held_modifiers:
+            return 'send'
+        return 'converted'
+
+
+def is_keyboard(device) -> bool:
+    """
+    Check whether an evdev device is a real keyboard
+
+    Args:
+        device: evdev.InputDevice
+
+    Returns:
+        True if the device reports Enter and letter keys
+    """
+    if device.name == VIRTUAL_DEVICE_NAME:
+        return False
+    keys = device.capabilities().get(EV_KEY, [])
+    return KEY_ENTER in keys and KEY_A in keys
+
+
+def find_keyboards(paths: Optional[Iterable[str]] = None) -> list:
+    """
+    Open keyboard devices
+
+    Args:
+        paths: Device paths to consider (defaults to all /dev/input/event*)
+
+    Returns:
+        List of evdev.InputDevice
+    """
+    devices = []
+    for path in (paths if paths is not None else evdev.list_devices()):
+        try:
+            device = evdev.InputDevice(path)
+        except OSError as e:
+            logger.debug(f"Cannot open {path}: {e}")
+            continue
+        if is_keyboard(device):
+            devices.append(device)
+        else:
+            device.close()
+    return devices
+
+
+class X11ActiveWindow:
+    """
+    Whether the X11 active window is Discord, kept current by X events
+
+    A thread with its own display connection listens for PropertyNotify on
+    the root window's _NET_ACTIVE_WINDOW (focus changes) and on the active
+    window's title (tab switches in a browser), and feeds them to the X11
+    backend's ActiveWindowTracker, so an Enter reads a cached bool instead
+    of making an X round trip.
+    """
+
+    def __init__(self, display, stats: Optional[GuardStats] = None,
+                 lookup_process: Callable[[int], str] = None):
+        """
+        Args:
+            display: Xlib display connection, used only by this object
+            stats: GuardStats for focus and window-cache counters
+            lookup_process: Maps a PID to a process name (defaults to /proc)
+        """
+        from Xlib import X, Xatom, error as xerror
+        self._X = X
+        self._XError = xerror.XError
+        self.display = display
+        self.root = display.screen().root
+        self.net_active_window = display.intern_atom('_NET_ACTIVE_WINDOW')
+        self.net_wm_name = display.intern_atom('_NET_WM_NAME')
+        self.net_wm_pid = display.intern_atom('_NET_WM_PID')
+        self.utf8_string = display.intern_atom('UTF8_STRING')
+        self.title_atoms = (self.net_wm_name, Xatom.WM_NAME)
+        self.tracker = ActiveWindowTracker(self._resolve, stats, lookup_process or process_name,
+                                           title=self._title)
+        self._thread: Optional[threading.Thread] = None
+        self._wake_r, self._wake_w = os.pipe()
+        self._stopping = False
+
+    def is_active(self) -> bool:
+        """Hot path: the cached classification of the active window"""
+        return self.tracker.is_active
+
+    def start(self):
+        """Classify the current window and follow changes on a background thread"""
+        self.root.change_attributes(event_mask=self._X.PropertyChangeMask)
+        self.refresh()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='x11-active-window', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop following changes and close the display connection"""
+        self._stopping = True
+        os.write(self._wake_w, b'x')
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.display.close()
+
+    def _run(self):
+        display = self.display
+        selector = selectors.DefaultSelector()
+        selector.register(display.fileno(), selectors.EVENT_READ)
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        try:
+            while not self._stopping:
+                while display.pending_events():
+                    self.handle(display.next_event())
+                for key, _ in selector.select():
+                    if key.fileobj == self._wake_r:
+                        os.read(self._wake_r, 64)
+        except Exception as e:
+            # Lost display: fail safe rather than guess
+            logger.error(f"Active-window tracking stopped: {e}")
+            self.tracker.is_active = False
+        finally:
+            selector.close()
+
+    def handle(self, event):
+        """Handle one X event"""
+        if event.type != self._X.PropertyNotify:
+            return
+        if event.atom == self.net_active_window:
+            self.refresh()
+        elif event.atom in self.title_atoms:
+            self.tracker.on_title_change(event.window.id)
+
+    def refresh(self):
+        """Follow the active window; reclassify when it changed"""
+        try:
+            prop = self.root.get_full_property(self.net_active_window, self._X.AnyPropertyType)
+        except self._XError:
+            prop = None
+        window_id = prop.value[0] if prop and len(prop.value) else None
+        previous = self.tracker.window
+        if window_id != previous:
+            self._watch_title(previous, False)
+            self._watch_title(window_id, True)
+        self.tracker.on_active_window(window_id)
+
+    def _watch_title(self, window_id: Optional[int], watch: bool):
+        if window_id:
+            watch_properties(self.display.create_resource_object('window', window_id), watch)
+
+    def _title(self, window_id: int) -> str:
+        window = self.display.create_resource_object('window', window_id)
+        return window_title(window, self.net_wm_name, self.utf8_string)
+
+    def _resolve(self, window_id: int):
+        return window_info(self.display.create_resource_object('window', window_id), self.net_wm_pid)
+
+
+def x11_discord_active(stats: Optional[GuardStats] = None) -> Optional[Callable[[], bool]]:
+    """
+    Build a foreground query that follows the X11 active window
+
+    Args:
+        stats: GuardStats for window-cache counters
+
+    Returns:
+        Query function, or None if no X display is reachable
+    """
+    if not os.environ.get('DISPLAY'):
+        return None
+    try:
+        from Xlib import display as xdisplay
+    except ImportError:
+        return None
+    try:
+        disp = xdisplay.Display()
+        tracker = X11ActiveWindow(disp, stats)
+        tracker.start()
+    except Exception as e:
+        logger.debug(f"No X display: {e}")
+        return None
+    return tracker.is_active
+
+
+class EvdevGuard:
+    """
+    Guard engine on evdev/uinput
+
+    Exposes the DiscordSendGuard control surface (start/stop/enabled/stats/
+    running/apply_config) so the control socket works unchanged.
+    """
+
+    # Engine settings apply_config() honours; others are reported as ignored
+    SUPPORTED_SETTINGS = frozenset(('debug', 'raise_priority'))
+
+    def __init__(self, is_target_active: Optional[Callable[[], bool]] = None,
+                 device_paths: Optional[Iterable[str]] = None, debug: bool = False,
+                 all_windows: bool = False):
+        """
+        Initialize guard
+
+        Args:
+            is_target_active: Foreground query (defaults to X11 if reachable)
+            device_paths: Keyboard device paths (defaults to autodetect)
+            debug: Enable debug logging
+            all_windows: Without a foreground query, convert Enter in every
+                application instead of refusing to start
+
+        Raises:
+            RuntimeError: If evdev is missing, or the active window cannot be
+                seen and all_windows was not given
+        """
+        if not HAS_EVDEV:
+            raise RuntimeError("evdev not available. Install with: pip install evdev")
+
+        self.debug = debug
+        if debug:
+            logger.setLevel(logging.DEBUG)
+        self.stats = GuardStats()
+        if is_target_active is None:
+            is_target_active = x11_discord_active(self.stats)
+            if is_target_active is None:
+                if not all_windows:
+                    raise RuntimeError(
+                        "Cannot see the active window (Wayland without XWayland?), so Enter would be "
+                        "converted in every application; pass --all-windows to accept that")
+                logger.warning("Cannot see the active window; converting Enter in every application")
+                is_target_active = lambda: True  # noqa: E731
+        self.transformer = EvdevTransformer(is_target_active, self.stats)
+        self.device_paths = list(device_paths) if device_paths is not None else None
+        self.running = False
+        self.raise_priority = True  # Raise the event loop thread's priority
+        self.priority_policy = None
+        self.devices = []
+        self.uinput = None
+        self._wake_r, self._wake_w = os.pipe()
+        self._stopping = False
+
+    @property
+    def enabled(self) -> bool:
+        """Whether Enter conversion is enabled"""
+        return self.transformer.enabled
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self.transformer.enabled = value
+
+    def apply_config(self, config):
+        """
+        Apply configuration
+
+        Only the settings in SUPPORTED_SETTINGS are applied. Other engine
+        settings changed from their defaults are logged as a warning and
+        listed in the "ignored_settings" stats info.
+
+        Args:
+            config: Config instance or dict
+        """
+        self.debug = bool(config.get('debug', False))
+        logger.setLevel(logging.DEBUG if self.debug else logging.INFO)
+        self.raise_priority = bool(config.get('raise_priority', True))
+        ignored = ignored_settings(config, self.SUPPORTED_SETTINGS)
+        self.stats.set_info('ignored_settings', ignored)
+        if ignored:
+            logger.warning(f"The evdev backend ignores these settings: {', '.join(ignored)}")
+
+    def start(self):
+        """Grab the keyboards and run the event loop until stop()"""
+        if self.running:
+            logger.warning("Already running")
+            return
+
+        self.devices = find_keyboards(self.device_paths)
+        if not self.devices:
+            raise RuntimeError("No keyboard devices found (check permissions on /dev/input)")
+
+        self.uinput = evdev.UInput.from_device(*self.devices, name=VIRTUAL_DEVICE_NAME)
+        selector = selectors.DefaultSelector()
+        try:
+            for device in self.devices:
+                device.grab()
+                selector.register(device, selectors.EVENT_READ)
+                logger.info(f"Grabbed {device.path} ({device.name})")
+            selector.register(self._wake_r, selectors.EVENT_READ)
+
+            # start() runs the loop on the calling thread
+            if self.raise_priority:
+                self.priority_policy = raise_thread_priority()
+                self.stats.trace('priority', policy=self.priority_policy)
+                logger.info(f"Event loop thread priority: {self.priority_policy}")
+
+            # Clear the stop flag before publishing running: a stop() that
+            # sees running must not be overwritten
+            self._stopping = False
+            self.running = True
+            self._loop(selector)
+        finally:
+            self._release(selector)
+            self.running = False
+            logger.info("Discord Send Guard (evdev) stopped")
+
+    def stop(self):
+        """Stop the event loop"""
+        if not self.running:
+            return
+        self._stopping = True
+        os.write(self._wake_w, b'x')
+
+    def _loop(self, selector):
+        process = self.transformer.process
+        write = self.uinput.write
+        syn = self.uinput.syn
+        stats = self.stats
+        perf_counter = time.perf_counter
+
+        while not self._stopping:
+            for key, _ in selector.select():
+                if key.fileobj == self._wake_r:
+                    os.read(self._wake_r, 64)
+                    continue
+                try:
+                    events = key.fileobj.read()
+                except OSError as e:
+                    logger.error(f"Keyboard {key.fileobj.path} unavailable: {e}")
+                    selector.unregister(key.fileobj)
+                    continue
+                for event in events:
+                    started = perf_counter()
+                    for etype, code, value in process(event.type, event.code, event.value):
+                        if etype == EV_SYN:
+                            syn()
+                        else:
+                            write(etype, code, value)
+                    if event.type == EV_KEY and event.value == KEY_DOWN:
+                        stats.observe('on_press', perf_counter() - started)
+
+    def _release(self, selector):
+        for device in self.devices:
+            try:
+                device.ungrab()
+            except OSError:
+                pass
+            device.close()
+        self.devices = []
+        selector.close()
+        if self.uinput:
+            self.uinput.close()
+            self.uinput = None
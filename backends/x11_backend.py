@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+X11 backend for Discord Send Guard
+
+Tracks the active window through PropertyNotify events on the root
+window's _NET_ACTIVE_WINDOW and on the active window's title, and
+classifies it once per focus or title change. Plain Enter is passively grabbed only while Discord is active, so
+other applications never round-trip through the guard; a grabbed Enter is
+replaced with Shift+Enter through XTest. Event tracking, grabs and
+injection all share one display connection owned by the event loop.
+"""
+
+import os
+import selectors
+import time
+import logging
+from typing import Callable, Optional, Tuple
+
+from utils.browser import WindowClassifier, linux_app_name
+from utils.config import ignored_settings
+from utils.scheduling import raise_thread_priority
+from utils.stats import GuardStats
+
+logger = logging.getLogger(__name__)
+
+try:
+    from Xlib import X, XK, Xatom, error as xerror
+    from Xlib import display as xdisplay
+    from Xlib.ext import xtest
+    HAS_XLIB = True
+except ImportError:
+    X = XK = Xatom = xerror = xdisplay = xtest = None
+    HAS_XLIB = False
+
+# Lock and NumLock (Mod2) must not stop the grab from matching
+LOCK_MASK = 2
+MOD2_MASK = 16
+IGNORED_MODIFIER_COMBOS = (0, LOCK_MASK, MOD2_MASK, LOCK_MASK | MOD2_MASK)
+
+WindowInfo = Tuple[Tuple[str, ...], Optional[int]]
+
+
+def process_name(pid: int) -> str:
+    """
+    Look up a process name from /proc
+
+    Args:
+        pid: Process ID
+
+    Returns:
+        Lower-cased command name, or an empty string
+    """
+    try:
+        with open(f'/proc/{pid}/comm') as f:
+            return f.read().strip().lower()
+    except OSError:
+        return ''
+
+
+def window_title(window, net_wm_name: int, utf8_string: int) -> str:
+    """
+    Read a window's title, preferring the UTF-8 _NET_WM_NAME
+
+    Args:
+        window: Xlib window
+        net_wm_name: _NET_WM_NAME atom
+        utf8_string: UTF8_STRING atom
+
+    Returns:
+        Title, or an empty string if the window has none or vanished
+    """
+    try:
+        prop = window.get_full_property(net_wm_name, utf8_string)
+        if prop and prop.value:
+            value = prop.value
+            return value.decode('utf-8', 'replace') if isinstance(value, bytes) else str(value)
+        return str(window.get_wm_name() or '')
+    except xerror.XError:
+        return ''
+
+
+def window_info(window, net_wm_pid: int) -> WindowInfo:
+    """
+    Read a window's WM_CLASS and owner PID
+
+    Args:
+        window: Xlib window
+        net_wm_pid: _NET_WM_PID atom
+
+    Returns:
+        (WM_CLASS parts, PID or None); ((), None) if the window vanished
+    """
+    try:
+        wm_class = window.get_wm_class() or ()
+        prop = window.get_full_property(net_wm_pid, X.AnyPropertyType)
+    except xerror.XError:
+        # Window vanished between the focus change and the lookup
+        return (), None
+    pid = int(prop.value[0]) if prop and len(prop.value) else None
+    return tuple(wm_class), pid
+
+
+def watch_properties(window, watch: bool):
+    """
+    Start or stop receiving PropertyNotify (title changes) for a window
+
+    Args:
+        window: Xlib window
+        watch: True to subscribe, False to unsubscribe
+    """
+    try:
+        window.change_attributes(event_mask=X.PropertyChangeMask if watch else 0)
+    except xerror.XError:
+        pass
+
+
+class ActiveWindowTracker:
+    """
+    Caches whether the active window belongs to Discord
+
+    The window is classified only when the active window or its title
+    changes, through WindowClassifier, so a browser counts only while a
+    Discord tab is showing; WM_CLASS/PID are resolved on a cache miss.
+    is_active is a plain attribute read on the Enter path.
+    """
+
+    def __init__(self, resolve: Callable[[int], WindowInfo],
+                 stats: Optional[GuardStats] = None,
+                 lookup_process: Callable[[int], str] = process_name,
+                 title: Callable[[int], str] = lambda window_id: ''):
+        """
+        Initialize tracker
+
+        Args:
+            resolve: Maps a window ID to (WM_CLASS parts, PID or None)
+            stats: GuardStats for focus counters
+            lookup_process: Maps a PID to a process name
+            title: Maps a window ID to its title
+        """
+        self.resolve = resolve
+        self.stats = stats or GuardStats()
+        self.lookup_process = lookup_process
+        self.title = title
+        self.classifier = WindowClassifier(stats=self.stats)
+        self.window = None
+        self.is_active = False
+
+    def on_active_window(self, window_id: Optional[int]) -> bool:
+        """
+        Handle an active-window change
+
+        Args:
+            window_id: New active window (0 or None when nothing is focused)
+
+        Returns:
+            True if the Discord match result changed
+        """
+        if window_id == self.window:
+            return False
+        self.window = window_id
+        self.stats.incr('focus_changes')
+        return self._classify()
+
+    def on_title_change(self, window_id: int) -> bool:
+        """
+        Handle a title change (a tab switch in a browser)
+
+        Args:
+            window_id: Window whose title changed
+
+        Returns:
+            True if the Discord match result changed
+        """
+        if not window_id or window_id != self.window:
+            return False
+        return self._classify()
+
+    def _classify(self) -> bool:
+        window_id = self.window
+        active = False
+        if window_id:
+            started = time.perf_counter()
+            active = self.classifier.classify(window_id, self.title(window_id),
+                                              lambda: (self._app_name(window_id), None))
+            self.stats.observe('focus_resolve', time.perf_counter() - started)
+
+        changed = active != self.is_active
+        self.is_active = active
+        if changed:
+            self.stats.trace('focus', window=window_id, discord=active)
+        return changed
+
+    def _app_name(self, window_id: int) -> str:
+        wm_class, pid = self.resolve(window_id)
+        names = list(wm_class)
+        if pid:
+            names.append(self.lookup_process(pid))
+        return linux_app_name(names)
+
+
+class X11Guard:
+    """
+    Guard engine on X11 passive grabs and XTest
+
+    Exposes the DiscordSendGuard control surface (start/stop/enabled/stats/
+    running/apply_config) so the control socket works unchanged.
+    """
+
+    # Engine settings apply_config() honours; others are reported as ignored
+    SUPPORTED_SETTINGS = frozenset(('debug', 'raise_priority'))
+
+    def __init__(self, display_name: Optional[str] = None, debug: bool = False):
+        """
+        Initialize guard
+
+        Args:
+            display_name: X display (defaults to $DISPLAY)
+            debug: Enable debug logging
+        """
+        if not HAS_XLIB:
+            raise RuntimeError("python-xlib not available. Install with: pip install python-xlib")
+
+        self.debug = debug
+        if debug:
+            logger.setLevel(logging.DEBUG)
+        try:
+            self.display = xdisplay.Display(display_name)
+        except Exception as e:
+            raise RuntimeError(f"Cannot open X display: {e}")
+        if not self.display.has_extension('XTEST'):
+            self.display.close()
+            raise RuntimeError("X server lacks the XTEST extension")
+
+        self.root = self.display.screen().root
+        self.net_active_window = self.display.intern_atom('_NET_ACTIVE_WINDOW')
+        self.net_wm_pid = self.display.intern_atom('_NET_WM_PID')
+        self.net_wm_name = self.display.intern_atom('_NET_WM_NAME')
+        self.utf8_string = self.display.intern_atom('UTF8_STRING')
+        self.title_atoms = (self.net_wm_name, Xatom.WM_NAME)
+        self.enter_keycodes = [
+            code for code in (
+                self.display.keysym_to_keycode(XK.XK_Return),
+                self.display.keysym_to_keycode(XK.XK_KP_Enter),
+            ) if code
+        ]
+        self.shift_keycode = self.display.keysym_to_keycode(XK.XK_Shift_L)
+
+        self.stats = GuardStats()
+        self.tracker = ActiveWindowTracker(self._resolve_window, self.stats, title=self._window_title)
+        self.running = False
+        self.raise_priority = True  # Raise the event loop thread's priority
+        self.priority_policy = None
+        self.grabbed = False
+        self._enabled = True
+        self._wake_r, self._wake_w = os.pipe()
+        self._stopping = False
+
+    @property
+    def enabled(self) -> bool:
+        """Whether Enter conversion is enabled"""
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        # The grab is updated by the event loop, which owns the connection
+        self._enabled = value
+        if self.running:
+            os.write(self._wake_w, b'e')
+
+    def apply_config(self, config):
+        """
+        Apply configuration
+
+        Only the settings in SUPPORTED_SETTINGS are applied. Other engine
+        settings changed from their defaults are logged as a warning and
+        listed in the "ignored_settings" stats info.
+
+        Args:
+            config: Config instance or dict
+        """
+        self.debug = bool(config.get('debug', False))
+        logger.setLevel(logging.DEBUG if self.debug else logging.INFO)
+        self.raise_priority = bool(config.get('raise_priority', True))
+        ignored = ignored_settings(config, self.SUPPORTED_SETTINGS)
+        self.stats.set_info('ignored_settings', ignored)
+        if ignored:
+            logger.warning(f"The X11 backend ignores these settings: {', '.join(ignored)}")
+
+    def start(self):
+        """Track the active window and run the event loop until stop()"""
+        if self.running:
+            logger.warning("Already running")
+            return
+
+        selector = selectors.DefaultSelector()
+        try:
+            self.root.change_attributes(event_mask=X.PropertyChangeMask)
+            self._refresh_active_window()
+            selector.register(self.display.fileno(), selectors.EVENT_READ)
+            selector.register(self._wake_r, selectors.EVENT_READ)
+
+            # start() runs the loop on the calling thread
+            if self.raise_priority:
+                self.priority_policy = raise_thread_priority()
+                self.stats.trace('priority', policy=self.priority_policy)
+                logger.info(f"Event loop thread priority: {self.priority_policy}")
+
+            # Clear the stop flag before publishing running: a stop() that
+            # sees running must not be overwritten
+            self._stopping = False
+            self.running = True
+            logger.info("Discord Send Guard (X11) started")
+            self._loop(selector)
+        finally:
+            self._set_grab(False)
+            self.display.flush()
+            selector.close()
+            self.running = False
+            logger.info("Discord Send Guard (X11) stopped")
+
+    def stop(self):
+        """Stop the event loop"""
+        if not self.running:
+            return
+        self._stopping = True
+        os.write(self._wake_w, b'x')
+
+    def close(self):
+        """Close the display connection"""
+        self.display.close()
+
+    def _loop(self, selector):
+        display = self.display
+        while not self._stopping:
+            # Replies to our own requests can leave events queued in Xlib
+            while display.pending_events():
+                self._handle(display.next_event())
+            for key, _ in selector.select():
+                if key.fileobj == self._wake_r:
+                    os.read(self._wake_r, 64)
+                    self._update_grab()
+
+    def _handle(self, event):
+        if event.type == X.KeyPress:
+            self._on_enter(event)
+        elif event.type == X.PropertyNotify:
+            if event.atom == self.net_active_window:
+                self._refresh_active_window()
+            elif event.atom in self.title_atoms and self.tracker.on_title_change(event.window.id):
+                logger.debug(f"Discord active: {self.tracker.is_active}")
+                self._update_grab()
+
+    def _on_enter(self, event):
+        started = time.perf_counter()
+        display = self.display
+
+        if not (self._enabled and self.tracker.is_active):
+            # Grab outlived the focus change: hand the key back untouched
+            display.allow_events(X.ReplayKeyboard, event.time)
+            display.flush()
+            self.stats.incr('enter_passthrough')
+            self.stats.observe('on_press', time.perf_counter() - started)
+            return
+
+        # Drop the physical Enter and type Shift+Enter into the focused window.
+        # Shift is held during the injected press, so the grab does not match it.
+        display.allow_events(X.AsyncKeyboard, event.time)
+        display.ungrab_keyboard(event.time)
+        shift = self.shift_keycode
+        xtest.fake_input(display, X.KeyPress, shift)
+        xtest.fake_input(display, X.KeyPress, event.detail)
+        xtest.fake_input(display, X.KeyRelease, event.detail)
+        xtest.fake_input(display, X.KeyRelease, shift)
+        display.flush()
+
+        self.stats.incr('enter_converted')
+        self.stats.trace('enter', action='converted', modifier=False)
+        self.stats.observe('on_press', time.perf_counter() - started)
+
+    def _refresh_active_window(self):
+        try:
+            prop = self.root.get_full_property(self.net_active_window, X.AnyPropertyType)
+        except xerror.XError:
+            prop = None
+        window_id = prop.value[0] if prop and len(prop.value) else None
+        previous = self.tracker.window
+        if window_id != previous:
+            # Follow the active window's title (tab switches in a browser)
+            self._watch_title(previous, False)
+            self._watch_title(window_id, True)
+        if self.tracker.on_active_window(window_id):
+            logger.debug(f"Discord active: {self.tracker.is_active}")
+        self._update_grab()
+
+    def _watch_title(self, window_id: Optional[int], watch: bool):
+        if window_id:
+            watch_properties(self.display.create_resource_object('window', window_id), watch)
+
+    def _window_title(self, window_id: int) -> str:
+        window = self.display.create_resource_object('window', window_id)
+        return window_title(window, self.net_wm_name, self.utf8_string)
+
+    def _resolve_window(self, window_id: int) -> WindowInfo:
+        return window_info(self.display.create_resource_object('window', window_id), self.net_wm_pid)
+
+    def _update_grab(self):
+        self._set_grab(self._enabled and self.tracker.is_active)
+
+    def _set_grab(self, grab: bool):
+        if grab == self.grabbed:
+            return
+        for keycode in self.enter_keycodes:
+            for modifiers in IGNORED_MODIFIER_COMBOS:
+                if grab:
+                    self.root.grab_key(keycode, modifiers, False, X.GrabModeAsync, X.GrabModeSync)
+                else:
+                    self.root.ungrab_key(keycode, modifiers)
+        self.display.flush()
+        self.grabbed = grab
+        self.stats.incr('grab_installs' if grab else 'grab_removals')
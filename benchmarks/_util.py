@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for benchmark scripts
+"""
+
+import os
+import sys
+
+# Make the project root importable when run as a script
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def percentiles(samples, points=(50, 90, 99, 99.9)):
+    """
+    Compute percentiles of a sample list
+
+    Args:
+        samples: Sequence of numbers
+        points: Percentiles to compute
+
+    Returns:
+        Dictionary of "p<point>" -> value, plus "max"
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    result = {}
+    for point in points:
+        index = min(len(ordered) - 1, int(len(ordered) * point / 100))
+        result[f"p{point:g}"] = ordered[index]
+    result["max"] = ordered[-1]
+    return result
+
+
+def report(title, samples, unit="us", scale=1e6):
+    """
+    Print a percentile summary line
+
+    Args:
+        title: Label for the line
+        samples: Durations in seconds
+        unit: Unit label
+        scale: Multiplier from seconds to the unit
+    """
+    stats = percentiles(samples)
+    parts = ", ".join(f"{name}={value * scale:.1f}{unit}" for name, value in stats.items())
+    print(f"{title:<40} n={len(samples)}  {parts}")
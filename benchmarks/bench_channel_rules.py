@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Channel rule matching with hundreds of patterns
+
+Compares the combined regex against trying each compiled pattern in turn,
+over a stream of title changes, and shows the cost of an unchanged title
+(the common case on every Enter).
+
+Usage:
+    python benchmarks/bench_channel_rules.py [--patterns N] [--titles N]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from _util import report
+from utils.channel_rules import ChannelRules, pattern_to_regex, ACTION_GUARD, ACTION_OFF
+
+WORDS = ('code', 'paste', 'dev', 'general', 'random', 'help', 'bots', 'logs', 'art', 'music',
+         'rust', 'python', 'go', 'ops', 'infra', 'design', 'memes', 'news', 'jobs', 'events')
+
+
+def make_rules(rng, count):
+    rules = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            pattern = f'#{rng.choice(WORDS)}-{rng.choice(WORDS)}-{i}'
+        elif kind < 0.9:
+            pattern = f'#{rng.choice(WORDS)}*{i} | Server{i % 50}'
+        else:
+            pattern = rf're:#{rng.choice(WORDS)}-(\d+)-{i}\b'
+        rules.append((pattern, ACTION_OFF if i % 3 else ACTION_GUARD))
+    return rules
+
+
+def make_titles(rng, count, rules):
+    titles = []
+    for _ in range(count):
+        if rng.random() < 0.3:
+            # A title that hits one of the rules
+            i = rng.randrange(len(rules))
+            titles.append(f'#{WORDS[i % len(WORDS)]}-x-{i} | Server{i % 50} - Discord')
+        else:
+            titles.append(f'#{rng.choice(WORDS)}-{rng.choice(WORDS)} | Server{rng.randrange(80)} - Discord')
+    return titles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--patterns', type=int, default=500)
+    parser.add_argument('--titles', type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rules = make_rules(rng, args.patterns)
+    titles = make_titles(rng, args.titles, rules)
+
+    start = time.perf_counter()
+    combined = ChannelRules(rules)
+    print(f"compile {args.patterns} patterns: {(time.perf_counter() - start) * 1e3:.1f}ms")
+
+    separate = [re.compile(pattern_to_regex(pattern), re.IGNORECASE) for pattern, _ in rules]
+
+    def first_match(title):
+        for index, regex in enumerate(separate):
+            if regex.search(title):
+                return index
+        return None
+
+    samples, expected = [], []
+    for title in titles:
+        begin = time.perf_counter()
+        expected.append(first_match(title))
+        samples.append(time.perf_counter() - begin)
+    report("per-pattern loop, per title change", samples)
+
+    samples, results = [], []
+    for title in titles:
+        begin = time.perf_counter()
+        combined.on_title(title)
+        samples.append(time.perf_counter() - begin)
+        results.append(combined.rule_index)
+    report("combined regex, per title change", samples)
+    assert results == expected, "combined regex disagrees with the per-pattern loop"
+
+    samples = []
+    for _ in range(args.titles):
+        begin = time.perf_counter()
+        combined.on_title(titles[-1])
+        samples.append(time.perf_counter() - begin)
+    report("unchanged title (per Enter)", samples)
+    print(f"rules hit: {sum(r is not None for r in results)}/{len(results)} titles, "
+          f"default action {ACTION_GUARD}")
+
+
+if __name__ == '__main__':
+    main()
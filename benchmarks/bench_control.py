@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Control socket request latency benchmark
+
+Usage:
+    python benchmarks/bench_control.py [--requests N] [--clients N]
+"""
+
+import argparse
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import _util  # noqa: F401  (sets up sys.path)
+from _util import report
+from utils.control import ControlServer, guard_handlers, send_command
+from utils.stats import GuardStats
+
+
+class _Guard:
+    enabled = True
+    running = True
+
+    def __init__(self):
+        self.stats = GuardStats()
+        for i in range(200):
+            self.stats.trace('enter', action='converted')
+
+
+def bench_one_shot(path, count):
+    """New connection per request (what the ctl subcommand does)"""
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        send_command('health', path=path)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_persistent(path, count, command=b'health\n'):
+    """Many requests on one connection"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(str(path))
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        sock.sendall(command)
+        data = b''
+        while not data.endswith(b'\n'):
+            data += sock.recv(65536)
+        samples.append(time.perf_counter() - start)
+    sock.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "control.sock"
+        server = ControlServer(guard_handlers(_Guard(), reload_config=lambda: None), path=path)
+        server.start()
+        try:
+            report("health (connect per request)", bench_one_shot(path, args.requests))
+            report("health (persistent connection)", bench_persistent(path, args.requests))
+            report("stats (persistent connection)", bench_persistent(path, args.requests, b'stats\n'))
+            report("trace (persistent connection)", bench_persistent(path, args.requests, b'trace\n'))
+
+            results = []
+            lock = threading.Lock()
+
+            def client():
+                samples = bench_persistent(path, args.requests // args.clients)
+                with lock:
+                    results.extend(samples)
+
+            threads = [threading.Thread(target=client) for _ in range(args.clients)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            report(f"health ({args.clients} concurrent clients)", results)
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
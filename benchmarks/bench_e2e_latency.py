@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+End-to-end keystroke latency through the evdev backend
+
+A uinput "keyboard" types Enter, the real EvdevGuard (in its own process,
+grabbing only that device) transforms it and re-emits it on its virtual
+keyboard, and a sink reading that device timestamps the Enter key-down
+the way a target application would receive it. Each sample is one key
+press from the write on the source to the read on the sink, so injection
+and the kernel round trip are included; presses are sequential and the
+sink drains every release before the next press.
+
+Paths:
+    baseline      source read directly, no guard (rig overhead)
+    passthrough   target not frontmost, Enter passes unchanged
+    converted     target frontmost, Enter becomes Shift+Enter
+    allowed_send  target frontmost, Ctrl+Enter passes as a send
+
+The event the sink receives is checked against the path (no modifier,
+Shift held, Ctrl held); mismatches and lost presses are counted.
+
+Needs python-evdev and write access to /dev/uinput. In a container, pass
+uinput through and expose the input device nodes it creates, e.g.:
+    docker run --rm --device /dev/uinput -v /dev/input:/dev/input \\
+        --device-cgroup-rule 'c 13:* rmw' -v "$PWD":/src -w /src python:3.11 \\
+        sh -c 'pip install evdev && python benchmarks/bench_e2e_latency.py --json out.json'
+
+Usage:
+    python benchmarks/bench_e2e_latency.py [--presses N] [--json FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import select
+import subprocess
+import sys
+import threading
+import time
+
+from _util import ROOT, percentiles, report
+from backends.evdev_backend import (
+    HAS_EVDEV, VIRTUAL_DEVICE_NAME, EV_KEY, KEY_ENTER, KEY_A, KEY_LEFTCTRL, KEY_LEFTSHIFT,
+    KEY_UP, KEY_DOWN,
+)
+
+SOURCE_NAME = 'discord-send-guard-latency-source'
+
+# name -> (target frontmost, modifier held by the "user", modifiers the sink must see)
+PATHS = {
+    'passthrough': (False, None, frozenset()),
+    'converted': (True, None, frozenset({KEY_LEFTSHIFT})),
+    'allowed_send': (True, KEY_LEFTCTRL, frozenset({KEY_LEFTCTRL})),
+}
+BASELINE = ('baseline', None, frozenset())
+
+
+class Sink:
+    """Reads a device like the target application and tracks the keys it sees held"""
+
+    def __init__(self, device):
+        self.device = device
+        self.held = set()
+
+    def wait(self, code, value, timeout=1.0):
+        """
+        Read until (code, value) arrives
+
+        Returns:
+            (arrival perf_counter, keys held before it) or None on timeout
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not select.select([self.device.fd], [], [], remaining)[0]:
+                return None
+            arrived = time.perf_counter()
+            found = None
+            for event in self.device.read():
+                if event.type != EV_KEY:
+                    continue
+                if found is None and event.code == code and event.value == value:
+                    found = (arrived, frozenset(self.held - {code}))
+                if event.value == KEY_UP:
+                    self.held.discard(event.code)
+                else:
+                    self.held.add(event.code)
+            if found is not None:
+                return found
+
+    def wait_released(self, timeout=1.0):
+        """Read until no key is held (the press is fully over)"""
+        deadline = time.perf_counter() + timeout
+        while self.held:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not select.select([self.device.fd], [], [], remaining)[0]:
+                self.held.clear()
+                return False
+            for event in self.device.read():
+                if event.type == EV_KEY:
+                    if event.value == KEY_UP:
+                        self.held.discard(event.code)
+                    else:
+                        self.held.add(event.code)
+        return True
+
+
+def tap(source, code, value):
+    source.write(EV_KEY, code, value)
+    source.syn()
+
+
+def measure(source, sink, modifier, expected, presses, warmup):
+    """
+    Time Enter key-downs from the source write to the sink read
+
+    Returns:
+        (latencies in seconds, wrong-shape count, lost count)
+    """
+    samples = []
+    wrong = lost = 0
+    for i in range(warmup + presses):
+        if modifier is not None:
+            # The modifier must be down at the sink before the Enter is timed
+            tap(source, modifier, KEY_DOWN)
+            sink.wait(modifier, KEY_DOWN)
+        started = time.perf_counter()
+        tap(source, KEY_ENTER, KEY_DOWN)
+        result = sink.wait(KEY_ENTER, KEY_DOWN)
+        tap(source, KEY_ENTER, KEY_UP)
+        if modifier is not None:
+            tap(source, modifier, KEY_UP)
+        sink.wait_released()
+        if i < warmup:
+            continue
+        if result is None:
+            lost += 1
+            continue
+        arrived, held = result
+        if held != expected:
+            wrong += 1
+        samples.append(arrived - started)
+    return samples, wrong, lost
+
+
+def run_guard(source_path, target_active, stop, timings):
+    """Child process: the real evdev backend on the source device only"""
+    from backends.evdev_backend import EvdevGuard
+
+    guard = EvdevGuard(is_target_active=lambda: bool(target_active.value), device_paths=[source_path])
+
+    def stopper():
+        stop.wait()
+        guard.stop()
+
+    threading.Thread(target=stopper, daemon=True).start()
+    guard.start()
+    timings.put(guard.stats.snapshot()['timings'].get('on_press'))
+
+
+def open_device(name, timeout=5.0):
+    """Wait for an input device by name (udev creates the node asynchronously)"""
+    import evdev
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for path in evdev.list_devices():
+            try:
+                device = evdev.InputDevice(path)
+            except OSError:
+                continue
+            if device.name == name:
+                return device
+            device.close()
+        time.sleep(0.05)
+    raise RuntimeError(f"Input device {name!r} did not appear")
+
+
+def summary(samples, wrong, lost):
+    stats = {f"{name}_us": round(value * 1e6, 1) for name, value in percentiles(samples).items()}
+    if samples:
+        stats['mean_us'] = round(sum(samples) / len(samples) * 1e6, 1)
+    stats.update(n=len(samples), wrong=wrong, lost=lost)
+    return stats
+
+
+def metadata(args):
+    try:
+        version = subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=ROOT, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        version = None
+    return {
+        'version': version,
+        'python': platform.python_version(),
+        'kernel': platform.release(),
+        'machine': platform.machine(),
+        'presses': args.presses,
+    }
+
+
+def compare(current, previous_file):
+    """Print p50/p99 changes against an earlier --json result"""
+    with open(previous_file, encoding='utf-8') as f:
+        previous = json.load(f)
+    print(f"\nAgainst {previous_file} ({previous['meta'].get('version')}):")
+    for name, stats in current['paths'].items():
+        old = previous['paths'].get(name)
+        if not old:
+            continue
+        parts = []
+        for point in ('p50_us', 'p99_us'):
+            if point in stats and point in old:
+                parts.append(f"{point[:-3]} {old[point]:.1f} -> {stats[point]:.1f}us "
+                             f"({stats[point] - old[point]:+.1f})")
+        print(f"  {name:<14} " + ", ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--presses', type=int, default=2000, help='Timed presses per path')
+    parser.add_argument('--warmup', type=int, default=100, help='Untimed presses per path')
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--compare', help='Earlier --json result to compare against')
+    args = parser.parse_args()
+
+    if not HAS_EVDEV:
+        sys.exit("python-evdev is required (pip install evdev)")
+    if not os.access('/dev/uinput', os.W_OK):
+        sys.exit("/dev/uinput is not writable (see the container command in --help)")
+    import evdev
+
+    source = evdev.UInput({EV_KEY: [KEY_ENTER, KEY_A, KEY_LEFTCTRL, KEY_LEFTSHIFT]}, name=SOURCE_NAME)
+    results = {'meta': metadata(args), 'paths': {}}
+    ctx = multiprocessing.get_context('spawn')
+    target_active = ctx.Value('b', 1, lock=False)
+    stop = ctx.Event()
+    timings = ctx.Queue()
+    guard = None
+    try:
+        # Rig overhead: the sink reads the source directly
+        name, modifier, expected = BASELINE
+        device = open_device(SOURCE_NAME)
+        samples, wrong, lost = measure(source, Sink(device), modifier, expected, args.presses, args.warmup)
+        device.close()
+        report(name, samples)
+        results['paths'][name] = summary(samples, wrong, lost)
+
+        guard = ctx.Process(target=run_guard, args=(source.device.path, target_active, stop, timings))
+        guard.start()
+        device = open_device(VIRTUAL_DEVICE_NAME)
+        time.sleep(0.2)  # the grab follows the virtual device
+        sink = Sink(device)
+        for name, (active, modifier, expected) in PATHS.items():
+            target_active.value = int(active)
+            samples, wrong, lost = measure(source, sink, modifier, expected, args.presses, args.warmup)
+            report(name, samples)
+            results['paths'][name] = summary(samples, wrong, lost)
+        device.close()
+    finally:
+        stop.set()
+        if guard is not None:
+            guard.join(timeout=5)
+            if guard.is_alive():
+                guard.terminate()
+        source.close()
+
+    try:
+        on_press = timings.get(timeout=1)
+    except Exception:
+        on_press = None
+    if on_press:
+        results['guard_on_press'] = on_press
+        print(f"guard on_press: avg={on_press['avg_us']:.1f}us max={on_press['max_us']:.1f}us")
+    for name, stats in results['paths'].items():
+        if stats['wrong'] or stats['lost']:
+            print(f"WARNING: {name}: {stats['wrong']} wrong-shape, {stats['lost']} lost presses")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Enter path under a synthetic 100 Hz Enter storm
+
+Replays two storms on a virtual clock: Enter held down (OS autorepeat
+at 100 Hz) and a macro tapping Enter at 100 Hz. Each is run once through
+the unprotected path, with a foreground query and a four-event
+Shift+Enter injection per event, and once through GuardMachine with
+NewlineCoalescer. The report
+shows hook-thread time per event, foreground queries, injected key
+events, and how many Enters were coalesced or shed.
+
+Usage:
+    python benchmarks/bench_enter_storm.py [--seconds S] [--query-us US]
+"""
+
+import argparse
+import time
+
+from _util import report
+from utils.stats import GuardStats
+from utils.config import MODIFIER_STATES
+from utils.state_machine import GuardMachine, ACT_DECIDE, ACT_REPEAT_NEWLINE, ACT_SHED, ACT_NEWLINE
+from utils.storm import NewlineCoalescer, DEFAULT_RATE, DEFAULT_BURST
+from utils.timer_wheel import TimerWheel, VirtualClock
+
+HZ = 100
+
+
+def spin(microseconds):
+    end = time.perf_counter() + microseconds / 1e6
+    while time.perf_counter() < end:
+        pass
+
+
+def storm_events(seconds, held):
+    """(time, 'down'/'up') at 100 Hz"""
+    events = []
+    for i in range(int(seconds * HZ)):
+        t = i / HZ
+        events.append((t, 'down'))
+        if not held:
+            events.append((t + 0.004, 'up'))
+    if held:
+        events.append((seconds, 'up'))
+    return events
+
+
+def run(events, query_us, protected):
+    clock = VirtualClock()
+    stats = GuardStats()
+    wheel = TimerWheel(tick=0.005, clock=clock)
+    counts = {'queries': 0, 'injected': 0}
+
+    def query():
+        counts['queries'] += 1
+        spin(query_us)
+
+    def inject(newlines):
+        counts['injected'] += 2 + 2 * newlines  # Shift held once
+
+    machine = GuardMachine([ACT_NEWLINE] * MODIFIER_STATES, DEFAULT_RATE, DEFAULT_BURST) if protected else None
+    coalescer = NewlineCoalescer(wheel, inject, stats=stats)
+    samples = []
+    for t, kind in events:
+        clock.now = t
+        wheel.advance()
+        if kind == 'up':
+            if machine:
+                machine.on_enter_up()
+            continue
+        begin = time.perf_counter()
+        if machine is None:
+            query()
+            counts['injected'] += 4
+        else:
+            action = machine.on_enter_down(t)
+            if action == ACT_DECIDE:
+                query()
+                counts['injected'] += 4
+                machine.record('converted', 0)
+            elif action == ACT_SHED:
+                stats.incr('enter_shed')
+            else:
+                stats.incr('enter_repeats')
+                if action == ACT_REPEAT_NEWLINE:
+                    coalescer.queue_newline()
+        samples.append(time.perf_counter() - begin)
+    clock.now += 1.0
+    wheel.advance()
+    return samples, counts, stats.counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--query-us', type=float, default=30.0, help='Cost of one foreground query')
+    args = parser.parse_args()
+
+    for held in (True, False):
+        name = 'held Enter' if held else 'macro taps'
+        events = storm_events(args.seconds, held)
+        for protected in (False, True):
+            label = f"{name}, {'GuardMachine' if protected else 'unprotected'}"
+            samples, counts, counters = run(events, args.query_us, protected)
+            report(label, samples)
+            print(f"    events={len(samples)} queries={counts['queries']} injected={counts['injected']} "
+                  f"repeats={counters.get('enter_repeats', 0)} coalesced={counters.get('enter_coalesced', 0)} "
+                  f"shed={counters.get('enter_shed', 0)}")
+
+
+if __name__ == '__main__':
+    main()
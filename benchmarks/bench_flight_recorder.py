@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Flight recorder cost per event
+
+Writes N key records and N decision records into a ring file in a
+temporary directory, timing each call, then decodes the ring once and
+reports how long a full read takes while the file stays mapped.
+
+Usage:
+    python benchmarks/bench_flight_recorder.py [--events N] [--slots S]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from _util import report
+from utils.flight_recorder import FlightRecorder, read_records, KEY_CLASS_ENTER
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=200_000)
+    parser.add_argument('--slots', type=int, default=65536)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'flight.rec')
+        recorder = FlightRecorder(path, slots=args.slots)
+        recorder.open()
+        perf_counter = time.perf_counter
+
+        key, decision = recorder.key, recorder.decision
+        key_samples, decision_samples = [], []
+        for _ in range(args.events):
+            begin = perf_counter()
+            key(KEY_CLASS_ENTER, True, 0)
+            key_samples.append(perf_counter() - begin)
+            begin = perf_counter()
+            decision('converted', 0)
+            decision_samples.append(perf_counter() - begin)
+        report('key record', key_samples)
+        report('decision record', decision_samples)
+
+        begin = perf_counter()
+        records = read_records(path)
+        elapsed = perf_counter() - begin
+        print(f"read {len(records)} records in {elapsed * 1e3:.1f} ms (ring still mapped)")
+        recorder.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Worst-case callback latency under allocation churn on other threads
+
+A callback thread is woken at a fixed rate while a churn thread keeps
+creating cyclic garbage on top of a large live heap (standing in for the
+GUI). Each mode runs in a fresh subprocess so GC state does not leak
+between runs.
+
+Usage:
+    python benchmarks/bench_gc_pauses.py [--seconds S]
+"""
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import threading
+import time
+
+from _util import report
+from utils.gc_tuning import prepare_hook_gc
+from utils.stats import GuardStats
+
+WAKE_INTERVAL = 0.002
+
+
+def churn(stop):
+    """Create reference cycles; one in ten survives long enough to reach gen2"""
+    survivors = []
+    while not stop.is_set():
+        for i in range(1000):
+            a = {}
+            b = [a]
+            a['b'] = b
+            if i % 10 == 0:
+                survivors.append(b)
+        if len(survivors) > 200000:
+            survivors = []
+
+
+def run_mode(mode, seconds):
+    # Large live heap so full collections are expensive
+    live = [{'i': i, 'v': [i]} for i in range(300000)]
+
+    stats = GuardStats()
+    recorder = None
+    if mode == 'tuned':
+        recorder = prepare_hook_gc(stats)
+    else:
+        from utils.gc_tuning import GCPauseRecorder
+        recorder = GCPauseRecorder(stats)
+        recorder.install()
+
+    stop = threading.Event()
+    churner = threading.Thread(target=churn, args=(stop,), daemon=True)
+    churner.start()
+
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        slept = time.perf_counter()
+        time.sleep(WAKE_INTERVAL)
+        # Callback body: a few small allocations, like on_press
+        entry = {'event': 'enter', 'action': 'converted'}
+        stats.observe('on_press', 0.0)
+        latencies.append(time.perf_counter() - slept - WAKE_INTERVAL)
+        del entry
+
+    stop.set()
+    churner.join()
+    recorder.uninstall()
+    del live
+    return {'latencies': latencies, 'gc': stats.snapshot()['timings']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--mode', choices=('default', 'tuned'))
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.seconds)))
+        return
+
+    for mode in ('default', 'tuned'):
+        output = subprocess.run(
+            [sys.executable, __file__, '--mode', mode, '--seconds', str(args.seconds)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output)
+        report(f"callback wake latency ({mode} gc)", result['latencies'])
+        for name, timing in sorted(result['gc'].items()):
+            if name.startswith('gc_gen'):
+                print(f"    {name}: {timing['count']} collections, "
+                      f"avg {timing['avg_us']:.0f}us, max {timing['max_us']:.0f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Key callback jitter under synthetic GUI load, with and without hook isolation
+
+A generator process emits timestamped "key events" at a fixed rate. The
+callback runs either on a thread inside the GUI process (current default)
+or in a spawned child like utils.hook_process. Meanwhile the GUI process
+runs pure-Python work standing in for tkinter/PIL/rumps activity.
+
+Usage:
+    python benchmarks/bench_hook_isolation.py [--events N] [--rate HZ]
+"""
+
+import argparse
+import multiprocessing
+import threading
+import time
+
+from _util import report
+
+
+def generator(conn, events, rate):
+    """Emit perf_counter timestamps at a fixed rate (stands in for the OS)"""
+    interval = 1.0 / rate
+    next_at = time.perf_counter()
+    for _ in range(events):
+        next_at += interval
+        while time.perf_counter() < next_at:
+            time.sleep(max(0.0, next_at - time.perf_counter() - 0.0005))
+        conn.send(time.perf_counter())
+    conn.send(None)
+
+
+def callback_loop(conn, results):
+    """Receive events and record wake latency (stands in for on_press)"""
+    latencies = []
+    while True:
+        sent = conn.recv()
+        if sent is None:
+            break
+        latencies.append(time.perf_counter() - sent)
+    results.send(latencies)
+
+
+def gui_load(stop):
+    """Pure-Python busy work holding the GIL (image resizing, widget layout)"""
+    while not stop.is_set():
+        pixels = [(i * 31) % 255 for i in range(20000)]
+        sorted(pixels)
+        sum(p * p for p in pixels)
+
+
+def run(mode, events, rate, load):
+    ctx = multiprocessing.get_context('spawn')
+    event_recv, event_send = ctx.Pipe(duplex=False)
+    result_recv, result_send = ctx.Pipe(duplex=False)
+
+    if mode == 'isolated':
+        callback = ctx.Process(target=callback_loop, args=(event_recv, result_send), daemon=True)
+    else:
+        callback = threading.Thread(target=callback_loop, args=(event_recv, result_send), daemon=True)
+    callback.start()
+
+    stop = threading.Event()
+    loaders = [threading.Thread(target=gui_load, args=(stop,), daemon=True) for _ in range(load)]
+    for t in loaders:
+        t.start()
+
+    source = ctx.Process(target=generator, args=(event_send, events, rate), daemon=True)
+    source.start()
+    latencies = result_recv.recv()
+    stop.set()
+    for t in loaders:
+        t.join()
+    source.join()
+    callback.join()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--rate', type=float, default=100.0)
+    args = parser.parse_args()
+
+    for load in (0, 1, 2):
+        for mode in ('in-process', 'isolated'):
+            latencies = run(mode, args.events, args.rate, load)
+            report(f"{mode}, {load} GUI load thread(s)", latencies)
+
+
+if __name__ == '__main__':
+    main()
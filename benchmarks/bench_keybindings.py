@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Keybinding lookup with large binding sets
+
+Compiles bindings over a synthetic key universe (the guard itself binds
+only the Enter keys) and compares the flat table lookup against scanning
+the binding list for each key event, at several binding-set sizes.
+
+Usage:
+    python benchmarks/bench_keybindings.py [--events N]
+"""
+
+import argparse
+import random
+import time
+
+from _util import report
+from utils.config import compile_keybindings, parse_chord, primary_modifier, KEY_ACTIONS, MODIFIER_STATES
+
+MODIFIER_ORDER = ('shift', 'ctrl', 'alt', 'cmd')
+
+
+def make_spec(rng, keys, count):
+    spec = {}
+    while len(spec) < count:
+        key = rng.choice(list(keys))
+        mask = rng.randrange(MODIFIER_STATES)
+        chord = '+'.join([name for bit, name in enumerate(MODIFIER_ORDER) if mask & (1 << bit)] + [key])
+        spec[chord] = rng.choice(KEY_ACTIONS)
+    return spec
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    keys = {f'key{i}': i for i in range(256)}
+    primary = primary_modifier(False)
+    events = [(rng.randrange(len(keys)), rng.randrange(MODIFIER_STATES)) for _ in range(args.events)]
+
+    for count in (2, 32, 512, 4096):
+        spec = make_spec(rng, keys, count)
+
+        start = time.perf_counter()
+        bindings = compile_keybindings(spec, is_mac=False, keys=keys)
+        print(f"compile {count} bindings: {(time.perf_counter() - start) * 1e3:.2f}ms")
+
+        parsed = [(parse_chord(chord, primary, keys), action) for chord, action in spec.items()]
+
+        def scan(key_id, mask):
+            for chord, action in parsed:
+                if chord == (mask, key_id):
+                    return action
+            return 'pass' if mask & primary else 'newline'
+
+        samples, expected = [], []
+        for key_id, mask in events:
+            begin = time.perf_counter()
+            expected.append(scan(key_id, mask))
+            samples.append(time.perf_counter() - begin)
+        report(f"linear scan, {count} bindings", samples)
+
+        samples, results = [], []
+        for key_id, mask in events:
+            begin = time.perf_counter()
+            results.append(bindings.lookup(key_id, mask))
+            samples.append(time.perf_counter() - begin)
+        report(f"flat table, {count} bindings", samples)
+        assert results == expected, "compiled table disagrees with the binding scan"
+
+
+if __name__ == '__main__':
+    main()
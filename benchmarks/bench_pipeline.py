@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Per-stage and fused-chain cost of the Enter pipeline
+
+Builds the guard's Enter stages from the real components (IME tracker,
+channel rules, compiled keybindings, stats) with the OS queries and key
+injection replaced by constants, then times each stage alone, the fused
+chain with every stage enabled and with the minimal set, and the
+stage-by-stage interpreter for comparison.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--events N]
+"""
+
+import argparse
+import time
+
+from _util import report
+from utils.channel_rules import ChannelRules, ACTION_OFF
+from utils.config import compile_keybindings, DEFAULT_CONFIG, MODIFIER_STATES
+from utils.ime import CompositionTracker
+from utils.pipeline import Stage, fuse, run_unfused, FILTER, CLASSIFY, TRANSFORM, OBSERVE
+from utils.stats import GuardStats
+
+
+def make_stages(stats):
+    ime = CompositionTracker(stats)
+    rules = ChannelRules([(f'#channel-{i}', ACTION_OFF) for i in range(100)], stats=stats)
+    rules.on_title('#general | Acme - Discord')
+    row = compile_keybindings(DEFAULT_CONFIG['keybindings'], is_mac=False).table[:MODIFIER_STATES]
+
+    def transform(action, mask):
+        return ('converted', False) if action == 'newline' else ('send', True)
+
+    return [
+        Stage('ime_confirm', FILTER,
+              lambda mask: 'ime_confirm' if ime.enter_confirms_composition() else None),
+        Stage('discord_active', FILTER, lambda mask: None),
+        Stage('channel_rules', FILTER,
+              lambda mask: 'channel_off' if rules.action == ACTION_OFF else None),
+        Stage('keybindings', CLASSIFY, row.__getitem__),
+        Stage('convert', TRANSFORM, transform),
+        Stage('stats', OBSERVE, lambda outcome, mask: stats.incr(f'enter_{outcome}')),
+        Stage('trace', OBSERVE, lambda outcome, mask: stats.trace('enter', action=outcome)),
+    ]
+
+
+def time_calls(call, events):
+    samples = []
+    for _ in range(events):
+        begin = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - begin)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=50000)
+    args = parser.parse_args()
+
+    stats = GuardStats()
+    stages = make_stages(stats)
+
+    for stage in stages:
+        if stage.kind == FILTER or stage.kind == CLASSIFY:
+            call = lambda f=stage.func: f(0)
+        elif stage.kind == TRANSFORM:
+            call = lambda f=stage.func: f('newline', 0)
+        else:
+            call = lambda f=stage.func: f('converted', 0)
+        report(f"stage {stage.name}", time_calls(call, args.events))
+
+    minimal = [stage for stage in stages if stage.name in ('discord_active', 'keybindings', 'convert')]
+    fused_minimal = fuse(minimal)
+    report("fused, minimal stages", time_calls(lambda: fused_minimal(0), args.events))
+
+    fused_all = fuse(stages)
+    report("fused, all stages", time_calls(lambda: fused_all(0), args.events))
+    report("unfused interpreter, all stages", time_calls(lambda: run_unfused(stages, 0), args.events))
+
+    print()
+    print(fused_all.source)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Second-launch hand-off benchmark
+
+Starts a holder process that owns the instance lock and serves the control
+socket, then measures how long a second launch takes to detect it, forward
+its intent and exit.
+
+Usage:
+    python benchmarks/bench_single_instance.py [--launches N]
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _util import ROOT, report
+from utils.single_instance import acquire_or_hand_off
+
+HOLDER = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+from utils.single_instance import InstanceLock
+from utils.control import ControlServer
+lock = InstanceLock(sys.argv[2]); assert lock.acquire()
+server = ControlServer({'toggle': lambda args: True}, path=sys.argv[3]); server.start()
+print('ready', flush=True)
+sys.stdin.read()
+"""
+
+SECOND_LAUNCH = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from utils.single_instance import acquire_or_hand_off
+sys.exit(0 if acquire_or_hand_off('toggle', sys.argv[2], sys.argv[3]) is None else 1)
+"""
+
+
+def time_process(argv, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        subprocess.run(argv, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--launches', type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lock_path = Path(tmp) / "instance.lock"
+        socket_path = Path(tmp) / "control.sock"
+        holder = subprocess.Popen(
+            [sys.executable, '-c', HOLDER, ROOT, str(lock_path), str(socket_path)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        try:
+            holder.stdout.readline()
+
+            samples = []
+            for _ in range(args.launches * 10):
+                start = time.perf_counter()
+                assert acquire_or_hand_off('toggle', lock_path, socket_path) is None
+                samples.append(time.perf_counter() - start)
+            report("detect + forward (in process)", samples)
+
+            report("interpreter start/exit (baseline)",
+                   time_process([sys.executable, '-c', 'pass'], args.launches), "ms", 1e3)
+            report("second launch to exit",
+                   time_process([sys.executable, '-c', SECOND_LAUNCH, ROOT,
+                                 str(lock_path), str(socket_path)], args.launches), "ms", 1e3)
+        finally:
+            holder.stdin.close()
+            holder.wait()
+
+
+if __name__ == '__main__':
+    main()
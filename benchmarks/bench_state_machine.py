@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Guard state machine throughput: NumPy batch vs. event-by-event stepping
+
+Generates a synthetic key stream (Enters, modifiers, other keys, a
+changing frontmost app, bursts of autorepeat), evaluates it once with
+GuardMachine.step() per event and once with run_batch(), checks that both
+give the same actions and prints events per second for each.
+
+Usage:
+    python benchmarks/bench_state_machine.py [--events N] [--rate R]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import _util  # noqa: F401  (project root on sys.path)
+from utils.config import compile_keybindings, DEFAULT_CONFIG, MODIFIER_STATES
+from utils.state_machine import GuardMachine, binding_codes, run_batch, KEY_OTHER
+
+DISCORD = 1
+
+
+def key_stream(count, seed=44):
+    """Random (timestamps, key_ids, downs, app_ids) arrays"""
+    rng = np.random.default_rng(seed)
+    timestamps = np.cumsum(rng.choice([0.0, 0.001, 0.01, 0.03, 0.2], size=count))
+    key_ids = rng.choice(np.arange(KEY_OTHER + 1), size=count, p=[0.4, 0.1, 0.05, 0.05, 0.1, 0.3])
+    downs = rng.random(count) < 0.6
+    app_ids = rng.choice([DISCORD, DISCORD, 2, 3], size=count)
+    return timestamps, key_ids, downs, app_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=2_000_000)
+    parser.add_argument('--rate', type=float, default=40.0, help='Enter rate limit (0: none)')
+    parser.add_argument('--burst', type=int, default=20)
+    args = parser.parse_args()
+
+    table = compile_keybindings(DEFAULT_CONFIG['keybindings'], True).table
+    codes = binding_codes(table[:MODIFIER_STATES])
+    timestamps, key_ids, downs, app_ids = key_stream(args.events)
+
+    begin = time.perf_counter()
+    batch = run_batch(timestamps, key_ids, downs, app_ids, [DISCORD], codes, args.rate, args.burst)
+    batch_seconds = time.perf_counter() - begin
+
+    machine = GuardMachine(codes, args.rate, args.burst)
+    step = machine.step
+    rows = zip(timestamps.tolist(), key_ids.tolist(), downs.tolist(), (app_ids == DISCORD).tolist())
+    begin = time.perf_counter()
+    stepped = [step(t, key_id, down, discord) for t, key_id, down, discord in rows]
+    step_seconds = time.perf_counter() - begin
+
+    if batch.tolist() != stepped:
+        raise SystemExit("run_batch() and GuardMachine.step() disagree")
+    for name, seconds in (('run_batch', batch_seconds), ('step loop', step_seconds)):
+        print(f"{name:<12} {args.events / seconds / 1e6:8.2f} M events/s  ({seconds * 1e3:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Hook thread wake latency under CPU saturation, default vs raised priority (Linux)
+
+Background processes spin on every CPU while a thread standing in for the
+hook sleeps for short intervals; the overshoot of each sleep is the wake
+latency a key callback would see.
+
+Usage:
+    python benchmarks/bench_thread_priority.py [--wakes N] [--hogs N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+
+from _util import report
+from utils.scheduling import raise_thread_priority
+
+WAKE_INTERVAL = 0.001
+
+
+def hog(stop):
+    while not stop.is_set():
+        pass
+
+
+def measure(wakes, raise_priority):
+    result = {}
+
+    def run():
+        result['policy'] = raise_thread_priority() if raise_priority else 'default'
+        samples = []
+        for _ in range(wakes):
+            start = time.perf_counter()
+            time.sleep(WAKE_INTERVAL)
+            samples.append(time.perf_counter() - start - WAKE_INTERVAL)
+        result['samples'] = samples
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return result['policy'], result['samples']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--wakes', type=int, default=2000)
+    parser.add_argument('--hogs', type=int, default=(os.cpu_count() or 1) * 2)
+    args = parser.parse_args()
+
+    policy, samples = measure(args.wakes, False)
+    report("idle, default priority", samples)
+
+    stop = multiprocessing.Event()
+    hogs = [multiprocessing.Process(target=hog, args=(stop,), daemon=True) for _ in range(args.hogs)]
+    for p in hogs:
+        p.start()
+    try:
+        time.sleep(0.5)
+        policy, samples = measure(args.wakes, False)
+        report(f"{args.hogs} CPU hogs, default priority", samples)
+        policy, samples = measure(args.wakes, True)
+        report(f"{args.hogs} CPU hogs, {policy}", samples)
+    finally:
+        stop.set()
+        for p in hogs:
+            p.join()
+
+
+if __name__ == '__main__':
+    main()
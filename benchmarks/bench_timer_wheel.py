@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Timing wheel overhead and accuracy with thousands of pending timers
+
+Measures schedule() and cancel() while N timers are pending (compared
+with starting and cancelling a threading.Timer), then lets the wheel
+thread fire N timers with random delays and reports how late each fired
+relative to its deadline.
+
+Usage:
+    python benchmarks/bench_timer_wheel.py [--timers N] [--tick SECONDS]
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from _util import report
+from utils.timer_wheel import TimerWheel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--timers', type=int, default=5000)
+    parser.add_argument('--tick', type=float, default=0.005)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    wheel = TimerWheel(tick=args.tick)
+
+    background = [wheel.schedule(rng.uniform(10, 20), lambda: None) for _ in range(args.timers)]
+    schedule_samples, cancel_samples = [], []
+    for _ in range(args.timers):
+        delay = rng.uniform(0.01, 0.5)
+        begin = time.perf_counter()
+        timer = wheel.schedule(delay, lambda: None)
+        schedule_samples.append(time.perf_counter() - begin)
+        begin = time.perf_counter()
+        wheel.cancel(timer)
+        cancel_samples.append(time.perf_counter() - begin)
+    report(f"schedule, {args.timers} pending", schedule_samples)
+    report(f"cancel, {args.timers} pending", cancel_samples)
+    for timer in background:
+        wheel.cancel(timer)
+
+    thread_samples = []
+    for _ in range(min(args.timers, 500)):
+        begin = time.perf_counter()
+        timer = threading.Timer(10, lambda: None)
+        timer.start()
+        timer.cancel()
+        thread_samples.append(time.perf_counter() - begin)
+    report("threading.Timer start+cancel", thread_samples)
+
+    lateness = []
+    remaining = threading.Semaphore(0)
+
+    def fired(deadline):
+        lateness.append(time.monotonic() - deadline)
+        remaining.release()
+
+    wheel.start()
+    try:
+        for _ in range(args.timers):
+            delay = rng.uniform(0.01, 1.0)
+            wheel.schedule(delay, fired, time.monotonic() + delay)
+        for _ in range(args.timers):
+            remaining.acquire()
+    finally:
+        wheel.stop()
+    report(f"lateness, {args.timers} timers, tick {args.tick * 1e3:g}ms", lateness)
+    print(f"early fires: {sum(late < 0 for late in lateness)}")
+
+
+if __name__ == '__main__':
+    main()
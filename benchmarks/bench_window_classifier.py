@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Window classifier accuracy and cost against a corpus of real window titles
+
+Every corpus entry is classified cold (title parsing and matching), then a
+stream of Enter checks that mostly stays in the same window measures the
+cached path and the cache hit rate.
+
+Usage:
+    python benchmarks/bench_window_classifier.py [--checks N] [--switch-every N]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from _util import report
+from utils.browser import WindowClassifier, classify_window
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'data', 'window_titles.tsv')
+
+
+def load_corpus(path=CORPUS):
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip() or line.startswith('#'):
+                continue
+            expected, app, title = line.rstrip('\n').split('\t')
+            entries.append((expected == '1', app, title))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--checks', type=int, default=100000)
+    parser.add_argument('--switch-every', type=int, default=20,
+                        help='Average Enters between window/title changes')
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    wrong = [(app, title) for expected, app, title in corpus
+             if classify_window(app, title) != expected]
+    print(f"corpus: {len(corpus)} titles, {len(corpus) - len(wrong)} correct")
+    for app, title in wrong:
+        print(f"  misclassified: [{app}] {title}")
+
+    samples = []
+    for _ in range(20):
+        for _, app, title in corpus:
+            start = time.perf_counter()
+            classify_window(app, title)
+            samples.append(time.perf_counter() - start)
+    report("cold classification", samples)
+
+    rng = random.Random(0)
+    classifier = WindowClassifier()
+    describe_calls = 0
+    samples = []
+    current = rng.randrange(len(corpus))
+    for _ in range(args.checks):
+        if rng.random() < 1.0 / args.switch_every:
+            current = rng.randrange(len(corpus))
+        _, app, title = corpus[current]
+
+        def describe(app=app):
+            nonlocal describe_calls
+            describe_calls += 1
+            return app, None
+
+        start = time.perf_counter()
+        classifier.classify(current, title, describe)
+        samples.append(time.perf_counter() - start)
+    report("Enter checks through the cache", samples)
+    print(f"cache hit rate: {1 - describe_calls / args.checks:.4f} "
+          f"({describe_calls} lookups for {args.checks} checks, {len(classifier)} cached windows)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Per-Enter latency of the X11 backend
+
+A dummy window with WM_CLASS "discord" is focused and marked active; Enter
+is typed through XTest and timed until the window receives it. The guard
+runs once disabled (no grab, baseline delivery) and once enabled (grab,
+Shift+Enter injection on the pooled connection).
+
+Run under a throwaway X server:
+    xvfb-run -a python benchmarks/bench_x11_enter.py [--presses N]
+"""
+
+import argparse
+import threading
+import time
+
+from Xlib import X, XK, display as xdisplay
+from Xlib.ext import xtest
+
+from _util import report
+from backends.x11_backend import X11Guard
+
+
+def make_discord_window(client):
+    root = client.screen().root
+    window = root.create_window(
+        0, 0, 100, 100, 0, client.screen().root_depth,
+        event_mask=X.KeyPressMask,
+    )
+    window.set_wm_class('discord', 'discord')
+    window.map()
+    window.set_input_focus(X.RevertToParent, X.CurrentTime)
+    root.change_property(
+        client.intern_atom('_NET_ACTIVE_WINDOW'), client.intern_atom('WINDOW'), 32, [window.id],
+    )
+    client.sync()
+    return window
+
+
+def measure(client, presses):
+    keycode = client.keysym_to_keycode(XK.XK_Return)
+    samples = []
+    for _ in range(presses):
+        start = time.perf_counter()
+        xtest.fake_input(client, X.KeyPress, keycode)
+        xtest.fake_input(client, X.KeyRelease, keycode)
+        client.flush()
+        while True:
+            event = client.next_event()
+            if event.type == X.KeyPress and event.detail == keycode:
+                break
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--presses', type=int, default=2000)
+    args = parser.parse_args()
+
+    client = xdisplay.Display()
+    make_discord_window(client)
+
+    guard = X11Guard()
+    runner = threading.Thread(target=guard.start, daemon=True)
+    runner.start()
+    while not guard.grabbed:
+        time.sleep(0.01)
+
+    try:
+        guard.enabled = False
+        while guard.grabbed:
+            time.sleep(0.01)
+        report("disabled (no grab)", measure(client, args.presses))
+
+        guard.enabled = True
+        while not guard.grabbed:
+            time.sleep(0.01)
+        report("enabled (grab + XTest Shift+Enter)", measure(client, args.presses))
+
+        timing = guard.stats.snapshot()['timings']['on_press']
+        print(f"guard on_press: avg={timing['avg_us']:.1f}us max={timing['max_us']:.1f}us")
+    finally:
+        guard.stop()
+        runner.join()
+        guard.close()
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Differential replay of the guard decision logic between two versions
+
+The same key stream is stepped through two versions of the guard, each
+loaded from a git revision or a source tree. Every differing decision is
+printed with the events before it, along with the throughput of each
+version. Streams are processed in chunks, so recordings of any length
+replay in bounded memory. Runs offline; nothing reads input devices.
+
+Engines (--engine): "guard" (default) drives each version's
+DiscordSendGuard key callbacks with a fake keyboard and foreground, so any
+change on the Enter path shows up, in any revision. "machine" steps only
+utils/state_machine.py: much faster, but blind to everything outside it.
+See utils/replay_diff.py for what the guard engine does not replay.
+
+Sources (--a / --b): a git revision (HEAD, v2.0.0, a branch, ...) or a
+source tree. The default compares HEAD with the working tree.
+
+Streams: synthetic typing (--events N, --seed S), a flight recorder ring
+(--recording flight.ring) or JSON lines with one
+{"t": 1.5, "key": "enter", "down": true, "discord": true} per line
+(--recording keys.jsonl[.gz]). --save writes the stream as JSON lines.
+
+Exits 1 when any decision differs.
+
+Usage:
+    python benchmarks/replay_diff.py [--engine guard|machine] [--a REV] [--b REV|DIR]
+                                     [--events N | --recording FILE]
+"""
+
+import argparse
+import json
+import sys
+
+from _util import ROOT
+from utils.config import DEFAULT_CONFIG
+from utils.replay_diff import (
+    DEFAULT_CHUNK, DEFAULT_CONTEXT, Engine, GuardEngine, ReplayError, diff_replay, format_difference,
+    jsonl_events, recorder_events, synthetic_events, write_jsonl,
+)
+
+
+def open_stream(args):
+    if not args.recording:
+        return synthetic_events(args.events, args.seed)
+    if args.recording.endswith(('.jsonl', '.jsonl.gz', '.json', '.json.gz')):
+        return jsonl_events(args.recording)
+    return recorder_events(args.recording)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--a', default='HEAD', help='First version: git revision or source tree (default: HEAD)')
+    parser.add_argument('--b', default=ROOT, help='Second version (default: the working tree)')
+    parser.add_argument('--engine', choices=('guard', 'machine'), default='guard',
+                        help='Replay the whole guard (default) or only the state machine')
+    parser.add_argument('--events', type=int,
+                        help='Synthetic events to generate (default: 200000 for guard, 1000000 for machine)')
+    parser.add_argument('--seed', type=int, default=50, help='Synthetic stream seed')
+    parser.add_argument('--recording', help='Flight recorder ring or JSON-lines recording to replay')
+    parser.add_argument('--save', help='Write the stream as JSON lines instead of replaying it')
+    parser.add_argument('--keybindings', help='keybindings as JSON (default: the built-in defaults)')
+    parser.add_argument('--mac', action='store_true', help='Resolve "mod" to Cmd')
+    parser.add_argument('--rate', type=float, default=0.0, help='Enter rate limit per second (0: none)')
+    parser.add_argument('--burst', type=int, default=0, help='Rate limit burst')
+    parser.add_argument('--no-repeats', action='store_true', help='Decide autorepeats independently')
+    parser.add_argument('--context', type=int, default=DEFAULT_CONTEXT, help='Events shown before each difference')
+    parser.add_argument('--max-diffs', type=int, default=50, help='Differences printed (all are counted)')
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK, help='Events evaluated at a time')
+    parser.add_argument('--json', help='Write the summary to this file')
+    args = parser.parse_args()
+    if args.events is None:
+        args.events = 200_000 if args.engine == 'guard' else 1_000_000
+
+    try:
+        if args.save:
+            written = write_jsonl(open_stream(args), args.save)
+            print(f"{written} events written to {args.save}")
+            return
+        keybindings = json.loads(args.keybindings) if args.keybindings else DEFAULT_CONFIG['keybindings']
+        label_b = 'worktree' if args.b == ROOT else args.b
+        engine = GuardEngine if args.engine == 'guard' else Engine
+        engine_a = engine.load(args.a)
+        engine_b = engine.load(args.b, label_b)
+        result = diff_replay(
+            engine_a, engine_b, open_stream(args), keybindings, args.mac, args.rate, args.burst,
+            not args.no_repeats, args.chunk, args.context, args.max_diffs,
+        )
+    except (ReplayError, ValueError) as e:
+        sys.exit(f"replay_diff: {e}")
+
+    for difference in result.shown:
+        print(format_difference(difference, engine_a.label, engine_b.label))
+    if result.differences > len(result.shown):
+        print(f"... {result.differences - len(result.shown)} more differences not shown")
+
+    print(f"\n{result.events} events, {result.differences} differing decisions")
+    for (action_a, action_b), count in result.pairs.most_common():
+        print(f"  {engine_a.label}={action_a} {engine_b.label}={action_b}: {count}")
+    throughput = {}
+    for engine, seconds in ((engine_a, result.seconds_a), (engine_b, result.seconds_b)):
+        rate = result.events / seconds if seconds else 0.0
+        throughput[engine.label] = round(rate)
+        print(f"{engine.label:<12} {seconds:8.3f}s  {rate / 1e6:6.2f}M events/s")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'engine': args.engine,
+                'a': engine_a.label,
+                'b': engine_b.label,
+                'events': result.events,
+                'differences': result.differences,
+                'pairs': [{'a': a, 'b': b, 'count': n} for (a, b), n in result.pairs.most_common()],
+                'events_per_second': throughput,
+            }, f, indent=2)
+        print(f"Results written to {args.json}")
+    if result.differences:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Long-running soak test for memory, thread and handle leaks
+
+Replays a synthetic key stream (typing, Enter with and without
+modifiers, held-Enter autorepeat) through the real DiscordSendGuard
+callbacks while cycling the menu bar app's toggle, config reload and
+settings/permission-guide windows thousands of times. Keyboard hook,
+key injection, foreground query and (without a display) Tk are fakes;
+everything else - timers, foreground pollers, the flight recorder,
+the pipeline rebuilds - is the real code.
+
+After a warm-up the harness samples RSS, live threads, open file
+descriptors, memory mappings and tracemalloc's traced memory once per
+round, and fails (exit code 1) if any of them grew past its threshold
+by the end, printing the allocation sites that grew the most.
+
+Runs headless on Linux. HOME is pointed at a temporary directory so the
+config, flight recorder and logs never touch the real ones.
+
+Usage:
+    python benchmarks/soak.py [--events N] [--cycles N] [--rounds N]
+                              [--max-rss-growth-mb MB] [--no-tracemalloc]
+"""
+
+import argparse
+import enum
+import gc
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+
+# Sandbox before anything reads Path.home()
+_SANDBOX = tempfile.TemporaryDirectory(prefix='dsg-soak-')
+os.environ['HOME'] = _SANDBOX.name
+if not os.environ.get('DISPLAY'):
+    os.environ.setdefault('PYNPUT_BACKEND', 'dummy')
+
+import _util  # noqa: E402,F401  (project root on sys.path)
+
+CHUNK_EVENTS = 100_000
+
+
+class FakeKey(enum.Enum):
+    """Distinct stand-ins for pynput keys (the dummy backend compares them all equal)"""
+    enter = 'enter'
+    shift = 'shift'
+    ctrl = 'ctrl'
+    alt = 'alt'
+    cmd = 'cmd'
+    backspace = 'backspace'
+    esc = 'esc'
+    char = 'char'
+    space = 'space'
+
+
+class FakeListener:
+    """Stands in for keyboard.Listener: runs until stop()"""
+
+    def __init__(self):
+        self._stopped = threading.Event()
+        self.joined = threading.Event()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        self._stopped.set()
+
+    def join(self, timeout=None):
+        self.joined.set()
+        self._stopped.wait(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class CountingController:
+    """Stands in for keyboard.Controller: counts injected key events"""
+
+    def __init__(self):
+        self.events = 0
+        self._pressed = _Pressed(self)
+
+    def press(self, key):
+        self.events += 1
+
+    def release(self, key):
+        self.events += 1
+
+    def pressed(self, *keys):
+        self.events += 2 * len(keys)
+        return self._pressed
+
+
+class _Pressed:
+    def __init__(self, controller):
+        self.controller = controller
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def install_fake_keys(dsg):
+    """Give the guard module distinct keys and a fake listener"""
+    dsg.Key = FakeKey
+    dsg.MODIFIER_KEYS = {
+        dsg.MOD_SHIFT: (FakeKey.shift,), dsg.MOD_CTRL: (FakeKey.ctrl,),
+        dsg.MOD_ALT: (FakeKey.alt,), dsg.MOD_CMD: (FakeKey.cmd,),
+    }
+
+
+def install_fake_tk():
+    """Minimal tkinter replacement for window open/close cycles without a display"""
+
+    class Widget:
+        def __init__(self, *args, **kwargs):
+            self.options = kwargs
+            self.children = []
+            if args and isinstance(args[0], Widget):
+                args[0].children.append(self)
+
+        def __getattr__(self, name):
+            return _noop
+
+        def destroy(self):
+            self.children = []
+
+        def mainloop(self):
+            # A user opens the window and closes it again
+            self.destroy()
+
+    class BooleanVar:
+        def __init__(self, value=False, **kwargs):
+            self.value = value
+
+        def get(self):
+            return self.value
+
+        def set(self, value):
+            self.value = value
+
+    tk = types.ModuleType('tkinter')
+    ttk = types.ModuleType('tkinter.ttk')
+    messagebox = types.ModuleType('tkinter.messagebox')
+    for name in ('BOTH', 'BOTTOM', 'CENTER', 'DISABLED', 'LEFT', 'NORMAL', 'RIGHT', 'W', 'X', 'Y', 'END'):
+        setattr(tk, name, name.lower())
+    tk.Tk = tk.Toplevel = Widget
+    tk.BooleanVar = tk.StringVar = BooleanVar
+    for name in ('Frame', 'Label', 'Button', 'Checkbutton', 'LabelFrame', 'Entry'):
+        setattr(ttk, name, Widget)
+    for name in ('showinfo', 'showwarning', 'showerror', 'askyesno'):
+        setattr(messagebox, name, _noop)
+    tk.ttk, tk.messagebox = ttk, messagebox
+    sys.modules.update({'tkinter': tk, 'tkinter.ttk': ttk, 'tkinter.messagebox': messagebox})
+
+
+def install_real_tk_autoclose():
+    """With a display: close each real window right after it is shown"""
+    from gui.settings_window import SettingsWindow
+    from gui.permission_guide import PermissionGuideWindow
+
+    def show(self):
+        self.window.after(1, self.window.destroy)
+        self.window.mainloop()
+
+    SettingsWindow.show = PermissionGuideWindow.show = show
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+def key_stream(count, seed=46):
+    """(key, down) events: typing with Enters, chords and held-Enter autorepeat"""
+    rng = random.Random(seed)
+    events = []
+    while len(events) < count:
+        roll = rng.random()
+        if roll < 0.7:
+            key = FakeKey.char if rng.random() < 0.85 else rng.choice((FakeKey.space, FakeKey.backspace))
+            events += [(key, True), (key, False)]
+        elif roll < 0.85:
+            events += [(FakeKey.enter, True), (FakeKey.enter, False)]
+        elif roll < 0.95:
+            modifier = rng.choice((FakeKey.shift, FakeKey.ctrl, FakeKey.cmd, FakeKey.alt))
+            events += [(modifier, True), (FakeKey.enter, True), (FakeKey.enter, False), (modifier, False)]
+        else:
+            # Held Enter: OS autorepeat without key-ups
+            events += [(FakeKey.enter, True)] * rng.randint(5, 40) + [(FakeKey.enter, False)]
+    return events[:count]
+
+
+def sample():
+    """Current resource usage of this process (Linux /proc)"""
+    with open('/proc/self/status') as f:
+        status = dict(line.split(':', 1) for line in f if ':' in line)
+    with open('/proc/self/maps') as f:
+        maps = sum(1 for _ in f)
+    return {
+        'rss_mb': int(status['VmRSS'].split()[0]) / 1024,
+        'threads': threading.active_count(),
+        'os_threads': len(os.listdir('/proc/self/task')),
+        'fds': len(os.listdir('/proc/self/fd')),
+        'maps': maps,
+        'traced_mb': tracemalloc.get_traced_memory()[0] / 2**20 if tracemalloc.is_tracing() else 0.0,
+    }
+
+
+class Soak:
+    """Drives the guard and the app's control paths"""
+
+    def __init__(self, real_tk):
+        import discord_send_guard as dsg
+        from app import DiscordSendGuardApp
+        from utils.config import get_config
+
+        install_fake_keys(dsg)
+        self.dsg = dsg
+        self.discord_active = True
+
+        self.listener = None
+        soak = self
+
+        class SoakGuard(dsg.DiscordSendGuard):
+            def _create_listener(self):
+                soak.listener = FakeListener()
+                return soak.listener
+
+            def _query_discord_active(self):
+                return soak.discord_active
+
+        self.config = get_config()
+        self.config.set('raise_priority', False)
+        # Replay is not paced in real time: without this nearly every Enter would be shed
+        self.config.set('enter_rate_limit', 0)
+        self.guard = SoakGuard()
+        self.guard.keyboard_controller = CountingController()
+        self.guard.apply_config(self.config)
+
+        # The menu bar app without rumps: only its guard/control paths
+        app = DiscordSendGuardApp.__new__(DiscordSendGuardApp)
+        app.config = self.config
+        app.guard = self.guard
+        app.guard_thread = None
+        app._enable_lock = threading.RLock()
+        app.app = types.SimpleNamespace(menu={})
+        app.status_item = types.SimpleNamespace(title='')
+        self.app = app
+
+        if real_tk:
+            install_real_tk_autoclose()
+        from gui.settings_window import show_settings
+        from gui.permission_guide import show_permission_guide
+        self.show_settings = show_settings
+        self.show_permission_guide = show_permission_guide
+
+    def replay(self, events):
+        on_press, on_release = self.guard.on_press, self.guard.on_release
+        for key, down in events:
+            if down:
+                on_press(key)
+            else:
+                on_release(key)
+
+    def cycle(self, i, replay):
+        """One toggle, reload and window-open cycle; replay() runs while the guard listens"""
+        app = self.app
+        self.listener = None
+        app._set_enabled(True)
+        self._wait_listening()
+        self.discord_active = bool(i % 3)
+        replay()
+        app._reload_config()
+        app._set_enabled(False)
+        if i % 4 == 0:
+            self.config.save()
+        for target in (lambda: self.show_settings(self.config, self.guard), self.show_permission_guide):
+            thread = threading.Thread(target=target)
+            thread.start()
+            thread.join()
+
+    def _wait_listening(self, timeout=2.0):
+        """Wait until the guard thread is inside the listener (a stop() before that is not seen)"""
+        deadline = time.monotonic() + timeout
+        while self.listener is None and time.monotonic() < deadline:
+            time.sleep(0.0005)
+        if self.listener is not None:
+            self.listener.joined.wait(max(deadline - time.monotonic(), 0))
+
+    def shutdown(self):
+        self.app._set_enabled(False)
+
+
+def check(baseline, final, args):
+    """Threshold violations between the baseline and the final sample"""
+    limits = {
+        'rss_mb': args.max_rss_growth_mb,
+        'traced_mb': args.max_traced_growth_mb,
+        'threads': args.max_thread_growth,
+        'os_threads': args.max_thread_growth,
+        'fds': args.max_fd_growth,
+        'maps': args.max_map_growth,
+    }
+    failures = []
+    for name, limit in limits.items():
+        growth = final[name] - baseline[name]
+        if growth > limit:
+            failures.append(f"{name} grew by {growth:.2f} (limit {limit})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=20_000_000, help='Key events replayed in total')
+    parser.add_argument('--cycles', type=int, default=2000, help='Toggle/reload/window cycles in total')
+    parser.add_argument('--rounds', type=int, default=20, help='Samples after the warm-up')
+    parser.add_argument('--max-rss-growth-mb', type=float, default=16.0)
+    parser.add_argument('--max-traced-growth-mb', type=float, default=4.0)
+    parser.add_argument('--max-thread-growth', type=int, default=0)
+    parser.add_argument('--max-fd-growth', type=int, default=0)
+    parser.add_argument('--max-map-growth', type=int, default=8)
+    parser.add_argument('--no-tracemalloc', action='store_true', help='Faster, but no allocation sites')
+    parser.add_argument('--frames', type=int, default=1, help='Traceback depth kept by tracemalloc')
+    parser.add_argument('--top', type=int, default=10, help='Allocation sites to show')
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    if not os.environ.get('DISPLAY'):
+        install_fake_tk()
+    soak = Soak(real_tk=bool(os.environ.get('DISPLAY')))
+    chunk = key_stream(min(args.events, CHUNK_EVENTS))
+
+    def run_round(events, cycles, cycle_offset):
+        if not cycles:
+            soak.app._set_enabled(True)
+            soak._wait_listening()
+            replay_n(events)
+            soak.app._set_enabled(False)
+            return
+        for i in range(cycles):
+            share = events // cycles + (1 if i < events % cycles else 0)
+            soak.cycle(cycle_offset + i, lambda: replay_n(share))
+
+    def replay_n(n):
+        left = n
+        while left > 0:
+            soak.replay(chunk[:left])
+            left -= min(left, len(chunk))
+
+    # Warm-up: caches, interned strings, first-time imports
+    warm_events, warm_cycles = max(args.events // 20, 1), max(args.cycles // 20, 1)
+    run_round(warm_events, warm_cycles, 0)
+    gc.collect()
+    if not args.no_tracemalloc:
+        tracemalloc.start(args.frames)
+    baseline = sample()
+    baseline_snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+
+    events_per_round = max((args.events - warm_events) // args.rounds, 0)
+    cycles_per_round = max((args.cycles - warm_cycles) // args.rounds, 0)
+    print(f"{'round':>5} {'events':>11} {'cycles':>7} {'rss MB':>8} {'traced MB':>10} "
+          f"{'threads':>7} {'fds':>5} {'maps':>5} {'s':>7}")
+    print(f"{'base':>5} {0:>11} {0:>7} {baseline['rss_mb']:>8.1f} {baseline['traced_mb']:>10.2f} "
+          f"{baseline['threads']:>7} {baseline['fds']:>5} {baseline['maps']:>5}")
+    started = time.perf_counter()
+    final = baseline
+    for round_number in range(1, args.rounds + 1):
+        run_round(events_per_round, cycles_per_round, warm_cycles + round_number * cycles_per_round)
+        gc.collect()
+        final = sample()
+        print(f"{round_number:>5} {round_number * events_per_round:>11} {round_number * cycles_per_round:>7} "
+              f"{final['rss_mb']:>8.1f} {final['traced_mb']:>10.2f} {final['threads']:>7} "
+              f"{final['fds']:>5} {final['maps']:>5} {time.perf_counter() - started:>7.1f}")
+    soak.shutdown()
+
+    counters = soak.guard.stats.counters
+    print(f"injected key events={soak.guard.keyboard_controller.events} "
+          f"converted={counters.get('enter_converted', 0)} repeats={counters.get('enter_repeats', 0)} "
+          f"shed={counters.get('enter_shed', 0)}")
+
+    failures = check(baseline, final, args)
+    if baseline_snapshot is not None:
+        growth = tracemalloc.take_snapshot().compare_to(baseline_snapshot, 'lineno')
+        print(f"\nTop {args.top} allocation sites by growth:")
+        for stat in growth[:args.top]:
+            print(f"  {stat}")
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("\nOK: no growth beyond thresholds")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,16 +6,54 @@ Discordがアクティブウィンドウのときだけ、Enterキー単体を
 Cmd+Enter(Mac)/Ctrl+Enter(Windows)を送信に変更するツール。
 """
 
+import os
 import sys
+import time
 import platform
+import threading
 import logging
 from typing import Optional
-from pynput import keyboard
-from pynput.keyboard import Key, KeyCode, Controller
+
+# pynputはX11のないLinux（Wayland等）では読み込めない。evdevバックエンドはpynput不要
+try:
+    from pynput import keyboard
+    from pynput.keyboard import Key, KeyCode, Controller
+    PYNPUT_IMPORT_ERROR = None
+except ImportError as e:
+    keyboard = Key = KeyCode = Controller = None
+    PYNPUT_IMPORT_ERROR = e
+
+from utils.stats import GuardStats
+from utils.gc_tuning import prepare_hook_gc
+from utils.scheduling import raise_thread_priority
+from utils.focus import FocusTracker, MacAXProvider
+from utils.channel_rules import ChannelRules, RuleError, ACTION_OFF
+from utils.timer_wheel import TimerWheel
+from utils.storm import NewlineCoalescer, DEFAULT_RATE, DEFAULT_BURST
+from utils.state_machine import (
+    GuardMachine, binding_codes, ACT_DECIDE, ACT_SHED, ACT_DROP, ACT_REPEAT_NEWLINE,
+)
+from utils.flight_recorder import FlightRecorder, DEFAULT_SLOTS, KEY_CLASS_ENTER, KEY_CLASS_BY_BIT
+from utils.pipeline import Stage, fuse, FILTER, CLASSIFY, TRANSFORM, OBSERVE
+from utils.config import (
+    compile_keybindings, primary_modifier, KeybindingError, DEFAULT_CONFIG,
+    ACTION_NEWLINE, ACTION_SEND, ENTER_KEY_ID, MODIFIER_STATES, MOD_SHIFT, MOD_CTRL, MOD_ALT, MOD_CMD,
+)
+from utils.browser import (
+    WindowClassifier, BROWSER_APPS, browser_url_mac, window_exe_name, may_host_discord,
+)
+from utils.ime import (
+    CompositionTracker, InputSourceWatcher, KEY_CHAR, KEY_BACKSPACE, KEY_ESCAPE, KEY_OTHER,
+)
+from utils.foreground import (
+    ActivationWatcher, ForegroundWatcher, FrontWindowCache, is_discord_app, AdaptiveForeground,
+    DirectProvider, PollingProvider, NotificationProvider,
+)
 
 # プラットフォーム判定
 IS_MAC = platform.system() == 'Darwin'
 IS_WINDOWS = platform.system() == 'Windows'
+IS_LINUX = platform.system() == 'Linux'
 
 # ロギング設定
 logging.basicConfig(
@@ -24,6 +62,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 修飾キーのビットとpynputのキー名
+MODIFIER_KEY_NAMES = {
+    MOD_SHIFT: ('shift', 'shift_l', 'shift_r'),
+    MOD_CTRL: ('ctrl', 'ctrl_l', 'ctrl_r'),
+    MOD_ALT: ('alt', 'alt_l', 'alt_r', 'alt_gr'),
+    MOD_CMD: ('cmd', 'cmd_l', 'cmd_r'),
+}
+MODIFIER_KEYS = {
+    bit: tuple(getattr(Key, name) for name in names if hasattr(Key, name))
+    for bit, names in MODIFIER_KEY_NAMES.items()
+} if Key is not None else {}
+
+# これより遅いコールバックはトレースに記録（GC停止などとの相関調査用）
+SLOW_CALLBACK_SECONDS = 0.005
+
+# フックが元のキーイベントをどう扱うか（on_pressの結果から決まる）
+EVENT_PASS = 0  # そのまま届ける
+EVENT_SUPPRESS = 1  # 破棄する（代わりの入力は注入済み）
+EVENT_REPLAY = 2  # 破棄し、保留したEnterの注入より後に届くよう送り直す
+
+# Windowsの低レベルキーボードフック
+WM_KEYDOWN = 0x0100
+WM_SYSKEYDOWN = 0x0104
+LLKHF_LOWER_IL_INJECTED = 0x02
+LLKHF_INJECTED = 0x10
+
+
+if keyboard is not None:
+    class _PriorityListener(keyboard.Listener):
+        """コールバックを実行するリスナースレッド自身の優先度を上げるListener"""
+
+        on_priority = None  # 適用されたポリシー名を受け取るコールバック
+
+        def run(self):
+            policy = raise_thread_priority()
+            if self.on_priority:
+                self.on_priority(policy)
+            super().run()
+
+
+class _ListenerHook:
+    """ScopedActivation用バックエンド: リスナーの開始/停止でフックを着脱する"""
+
+    def __init__(self, guard: 'DiscordSendGuard'):
+        self.guard = guard
+
+    def install(self):
+        # 非アクティブ中のキー状態（修飾キー、押されたままのEnter）は見えていないのでリセット
+        self.guard.machine.release_keys()
+        self.guard.listener = self.guard._create_listener()
+        self.guard.listener.start()
+
+    def uninstall(self):
+        listener = self.guard.listener
+        if listener:
+            listener.stop()
+            self.guard.listener = None
+
 
 class DiscordSendGuard:
     """Discord Send Guardのメインクラス"""
@@ -35,14 +131,72 @@ class DiscordSendGuard:
         Args:
             debug: デバッグモードの有効化
         """
-        self.debug = debug
+        self._debug = debug
         if debug:
             logger.setLevel(logging.DEBUG)
 
+        if PYNPUT_IMPORT_ERROR is not None:
+            raise RuntimeError(f"pynput not available: {PYNPUT_IMPORT_ERROR}")
+
         self.keyboard_controller = Controller()
-        self.modifier_pressed = False  # Cmd(Mac) or Ctrl(Windows)が押されているか
+        # キーバインド: (キーID, 修飾キーのマスク) → 動作の表（設定読み込み時にコンパイル）
+        self.keybindings = compile_keybindings(DEFAULT_CONFIG['keybindings'], IS_MAC)
+        # I/Oを含まない判定の状態（修飾キーのマスク、オートリピート、レート制限）
+        self.machine = GuardMachine(self._binding_codes(), DEFAULT_RATE, DEFAULT_BURST)
         self.running = False
-        self.listener: Optional[keyboard.Listener] = None
+        self.enabled = True  # Falseの間はEnterを変換せずに通す
+        self.listener: Optional['keyboard.Listener'] = None
+        # 直前のキーイベントの扱い（フックスレッドだけが読み書きする）
+        self._event_disposition = EVENT_PASS
+        self._replay_event = False
+        self.stats = GuardStats()
+        # ウィンドウごとのDiscord判定キャッシュ（タイトルが変わったときだけ再判定）
+        self.window_classifier = WindowClassifier(stats=self.stats)
+        # macOSの前面ウィンドウ（番号・タイトル）。アプリの切り替えかタイトルの変化まで使い回す
+        self.front_windows = FrontWindowCache(stats=self.stats)
+        # チャンネルごとのルール（ウィンドウタイトルで判定、タイトル変化時のみ評価）
+        self.channel_rules = ChannelRules(stats=self.stats)
+        self.gc_tuning = True  # リスナー開始前にGCを凍結・調整する
+        self.raise_priority = True  # フックスレッドの優先度を上げる
+        self.priority_policy = None
+        self.scoped_activation = False  # Discordが前面のときだけフックを設置する
+        self.activation: Optional['ScopedActivation'] = None
+        self._stop_event = threading.Event()
+        # start()/stop()の状態遷移（running、リスナーの作成と停止要求）を守る
+        self._lifecycle_lock = threading.Lock()
+        self._finished = threading.Event()  # 実行中でなく、後片付けも済んでいる
+        self._finished.set()
+        # 前面アプリ判定の戦略: 'auto'なら起動時に計測して最安の方式を選ぶ
+        self.foreground_strategy = 'auto'
+        self.freshness_target = 0.05
+        self.has_main_run_loop = False  # メニューバーアプリではTrue（通知を受け取れる）
+        # プロセス全体の設定（GCの凍結・閾値）を変えてよいか。メニューバーアプリ内ではFalse
+        self.owns_process = True
+        self.foreground: Optional[AdaptiveForeground] = None
+        self._gc_recorder = None
+        # IME変換中のEnter（確定）は変換しない
+        self.ime_awareness = True
+        self.ime = CompositionTracker(self.stats)
+        self._ime_watcher: Optional[InputSourceWatcher] = None
+        # Discord内でもメッセージ入力欄以外（検索・モーダル等）ではEnterを変換しない
+        self.composer_only = True
+        self._focus: Optional[FocusTracker] = None
+        self.decision_trace = True  # Enterの判定をトレースに記録
+        # 遅延動作用のタイマー（専用スレッド1本、フックスレッドでは待たない）
+        self.scheduler = TimerWheel(stats=self.stats)
+        # Enter直後の修飾キーを待つ先読み（0で無効）
+        self.enter_lookahead = 0.0
+        self.lookahead: Optional['EnterLookahead'] = None
+        # オートリピートの改行はタイマースレッドからまとめて注入
+        self.coalescer = NewlineCoalescer(self.scheduler, self._inject_newlines, stats=self.stats)
+        # キーイベントと判定のメタデータを常時記録するリングファイル（start()で開く）
+        self.flight_recorder = True
+        self.flight_recorder_slots = DEFAULT_SLOTS
+        self.recorder: Optional[FlightRecorder] = None
+        # Enterの処理: 有効な段だけを融合した1つの関数（設定変更時に丸ごと差し替え）
+        self._pipeline_lock = threading.Lock()
+        self.enter_pipeline = None
+        self.rebuild_pipeline()
 
         logger.info(f"Discord Send Guard initialized on {platform.system()}")
 
@@ -53,6 +207,12 @@ class DiscordSendGuard:
         Returns:
             Discordがアクティブの場合True
         """
+        if self.foreground is not None:
+            return self.foreground.is_active()
+        return self._query_discord_active()
+
+    def _query_discord_active(self) -> bool:
+        """OSに直接問い合わせてDiscordがアクティブか判定"""
         try:
             if IS_MAC:
                 return self._is_discord_active_mac()
@@ -66,106 +226,421 @@ class DiscordSendGuard:
             return False
 
     def _is_discord_active_mac(self) -> bool:
-        """macOSでDiscordがアクティブかチェック"""
+        """macOSでDiscord（アプリまたはブラウザのタブ）がアクティブかチェック"""
         try:
             from AppKit import NSWorkspace
             active_app = NSWorkspace.sharedWorkspace().activeApplication()
             app_name = active_app.get('NSApplicationName', '').lower()
+            pid = active_app.get('NSApplicationProcessIdentifier')
 
             if self.debug:
                 logger.debug(f"Active app: {app_name}")
 
-            return 'discord' in app_name
+            # ブラウザのみウィンドウタイトルを見る（ウィンドウサーバーへの問い合わせで、AXは使わない）
+            window, title, url = pid, '', None
+            if app_name in BROWSER_APPS:
+                window, title = self.front_windows.lookup(pid)
+                window = (pid, window)
+                if not title:
+                    # 画面収録の許可がないとタイトルが空になり、タブを切り替えても同じキーになる。
+                    # そのときはURL（AX）でタブを見分ける
+                    url = browser_url_mac(pid)
+
+            # URLの取得（AX）は分類キャッシュのミス時のみ
+            active = self.window_classifier.classify(
+                window, title, lambda: (app_name, browser_url_mac(pid) if app_name in BROWSER_APPS else None),
+                url=url,
+            )
+            if active and self.channel_rules:
+                if app_name not in BROWSER_APPS:
+                    title = self.front_windows.lookup(pid)[1]
+                self.channel_rules.on_title(title)
+            return active
         except ImportError:
             logger.error("AppKit not available. Install with: pip install pyobjc-framework-Cocoa")
             return False
 
     def _is_discord_active_windows(self) -> bool:
-        """WindowsでDiscordがアクティブかチェック"""
+        """WindowsでDiscord（アプリまたはブラウザのタブ）がアクティブかチェック"""
         try:
             import win32gui
 
             hwnd = win32gui.GetForegroundWindow()
-            window_title = win32gui.GetWindowText(hwnd).lower()
+            window_title = win32gui.GetWindowText(hwnd)
 
             if self.debug:
                 logger.debug(f"Active window: {window_title}")
 
-            return 'discord' in window_title
+            # 実行ファイル名の取得は分類キャッシュのミス時のみ
+            active = self.window_classifier.classify(
+                hwnd, window_title, lambda: (window_exe_name(hwnd), None)
+            )
+            if active and self.channel_rules:
+                self.channel_rules.on_title(window_title)
+            return active
         except ImportError:
             logger.error("win32gui not available. Install with: pip install pywin32")
             return False
 
-    def on_press(self, key) -> bool:
+    @property
+    def modifier_mask(self) -> int:
+        """押されている修飾キーのビット（MOD_*）"""
+        return self.machine.mask
+
+    @modifier_mask.setter
+    def modifier_mask(self, mask: int):
+        self.machine.mask = mask
+
+    def _binding_codes(self) -> list:
+        """キーバインドのEnterの行を状態機械の動作コードに変換"""
+        start = ENTER_KEY_ID * MODIFIER_STATES
+        return binding_codes(self.keybindings.table[start:start + MODIFIER_STATES])
+
+    @property
+    def modifier_pressed(self) -> bool:
+        """Cmd(Mac) or Ctrl(Windows/Linux)が押されているか"""
+        return bool(self.modifier_mask & primary_modifier(IS_MAC))
+
+    @modifier_pressed.setter
+    def modifier_pressed(self, pressed: bool):
+        if pressed:
+            self.modifier_mask |= primary_modifier(IS_MAC)
+        else:
+            self.modifier_mask &= ~primary_modifier(IS_MAC)
+
+    def _modifier_bit(self, key) -> int:
+        """修飾キーのビット（修飾キー以外は0）。よく使う主修飾キーを先に判定"""
+        primary = primary_modifier(IS_MAC)
+        if key in MODIFIER_KEYS[primary]:
+            return primary
+        for bit, keys in MODIFIER_KEYS.items():
+            if key in keys:
+                return bit
+        return 0
+
+    def on_press(self, key, injected: bool = False) -> bool:
         """
         キー押下時のハンドラ
 
         Args:
             key: 押されたキー
+            injected: 合成されたイベントか（自分が送ったShift+Enter等）
 
         Returns:
-            False to stop the listener, True to continue
+            False to suppress the original key event (its replacement has
+            been injected), True to let it through
         """
+        if injected:
+            # 合成イベントは修飾キー状態にもEnter判定にも使わない
+            return True
+        started = time.perf_counter()
         try:
-            # Cmd(Mac) or Ctrl(Windows)の検出
-            if IS_MAC and key == Key.cmd:
-                self.modifier_pressed = True
-                if self.debug:
-                    logger.debug("Cmd pressed")
-            elif IS_WINDOWS and key == Key.ctrl_l or key == Key.ctrl_r:
-                self.modifier_pressed = True
+            # 修飾キーの検出
+            modifier = self._modifier_bit(key)
+            if modifier:
+                self.modifier_mask |= modifier
                 if self.debug:
-                    logger.debug("Ctrl pressed")
+                    logger.debug(f"Modifier pressed (mask={self.modifier_mask})")
+            recorder = self.recorder
+            if recorder is not None:
+                # 文字は記録せず、キーの種類だけ
+                recorder.key(KEY_CLASS_ENTER if key == Key.enter else KEY_CLASS_BY_BIT[modifier],
+                             True, self.modifier_mask)
 
-            # Enterキーの処理
-            if key == Key.enter:
-                if not self.is_discord_active():
-                    # Discord以外では通常動作
-                    return True
-
-                if self.modifier_pressed:
-                    # Cmd+Enter / Ctrl+Enter → 送信（Enterを通す）
-                    if self.debug:
-                        logger.debug("Modifier+Enter detected in Discord - allowing send")
-                    return True
-                else:
-                    # Enter単体 → 改行（Enterをブロックして Shift+Enter を送信）
-                    if self.debug:
-                        logger.debug("Enter detected in Discord - converting to newline")
-
-                    # 元のEnterをブロック
-                    # Shift+Enterを送信（Discordでは改行になる）
-                    with self.keyboard_controller.pressed(Key.shift):
-                        self.keyboard_controller.press(Key.enter)
-                        self.keyboard_controller.release(Key.enter)
-
-                    return False  # 元のEnterイベントをブロック
+            # 保留中のEnter: 送信になる修飾キーなら即確定、他のキーなら順序を保つため先に確定
+            lookahead = self.lookahead
+            if lookahead is not None and lookahead.pending:
+                if not modifier:
+                    # 確定したEnterは注入なので後から届く。このキーは止めて、その後に送り直す
+                    if lookahead.resolve_now(reason='flushed'):
+                        self._replay_event = True
+                elif self.keybindings.lookup(ENTER_KEY_ID, self.modifier_mask) != ACTION_NEWLINE:
+                    lookahead.resolve_now(self.modifier_mask)
+
+            # まとめ待ちのリピート改行: 他のキーに追い越させない。先に注入し、このキーはその後に送り直す
+            if not modifier and key != Key.enter and self.coalescer.flush():
+                self._replay_event = True
+
+            # IMEの変換状態を追跡（IMEが選択されているときだけ）
+            if self.ime.ime_active and key != Key.enter:
+                self.ime.on_key(self._ime_key_kind(key))
+
+            # Enterキーの処理（有効な段だけを融合したパイプライン）
+            if key == Key.enter and self.enabled:
+                action = self.machine.on_enter_down(self.scheduler.clock())
+                if action == ACT_DECIDE:
+                    # 新しいEnter（送信かもしれない）も前のリピート改行の後
+                    flushed = self.coalescer.flush()
+                    result = self.enter_pipeline(self.modifier_mask)
+                    if flushed and result:
+                        self._replay_event = True
+                    return result
+                return self._apply_repeat(action)
 
         except Exception as e:
             logger.error(f"Error in on_press: {e}")
+            self.stats.incr('errors')
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stats.observe('on_press', elapsed)
+            if elapsed > SLOW_CALLBACK_SECONDS:
+                self.stats.trace('slow_callback', callback='on_press', us=round(elapsed * 1e6, 1))
 
         return True
 
-    def on_release(self, key) -> bool:
+    def _apply_repeat(self, action: int) -> bool:
+        """
+        オートリピート・上限超過のEnter（前面アプリの問い合わせなし）
+
+        Returns:
+            on_pressと同じ（Falseなら元のEnterはフックで破棄される）
+        """
+        if self.recorder is not None:
+            self.recorder.repeat(action, self.modifier_mask)
+        if action == ACT_SHED:
+            # 上限超過 → 元のEnterを破棄し、送信も改行もしない（誤送信しない側に倒す）
+            self.stats.incr('enter_shed')
+            return False
+        self.stats.incr('enter_repeats')
+        if action == ACT_REPEAT_NEWLINE:
+            # 元のEnterは破棄し、改行はタイマースレッドからまとめて注入
+            self.coalescer.queue_newline()
+            return False
+        # 送信の繰り返しは破棄し、Discord外やCmd+Enterはそのまま通す
+        return action != ACT_DROP
+
+    def _send_plain_enter(self):
+        """押されている修飾キーを一時的に離してEnterを送信"""
+        held = [MODIFIER_KEYS[bit][0] for bit in MODIFIER_KEYS if self.modifier_mask & bit]
+        for key in held:
+            self.keyboard_controller.release(key)
+        self.keyboard_controller.press(Key.enter)
+        self.keyboard_controller.release(Key.enter)
+        for key in reversed(held):
+            self.keyboard_controller.press(key)
+
+    def _ime_key_kind(self, key) -> str:
+        """IME変換状態の推定に使うキーの種類"""
+        if key == Key.backspace:
+            return KEY_BACKSPACE
+        if key == Key.esc:
+            return KEY_ESCAPE
+        if not self.modifier_pressed and getattr(key, 'char', None):
+            return KEY_CHAR
+        return KEY_OTHER
+
+    def _record_priority(self, policy: str):
+        """リスナースレッドに適用された優先度ポリシーを記録"""
+        self.priority_policy = policy
+        self.stats.trace('priority', policy=policy)
+        logger.info(f"Keyboard hook thread priority: {policy}")
+
+    @property
+    def debug(self) -> bool:
+        return self._debug
+
+    @debug.setter
+    def debug(self, debug: bool):
+        self._debug = debug
+        self.rebuild_pipeline()
+
+    @property
+    def focus(self) -> Optional[FocusTracker]:
+        return self._focus
+
+    @focus.setter
+    def focus(self, focus: Optional[FocusTracker]):
+        self._focus = focus
+        self.rebuild_pipeline()
+
+    def pipeline_stages(self) -> list:
+        """現在の設定で有効なEnter処理の段（この順に実行）"""
+        stages = []
+        if self.ime_awareness:
+            stages.append(Stage('ime_confirm', FILTER, self._filter_ime))
+        stages.append(Stage('discord_active', FILTER, self._filter_discord))
+        if self._focus is not None:
+            stages.append(Stage('composer', FILTER, self._filter_composer))
+        if self.channel_rules:
+            stages.append(Stage('channel_rules', FILTER, self._filter_channel))
+        # Enterの行だけを切り出し、修飾キーのマスクで直接引く
+        start = ENTER_KEY_ID * MODIFIER_STATES
+        row = self.keybindings.table[start:start + MODIFIER_STATES]
+        stages.append(Stage('keybindings', CLASSIFY, row.__getitem__))
+        transform = self._transform_enter_lookahead if self.lookahead else self._transform_enter
+        stages.append(Stage('convert', TRANSFORM, transform))
+        stages.append(Stage('stats', OBSERVE, self._observe_stats))
+        if self.decision_trace:
+            stages.append(Stage('trace', OBSERVE, self._observe_trace))
+        if self.machine.track_repeats:
+            stages.append(Stage('repeat_state', OBSERVE, self.machine.record))
+        if self.recorder is not None:
+            stages.append(Stage('flight_recorder', OBSERVE, self.recorder.decision))
+        if self._debug:
+            stages.append(Stage('debug_log', OBSERVE, self._observe_debug))
+        return stages
+
+    def rebuild_pipeline(self):
+        """Enter処理のパイプラインを組み直し、1回の代入で差し替える"""
+        with self._pipeline_lock:
+            self.enter_pipeline = fuse(self.pipeline_stages())
+        self.stats.set_info('enter_pipeline', list(self.enter_pipeline.stages))
+
+    def _filter_ime(self, mask: int) -> Optional[str]:
+        # 変換確定のEnter → そのまま通す
+        return 'ime_confirm' if self.ime.enter_confirms_composition() else None
+
+    def _filter_discord(self, mask: int) -> Optional[str]:
+        # Discord以外では通常動作
+        return None if self.is_discord_active() else 'passthrough'
+
+    def _filter_composer(self, mask: int) -> Optional[str]:
+        # 検索欄やモーダルでは通常のEnter
+        return None if self._focus.is_message_composer() else 'outside_composer'
+
+    def _filter_channel(self, mask: int) -> Optional[str]:
+        # ルールでガードを外したチャンネル
+        return 'channel_off' if self.channel_rules.action == ACTION_OFF else None
+
+    def _transform_enter(self, action: str, mask: int):
+        """キーバインドの動作を実行。(結果, 元のEnterを通すか)"""
+        if action == ACTION_SEND and mask:
+            # 修飾キー付きEnterで送信 → 修飾キーを外したEnterに置き換え（元のEnterはフックで破棄）
+            self._send_plain_enter()
+            return 'send', False
+        if action != ACTION_NEWLINE:
+            # Cmd+Enter / Ctrl+Enter など → 送信（Enterを通す）
+            return 'send', True
+        # Enter単体 → 改行（元のEnterをブロックしてShift+Enterを送信、Discordでは改行になる）
+        with self.keyboard_controller.pressed(Key.shift):
+            self.keyboard_controller.press(Key.enter)
+            self.keyboard_controller.release(Key.enter)
+        return 'converted', False
+
+    def _transform_enter_lookahead(self, action: str, mask: int):
+        """改行になるEnterは先読みの間保留し、タイマーか次のキーで確定"""
+        # 設定の再読み込みで先読みが外れた直後は、古いパイプラインでも即時に処理
+        lookahead = self.lookahead
+        if action == ACTION_NEWLINE and lookahead is not None:
+            lookahead.hold(mask)
+            return 'held', False
+        return self._transform_enter(action, mask)
+
+    def _resolve_held_enter(self, mask: int):
+        """保留したEnterを確定時の修飾キーで実行（フックスレッドかタイマースレッド）"""
+        action = self.keybindings.lookup(ENTER_KEY_ID, mask)
+        if action == ACTION_NEWLINE:
+            with self.keyboard_controller.pressed(Key.shift):
+                self.keyboard_controller.press(Key.enter)
+                self.keyboard_controller.release(Key.enter)
+            outcome = 'converted'
+        elif action == ACTION_SEND and mask:
+            self._send_plain_enter()
+            outcome = 'send'
+        else:
+            # 元のEnterは保留で止めているので、押されたままの修飾キーと組み合わせて送る
+            self.keyboard_controller.press(Key.enter)
+            self.keyboard_controller.release(Key.enter)
+            outcome = 'send'
+        self._observe_stats(outcome, mask)
+        if self.decision_trace:
+            self._observe_trace(outcome, mask)
+        if self.recorder is not None:
+            self.recorder.decision(outcome, mask)
+
+    def _inject_newlines(self, count: int):
+        """改行をまとめて注入（Shiftは1回だけ押す。タイマースレッドから呼ばれる）"""
+        with self.keyboard_controller.pressed(Key.shift):
+            for _ in range(count):
+                self.keyboard_controller.press(Key.enter)
+                self.keyboard_controller.release(Key.enter)
+        self._observe_stats('converted', 0)
+        self.stats.incr('enter_converted', count - 1)
+
+    def _observe_stats(self, outcome: str, mask: int):
+        self.stats.incr(f'enter_{outcome}')
+
+    def _observe_trace(self, outcome: str, mask: int):
+        # 文字内容は記録しない
+        self.stats.trace('enter', action=outcome, modifier=bool(mask & primary_modifier(IS_MAC)))
+
+    def _observe_debug(self, outcome: str, mask: int):
+        logger.debug(f"Enter (mask={mask}): {outcome}")
+
+    def apply_config(self, config):
+        """
+        設定を反映
+
+        Args:
+            config: Configインスタンスまたはdict
+        """
+        self._debug = bool(config.get('debug', False))
+        self.decision_trace = bool(config.get('decision_trace', True))
+        self.gc_tuning = bool(config.get('gc_tuning', True))
+        self.raise_priority = bool(config.get('raise_priority', True))
+        self.scoped_activation = bool(config.get('scoped_activation', False))
+        self.foreground_strategy = config.get('foreground_strategy', 'auto')
+        self.freshness_target = config.get('freshness_target_ms', 50) / 1000.0
+        self.ime_awareness = bool(config.get('ime_awareness', True))
+        self.composer_only = bool(config.get('composer_only', True))
+        self.enter_lookahead = max(config.get('enter_lookahead_ms', 0), 0) / 1000.0
+        self.flight_recorder = bool(config.get('flight_recorder', True))
+        self.flight_recorder_slots = max(int(config.get('flight_recorder_slots', DEFAULT_SLOTS)), 1)
+        if self.lookahead is not None:
+            self.lookahead.resolve_now(reason='flushed')
+        self.lookahead = None
+        if self.enter_lookahead:
+            # 既定では無効なので、使うときだけ読み込む（フック専用プロセスの起動を軽く保つ）
+            from utils.lookahead import EnterLookahead
+            self.lookahead = EnterLookahead(
+                self.scheduler, self.enter_lookahead, self._resolve_held_enter, self.stats,
+            )
+        try:
+            self.channel_rules = ChannelRules.from_config(config.get('channel_rules') or [], stats=self.stats)
+        except RuleError as e:
+            logger.error(f"Ignoring channel_rules: {e}")
+            self.channel_rules = ChannelRules(stats=self.stats)
+        try:
+            self.keybindings = compile_keybindings(
+                config.get('keybindings') or DEFAULT_CONFIG['keybindings'], IS_MAC)
+        except KeybindingError as e:
+            logger.error(f"Ignoring keybindings: {e}")
+            self.keybindings = compile_keybindings(DEFAULT_CONFIG['keybindings'], IS_MAC)
+        if config.get('storm_protection', True):
+            self.machine.configure(self._binding_codes(), config.get('enter_rate_limit', DEFAULT_RATE),
+                                   config.get('enter_burst', DEFAULT_BURST))
+        else:
+            self.machine.configure(self._binding_codes(), track_repeats=False)
+        self.rebuild_pipeline()
+        logger.setLevel(logging.DEBUG if self.debug else logging.INFO)
+
+    def on_release(self, key, injected: bool = False) -> bool:
         """
         キー解放時のハンドラ
 
         Args:
             key: 解放されたキー
+            injected: 合成されたイベントか
 
         Returns:
             False to stop the listener, True to continue
         """
+        if injected:
+            return True
         try:
-            # Cmd(Mac) or Ctrl(Windows)の解放
-            if IS_MAC and key == Key.cmd:
-                self.modifier_pressed = False
-                if self.debug:
-                    logger.debug("Cmd released")
-            elif IS_WINDOWS and (key == Key.ctrl_l or key == Key.ctrl_r):
-                self.modifier_pressed = False
+            # 修飾キーの解放
+            modifier = self._modifier_bit(key)
+            if modifier:
+                self.modifier_mask &= ~modifier
                 if self.debug:
-                    logger.debug("Ctrl released")
+                    logger.debug(f"Modifier released (mask={self.modifier_mask})")
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.key(KEY_CLASS_ENTER if key == Key.enter else KEY_CLASS_BY_BIT[modifier],
+                             False, self.modifier_mask)
+
+            if key == Key.enter:
+                self.machine.on_enter_up()
 
             # Ctrl+C で終了
             if key == KeyCode.from_char('c') and self.modifier_pressed:
@@ -179,9 +654,19 @@ class DiscordSendGuard:
 
     def start(self):
         """Discord Send Guardを開始"""
-        if self.running:
-            logger.warning("Already running")
-            return
+        # 二重起動の判定と停止要求のリセットは、stop()と同じロックの下で行う。
+        # stop()直後なら、前回の後片付け（タイマーや監視スレッドの停止）が終わるまで待つ
+        while True:
+            with self._lifecycle_lock:
+                if self.running:
+                    logger.warning("Already running")
+                    return
+                if self._finished.is_set():
+                    self.running = True
+                    self._finished.clear()
+                    self._stop_event.clear()
+                    break
+            self._finished.wait()
 
         logger.info("Starting Discord Send Guard...")
         logger.info("Press Ctrl+C to stop")
@@ -193,33 +678,397 @@ class DiscordSendGuard:
         elif IS_WINDOWS:
             logger.info("NOTE: Windows may require administrator privileges")
 
-        self.running = True
+        try:
+            self._run_until_stopped()
+        finally:
+            self.running = False
+            self._finished.set()
+            logger.info("Discord Send Guard stopped")
 
-        # キーボードリスナーを開始
-        with keyboard.Listener(
-            on_press=self.on_press,
-            on_release=self.on_release,
-            suppress=False  # 通常は他のキーを抑制しない
-        ) as self.listener:
-            self.listener.join()
+    def _run_until_stopped(self):
+        """監視スレッド・タイマーを起動し、stop()までリスナーを動かして後片付けする"""
+        # 初期化で生まれたオブジェクトを凍結し、以後のGC停止を記録
+        # （アプリと同居するときは停止の記録だけ）
+        if self.gc_tuning and self._gc_recorder is None:
+            if self.owns_process:
+                self._gc_recorder = prepare_hook_gc(self.stats)
+            else:
+                self._gc_recorder = prepare_hook_gc(self.stats, thresholds=None, freeze=False)
 
-        self.running = False
-        logger.info("Discord Send Guard stopped")
+        self._start_foreground()
+
+        self._start_focus()
+
+        self._start_recorder()
+
+        self.scheduler.start()
+
+        if self.ime_awareness:
+            self._ime_watcher = InputSourceWatcher(self.ime, run_loop_available=self.has_main_run_loop)
+            self._ime_watcher.start()
+
+        if self.scoped_activation:
+            # 前面アプリの変化に応じてリスナーを着脱
+            self._run_scoped()
+        else:
+            # 停止中に離されたキーは見えていないので、押下状態を持ち越さない
+            self.machine.release_keys()
+            # キーボードリスナーを開始（準備中に届いたstop()も取りこぼさない）
+            with self._lifecycle_lock:
+                listener = None if self._stop_event.is_set() else self._create_listener()
+                self.listener = listener
+            if listener is not None:
+                with listener:
+                    if self._stop_event.is_set():
+                        listener.stop()
+                    listener.join()
+
+        if self._gc_recorder:
+            # 閾値を戻し、開始時に凍結したオブジェクトを戻す（差し替え済みの段などを回収できるように）
+            self._gc_recorder.uninstall()
+            self._gc_recorder = None
+
+        if self.foreground:
+            self.foreground.stop()
+            self.foreground = None
+        self.front_windows.stop()
+
+        if self._ime_watcher:
+            self._ime_watcher.stop()
+            self._ime_watcher = None
+
+        if self.focus:
+            self.focus.stop()
+            self.focus = None
+
+        if self.lookahead is not None:
+            self.lookahead.resolve_now(reason='flushed')
+        # キューに残ったリピートの改行は今注入する（次回の開始時に遅れて入力しない）
+        self.coalescer.flush()
+        self.scheduler.stop()
+
+        self._stop_recorder()
+
+    def _refresh_discord_active(self) -> bool:
+        """変化の通知を受けての判定（キャッシュ済みの前面ウィンドウは使わない）"""
+        # 同じ通知でのキャッシュの無効化より先に呼ばれることがある
+        self.front_windows.invalidate()
+        return self._query_discord_active()
+
+    def _start_foreground(self):
+        """前面アプリ判定の方式を計測して選択（'direct'なら毎回問い合わせ）"""
+        if IS_MAC:
+            # 通知を受け取れるときだけ前面ウィンドウをキャッシュ（受け取れなければ毎回問い合わせ）
+            self.front_windows.run_loop_available = self.has_main_run_loop
+            self.front_windows.start()
+            self.stats.set_info('front_window_cache', self.front_windows.caching)
+
+        if self.foreground_strategy != 'auto':
+            self.stats.set_info('foreground_strategy', 'direct')
+            return
+
+        direct = DirectProvider(self._query_discord_active)
+        providers = [
+            # アプリ切り替えとタイトルの変化（タブ・チャンネルの切り替え）のときだけ判定し直す
+            NotificationProvider(is_discord_app, run_loop_available=self.has_main_run_loop,
+                                 query=self._refresh_discord_active),
+            PollingProvider(self._query_discord_active, interval=self.freshness_target / 2),
+            direct,
+        ]
+        self.foreground = AdaptiveForeground(
+            providers, direct,
+            freshness_target=self.freshness_target,
+            stats=self.stats,
+        )
+        self.foreground.start()
+
+    def _start_focus(self):
+        """フォーカス中の要素の追跡を開始（macOSのアクセシビリティAPIが使える場合のみ）"""
+        if not (self.composer_only and IS_MAC):
+            return
+        if not self.has_main_run_loop:
+            # 通知が届かない（CLI）と、Enterのたびにフックスレッドで問い合わせることになる。
+            # 入力欄は判定せず、Discord内ではどこでもガードする（安全側）
+            self.stats.set_info('focus_notifications', False)
+            return
+        provider = MacAXProvider(is_discord_app, run_loop_available=self.has_main_run_loop)
+        if not provider.available():
+            return
+        self.focus = FocusTracker(provider, self.stats)
+        self.focus.start()
+
+    def _start_recorder(self):
+        """フライトレコーダーのリングファイルを開いて判定の観測段に加える"""
+        if not self.flight_recorder:
+            return
+        recorder = FlightRecorder(slots=self.flight_recorder_slots)
+        try:
+            recorder.open()
+        except (OSError, ValueError) as e:
+            logger.error(f"Flight recorder unavailable: {e}")
+            return
+        self.recorder = recorder
+        self.stats.set_info('flight_recorder', str(recorder.path))
+        self.rebuild_pipeline()
+
+    def _stop_recorder(self):
+        """記録を止めてリングファイルを閉じる（内容はファイルに残る）"""
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            self.rebuild_pipeline()
+            recorder.close()
+
+    def _create_listener(self) -> 'keyboard.Listener':
+        """キーボードリスナーを作成（開始はしない）"""
+        listener_class = _PriorityListener if self.raise_priority else keyboard.Listener
+        listener = listener_class(
+            on_press=self._hook_press,
+            on_release=self._hook_release,
+            suppress=False,  # 全体は抑制せず、止めるのは判定したイベントだけ
+            darwin_intercept=self._darwin_intercept,
+            win32_event_filter=self._win32_event_filter,
+        )
+        if self.raise_priority:
+            listener.on_priority = self._record_priority
+        return listener
+
+    def _hook_press(self, key, injected: bool = False) -> bool:
+        """リスナーのon_press: 判定結果をこのイベントの扱いとして残す（リスナーは止めない）"""
+        self._replay_event = False
+        if not self.on_press(key, injected):
+            self._event_disposition = EVENT_SUPPRESS
+        elif self._replay_event:
+            self._event_disposition = EVENT_REPLAY
+        else:
+            self._event_disposition = EVENT_PASS
+        return True
+
+    def _hook_release(self, key, injected: bool = False) -> bool:
+        """リスナーのon_release: 解放は止めない（Falseはリスナーの停止）"""
+        self._event_disposition = EVENT_PASS
+        return self.on_release(key, injected)
+
+    def _take_disposition(self) -> int:
+        disposition, self._event_disposition = self._event_disposition, EVENT_PASS
+        return disposition
+
+    def _darwin_intercept(self, event_type, event):
+        """
+        macOS: イベントタップでon_press/on_releaseの直後に呼ばれる
+
+        Returns:
+            届けるイベント、破棄するならNone
+        """
+        disposition = self._take_disposition()
+        if disposition == EVENT_REPLAY:
+            import Quartz
+            # 保留を確定した注入より後に届くよう同じイベントを投稿し直す。
+            # 自プロセスの合成イベントとして戻ってくるので、判定には使われない
+            Quartz.CGEventSetIntegerValueField(event, Quartz.kCGEventSourceUnixProcessID, os.getpid())
+            Quartz.CGEventPost(Quartz.kCGHIDEventTap, event)
+            return None
+        return None if disposition == EVENT_SUPPRESS else event
+
+    def _win32_event_filter(self, msg, data) -> bool:
+        """
+        Windows: フックのスレッドで同期的に判定し、止めるイベントはsuppress_event()で破棄
+
+        pynputはフィルタの後でon_press/on_releaseを別メッセージとして非同期に呼ぶので、
+        そのままではEnterを止められず、修飾キーの状態も遅れることがある。ここで全部を
+        処理し、Falseを返してpynputからの呼び出しを止める
+
+        Args:
+            msg: WM_KEYDOWN等
+            data: KBDLLHOOKSTRUCT
+
+        Returns:
+            False（pynputのコールバックは呼ばない）
+        """
+        listener = self.listener
+        if listener is None:
+            return True
+        if data.flags & (LLKHF_INJECTED | LLKHF_LOWER_IL_INJECTED):
+            return False
+        try:
+            # pynput自身もフィルタの後で同じ変換を使う
+            key = listener._event_to_key(msg, data.vkCode)
+        except OSError:
+            key = None
+        if msg not in (WM_KEYDOWN, WM_SYSKEYDOWN):
+            if self._hook_release(key) is False:
+                listener.stop()
+            return False
+        self._hook_press(key)
+        disposition = self._take_disposition()
+        if disposition == EVENT_REPLAY:
+            # 保留を確定した注入より後に届くよう同じ仮想キーを注入し直す
+            self.keyboard_controller.press(KeyCode.from_vk(data.vkCode))
+        if disposition != EVENT_PASS:
+            listener.suppress_event()
+        return False
+
+    def _run_scoped(self):
+        """スコープ付き起動: stop()まで前面アプリを監視してフックを着脱"""
+        from utils.activation import ScopedActivation
+        # ブラウザが前面の間もフックを外さない（タブ・チャンネルの判定はEnterごとに行う）
+        self.activation = ScopedActivation(_ListenerHook(self), may_host_discord, self.stats)
+        # アプリ切り替え通知なら切り替え直後のEnterも取りこぼさない。通知が届かないとき（CLI）はポーリング
+        watcher = ActivationWatcher(self.activation.on_foreground, run_loop_available=self.has_main_run_loop)
+        if not watcher.available():
+            watcher = ForegroundWatcher(self.activation.on_foreground)
+        watcher.start()
+        try:
+            self._stop_event.wait()
+        finally:
+            watcher.stop()
+            self.activation.shutdown()
 
     def stop(self):
         """Discord Send Guardを停止"""
-        if not self.running:
-            return
+        with self._lifecycle_lock:
+            if not self.running:
+                return
+            self._stop_event.set()
+            listener = self.listener
 
         logger.info("Stopping Discord Send Guard...")
-        if self.listener:
-            self.listener.stop()
+        if listener:
+            listener.stop()
         self.running = False
 
 
+def resolve_backend(backend: str = 'auto') -> str:
+    """
+    'auto'を実際のバックエンド名に解決
+
+    Args:
+        backend: 'auto', 'pynput', 'evdev' or 'x11'
+
+    Returns:
+        'pynput', 'evdev' or 'x11'
+    """
+    if backend != 'auto':
+        return backend
+    if IS_LINUX:
+        return 'x11' if os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY') else 'evdev'
+    return 'pynput'
+
+
+def create_guard(backend: str = 'auto', debug: bool = False, all_windows: bool = False):
+    """
+    バックエンドに応じたガードを作成
+
+    Args:
+        backend: 'auto', 'pynput', 'evdev' or 'x11'
+            （autoはLinuxのX11セッションでx11、Waylandでevdev、それ以外でpynput）
+        debug: デバッグモードの有効化
+        all_windows: evdevで前面のウィンドウが見えないとき、全アプリでEnterを変換する
+            （指定しなければ起動しない）
+
+    Returns:
+        DiscordSendGuardと同じ操作ができるガード
+    """
+    backend = resolve_backend(backend)
+    if backend == 'x11':
+        from backends.x11_backend import X11Guard
+        return X11Guard(debug=debug)
+    if backend == 'evdev':
+        from backends.evdev_backend import EvdevGuard
+        return EvdevGuard(debug=debug, all_windows=all_windows)
+    if not (IS_MAC or IS_WINDOWS):
+        # pynputがキー単位で止められるのはmacOS（イベントタップ）とWindows（低レベルフック）だけ
+        raise RuntimeError("The pynput backend cannot suppress single keys on this platform; "
+                           "use --backend x11 or --backend evdev")
+    return DiscordSendGuard(debug=debug)
+
+
+def run_ctl(args) -> int:
+    """
+    ctlサブコマンド: 実行中のガードにコマンドを送信
+
+    Args:
+        args: argparseの解析結果
+
+    Returns:
+        終了コード
+    """
+    import json
+    from utils.control import send_command, ControlError
+
+    try:
+        result = send_command(args.ctl_command, args.ctl_args, path=args.control_socket)
+    except ControlError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+
+def run_recorder(args) -> int:
+    """
+    recorderサブコマンド: フライトレコーダーの内容を表示（ガードは止めない）
+
+    Args:
+        args: argparseの解析結果
+
+    Returns:
+        終了コード
+    """
+    import json
+    from utils.flight_recorder import read_records, format_record, RecorderError
+
+    try:
+        records = read_records(args.file, last=args.last)
+    except RecorderError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    for record in records:
+        print(json.dumps(record.as_dict()) if args.json else format_record(record))
+    return 0
+
+
+def run_doctor(args) -> int:
+    """
+    doctorサブコマンド: この環境でのガード関連のコストを計測し、順位付きで表示してJSONに保存
+
+    Args:
+        args: argparseの解析結果
+
+    Returns:
+        終了コード
+    """
+    from utils import doctor
+
+    backend = resolve_backend(args.backend)
+    probes = doctor.fake_probes() if args.fake else doctor.real_probes(backend)
+    meta = doctor.environment('fake' if args.fake else backend)
+
+    def progress(probe):
+        print(f"  measuring {probe.name}...", file=sys.stderr)
+
+    # 計測中のガード・バックエンドのログは表に混ぜない
+    logging.disable(logging.WARNING)
+    try:
+        results = doctor.run_doctor(probes, repeat=args.repeat, progress=progress)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    print(doctor.format_report(results, meta))
+    try:
+        path = doctor.write_report(results, meta, args.json)
+    except OSError as e:
+        print(f"error: cannot write report: {e}", file=sys.stderr)
+        return 1
+    print(f"\nReport written to {path}")
+    return 0
+
+
 def main():
     """メインエントリーポイント"""
     import argparse
+    from utils.control import COMMANDS
 
     parser = argparse.ArgumentParser(
         description='Discord Send Guard - Prevent accidental message sends in Discord'
@@ -234,17 +1083,86 @@ def main():
         action='version',
         version='Discord Send Guard 1.0.0'
     )
+    parser.add_argument(
+        '--backend',
+        choices=('auto', 'pynput', 'evdev', 'x11'),
+        default='auto',
+        help='Keyboard backend (default: x11 or evdev on Linux, pynput elsewhere)'
+    )
+    parser.add_argument(
+        '--all-windows',
+        action='store_true',
+        help='evdev backend: convert Enter in every application when the active window '
+             'cannot be seen (Wayland without XWayland)'
+    )
+    parser.add_argument(
+        '--control-socket',
+        default=None,
+        help='Path of the control socket (default: ~/.discord-send-guard/control.sock)'
+    )
+
+    subparsers = parser.add_subparsers(dest='command')
+    ctl_parser = subparsers.add_parser('ctl', help='Send a command to the running guard')
+    ctl_parser.add_argument('ctl_command', choices=COMMANDS, help='Command to send')
+    ctl_parser.add_argument('ctl_args', nargs='*', help='Command arguments')
+    recorder_parser = subparsers.add_parser('recorder', help='Decode the flight recorder ring')
+    recorder_parser.add_argument('--file', default=None,
+                                 help='Ring file (default: ~/.discord-send-guard/flight.rec)')
+    recorder_parser.add_argument('--last', type=int, default=None, help='Only the newest N records')
+    recorder_parser.add_argument('--json', action='store_true', help='One JSON object per line')
+    doctor_parser = subparsers.add_parser('doctor', help='Measure guard-relevant costs on this machine')
+    doctor_parser.add_argument('--json', default=None,
+                               help='Report file (default: ~/.discord-send-guard/doctor.json)')
+    doctor_parser.add_argument('--repeat', type=int, default=None, help='Calls per probe')
+    doctor_parser.add_argument('--fake', action='store_true',
+                               help='Deterministic stand-ins for every probe (CI)')
 
     args = parser.parse_args()
 
+    if args.command == 'ctl':
+        sys.exit(run_ctl(args))
+    if args.command == 'recorder':
+        sys.exit(run_recorder(args))
+    if args.command == 'doctor':
+        sys.exit(run_doctor(args))
+
     # プラットフォームチェック
-    if not (IS_MAC or IS_WINDOWS):
+    if not (IS_MAC or IS_WINDOWS or IS_LINUX):
         logger.error(f"Unsupported platform: {platform.system()}")
-        logger.error("This tool only supports macOS and Windows")
+        logger.error("This tool only supports macOS, Windows and Linux")
         sys.exit(1)
 
+    # 多重起動防止: 既に起動中ならそちらを有効化して終了
+    from utils.single_instance import acquire_or_hand_off
+    instance_lock = acquire_or_hand_off('enable', socket_path=args.control_socket)
+    if instance_lock is None:
+        sys.exit(0)
+
     # Discord Send Guardを開始
-    guard = DiscordSendGuard(debug=args.debug)
+    from utils.config import get_config
+    from utils.control import ControlServer, guard_handlers
+
+    try:
+        guard = create_guard(args.backend, debug=args.debug, all_windows=args.all_windows)
+    except RuntimeError as e:
+        logger.error(str(e))
+        instance_lock.release()
+        sys.exit(1)
+
+    def reload_config():
+        config = get_config()
+        config.load()
+        guard.apply_config(config)
+        if args.debug:
+            guard.debug = True
+            logger.setLevel(logging.DEBUG)
+
+    reload_config()
+
+    # 制御ソケット（キーボードコールバックとは別スレッドで動作）
+
+    control = ControlServer(guard_handlers(guard, reload_config), path=args.control_socket)
+    control.start()
 
     try:
         guard.start()
@@ -254,6 +1172,9 @@ def main():
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         sys.exit(1)
+    finally:
+        control.stop()
+        instance_lock.release()
 
 
 if __name__ == '__main__':
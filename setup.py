@@ -54,6 +54,10 @@ setup(
     py_modules=['discord_send_guard'],
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={
+        # utils.state_machine.run_batch (offline replay of key streams)
+        'batch': ['numpy>=1.17'],
+    },
     python_requires='>=3.7',
     app=APP,
     data_files=DATA_FILES,
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+スコープ付き起動（前面アプリ連動のフック着脱）のテスト
+"""
+
+import types
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.activation import ScopedActivation, ACTIVE, PASSIVE
+from utils.browser import may_host_discord
+from utils.foreground import ActivationWatcher, ForegroundWatcher, is_discord_app
+from utils.stats import GuardStats
+
+
+class FakeClock:
+    """手動で進める時計"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeHook:
+    """install/uninstallの呼び出しを記録するバックエンド"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.installed = False
+        self.fail = fail
+
+    def install(self):
+        if self.fail:
+            raise RuntimeError("no permission")
+        self.calls.append('install')
+        self.installed = True
+
+    def uninstall(self):
+        self.calls.append('uninstall')
+        self.installed = False
+
+
+class TestScopedActivation(unittest.TestCase):
+    """ScopedActivationのテストケース"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.hook = FakeHook()
+        self.stats = GuardStats()
+        self.activation = ScopedActivation(self.hook, is_discord_app, self.stats, clock=self.clock)
+
+    def test_starts_passive(self):
+        """初期状態はフック未設置"""
+        self.assertEqual(self.activation.state, PASSIVE)
+        self.assertEqual(self.hook.calls, [])
+
+    def test_install_and_uninstall_on_focus_changes(self):
+        """Discordが前面になると設置、離れると解除"""
+        self.activation.on_foreground('safari')
+        self.assertEqual(self.hook.calls, [])
+        self.activation.on_foreground('discord')
+        self.assertTrue(self.activation.active)
+        self.activation.on_foreground('discord')
+        self.activation.on_foreground('discord ptb')
+        self.assertEqual(self.hook.calls, ['install'])
+        self.activation.on_foreground('terminal')
+        self.assertEqual(self.activation.state, PASSIVE)
+        self.assertEqual(self.hook.calls, ['install', 'uninstall'])
+
+        counters = self.stats.snapshot()['counters']
+        self.assertEqual(counters['activation_installs'], 1)
+        self.assertEqual(counters['activation_uninstalls'], 1)
+        timings = self.stats.snapshot()['timings']
+        self.assertEqual(timings['activation_install']['count'], 1)
+        self.assertEqual(timings['activation_uninstall']['count'], 1)
+
+    def test_mode_times(self):
+        """各モードの滞在時間を計測する"""
+        self.clock.now = 2.0
+        self.activation.on_foreground('discord')
+        self.clock.now = 5.0
+        self.activation.on_foreground('finder')
+        self.clock.now = 6.5
+        times = self.activation.mode_times()
+        self.assertAlmostEqual(times[ACTIVE], 3.0)
+        self.assertAlmostEqual(times[PASSIVE], 3.5)
+        self.assertEqual(self.stats.counters['time_active_ms'], 3000)
+
+    def test_shutdown_uninstalls(self):
+        """終了時にフックを外し、以後のイベントを無視する"""
+        self.activation.on_foreground('discord')
+        self.activation.shutdown()
+        self.assertFalse(self.hook.installed)
+        self.activation.on_foreground('discord')
+        self.assertFalse(self.hook.installed)
+        self.assertEqual(self.hook.calls, ['install', 'uninstall'])
+
+    def test_backend_failure_keeps_state(self):
+        """設置に失敗したら状態を変えずにエラーを数える"""
+        activation = ScopedActivation(FakeHook(fail=True), is_discord_app, self.stats, clock=self.clock)
+        activation.on_foreground('discord')
+        self.assertEqual(activation.state, PASSIVE)
+        self.assertEqual(self.stats.counters['activation_errors'], 1)
+
+    def test_scripted_event_sequence(self):
+        """連続した前面切り替えで設置状態が常に前面アプリと一致する"""
+        sequence = ['finder', 'discord', 'discord', 'slack', 'discord', 'chrome', 'chrome', 'discord']
+        for app in sequence:
+            self.activation.on_foreground(app)
+            self.assertEqual(self.hook.installed, is_discord_app(app))
+        self.assertEqual(self.hook.calls.count('install'), 3)
+        self.assertEqual(self.hook.calls.count('uninstall'), 2)
+
+    def test_discord_app_matcher(self):
+        """Discordのアプリ名・タイトルのみ一致し、名前に含むだけの他アプリは除外"""
+        for name in ('discord', 'discord ptb', 'discord.exe', '#general | server - discord'):
+            self.assertTrue(is_discord_app(name), name)
+        for name in ('discord-notes.md - notepad', 'discord - google search - google chrome', 'finder'):
+            self.assertFalse(is_discord_app(name), name)
+
+
+class TestForegroundWatcher(unittest.TestCase):
+    """ForegroundWatcherのテストケース"""
+
+    def test_reports_only_changes(self):
+        """変化したときだけ通知する"""
+        answers = iter(['finder', 'finder', 'discord', 'discord', 'finder'])
+        events = []
+        watcher = ForegroundWatcher(events.append, query=lambda: next(answers))
+        for _ in range(5):
+            watcher.poll()
+        self.assertEqual(events, ['finder', 'discord', 'finder'])
+
+
+class TestActivationWatcher(unittest.TestCase):
+    """ActivationWatcher（アプリ切り替え通知）のテストケース"""
+
+    def setUp(self):
+        self.blocks = {}
+        center = MagicMock(name='center')
+        center.addObserverForName_object_queue_usingBlock_.side_effect = \
+            lambda name, obj, queue, block: self.blocks.setdefault(name, block) and name
+        workspace = MagicMock(name='workspace')
+        workspace.notificationCenter.return_value = center
+        workspace.activeApplication.return_value = {'NSApplicationName': 'Finder'}
+        self.center = center
+        appkit = types.SimpleNamespace(
+            NSWorkspace=types.SimpleNamespace(sharedWorkspace=lambda: workspace),
+            NSWorkspaceDidActivateApplicationNotification='activate',
+        )
+        patcher = patch.dict(sys.modules, {'AppKit': appkit})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def activate(self, name):
+        app = types.SimpleNamespace(localizedName=lambda: name)
+        self.blocks['activate'](types.SimpleNamespace(userInfo=lambda: {'NSWorkspaceApplicationKey': app}))
+
+    def test_switches_hook_on_notification(self):
+        """通知を受けたその場でフックを着脱する（ポーリング間隔の遅れがない）"""
+        hook = FakeHook()
+        activation = ScopedActivation(hook, may_host_discord, clock=FakeClock())
+        with patch('utils.foreground.IS_MAC', True):
+            watcher = ActivationWatcher(activation.on_foreground, run_loop_available=True)
+            self.assertTrue(watcher.available())
+            watcher.start()
+            self.assertFalse(hook.installed)
+            self.activate('Discord')
+            self.assertTrue(hook.installed)
+            self.activate('Google Chrome')
+            self.assertTrue(hook.installed)
+            self.activate('Terminal')
+            self.assertFalse(hook.installed)
+            watcher.stop()
+        self.center.removeObserver_.assert_called_once()
+
+    def test_unavailable_without_run_loop(self):
+        """メインの実行ループがない（CLI）なら使わない"""
+        with patch('utils.foreground.IS_MAC', True):
+            self.assertFalse(ActivationWatcher(print, run_loop_available=False).available())
+
+
+class TestGuardScopedActivation(unittest.TestCase):
+    """ガードのスコープ付き起動のテストケース"""
+
+    def run_scoped(self, has_main_run_loop):
+        from discord_send_guard import DiscordSendGuard
+        guard = DiscordSendGuard()
+        guard.has_main_run_loop = has_main_run_loop
+        guard._stop_event.set()
+        with patch('discord_send_guard.ActivationWatcher') as activation_watcher, \
+                patch('discord_send_guard.ForegroundWatcher') as foreground_watcher:
+            activation_watcher.return_value.available.return_value = has_main_run_loop
+            guard._run_scoped()
+        return guard, activation_watcher, foreground_watcher
+
+    def test_uses_notifications_in_app(self):
+        """アプリでは通知で切り替え、ポーリングしない"""
+        guard, activation_watcher, foreground_watcher = self.run_scoped(True)
+        activation_watcher.return_value.start.assert_called_once()
+        foreground_watcher.assert_not_called()
+        self.assertIs(guard.activation.matcher, may_host_discord)
+
+    def test_polls_in_cli(self):
+        """CLIではポーリングに戻る"""
+        _, activation_watcher, foreground_watcher = self.run_scoped(False)
+        activation_watcher.return_value.start.assert_not_called()
+        foreground_watcher.return_value.start.assert_called_once()
+
+
+class TestMayHostDiscord(unittest.TestCase):
+    """may_host_discordのテストケース"""
+
+    def test_browsers_keep_hook(self):
+        """Discordとブラウザ（アプリ名・ウィンドウタイトル）ではフックを外さない"""
+        for name in ('discord', 'discord ptb', 'google chrome', 'safari', 'arc',
+                     'youtube - google chrome', 'inbox — mozilla firefox'):
+            with self.subTest(name=name):
+                self.assertTrue(may_host_discord(name))
+        for name in ('finder', 'terminal', 'slack', ''):
+            with self.subTest(name=name):
+                self.assertFalse(may_host_discord(name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+ウィンドウ分類（ブラウザ版Discordの検出）のテスト
+"""
+
+import unittest
+import os
+import sys
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.browser import (
+    WindowClassifier, classify_window, is_discord_title, is_discord_url, linux_app_name,
+)
+
+CORPUS = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'data', 'window_titles.tsv')
+
+
+class TestClassifyWindow(unittest.TestCase):
+    """classify_windowのテストケース"""
+
+    def test_corpus(self):
+        """実際のウィンドウタイトル集をすべて正しく分類"""
+        with open(CORPUS, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                expected, app, title = line.rstrip('\n').split('\t')
+                with self.subTest(app=app, title=title):
+                    self.assertEqual(classify_window(app, title), expected == '1')
+
+    def test_url_overrides_title(self):
+        """ブラウザはURLがあればURLで判定"""
+        self.assertTrue(classify_window('safari', '', 'https://discord.com/channels/1/2'))
+        self.assertFalse(classify_window('safari', 'Discord | #general | S', 'https://example.com/'))
+
+    def test_urls(self):
+        """DiscordのWebクライアントのURLのみTrue"""
+        self.assertTrue(is_discord_url('https://discord.com/channels/@me/123'))
+        self.assertTrue(is_discord_url('https://ptb.discord.com/channels/1/2'))
+        self.assertFalse(is_discord_url('https://discord.com/blog'))
+        self.assertFalse(is_discord_url('https://notdiscord.com/channels/1/2'))
+        self.assertFalse(is_discord_url(None))
+
+    def test_search_results_are_not_discord(self):
+        """「Discord」の検索結果ページは対象外"""
+        self.assertFalse(is_discord_title('Discord - Google Search - Google Chrome'))
+        self.assertTrue(is_discord_title('Discord | #general | Server - Google Chrome'))
+
+    def test_unknown_app_falls_back_to_title(self):
+        """アプリ名が取れない場合はタイトルのみで判定"""
+        self.assertTrue(classify_window('', 'Discord - Channel Name'))
+        self.assertFalse(classify_window('', 'Google Chrome'))
+
+    def test_linux_app_names(self):
+        """X11のWM_CLASS・プロセス名を既知のアプリ名に揃える"""
+        self.assertEqual(linux_app_name(['discord', 'discord', 'Discord']), 'discord')
+        self.assertEqual(linux_app_name(['Navigator', 'firefox-esr']), 'firefox')
+        self.assertEqual(linux_app_name(['code', 'Code', 'code']), 'code')
+        self.assertEqual(linux_app_name([]), '')
+        self.assertFalse(classify_window(linux_app_name(['code', 'Code']), 'discord-notes.md - Visual Studio Code'))
+
+
+class TestWindowClassifier(unittest.TestCase):
+    """WindowClassifierのテストケース"""
+
+    def setUp(self):
+        self.lookups = []
+        self.classifier = WindowClassifier(max_entries=3)
+
+    def describe(self, app, url=None):
+        def lookup():
+            self.lookups.append(app)
+            return app, url
+        return lookup
+
+    def test_cached_per_window_and_title(self):
+        """同じウィンドウ・タイトルでは再判定しない"""
+        for _ in range(10):
+            self.assertTrue(self.classifier.classify(1, 'Discord | #a | S', self.describe('google chrome')))
+        self.assertEqual(len(self.lookups), 1)
+
+    def test_title_change_reclassifies(self):
+        """タブ切り替えでタイトルが変われば再判定"""
+        self.classifier.classify(1, 'Discord | #a | S', self.describe('google chrome'))
+        self.assertFalse(self.classifier.classify(1, 'YouTube', self.describe('google chrome')))
+        self.assertEqual(len(self.lookups), 2)
+
+    def test_bounded(self):
+        """キャッシュは上限を超えない（古いものから捨てる）"""
+        for window in range(10):
+            self.classifier.classify(window, 'Discord', self.describe('discord'))
+        self.assertEqual(len(self.classifier), 3)
+        self.classifier.classify(0, 'Discord', self.describe('discord'))
+        self.assertEqual(len(self.lookups), 11)
+
+    def test_hits_refresh_recency(self):
+        """ヒットしたウィンドウは最近使ったものになり、先に捨てられない（LRU）"""
+        for window in range(3):
+            self.classifier.classify(window, 'Discord', self.describe('discord'))
+        self.classifier.classify(0, 'Discord', self.describe('discord'))
+        self.classifier.classify(3, 'Discord', self.describe('discord'))
+        self.classifier.classify(0, 'Discord', self.describe('discord'))
+        self.assertEqual(len(self.lookups), 4)
+        self.classifier.classify(1, 'Discord', self.describe('discord'))
+        self.assertEqual(len(self.lookups), 5)
+
+    def test_url_keys_tabs_without_title(self):
+        """タイトルが読めないとき（画面収録の許可なし）はURLでタブを見分ける"""
+        discord_url = 'https://discord.com/channels/1/2'
+        self.assertTrue(self.classifier.classify(
+            1, '', self.describe('google chrome'), url=discord_url))
+        self.assertFalse(self.classifier.classify(
+            1, '', self.describe('google chrome'), url='https://www.youtube.com/'))
+        self.assertTrue(self.classifier.classify(
+            1, '', self.describe('google chrome'), url=discord_url))
+        self.assertEqual(len(self.lookups), 2)
+
+    def test_counts_hits_and_misses(self):
+        """統計にヒット・ミスを記録"""
+        from utils.stats import GuardStats
+        stats = GuardStats()
+        classifier = WindowClassifier(stats=stats)
+        classifier.classify(1, 'Discord', self.describe('discord'))
+        classifier.classify(1, 'Discord', self.describe('discord'))
+        self.assertEqual(stats.counters['window_cache_hits'], 1)
+        self.assertEqual(stats.counters['window_cache_misses'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
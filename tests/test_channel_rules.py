@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+チャンネルごとのルールのテスト
+"""
+
+import unittest
+import os
+import sys
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.channel_rules import ChannelRules, RuleError, ACTION_GUARD, ACTION_OFF
+from utils.stats import GuardStats
+
+
+class TestChannelRules(unittest.TestCase):
+    """ChannelRulesのテストケース"""
+
+    def setUp(self):
+        self.stats = GuardStats()
+        self.rules = ChannelRules([
+            ('#code-paste', ACTION_OFF),
+            (r're:#(sn|sp)ippets?\b', ACTION_OFF),
+            ('#*-dev | Acme', ACTION_GUARD),
+            ('Acme', ACTION_OFF),
+        ], stats=self.stats)
+
+    def test_first_matching_rule_wins(self):
+        """先に書かれたルールが優先"""
+        self.assertEqual(self.rules.match('#code-paste | Acme - Discord'), 0)
+        self.assertEqual(self.rules.match('#backend-dev | Acme - Discord'), 2)
+        self.assertEqual(self.rules.match('#general | Acme - Discord'), 3)
+
+    def test_regex_with_groups(self):
+        """グループを含む正規表現ルールでも正しいルールを返す"""
+        self.assertEqual(self.rules.match('#snippets | Other - Discord'), 1)
+        self.assertEqual(self.rules.match('#spippet | Other - Discord'), 1)
+        self.assertIsNone(self.rules.match('#snippetsx | Other - Discord'))
+
+    def test_case_insensitive_and_default(self):
+        """大文字小文字を区別せず、該当なしはデフォルト動作"""
+        self.assertEqual(self.rules.on_title('#CODE-PASTE | acme - Discord'), ACTION_OFF)
+        self.assertEqual(self.rules.on_title('#general | Other - Discord'), ACTION_GUARD)
+
+    def test_evaluates_only_on_title_change(self):
+        """同じタイトルでは再評価しない"""
+        for _ in range(5):
+            self.rules.on_title('#code-paste | Acme - Discord')
+        self.rules.on_title('#general | Other - Discord')
+        self.assertEqual(self.stats.counters['channel_rule_evaluations'], 2)
+        self.assertEqual(self.rules.action, ACTION_GUARD)
+
+    def test_glob_escapes_regex_characters(self):
+        """通常パターンの記号は文字として扱う"""
+        rules = ChannelRules([('#c++ (help)', ACTION_OFF)])
+        self.assertEqual(rules.match('#c++ (help) | Lang - Discord'), 0)
+        self.assertIsNone(rules.match('#cc (help) | Lang - Discord'))
+
+    def test_empty_rules(self):
+        """ルールなしは常にガード"""
+        rules = ChannelRules()
+        self.assertFalse(rules)
+        self.assertEqual(rules.on_title('#code-paste'), ACTION_GUARD)
+
+    def test_from_config(self):
+        """設定のリストから作成（actionの既定はoff）"""
+        rules = ChannelRules.from_config([{'pattern': '#code-paste'}, {'pattern': 'Acme', 'action': 'guard'}])
+        self.assertEqual(rules.rules, [('#code-paste', ACTION_OFF), ('Acme', ACTION_GUARD)])
+
+    def test_invalid_rules(self):
+        """不正なルールはRuleError"""
+        with self.assertRaises(RuleError):
+            ChannelRules([('#a', 'explode')])
+        with self.assertRaises(RuleError):
+            ChannelRules([('re:(unclosed', ACTION_OFF)])
+        with self.assertRaises(RuleError):
+            ChannelRules.from_config(['#a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
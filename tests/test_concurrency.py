@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+"""
+ガード・設定・GUIを同時に操作するストレステスト
+
+再生したキー入力を高頻度でフックに流しながら、別スレッドで有効/無効の切り替え、
+設定の書き換えと再読み込み、設定ウィンドウの開閉を繰り返す。終了後に
+Enterの取りこぼし・重複がないこと、修飾キーが押しっぱなしで残らないこと、
+どのスレッドも止まらない（デッドロックしない）ことを確認し、主要なロックの
+保持時間と競合を表示する。
+
+既定は短時間。STRESS_SECONDS=60 のように実行時間を延ばせる。
+"""
+
+import enum
+import faulthandler
+import importlib
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import discord_send_guard as dsg
+from discord_send_guard import DiscordSendGuard
+from utils import config as config_module
+from utils.state_machine import ACT_REPEAT_NEWLINE
+
+STRESS_SECONDS = float(os.environ.get('STRESS_SECONDS', '2'))
+JOIN_TIMEOUT = 10.0
+# ロックの保持がこれを超えたら、ロックを持ったまま待っている
+MAX_HOLD_SECONDS = 0.5
+
+
+class FakeKey(enum.Enum):
+    """区別できるキー（dummyバックエンドのKeyはすべて等しくなる）"""
+    enter = 'enter'
+    shift = 'shift'
+    ctrl = 'ctrl'
+    alt = 'alt'
+    cmd = 'cmd'
+    backspace = 'backspace'
+    esc = 'esc'
+    char = 'char'
+
+
+MODIFIERS = (FakeKey.shift, FakeKey.ctrl, FakeKey.alt, FakeKey.cmd)
+
+
+class TimedLock:
+    """取得回数・競合・待ち時間・保持時間を記録するロック（Lock/RLockの代わり）"""
+
+    def __init__(self, name, reentrant=False):
+        self.name = name
+        self._lock = threading.RLock() if reentrant else threading.Lock()
+        self._depth = 0
+        self._held_at = 0.0
+        self.acquisitions = 0
+        self.contended = 0
+        self.max_wait = 0.0
+        self.max_hold = 0.0
+        self.total_hold = 0.0
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self._lock.acquire(False):
+            waited = None
+        elif not blocking:
+            return False
+        else:
+            started = time.perf_counter()
+            if not self._lock.acquire(True, timeout):
+                return False
+            waited = time.perf_counter() - started
+        # ここからはロックを持っているので記録も守られる
+        if waited is not None:
+            self.contended += 1
+            self.max_wait = max(self.max_wait, waited)
+        if self._depth == 0:
+            self._held_at = time.perf_counter()
+            self.acquisitions += 1
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            held = time.perf_counter() - self._held_at
+            self.total_hold += held
+            self.max_hold = max(self.max_hold, held)
+        self._lock.release()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def report(self) -> str:
+        mean_us = self.total_hold / self.acquisitions * 1e6 if self.acquisitions else 0.0
+        rate = self.contended / self.acquisitions * 100 if self.acquisitions else 0.0
+        return (f"{self.name:<12} {self.acquisitions:>9} {self.contended:>8} {rate:>6.2f}% "
+                f"{self.max_wait * 1e3:>9.3f} {self.max_hold * 1e3:>9.3f} {mean_us:>8.2f}")
+
+
+class KeySource:
+    """OSのキーボード: 開始中のリスナーにだけイベントを届ける（それ以外は素通り）"""
+
+    def __init__(self):
+        self.listener = None
+        # 再生スレッドだけが数える
+        self.enter_downs = 0  # リスナーに届いたEnterの押下
+        self.passed_enters = 0  # そのうちフックで破棄されずアプリに届いたもの
+
+    def emit(self, key, down):
+        listener = self.listener
+        if listener is None or not down or key is not FakeKey.enter:
+            if listener is not None:
+                listener.deliver(key, down)
+            return
+        passed = listener.deliver(key, down)
+        if passed is not None:
+            self.enter_downs += 1
+            self.passed_enters += passed
+
+
+class FakeListener:
+    """
+    keyboard.Listenerの代わり: stop()後はコールバックせず、join()は実行中のコールバックを待つ
+
+    macOSのリスナーと同じく、コールバックがFalseを返したら止まり（そのイベントは
+    届いたものとして扱う）、コールバックの直後にガードの判定でイベントを破棄する
+    """
+
+    def __init__(self, source, on_press, on_release, take_disposition):
+        self.source = source
+        self.on_press = on_press
+        self.on_release = on_release
+        self.take_disposition = take_disposition
+        self._callback = threading.Lock()
+        self._stopped = threading.Event()
+
+    def deliver(self, key, down):
+        """
+        Returns:
+            届かなければNone、届いたらアプリまで通したか（保留の確定後に送り直すものを含む）
+        """
+        with self._callback:
+            if self._stopped.is_set():
+                return None
+            if (self.on_press if down else self.on_release)(key) is False:
+                self.stop()
+            return self.take_disposition() != dsg.EVENT_SUPPRESS
+
+    def start(self):
+        self.source.listener = self
+
+    def stop(self):
+        self._stopped.set()
+        if self.source.listener is self:
+            self.source.listener = None
+
+    def join(self, timeout=None):
+        self._stopped.wait(timeout)
+        with self._callback:
+            pass
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        self.join()
+
+
+class CountingController:
+    """keyboard.Controllerの代わり: Shift付き/なしのEnter注入を数える（複数スレッドから呼ばれる）"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def press(self, key):
+        if key is FakeKey.enter:
+            kind = 'shift_enter' if getattr(self._local, 'shift', 0) else 'plain_enter'
+            with self._lock:
+                self.counts[kind] += 1
+
+    def release(self, key):
+        pass
+
+    def pressed(self, *keys):
+        controller = self
+
+        class _Pressed:
+            def __enter__(self):
+                if FakeKey.shift in keys:
+                    controller._local.shift = getattr(controller._local, 'shift', 0) + 1
+
+            def __exit__(self, *exc):
+                if FakeKey.shift in keys:
+                    controller._local.shift -= 1
+                return False
+
+        return _Pressed()
+
+
+class StressGuard(DiscordSendGuard):
+    """判定の経路ごとに回数を数えるガード"""
+
+    def __init__(self, source):
+        super().__init__()
+        self.source = source
+        self.discord_active = True
+        self.tally = Counter()
+        self._tally_lock = threading.Lock()
+        self._context = threading.local()
+
+    def count(self, name, amount=1):
+        with self._tally_lock:
+            self.tally[name] += amount
+
+    def _create_listener(self):
+        return FakeListener(self.source, self._hook_press, self._hook_release, self._take_disposition)
+
+    def _query_discord_active(self):
+        return self.discord_active
+
+    def _apply_repeat(self, action):
+        self.count('repeat')
+        if action == ACT_REPEAT_NEWLINE:
+            self.count('repeat_newline')
+        passed = super()._apply_repeat(action)
+        if passed:
+            self.count('repeat_passed')
+        return passed
+
+    def _observe_stats(self, outcome, mask):
+        # パイプラインの判定だけを数える（保留の確定・まとめた改行の注入は別に数える）
+        context = getattr(self._context, 'name', None)
+        if context is None:
+            self.count('decided')
+            self.count(f'decided_{outcome}')
+        elif context == 'resolve':
+            self.count(f'resolved_{outcome}')
+        super()._observe_stats(outcome, mask)
+
+    def _resolve_held_enter(self, mask):
+        self.count('resolved')
+        self._context.name = 'resolve'
+        try:
+            super()._resolve_held_enter(mask)
+        finally:
+            self._context.name = None
+
+    def _inject_newlines(self, count):
+        self.count('injected_newlines', count)
+        self._context.name = 'inject'
+        try:
+            super()._inject_newlines(count)
+        finally:
+            self._context.name = None
+
+
+def key_stream(rng, count):
+    """(key, down): 入力、修飾キー付きEnter、押しっぱなしのEnter（リピート）"""
+    events = []
+    while len(events) < count:
+        roll = rng.random()
+        if roll < 0.6:
+            key = FakeKey.char if rng.random() < 0.9 else rng.choice((FakeKey.backspace, FakeKey.esc))
+            events += [(key, True), (key, False)]
+        elif roll < 0.8:
+            events += [(FakeKey.enter, True), (FakeKey.enter, False)]
+        elif roll < 0.95:
+            modifier = rng.choice(MODIFIERS)
+            events += [(modifier, True), (FakeKey.enter, True), (FakeKey.enter, False), (modifier, False)]
+        else:
+            events += [(FakeKey.enter, True)] * rng.randint(3, 20) + [(FakeKey.enter, False)]
+    return events
+
+
+def fake_tkinter():
+    """ディスプレイなしで設定ウィンドウを開閉するためのtkinter"""
+
+    class Var:
+        def __init__(self, value=False, **kwargs):
+            self.value = value
+
+        def get(self):
+            return self.value
+
+        def set(self, value):
+            self.value = value
+
+    tk = MagicMock(name='tkinter')
+    tk.BooleanVar = tk.StringVar = Var
+    ttk = MagicMock(name='ttk')
+    messagebox = MagicMock(name='messagebox')
+    tk.ttk, tk.messagebox = ttk, messagebox
+    return {'tkinter': tk, 'tkinter.ttk': ttk, 'tkinter.messagebox': messagebox}
+
+
+class ErrorCounter(logging.Handler):
+    """ERROR以上のログを数える"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestGuardLifecycle(unittest.TestCase):
+    """start()/stop()が交錯するケースのテスト"""
+
+    def setUp(self):
+        patcher = patch.multiple(dsg, Key=FakeKey, MODIFIER_KEYS={
+            dsg.MOD_SHIFT: (FakeKey.shift,), dsg.MOD_CTRL: (FakeKey.ctrl,),
+            dsg.MOD_ALT: (FakeKey.alt,), dsg.MOD_CMD: (FakeKey.cmd,),
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.source = KeySource()
+        self.guard = StressGuard(self.source)
+        self.guard.keyboard_controller = CountingController()
+        self.guard.apply_config({'raise_priority': False, 'gc_tuning': False, 'ime_awareness': False,
+                                 'flight_recorder': False, 'foreground_strategy': 'direct'})
+
+    def run_guard(self):
+        thread = threading.Thread(target=self.guard.start, daemon=True)
+        thread.start()
+        return thread
+
+    def wait_listening(self, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while self.source.listener is None and time.monotonic() < deadline:
+            time.sleep(0.001)
+        self.assertIsNotNone(self.source.listener)
+
+    def test_stop_right_after_start(self):
+        """開始直後（リスナー作成前）のstop()も取りこぼさない"""
+        for _ in range(200):
+            thread = self.run_guard()
+            while not self.guard.running and thread.is_alive():
+                time.sleep(0)
+            self.guard.stop()
+            thread.join(2.0)
+            self.assertFalse(thread.is_alive())
+            self.assertFalse(self.guard.running)
+
+    def test_restart_waits_for_teardown(self):
+        """stop()直後のstart()は前回の後片付けを待ってから動く"""
+        for _ in range(50):
+            first = self.run_guard()
+            self.wait_listening()
+            self.guard.stop()
+            second = self.run_guard()
+            self.wait_listening()
+            self.assertTrue(self.guard.running)
+            self.assertIsNotNone(self.guard.scheduler._thread)
+            self.guard.stop()
+            first.join(2.0)
+            second.join(2.0)
+            self.assertFalse(first.is_alive() or second.is_alive())
+
+    def test_key_state_reset_on_start(self):
+        """停止中に離されたキーは押されたままにしない"""
+        thread = self.run_guard()
+        self.wait_listening()
+        self.source.emit(FakeKey.shift, True)
+        self.source.emit(FakeKey.enter, True)
+        self.guard.stop()
+        thread.join(2.0)
+        # 停止中に離された（リスナーには届かない）
+        self.source.emit(FakeKey.shift, False)
+        self.source.emit(FakeKey.enter, False)
+        thread = self.run_guard()
+        self.wait_listening()
+        self.assertEqual(self.guard.modifier_mask, 0)
+        self.assertFalse(self.guard.machine.enter_down)
+        self.guard.stop()
+        thread.join(2.0)
+
+    def test_queued_newlines_injected_at_stop(self):
+        """停止前にキューに入ったリピートの改行は停止時に注入する（次回の開始時ではなく）"""
+        thread = self.run_guard()
+        self.wait_listening()
+        self.guard.enter_pipeline(0)
+        self.guard.machine.enter_down = True
+        self.guard._apply_repeat(ACT_REPEAT_NEWLINE)
+        self.guard.stop()
+        thread.join(2.0)
+        self.assertEqual(self.guard.keyboard_controller.counts['shift_enter'], 2)
+        self.assertEqual(len(self.guard.scheduler), 0)
+
+    def test_lookahead_removed_while_deciding(self):
+        """先読みが外れた直後に古いパイプラインで判定されても即時に処理"""
+        self.guard.apply_config({'enter_lookahead_ms': 30, 'ime_awareness': False,
+                                 'foreground_strategy': 'direct'})
+        pipeline = self.guard.enter_pipeline
+        self.guard.lookahead = None
+        self.assertFalse(pipeline(0))
+        self.assertEqual(self.guard.keyboard_controller.counts['shift_enter'], 1)
+
+
+class TestConcurrencyStress(unittest.TestCase):
+    """入力の再生・切り替え・設定の再読み込み・設定ウィンドウを同時に動かすテスト"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        home = Path(self.tmpdir.name)
+        for patcher in (
+            patch.multiple(dsg, Key=FakeKey, MODIFIER_KEYS={
+                dsg.MOD_SHIFT: (FakeKey.shift,), dsg.MOD_CTRL: (FakeKey.ctrl,),
+                dsg.MOD_ALT: (FakeKey.alt,), dsg.MOD_CMD: (FakeKey.cmd,),
+            }),
+            patch.object(config_module, 'CONFIG_DIR', home / 'config'),
+            patch.object(config_module, 'CONFIG_FILE', home / 'config' / 'config.json'),
+            patch('utils.flight_recorder.RECORDER_FILE', home / 'flight.rec'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # app.pyは読み込み時にログの出力先を設定するので、一時ディレクトリに向けて読み込む
+        with patch('pathlib.Path.home', return_value=home), patch('logging.basicConfig'):
+            app_module = importlib.import_module('app')
+        with patch.dict(sys.modules, fake_tkinter()):
+            sys.modules.pop('gui.settings_window', None)
+            self.settings_module = importlib.import_module('gui.settings_window')
+
+        self.config = config_module.Config()
+        self.config.update({'raise_priority': False, 'enter_rate_limit': 0})
+        self.source = KeySource()
+        self.guard = StressGuard(self.source)
+        self.guard.keyboard_controller = CountingController()
+        self.guard.apply_config(self.config)
+
+        # rumpsなしのメニューバーアプリ（ガードの操作部分だけ）
+        app = app_module.DiscordSendGuardApp.__new__(app_module.DiscordSendGuardApp)
+        app.config = self.config
+        app.guard = self.guard
+        app.guard_thread = None
+        app._enable_lock = threading.RLock()
+        app.app = types.SimpleNamespace(menu={})
+        app.status_item = types.SimpleNamespace(title='')
+        self.app = app
+
+        self.locks = self.instrument_locks()
+        self.errors = ErrorCounter()
+        logging.getLogger().addHandler(self.errors)
+        self.addCleanup(logging.getLogger().removeHandler, self.errors)
+        root_level = logging.getLogger().level
+        self.addCleanup(logging.getLogger().setLevel, root_level)
+        logging.disable(logging.WARNING)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def instrument_locks(self):
+        """主要なロックを計測付きに差し替え（スケジューラのスレッド開始前に行う）"""
+        guard = self.guard
+        locks = {
+            'lifecycle': TimedLock('lifecycle'),
+            'pipeline': TimedLock('pipeline'),
+            'coalescer': TimedLock('coalescer'),
+            'scheduler': TimedLock('scheduler'),
+            'stats': TimedLock('stats'),
+            'config': TimedLock('config', reentrant=True),
+        }
+        guard._lifecycle_lock = locks['lifecycle']
+        guard._pipeline_lock = locks['pipeline']
+        guard.coalescer._lock = locks['coalescer']
+        guard.scheduler._lock = locks['scheduler']
+        guard.scheduler._wake = threading.Condition(locks['scheduler'])
+        guard.stats._lock = locks['stats']
+        self.config._lock = locks['config']
+        return locks
+
+    def test_stress(self):
+        """取りこぼし・重複・押しっぱなし・デッドロックがない"""
+        done = threading.Event()
+        failures = []
+        rounds = Counter()
+
+        def worker(name, body, seed):
+            rng = random.Random(seed)
+            try:
+                while not done.is_set():
+                    body(rng)
+                    rounds[name] += 1
+            except Exception as e:
+                failures.append(f"{name}: {e!r}")
+
+        stream = key_stream(random.Random(47), 20000)
+
+        def replay(rng):
+            # フックスレッド: 前面アプリも時々切り替わる
+            self.guard.discord_active = rng.random() < 0.8
+            start = rng.randrange(len(stream) - 2000)
+            for key, down in stream[start:start + 2000]:
+                self.source.emit(key, down)
+            # 離し忘れがないように再生の区切りでは全部離す
+            for key in MODIFIERS + (FakeKey.enter,):
+                self.source.emit(key, False)
+
+        def toggle(rng):
+            self.app._set_enabled(True)
+            time.sleep(rng.random() * 0.01)
+            self.app._set_enabled(False)
+            if rng.random() < 0.3:
+                # 有効化の直後に無効化（guard.start()の前にstop()が届く）
+                self.app._set_enabled(True)
+                self.app._set_enabled(False)
+            self.app._set_enabled(True)
+            time.sleep(rng.random() * 0.02)
+
+        def reload(rng):
+            self.config.update({
+                'enter_lookahead_ms': rng.choice((0, 0, 20)),
+                'storm_protection': rng.random() < 0.8,
+                'decision_trace': rng.random() < 0.5,
+                'flight_recorder': rng.random() < 0.5,
+                'channel_rules': rng.choice(([], [{'pattern': 'general', 'action': 'off'}])),
+                'keybindings': rng.choice(({'enter': 'newline', 'mod+enter': 'pass'},
+                                           {'enter': 'newline', 'mod+enter': 'send'})),
+            })
+            self.app._reload_config()
+            time.sleep(rng.random() * 0.005)
+
+        def settings(rng):
+            window = self.settings_module.SettingsWindow(self.config, self.guard)
+            if rng.random() < 0.2:
+                window.enabled_var.set(not window.enabled_var.get())
+            if rng.random() < 0.5:
+                window._save_settings()
+            else:
+                window._cancel()
+            time.sleep(rng.random() * 0.005)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        self.addCleanup(sys.setswitchinterval, interval)
+        threads = [threading.Thread(target=worker, args=(name, body, seed), name=name, daemon=True)
+                   for seed, (name, body) in enumerate(
+                       (('replay', replay), ('toggle', toggle), ('reload', reload), ('settings', settings)))]
+        for thread in threads:
+            thread.start()
+        time.sleep(STRESS_SECONDS)
+        done.set()
+        for thread in threads:
+            thread.join(JOIN_TIMEOUT)
+        stuck = [thread.name for thread in threads if thread.is_alive()]
+        if stuck:
+            faulthandler.dump_traceback(sys.stderr)
+            self.fail(f"Threads did not finish (deadlock?): {stuck}")
+        sys.setswitchinterval(interval)
+        self.assertEqual(failures, [])
+
+        # 最後にもう一度、全部が届く状態で再生してから止める
+        self.app._set_enabled(True)
+        deadline = time.monotonic() + 2
+        while self.source.listener is None and time.monotonic() < deadline:
+            time.sleep(0.001)
+        self.assertIsNotNone(self.source.listener)
+        replay(random.Random(0))
+        self.assertEqual(self.guard.modifier_mask, 0, "modifier stuck after a balanced replay")
+        self.app._set_enabled(False)
+        self.assertFalse(self.app._guard_running())
+        self.assertFalse(self.guard.running)
+
+        tally = self.guard.tally
+        injected = self.guard.keyboard_controller.counts
+        print(f"\n{dict(rounds)} enter downs={self.source.enter_downs} {dict(tally)} {dict(injected)}")
+        print(f"{'lock':<12} {'acquired':>9} {'waited':>8} {'rate':>7} {'max wait':>9} "
+              f"{'max hold':>9} {'mean us':>8}  (ms)")
+        for lock in self.locks.values():
+            print(lock.report())
+
+        self.assertGreater(rounds['toggle'], 0)
+        self.assertGreater(rounds['reload'], 0)
+        self.assertGreater(rounds['settings'], 0)
+        self.assertGreater(self.source.enter_downs, 0)
+        # 届いたEnterはどれも1回だけ判定される（パイプラインかリピート）
+        self.assertEqual(tally['decided'] + tally['repeat'], self.source.enter_downs)
+        # 保留したEnterはすべて1回だけ確定
+        self.assertEqual(tally['decided_held'], tally['resolved'])
+        # キューに入れた改行はすべて注入済み
+        self.assertEqual(tally['injected_newlines'], tally['repeat_newline'])
+        self.assertEqual(len(self.guard.scheduler), 0)
+        # 注入したShift+Enterは改行の判定と一致（重複・欠落なし）
+        self.assertEqual(injected['shift_enter'],
+                         tally['decided_converted'] + tally['resolved_converted'] + tally['injected_newlines'])
+        # アプリに届いたEnter（通した元のEnterと注入したEnter）は送信の判定と一致
+        sent = sum(tally[f'decided_{outcome}'] for outcome in
+                   ('send', 'passthrough', 'ime_confirm', 'outside_composer', 'channel_off'))
+        self.assertEqual(self.source.passed_enters + injected['plain_enter'],
+                         sent + tally['resolved_send'] + tally['repeat_passed'])
+        self.assertEqual([record.getMessage() for record in self.errors.records], [])
+        for name in ('pipeline', 'coalescer', 'scheduler', 'stats', 'lifecycle'):
+            self.assertLess(self.locks[name].max_hold, MAX_HOLD_SECONDS, name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+制御ソケットのテスト
+"""
+
+import unittest
+import os
+import sys
+import socket
+import tempfile
+import threading
+import types
+import importlib
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.control import ControlServer, ControlError, send_command, guard_handlers, HAS_UNIX_SOCKETS
+from utils.stats import GuardStats
+
+
+class FakeGuard:
+    """制御ハンドラ用の最小限のガード"""
+
+    def __init__(self):
+        self.enabled = True
+        self.running = True
+        self.stats = GuardStats()
+
+
+@unittest.skipUnless(HAS_UNIX_SOCKETS, "Unix domain sockets required")
+class TestControlServer(unittest.TestCase):
+    """ControlServerのテストケース"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "control.sock"
+        self.guard = FakeGuard()
+        self.reloads = []
+        handlers = guard_handlers(self.guard, reload_config=lambda: self.reloads.append(1))
+        self.server = ControlServer(handlers, path=self.path)
+        self.assertTrue(self.server.start())
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+    def test_enable_disable(self):
+        """enable/disableでガードの状態が切り替わる"""
+        self.assertEqual(send_command('disable', path=self.path), {"enabled": False})
+        self.assertFalse(self.guard.enabled)
+        self.assertEqual(send_command('enable', path=self.path), {"enabled": True})
+        self.assertTrue(self.guard.enabled)
+
+    def test_reload_stats_trace_health(self):
+        """reload/stats/trace/healthの応答"""
+        self.guard.stats.incr('enter_converted', 3)
+        self.guard.stats.trace('enter', action='converted')
+        self.guard.stats.trace('enter', action='send')
+
+        send_command('reload', path=self.path)
+        self.assertEqual(self.reloads, [1])
+
+        stats = send_command('stats', path=self.path)
+        self.assertEqual(stats['counters']['enter_converted'], 3)
+
+        trace = send_command('trace', ['1'], path=self.path)
+        self.assertEqual([entry['action'] for entry in trace], ['send'])
+
+        health = send_command('health', path=self.path)
+        self.assertEqual(health['status'], 'ok')
+        self.assertEqual(health['pid'], os.getpid())
+
+    def test_unknown_command(self):
+        """未知のコマンドはエラー"""
+        with self.assertRaises(ControlError):
+            send_command('explode', path=self.path)
+
+    def test_pipelined_requests_on_one_connection(self):
+        """1つの接続で複数リクエストを送信できる"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(2)
+        sock.connect(str(self.path))
+        sock.sendall(b'health\nbogus\nstats\n')
+        data = b''
+        while data.count(b'\n') < 3:
+            data += sock.recv(65536)
+        sock.close()
+        lines = data.decode().splitlines()
+        self.assertTrue(lines[0].startswith('ok '))
+        self.assertTrue(lines[1].startswith('error '))
+        self.assertTrue(lines[2].startswith('ok '))
+
+    def test_concurrent_clients(self):
+        """複数クライアントからの同時リクエスト"""
+        errors = []
+
+        def client():
+            try:
+                for _ in range(50):
+                    self.assertEqual(send_command('health', path=self.path)['status'], 'ok')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=client) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+        self.assertEqual(errors, [])
+
+    def test_stale_socket_is_replaced(self):
+        """死んだプロセスのソケットファイルは再利用される"""
+        self.server.stop()
+        self.path.touch()
+        server = ControlServer({}, path=self.path)
+        self.assertTrue(server.start())
+        server.stop()
+        self.assertFalse(self.path.exists())
+
+    def test_second_server_refused_while_live(self):
+        """稼働中のソケットは奪わない"""
+        server = ControlServer({}, path=self.path)
+        self.assertFalse(server.start())
+
+
+class TestAppControlHandlers(unittest.TestCase):
+    """メニューバーアプリの制御ハンドラのテストケース"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        # app.pyは読み込み時にログの出力先を設定するので、一時ディレクトリに向けて読み込む
+        with patch('pathlib.Path.home', return_value=Path(self.tmpdir.name)), patch('logging.basicConfig'):
+            app_module = importlib.import_module('app')
+        self.app = app_module.DiscordSendGuardApp.__new__(app_module.DiscordSendGuardApp)
+        self.app.config = types.SimpleNamespace(enabled=True)
+        self.app.guard = FakeGuard()
+        self.app._set_enabled = MagicMock(name='_set_enabled')
+        self.app._reload_config = MagicMock(name='_reload_config')
+        self.app._show_settings = MagicMock(name='_show_settings')
+        self.queued = []
+        app_helper = types.SimpleNamespace(callAfter=lambda func, *args: self.queued.append((func, args)))
+        modules = {'PyObjCTools': types.SimpleNamespace(AppHelper=app_helper),
+                   'PyObjCTools.AppHelper': app_helper}
+        patcher = patch.dict(sys.modules, modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with patch('utils.control.ControlServer') as server_class:
+            self.app._start_control_server()
+        self.handlers = server_class.call_args.args[0]
+
+    def test_handlers_run_on_main_thread(self):
+        """制御スレッドではメニューやウィンドウに触れず、メインスレッドに渡す"""
+        self.assertEqual(self.handlers['toggle']([]), {"enabled": False})
+        self.assertEqual(self.handlers['show-settings']([]), {"shown": True})
+        self.handlers['reload']([])
+        self.app._set_enabled.assert_not_called()
+        self.app._show_settings.assert_not_called()
+        self.app._reload_config.assert_not_called()
+        for func, args in self.queued:
+            func(*args)
+        self.app._set_enabled.assert_called_once_with(False)
+        self.app._show_settings.assert_called_once_with(None)
+        self.app._reload_config.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
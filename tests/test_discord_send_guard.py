@@ -12,7 +12,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from discord_send_guard import DiscordSendGuard
-from pynput.keyboard import Key
+from pynput.keyboard import Key, KeyCode
 
 
 class TestDiscordSendGuard(unittest.TestCase):
@@ -149,6 +149,54 @@ class TestDiscordSendGuard(unittest.TestCase):
         result = self.guard.on_press(Key.enter)
         self.assertTrue(result)
 
+    def test_listener_hook_installs_and_removes_listener(self):
+        """スコープ付き起動のバックエンドがリスナーを着脱する"""
+        from discord_send_guard import _ListenerHook
+        listener = MagicMock()
+        with patch.object(DiscordSendGuard, '_create_listener', return_value=listener):
+            hook = _ListenerHook(self.guard)
+            self.guard.modifier_pressed = True
+            hook.install()
+            self.assertIs(self.guard.listener, listener)
+            self.assertFalse(self.guard.modifier_pressed)
+            listener.start.assert_called_once()
+            hook.uninstall()
+            listener.stop.assert_called_once()
+            self.assertIsNone(self.guard.listener)
+
+    def test_apply_config(self):
+        """設定の反映"""
+        self.guard.apply_config({'debug': False, 'scoped_activation': True, 'gc_tuning': False})
+        self.assertFalse(self.guard.debug)
+        self.assertTrue(self.guard.scoped_activation)
+        self.assertFalse(self.guard.gc_tuning)
+
+    @patch.object(DiscordSendGuard, 'is_discord_active')
+    def test_enter_confirming_ime_composition(self, mock_discord_active):
+        """IME変換中のEnterは確定として変換せずに通す"""
+        mock_discord_active.return_value = True
+        self.guard.keyboard_controller = MagicMock()
+        self.guard.ime.set_input_source('com.apple.inputmethod.Kotoeri.RomajiTyping.Japanese')
+        self.guard.on_press(KeyCode.from_char('k'))
+        self.guard.on_press(KeyCode.from_char('a'))
+        self.assertTrue(self.guard.on_press(Key.enter))
+        self.guard.keyboard_controller.press.assert_not_called()
+        self.assertEqual(self.guard.stats.counters['enter_ime_confirm'], 1)
+
+    @patch.object(DiscordSendGuard, 'is_discord_active')
+    def test_enter_outside_message_composer(self, mock_discord_active):
+        """メッセージ入力欄以外（検索など）のEnterは変換しない"""
+        from utils.focus import FocusTracker, FakeAXProvider, FocusedElement
+        mock_discord_active.return_value = True
+        self.guard.keyboard_controller = MagicMock()
+        provider = FakeAXProvider(FocusedElement('AXComboBox', 'search', 'Search'))
+        self.guard.focus = FocusTracker(provider, self.guard.stats)
+        self.guard.focus.start(audit_interval=None)
+        self.assertTrue(self.guard.on_press(Key.enter))
+        self.assertEqual(self.guard.stats.counters['enter_outside_composer'], 1)
+        self.guard.keyboard_controller.press.assert_not_called()
+        self.guard.focus.stop()
+
     def test_stop_when_not_running(self):
         """実行中でないときのstop()のテスト"""
         self.assertFalse(self.guard.running)
@@ -177,6 +225,7 @@ class TestIntegration(unittest.TestCase):
 
             result = guard.on_press(Key.enter)
             self.assertTrue(result)
+            guard.on_release(Key.enter)
 
             guard.on_release(Key.cmd)
             self.assertFalse(guard.modifier_pressed)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+doctorコマンド（環境ごとのコスト計測）のテスト
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import contextmanager, redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import doctor
+from utils.doctor import (
+    Probe, ProbeUnavailable, SelfTimed, FakeFacilities, run_probe, run_doctor, fake_probes, format_report,
+)
+
+
+class TestProbes(unittest.TestCase):
+    """Probeの実行と順位付けのテストケース"""
+
+    def test_fake_ranking_is_deterministic(self):
+        """フェイクは固定のコストで、高い順に並び、使えないものは最後"""
+        results = run_doctor(fake_probes())
+        names = [r.name for r in results]
+        self.assertEqual(names[:4], ['import discord_send_guard', 'import numpy', 'import pynput', 'listener start'])
+        self.assertEqual(results[-1].name, 'import rumps')
+        self.assertEqual(results[-1].status, 'unavailable')
+        self.assertEqual({r.category for r in results},
+                         {'foreground', 'injection', 'permission', 'listener', 'import', 'config'})
+        self.assertAlmostEqual(results[0].median, 0.12)
+
+    def test_self_timed_and_runner_timed(self):
+        """SelfTimedを返す呼び出しはその値、それ以外（floatでも）は実行時間を記録"""
+        @contextmanager
+        def self_timed():
+            yield lambda: SelfTimed(0.5)
+
+        @contextmanager
+        def timed():
+            yield lambda: 0.5
+
+        self.assertEqual(run_probe(Probe('a', 'x', self_timed, 3)).median, 0.5)
+        result = run_probe(Probe('b', 'x', timed, 3))
+        self.assertEqual(result.status, 'ok')
+        self.assertLess(result.median, 0.5)
+
+    def test_failures_are_reported(self):
+        """使えない・失敗したプローブは例外にせず結果に残す"""
+        @contextmanager
+        def unavailable():
+            raise ProbeUnavailable('no display')
+            yield
+
+        @contextmanager
+        def failing():
+            yield lambda: 1 / 0
+
+        first = run_probe(Probe('a', 'x', unavailable, 3))
+        self.assertEqual((first.status, first.detail), ('unavailable', 'no display'))
+        second = run_probe(Probe('b', 'x', failing, 3))
+        self.assertEqual(second.status, 'error')
+        self.assertIn('ZeroDivisionError', second.detail)
+        report = format_report([first, second], doctor.environment('fake'))
+        self.assertIn('unavailable: no display', report)
+
+    def test_config_save_leaves_real_config(self):
+        """保存の計測は本物の設定ファイルを書き換えず、後片付けする"""
+        with tempfile.TemporaryDirectory() as tmp:
+            config_file = Path(tmp) / 'config.json'
+            config_file.write_text(json.dumps({'enabled': False}), encoding='utf-8')
+            before = config_file.read_bytes()
+            with patch.object(doctor, 'CONFIG_FILE', config_file):
+                result = run_probe(Probe('config save', 'config', lambda: doctor._config_save(Path(tmp)), 3))
+            self.assertEqual(result.status, 'ok')
+            self.assertEqual(config_file.read_bytes(), before)
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()), ['config.json'])
+
+    def test_real_probes_cover_every_area(self):
+        """実機用のプローブは全項目と各依存パッケージを含む"""
+        probes = doctor.real_probes('evdev')
+        self.assertEqual({p.category for p in probes},
+                         {'foreground', 'injection', 'permission', 'listener', 'import', 'config'})
+        for module in doctor.DEPENDENCIES:
+            self.assertIn(f'import {module}', [p.name for p in probes])
+
+
+class TestRealProbeBodies(unittest.TestCase):
+    """実機用プローブの本体をフェイクの環境で動かすテストケース"""
+
+    def measure(self, name, backend, system, repeat=2):
+        """real_probesの1項目をフェイクの時計で実行"""
+        probe = next(p for p in doctor.real_probes(backend, system) if p.name == name)
+        return run_probe(probe._replace(clock=system.clock), repeat)
+
+    def test_pynput_probes(self):
+        """pynput: 前面判定・Shiftの注入・リスナー起動・アクセシビリティ確認"""
+        system = FakeFacilities('Darwin')
+        self.assertAlmostEqual(self.measure('foreground query', 'pynput', system).median, 0.0004)
+        self.assertAlmostEqual(self.measure('key injection', 'pynput', system).median, 0.00015)
+        self.assertAlmostEqual(self.measure('permission check', 'pynput', system).median, 0.002)
+        self.assertAlmostEqual(self.measure('listener start', 'pynput', system, 1).median, 0.03)
+        self.assertEqual(system.calls, [
+            'query foreground', 'query foreground',
+            'press shift', 'release shift', 'press shift', 'release shift',
+            'accessibility check', 'accessibility check',
+            'listener start', 'listener live', 'listener stop',
+        ])
+
+    def test_evdev_probes(self):
+        """evdev: uinputでの注入・キーボードの列挙・デバイスの権限確認"""
+        system = FakeFacilities('Linux')
+        self.assertAlmostEqual(self.measure('key injection', 'evdev', system, 1).median, 0.00015)
+        self.assertEqual(system.calls, ['uinput discord-send-guard-doctor', 'write 42=1', 'write 42=0', 'syn',
+                                        'uinput close'])
+        self.assertAlmostEqual(self.measure('listener start', 'evdev', system, 1).median, 0.03)
+        self.assertIn('keyboard close', system.calls)
+        self.assertEqual(self.measure('permission check', 'evdev', system).status, 'ok')
+        self.assertAlmostEqual(self.measure('foreground query', 'evdev', system).median, 0.0004)
+        with patch.object(system, 'can_write', return_value=False):
+            self.assertEqual(self.measure('key injection', 'evdev', system).status, 'unavailable')
+
+    def test_x11_probes(self):
+        """x11: XTestでの注入と、フックが有効になるまでの自己計測"""
+        system = FakeFacilities('Linux')
+        self.assertAlmostEqual(self.measure('key injection', 'x11', system, 1).median, 0.00015)
+        self.assertEqual(system.calls, ['xtest 2 50', 'xtest 3 50', 'x sync', 'display close'])
+        result = self.measure('listener start', 'x11', system, 1)
+        self.assertEqual(result.status, 'ok')
+        self.assertGreaterEqual(result.median, 0.03)
+        self.assertEqual(system.calls[-2:], ['x11 guard stop', 'x11 guard close'])
+        self.assertEqual(self.measure('permission check', 'x11', system).status, 'unavailable')
+
+    def test_windows_and_unsupported(self):
+        """Windowsは管理者確認、Linuxのpynputは前面判定なし、pynputがなければ使えない"""
+        windows = FakeFacilities('Windows')
+        self.assertEqual(self.measure('permission check', 'pynput', windows).status, 'ok')
+        self.assertEqual(windows.calls, ['admin check', 'admin check'])
+        linux = FakeFacilities('Linux')
+        self.assertEqual(self.measure('foreground query', 'pynput', linux).status, 'unavailable')
+        broken = FakeFacilities('Darwin', pynput_error=ImportError('no backend'))
+        for name in ('foreground query', 'key injection', 'listener start'):
+            result = self.measure(name, 'pynput', broken)
+            self.assertEqual(result.status, 'unavailable')
+            self.assertIn('no backend', result.detail)
+
+    def test_import_time(self):
+        """インポート時間は子プロセスの自己計測、未導入は使えない、失敗はエラー"""
+        system = FakeFacilities(import_costs={'Xlib': 0.02})
+        self.assertAlmostEqual(self.measure('import Xlib', 'pynput', system).median, 0.02)
+        self.assertEqual(self.measure('import rumps', 'pynput', system).status, 'unavailable')
+        failed = subprocess.CompletedProcess([], 1, '', 'Traceback\nRuntimeError: boom')
+        with patch.object(system, 'python', return_value=failed):
+            result = self.measure('import numpy', 'pynput', system)
+        self.assertEqual((result.status, result.detail), ('error', 'RuntimeError: RuntimeError: boom'))
+        system.frozen = True
+        self.assertEqual(self.measure('import numpy', 'pynput', system).status, 'unavailable')
+
+    def test_import_code_times_the_import(self):
+        """子プロセスで実行するコードは本当にインポートして秒数を出力する"""
+        done = doctor.Facilities().python(doctor.IMPORT_CODE.format('json'))
+        self.assertEqual(done.returncode, 0)
+        self.assertGreaterEqual(float(done.stdout.strip()), 0.0)
+
+
+class TestDoctorCommand(unittest.TestCase):
+    """doctorサブコマンドのテストケース"""
+
+    def test_fake_report(self):
+        """--fakeで表を表示し、JSONに保存"""
+        from discord_send_guard import run_doctor as run_doctor_command
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'doctor.json'
+            out = io.StringIO()
+            with redirect_stdout(out), patch('sys.stderr', io.StringIO()):
+                code = run_doctor_command(SimpleNamespace(backend='auto', fake=True, repeat=None, json=str(path)))
+            self.assertEqual(code, 0)
+            self.assertIn('import discord_send_guard', out.getvalue())
+            report = json.loads(path.read_text(encoding='utf-8'))
+        self.assertEqual(report['meta']['backend'], 'fake')
+        self.assertEqual(report['probes'][0]['name'], 'import discord_send_guard')
+        self.assertEqual(report['probes'][0]['median_ms'], 120.0)
+        self.assertEqual(report['probes'][-1]['status'], 'unavailable')
+
+
+if __name__ == '__main__':
+    unittest.main()
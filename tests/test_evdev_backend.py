@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Linux evdev/uinputバックエンドのテスト
+"""
+
+import unittest
+import os
+import sys
+import time
+import select
+import threading
+from unittest.mock import MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backends import evdev_backend
+from backends.evdev_backend import (
+    EvdevTransformer, EvdevGuard, X11ActiveWindow, HAS_EVDEV, VIRTUAL_DEVICE_NAME,
+    EV_KEY, EV_SYN, SYN_REPORT, KEY_ENTER, KEY_KPENTER, KEY_LEFTCTRL,
+    KEY_LEFTSHIFT, KEY_A, KEY_UP, KEY_DOWN, KEY_REPEAT,
+)
+
+try:
+    from Xlib import X
+    HAS_XLIB = True
+except ImportError:
+    HAS_XLIB = False
+
+SYN = (EV_SYN, SYN_REPORT, 0)
+
+
+def _keys(events):
+    """SYNを除いたキーイベント列"""
+    return [event for event in events if event[0] == EV_KEY]
+
+
+class TestEvdevTransformer(unittest.TestCase):
+    """EvdevTransformerのテストケース"""
+
+    def setUp(self):
+        self.active = [True]
+        self.transformer = EvdevTransformer(lambda: self.active[0])
+
+    def feed(self, *events):
+        out = []
+        for event in events:
+            out.extend(self.transformer.process(*event))
+        return out
+
+    def test_enter_becomes_shift_enter(self):
+        """Discordで単体のEnterはShift+Enterになる"""
+        out = self.feed((EV_KEY, KEY_ENTER, KEY_DOWN), SYN, (EV_KEY, KEY_ENTER, KEY_UP), SYN)
+        self.assertEqual(_keys(out), [
+            (EV_KEY, KEY_LEFTSHIFT, KEY_DOWN),
+            (EV_KEY, KEY_ENTER, KEY_DOWN),
+            (EV_KEY, KEY_ENTER, KEY_UP),
+            (EV_KEY, KEY_LEFTSHIFT, KEY_UP),
+        ])
+        self.assertEqual(self.transformer.stats.counters['enter_converted'], 1)
+
+    def test_ctrl_enter_passes(self):
+        """Ctrl+Enterはそのまま送信"""
+        out = self.feed(
+            (EV_KEY, KEY_LEFTCTRL, KEY_DOWN), (EV_KEY, KEY_ENTER, KEY_DOWN),
+            (EV_KEY, KEY_ENTER, KEY_UP), (EV_KEY, KEY_LEFTCTRL, KEY_UP),
+        )
+        self.assertNotIn((EV_KEY, KEY_LEFTSHIFT, KEY_DOWN), out)
+        self.assertEqual(self.transformer.stats.counters['enter_send'], 1)
+
+    def test_other_app_passes(self):
+        """Discord以外では変換しない"""
+        self.active[0] = False
+        out = self.feed((EV_KEY, KEY_KPENTER, KEY_DOWN), (EV_KEY, KEY_KPENTER, KEY_UP))
+        self.assertEqual(out, [(EV_KEY, KEY_KPENTER, KEY_DOWN), (EV_KEY, KEY_KPENTER, KEY_UP)])
+
+    def test_autorepeat_keeps_shift(self):
+        """押しっぱなしのリピートもShift付きのまま"""
+        out = self.feed(
+            (EV_KEY, KEY_ENTER, KEY_DOWN), (EV_KEY, KEY_ENTER, KEY_REPEAT),
+            (EV_KEY, KEY_ENTER, KEY_REPEAT), (EV_KEY, KEY_ENTER, KEY_UP),
+        )
+        self.assertEqual(_keys(out).count((EV_KEY, KEY_LEFTSHIFT, KEY_DOWN)), 1)
+        self.assertEqual(_keys(out).count((EV_KEY, KEY_ENTER, KEY_REPEAT)), 2)
+        self.assertEqual(_keys(out)[-1], (EV_KEY, KEY_LEFTSHIFT, KEY_UP))
+
+    def test_user_shift_is_not_released(self):
+        """ユーザーがShiftを押している場合はそのShiftを離さない"""
+        out = self.feed(
+            (EV_KEY, KEY_LEFTSHIFT, KEY_DOWN), (EV_KEY, KEY_ENTER, KEY_DOWN),
+            (EV_KEY, KEY_ENTER, KEY_UP),
+        )
+        self.assertEqual(_keys(out).count((EV_KEY, KEY_LEFTSHIFT, KEY_UP)), 0)
+
+    def test_focus_change_while_held(self):
+        """押下中にフォーカスが変わっても解放はShiftの対で閉じる"""
+        out = self.feed((EV_KEY, KEY_ENTER, KEY_DOWN))
+        self.active[0] = False
+        out += self.feed((EV_KEY, KEY_ENTER, KEY_UP))
+        self.assertEqual(_keys(out)[-1], (EV_KEY, KEY_LEFTSHIFT, KEY_UP))
+
+    def test_disabled_passes(self):
+        """無効化中は変換しない"""
+        self.transformer.enabled = False
+        out = self.feed((EV_KEY, KEY_ENTER, KEY_DOWN), (EV_KEY, KEY_ENTER, KEY_UP))
+        self.assertEqual(out, [(EV_KEY, KEY_ENTER, KEY_DOWN), (EV_KEY, KEY_ENTER, KEY_UP)])
+
+    def test_non_key_events_pass(self):
+        """キー以外のイベントはそのまま"""
+        self.assertEqual(self.feed((4, 4, 458792), SYN), [(4, 4, 458792), SYN])
+
+
+@unittest.skipUnless(HAS_EVDEV, "requires evdev")
+class TestEvdevGuardSetup(unittest.TestCase):
+    """EvdevGuardの作成と設定のテストケース"""
+
+    @patch.object(evdev_backend, 'x11_discord_active', return_value=None)
+    def test_blind_foreground_needs_opt_in(self, mock_x11):
+        """前面のウィンドウが見えなければ、明示しない限り起動しない（全アプリで変換しない）"""
+        with self.assertRaisesRegex(RuntimeError, '--all-windows'):
+            EvdevGuard()
+        guard = EvdevGuard(all_windows=True)
+        self.assertTrue(guard.transformer.is_target_active())
+
+    def test_unsupported_settings_are_reported(self):
+        """反映できない設定は警告し、statsに残す"""
+        guard = EvdevGuard(is_target_active=lambda: True)
+        with self.assertLogs(evdev_backend.logger, 'WARNING') as logs:
+            guard.apply_config({'debug': True, 'channel_rules': [{'pattern': 'general', 'action': 'off'}],
+                                'enter_lookahead_ms': 30, 'enabled': False})
+        self.assertTrue(guard.debug)
+        self.assertEqual(guard.stats.info['ignored_settings'], ['channel_rules', 'enter_lookahead_ms'])
+        self.assertIn('channel_rules, enter_lookahead_ms', logs.output[0])
+        guard.apply_config({'debug': False})
+        self.assertEqual(guard.stats.info['ignored_settings'], [])
+
+    def test_raise_priority_setting(self):
+        """raise_priorityは反映でき、有効ならイベントループのスレッドの優先度を上げる"""
+        guard = EvdevGuard(is_target_active=lambda: True)
+        guard.apply_config({'raise_priority': False})
+        self.assertEqual(guard.stats.info['ignored_settings'], [])
+        self.assertFalse(guard.raise_priority)
+
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        self.addCleanup(os.close, write_fd)
+        device = MagicMock(fileno=lambda: read_fd)
+        for enabled, expected in ((False, None), (True, 'SCHED_FIFO')):
+            guard.raise_priority = enabled
+            guard.priority_policy = None
+            with patch.object(evdev_backend, 'find_keyboards', return_value=[device]), \
+                    patch.object(evdev_backend.evdev, 'UInput'), \
+                    patch.object(evdev_backend, 'raise_thread_priority', return_value='SCHED_FIFO'), \
+                    patch.object(guard, '_loop'), patch.object(guard, '_release'):
+                guard.start()
+            self.assertEqual(guard.priority_policy, expected)
+
+    def test_stop_right_after_running_is_not_lost(self):
+        """runningになった直後のstop()で確実に止まる"""
+        class StopOnRunning(EvdevGuard):
+            def __setattr__(self, name, value):
+                super().__setattr__(name, value)
+                if name == 'running' and value:
+                    self.stop()
+
+        guard = StopOnRunning(is_target_active=lambda: True)
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        self.addCleanup(os.close, write_fd)
+        device = MagicMock(fileno=lambda: read_fd)
+        with patch.object(evdev_backend, 'find_keyboards', return_value=[device]), \
+                patch.object(evdev_backend.evdev, 'UInput'), \
+                patch.object(evdev_backend, 'raise_thread_priority', return_value='SCHED_OTHER'), \
+                patch.object(guard, '_release'):
+            thread = threading.Thread(target=guard.start, daemon=True)
+            thread.start()
+            thread.join(timeout=2)
+        self.assertFalse(thread.is_alive())
+
+
+class _Prop:
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeWindow:
+    """X11ウィンドウの代わり（WM_CLASS・PID・タイトルを持つ）"""
+
+    def __init__(self, display, window_id, wm_class=(), pid=None, title=''):
+        self.display = display
+        self.id = window_id
+        self.wm_class = wm_class
+        self.pid = pid
+        self.title = title
+        self.event_mask = 0
+
+    def get_full_property(self, atom, prop_type):
+        self.display.calls += 1
+        if atom == self.display.atoms['_NET_WM_NAME']:
+            return _Prop(self.title.encode('utf-8'))
+        if atom == self.display.atoms['_NET_WM_PID'] and self.pid:
+            return _Prop([self.pid])
+        return None
+
+    def get_wm_name(self):
+        return self.title
+
+    def get_wm_class(self):
+        self.display.calls += 1
+        return self.wm_class
+
+    def change_attributes(self, event_mask):
+        self.event_mask = event_mask
+
+
+class FakeRoot:
+    def __init__(self, display):
+        self.display = display
+        self.active = None
+        self.event_mask = 0
+
+    def get_full_property(self, atom, prop_type):
+        self.display.calls += 1
+        return _Prop([self.active] if self.active else [])
+
+    def change_attributes(self, event_mask):
+        self.event_mask = event_mask
+
+
+class FakeDisplay:
+    """X11ActiveWindowが使う分だけのXlib Displayの代わり"""
+
+    def __init__(self):
+        self.atoms = {}
+        self.windows = {}
+        self.calls = 0
+        self.root = FakeRoot(self)
+
+    def intern_atom(self, name):
+        return self.atoms.setdefault(name, 1000 + len(self.atoms))
+
+    def screen(self):
+        return MagicMock(root=self.root)
+
+    def create_resource_object(self, kind, window_id):
+        return self.windows[window_id]
+
+    def add(self, window_id, **kwargs):
+        self.windows[window_id] = FakeWindow(self, window_id, **kwargs)
+        return self.windows[window_id]
+
+
+@unittest.skipUnless(HAS_XLIB, "requires python-xlib")
+class TestX11ActiveWindow(unittest.TestCase):
+    """X11ActiveWindowのテストケース"""
+
+    def setUp(self):
+        self.display = FakeDisplay()
+        self.display.add(1, wm_class=('discord', 'discord'), pid=10, title='#general - Discord')
+        self.display.add(2, wm_class=('google-chrome', 'Google-chrome'), pid=20,
+                         title='Discord | #general | Server - Google Chrome')
+        self.display.add(3, wm_class=('code', 'Code'), pid=30, title='notes about discord - Visual Studio Code')
+        processes = {10: 'Discord', 20: 'chrome', 30: 'code'}
+        self.tracker = X11ActiveWindow(self.display, lookup_process=processes.get)
+
+    def focus(self, window_id):
+        self.display.root.active = window_id
+        self.tracker.handle(MagicMock(type=X.PropertyNotify, atom=self.tracker.net_active_window))
+
+    def test_discord_app_is_active(self):
+        """Discordアプリが前面なら対象"""
+        self.focus(1)
+        self.assertTrue(self.tracker.is_active())
+
+    def test_discord_browser_tab_is_active(self):
+        """ブラウザのDiscordタブも対象"""
+        self.focus(2)
+        self.assertTrue(self.tracker.is_active())
+
+    def test_title_mentioning_discord_is_not_active(self):
+        """タイトルに"discord"を含むだけの他アプリは対象外"""
+        self.focus(3)
+        self.assertFalse(self.tracker.is_active())
+
+    def test_title_change_reclassifies(self):
+        """前面ウィンドウのタイトル変更（タブ切り替え）で判定し直す"""
+        self.focus(2)
+        self.assertEqual(self.display.windows[2].event_mask, X.PropertyChangeMask)
+        self.display.windows[2].title = 'Inbox - Google Chrome'
+        self.tracker.handle(MagicMock(type=X.PropertyNotify, atom=self.tracker.net_wm_name,
+                                      window=self.display.windows[2]))
+        self.assertFalse(self.tracker.is_active())
+
+    def test_focus_change_moves_title_subscription(self):
+        """タイトルの購読は前面ウィンドウに付いていく"""
+        self.focus(2)
+        self.focus(3)
+        self.assertEqual(self.display.windows[2].event_mask, 0)
+        self.assertEqual(self.display.windows[3].event_mask, X.PropertyChangeMask)
+
+    def test_query_makes_no_x_calls(self):
+        """判定の問い合わせはX11への往復をしない"""
+        self.focus(1)
+        calls = self.display.calls
+        for _ in range(100):
+            self.tracker.is_active()
+        self.assertEqual(self.display.calls, calls)
+
+
+def _uinput_available():
+    return HAS_EVDEV and os.access('/dev/uinput', os.W_OK)
+
+
+@unittest.skipUnless(_uinput_available(), "requires evdev and writable /dev/uinput")
+class TestEvdevLoopback(unittest.TestCase):
+    """uinputループバックでのエンドツーエンドテスト"""
+
+    def read_keys(self, device, count, timeout=2.0):
+        events = []
+        deadline = time.monotonic() + timeout
+        while len(events) < count and time.monotonic() < deadline:
+            if select.select([device.fd], [], [], 0.1)[0]:
+                events.extend((e.type, e.code, e.value) for e in device.read() if e.type == EV_KEY)
+        return events
+
+    def test_loopback(self):
+        """仮想キーボードのEnterがガード経由でShift+Enterとして出力される"""
+        import evdev
+
+        source = evdev.UInput(
+            {EV_KEY: [KEY_ENTER, KEY_A, KEY_LEFTCTRL, KEY_LEFTSHIFT]},
+            name='discord-send-guard-test-source'
+        )
+        guard = EvdevGuard(is_target_active=lambda: True, device_paths=[source.device.path])
+        runner = threading.Thread(target=guard.start, daemon=True)
+        runner.start()
+        try:
+            deadline = time.monotonic() + 5
+            while guard.uinput is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.3)  # udevが仮想デバイスノードを作るのを待つ
+            output = next(
+                evdev.InputDevice(path) for path in evdev.list_devices()
+                if evdev.InputDevice(path).name == VIRTUAL_DEVICE_NAME
+            )
+
+            for value in (KEY_DOWN, KEY_UP):
+                source.write(EV_KEY, KEY_ENTER, value)
+                source.syn()
+            self.assertEqual(self.read_keys(output, 4), [
+                (EV_KEY, KEY_LEFTSHIFT, KEY_DOWN),
+                (EV_KEY, KEY_ENTER, KEY_DOWN),
+                (EV_KEY, KEY_ENTER, KEY_UP),
+                (EV_KEY, KEY_LEFTSHIFT, KEY_UP),
+            ])
+            output.close()
+        finally:
+            guard.stop()
+            runner.join(timeout=5)
+            source.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+フライトレコーダー（メモリマップのリングファイル）のテスト
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.flight_recorder import (
+    FlightRecorder, read_records, format_record, RecorderError, RECORD, HEADER_SIZE,
+    KEY_CLASS_ENTER, KEY_CLASS_BY_BIT,
+)
+from utils.config import MOD_SHIFT
+from utils.state_machine import ACT_SHED, ACT_REPEAT_NEWLINE
+
+
+class TestFlightRecorder(unittest.TestCase):
+    """FlightRecorderのテストケース"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / 'sub' / 'flight.rec'
+        self.recorder = FlightRecorder(self.path, slots=8)
+        self.recorder.open()
+
+    def tearDown(self):
+        self.recorder.close()
+        self.tmpdir.cleanup()
+
+    def test_records_key_metadata_and_decisions(self):
+        """キーの種類・修飾キー・判定・前面アプリを記録（文字は記録しない）"""
+        self.recorder.key(KEY_CLASS_BY_BIT[MOD_SHIFT], True, MOD_SHIFT)
+        self.recorder.key(KEY_CLASS_ENTER, True, MOD_SHIFT)
+        self.recorder.decision('converted', MOD_SHIFT)
+        self.recorder.key(KEY_CLASS_BY_BIT[0], True, 0)
+        records = read_records(self.path)
+        self.assertEqual([(r.kind, r.key, r.mask) for r in records],
+                         [('down', 'shift', MOD_SHIFT), ('down', 'enter', MOD_SHIFT),
+                          ('decision', 'enter', MOD_SHIFT), ('down', 'other', 0)])
+        self.assertEqual(records[2].outcome, 'converted')
+        self.assertEqual(records[2].foreground, 'discord')
+        self.assertEqual(records[3].foreground, 'discord')
+        self.recorder.decision('passthrough', 0)
+        self.recorder.repeat(ACT_SHED, 0)
+        self.assertEqual([(r.outcome, r.foreground) for r in read_records(self.path, last=2)],
+                         [('passthrough', 'other'), ('shed', 'other')])
+
+    def test_ring_keeps_newest(self):
+        """スロット数を超えたら古い記録から上書き"""
+        for _ in range(20):
+            self.recorder.repeat(ACT_REPEAT_NEWLINE, 0)
+        records = read_records(self.path)
+        self.assertEqual([r.seq for r in records], list(range(13, 21)))
+        self.assertEqual(read_records(self.path, last=0), [])
+
+    def test_survives_restart(self):
+        """閉じずに終わっても記録は残り、再開後は続きから書く"""
+        self.recorder.decision('send', 8)
+        # クラッシュを模して閉じずに別のレコーダーで開き直す
+        reopened = FlightRecorder(self.path, slots=8)
+        reopened.open()
+        reopened.decision('converted', 0)
+        reopened.close()
+        self.assertEqual([(r.seq, r.outcome) for r in read_records(self.path)],
+                         [(1, 'send'), (2, 'converted')])
+
+    def test_resized_ring_starts_fresh(self):
+        """スロット数が変わったらリングを作り直す"""
+        self.recorder.decision('send', 8)
+        self.recorder.close()
+        self.recorder = FlightRecorder(self.path, slots=16)
+        self.recorder.open()
+        self.assertEqual(read_records(self.path), [])
+
+    def test_torn_slot_is_discarded(self):
+        """書きかけのスロットは読み飛ばす"""
+        self.recorder.decision('send', 8)
+        self.recorder.decision('converted', 0)
+        with open(self.path, 'r+b') as f:
+            f.seek(HEADER_SIZE + RECORD.size - 4)
+            f.write(b'\xff\xff\xff\xff')
+        self.assertEqual([r.seq for r in read_records(self.path)], [2])
+
+    def test_invalid_file(self):
+        """存在しない・形式の違うファイルはRecorderError"""
+        with self.assertRaises(RecorderError):
+            read_records(Path(self.tmpdir.name) / 'missing.rec')
+        other = Path(self.tmpdir.name) / 'other.rec'
+        other.write_bytes(b'x' * 256)
+        with self.assertRaises(RecorderError):
+            read_records(other)
+
+    def test_format(self):
+        """1行表示"""
+        self.recorder.decision('converted', 0)
+        line = format_record(read_records(self.path)[0])
+        self.assertIn('decision', line)
+        self.assertIn('converted', line)
+
+
+class TestGuardRecorder(unittest.TestCase):
+    """DiscordSendGuardのフライトレコーダーのテストケース"""
+
+    def setUp(self):
+        from discord_send_guard import DiscordSendGuard
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / 'flight.rec'
+        self.guard = DiscordSendGuard()
+        self.guard.keyboard_controller = MagicMock()
+        self.guard.apply_config({'ime_awareness': False, 'flight_recorder_slots': 64})
+
+    def tearDown(self):
+        self.guard._stop_recorder()
+        self.tmpdir.cleanup()
+
+    def start_recorder(self):
+        with patch('utils.flight_recorder.RECORDER_FILE', self.path):
+            self.guard._start_recorder()
+
+    def test_recorder_stage(self):
+        """開いている間だけ判定の観測段に含まれる"""
+        self.assertNotIn('flight_recorder', self.guard.enter_pipeline.stages)
+        self.start_recorder()
+        self.assertEqual(self.guard.recorder.slots, 64)
+        self.assertIn('flight_recorder', self.guard.enter_pipeline.stages)
+        self.guard._stop_recorder()
+        self.assertIsNone(self.guard.recorder)
+        self.assertNotIn('flight_recorder', self.guard.enter_pipeline.stages)
+
+    def test_disabled(self):
+        """flight_recorder=Falseなら開かない"""
+        self.guard.apply_config({'flight_recorder': False})
+        self.start_recorder()
+        self.assertIsNone(self.guard.recorder)
+        self.assertFalse(self.path.exists())
+
+    @patch('discord_send_guard.DiscordSendGuard.is_discord_active', return_value=True)
+    def test_decisions_recorded(self, mock_discord_active):
+        """パイプラインの判定とリピートが記録される"""
+        self.start_recorder()
+        self.guard.enter_pipeline(0)
+        self.guard._apply_repeat(ACT_REPEAT_NEWLINE)
+        records = read_records(self.path)
+        self.assertEqual([(r.kind, r.outcome, r.foreground) for r in records],
+                         [('decision', 'converted', 'discord'), ('decision', 'repeat_newline', 'discord')])
+
+    def test_reader_command(self):
+        """recorderサブコマンドで動作中でも読み出せる"""
+        from discord_send_guard import run_recorder
+        self.start_recorder()
+        self.guard.recorder.decision('send', 8)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = run_recorder(SimpleNamespace(file=str(self.path), last=None, json=True))
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out.getvalue())['outcome'], 'send')
+        with redirect_stdout(io.StringIO()), patch('sys.stderr', io.StringIO()):
+            self.assertEqual(run_recorder(SimpleNamespace(file=str(self.path) + '.x', last=None, json=False)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+フォーカス中の要素の追跡のテスト
+"""
+
+import unittest
+import os
+import sys
+import types
+from unittest.mock import MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.focus import FocusTracker, FakeAXProvider, FocusedElement, MacAXProvider, is_message_composer
+
+COMPOSER = FocusedElement('AXTextArea', 'message-input', 'Message #general')
+COMPOSER_JA = FocusedElement('AXTextArea', '', '#general へメッセージを送信')
+SEARCH = FocusedElement('AXComboBox', 'search', 'Search')
+QUICK_SWITCHER = FocusedElement('AXTextField', 'quick-switcher', 'Quick switcher')
+BIO_FIELD = FocusedElement('AXTextArea', 'bio', 'About me')
+RELABELLED = FocusedElement('AXTextArea', '', 'Write to #general')
+RESEARCH = FocusedElement('AXTextArea', 'message-input', 'Message #research')
+SEARCH_JA = FocusedElement('AXTextField', '', '検索')
+
+
+class FakeClock:
+    """呼び出し側が進める時計"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestIsMessageComposer(unittest.TestCase):
+    """メッセージ入力欄判定のテストケース"""
+
+    def test_classification(self):
+        """検索・クイックスイッチャーだけFalse"""
+        self.assertTrue(is_message_composer(COMPOSER))
+        self.assertTrue(is_message_composer(COMPOSER_JA))
+        self.assertFalse(is_message_composer(SEARCH))
+        self.assertFalse(is_message_composer(SEARCH_JA))
+        self.assertFalse(is_message_composer(QUICK_SWITCHER))
+
+    def test_fails_safe(self):
+        """見分けられない要素・不明なフォーカスは入力欄として扱う（ガードを外さない）"""
+        self.assertTrue(is_message_composer(RELABELLED))
+        self.assertTrue(is_message_composer(RESEARCH))
+        self.assertTrue(is_message_composer(BIO_FIELD))
+        self.assertTrue(is_message_composer(None))
+
+
+class TestFocusTracker(unittest.TestCase):
+    """FocusTrackerのテストケース"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.provider = FakeAXProvider(COMPOSER)
+        self.tracker = FocusTracker(self.provider, clock=self.clock)
+        self.tracker.start(audit_interval=None)
+
+    def tearDown(self):
+        self.tracker.stop()
+
+    def test_answers_from_cache(self):
+        """通知が届く間は直接問い合わせをしない"""
+        queries = self.provider.queries
+        for _ in range(100):
+            self.assertTrue(self.tracker.is_message_composer())
+        self.assertEqual(self.provider.queries, queries)
+        self.assertEqual(self.tracker.hit_rate(), 1.0)
+
+    def test_follows_notifications(self):
+        """フォーカス変更通知でキャッシュを更新"""
+        self.provider.focus(SEARCH)
+        self.assertFalse(self.tracker.is_message_composer())
+        self.provider.focus(COMPOSER)
+        self.assertTrue(self.tracker.is_message_composer())
+
+    def test_records_cache_age(self):
+        """Enter時点のキャッシュの古さを記録"""
+        self.clock.now = 2.5
+        self.tracker.is_message_composer()
+        timing = self.tracker.stats.snapshot()['timings']['focus_cache_age']
+        self.assertAlmostEqual(timing['max_us'], 2.5e6)
+
+    def test_invalidate_forces_query(self):
+        """無効化後の最初のチェックは直接問い合わせ"""
+        self.provider.focus(SEARCH, notify=False)
+        self.tracker.invalidate()
+        self.assertFalse(self.tracker.is_message_composer())
+        self.assertEqual(self.tracker.stats.counters['focus_cache_misses'], 1)
+        self.assertTrue(self.tracker.valid)
+
+    def test_audit_detects_missed_notification(self):
+        """取りこぼした通知を監査で検出して修正"""
+        self.provider.focus(QUICK_SWITCHER, notify=False)
+        self.assertFalse(self.tracker.audit())
+        self.assertEqual(self.tracker.stats.counters['focus_audit_mismatches'], 1)
+        self.assertFalse(self.tracker.is_message_composer())
+        self.assertTrue(self.tracker.audit())
+
+    def test_without_notifications(self):
+        """通知が使えなければ毎回問い合わせる"""
+        provider = FakeAXProvider(SEARCH, notifications=False)
+        tracker = FocusTracker(provider)
+        tracker.start(audit_interval=None)
+        self.assertFalse(tracker.is_message_composer())
+        self.assertFalse(tracker.is_message_composer())
+        self.assertEqual(tracker.hit_rate(), 0.0)
+        self.assertEqual(provider.queries, 3)  # 開始時 + 2回
+
+    def test_unknown_focus_keeps_guard_on(self):
+        """フォーカス要素が取れない場合はガードを有効のままにする"""
+        self.provider.focus(None)
+        self.assertTrue(self.tracker.is_message_composer())
+
+
+
+class FakeApp:
+    """NSRunningApplicationの代わり"""
+
+    def __init__(self, name, pid):
+        self.name, self.pid = name, pid
+
+    def localizedName(self):
+        return self.name
+
+    def processIdentifier(self):
+        return self.pid
+
+
+def fake_mac_modules(apps):
+    """AppKit・ApplicationServices・CoreFoundation・objcの代わり（通知は名前ごとに記録）"""
+    blocks = {}
+
+    def add_observer(name, obj, queue, block):
+        blocks[name] = block
+        return name
+
+    center = MagicMock(name='center')
+    center.addObserverForName_object_queue_usingBlock_.side_effect = add_observer
+    workspace = MagicMock(name='workspace')
+    workspace.notificationCenter.return_value = center
+    workspace.runningApplications.side_effect = lambda: list(apps)
+    appkit = types.SimpleNamespace(
+        NSWorkspace=types.SimpleNamespace(sharedWorkspace=lambda: workspace),
+        NSWorkspaceDidLaunchApplicationNotification='launch',
+        NSWorkspaceDidTerminateApplicationNotification='terminate',
+    )
+    services = MagicMock(name='ApplicationServices')
+    services.AXObserverCreate.side_effect = lambda pid, callback, refcon: (0, f'observer-{pid}')
+    objc = types.SimpleNamespace(callbackFor=lambda signature: (lambda func: func))
+    modules = {'AppKit': appkit, 'ApplicationServices': services,
+               'CoreFoundation': MagicMock(name='CoreFoundation'), 'objc': objc}
+    return modules, blocks, workspace, services
+
+
+def notification(app):
+    return types.SimpleNamespace(userInfo=lambda: {'NSWorkspaceApplicationKey': app})
+
+
+class TestMacAXProvider(unittest.TestCase):
+    """MacAXProviderの再接続のテストケース"""
+
+    def setUp(self):
+        self.apps = [FakeApp('Finder', 1), FakeApp('Discord', 100)]
+        modules, self.blocks, self.workspace, self.services = fake_mac_modules(self.apps)
+        patcher = patch.dict(sys.modules, modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.provider = MacAXProvider(lambda name: name == 'discord', run_loop_available=True)
+        self.seen = []
+        self.assertTrue(self.provider.subscribe(self.seen.append))
+
+    def bound_pids(self):
+        return [call.args[0] for call in self.services.AXObserverCreate.call_args_list]
+
+    def test_rebinds_when_discord_restarts(self):
+        """Discordの終了で外し、再起動で新しいプロセスにつなぎ直す"""
+        self.assertEqual(self.bound_pids(), [100])
+        self.blocks['terminate'](notification(FakeApp('Discord', 100)))
+        self.assertIsNone(self.provider._observer)
+        self.assertEqual(self.seen, [None])
+        self.blocks['launch'](notification(FakeApp('Discord', 200)))
+        self.assertEqual(self.bound_pids(), [100, 200])
+        self.assertEqual(self.provider._observer, 'observer-200')
+        # 他のアプリの起動・終了では変えない
+        self.blocks['launch'](notification(FakeApp('Safari', 300)))
+        self.blocks['terminate'](notification(FakeApp('Finder', 1)))
+        self.assertEqual(self.provider._observer, 'observer-200')
+
+    def test_query_does_not_scan_applications(self):
+        """通知で追跡している間は問い合わせのたびにアプリ一覧を走査しない"""
+        scans = self.workspace.runningApplications.call_count
+        self.services.AXUIElementCopyAttributeValue.return_value = (1, None)
+        self.provider.focused_element()
+        self.assertEqual(self.workspace.runningApplications.call_count, scans)
+        self.provider.unsubscribe()
+        self.assertEqual(self.provider._workspace_observers, [])
+
+
+class TestGuardFocus(unittest.TestCase):
+    """ガードのフォーカス追跡の開始のテストケース"""
+
+    def test_cli_skips_composer_check(self):
+        """通知が届かないCLIでは入力欄を判定しない（Enterごとの同期問い合わせをしない）"""
+        import discord_send_guard as dsg
+        guard = dsg.DiscordSendGuard()
+        with patch.object(dsg, 'IS_MAC', True), patch.object(dsg, 'MacAXProvider') as provider_class:
+            guard._start_focus()
+        provider_class.assert_not_called()
+        self.assertIsNone(guard.focus)
+        self.assertNotIn('composer', guard.enter_pipeline.stages)
+        self.assertFalse(guard.stats.info['focus_notifications'])
+
+
+if __name__ == '__main__':
+    unittest.main()
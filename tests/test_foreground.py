@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+前面アプリ判定プロバイダと実行時キャリブレーションのテスト
+"""
+
+import types
+import unittest
+from collections import deque
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.foreground import (
+    AdaptiveForeground, DirectProvider, PollingProvider, ForegroundProvider, NotificationProvider,
+    FrontWindowCache,
+)
+from utils.stats import GuardStats
+
+
+class FakeClock:
+    """呼び出し側が進める時計"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeProvider(ForegroundProvider):
+    """コスト・鮮度・正誤を指定できるプロバイダ"""
+
+    def __init__(self, name, clock, cost, max_age=0.0, background=0.0, answer=None, truth=None):
+        self.name = name
+        self.clock = clock
+        self.cost = cost
+        self._max_age = max_age
+        self.background = background
+        self.answer = answer
+        self.truth = truth
+        self.started = 0
+        self.stopped = 0
+
+    def start(self):
+        self.started += 1
+
+    def stop(self):
+        self.stopped += 1
+
+    def is_active(self):
+        self.clock.now += self.cost
+        if self.answer is not None:
+            return self.answer
+        return self.truth[0]
+
+    def max_age(self):
+        return self._max_age
+
+    def background_cost(self):
+        return self.background
+
+
+class TestAdaptiveForeground(unittest.TestCase):
+    """AdaptiveForegroundのテストケース"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.truth = [True]
+        self.direct = FakeProvider('direct', self.clock, cost=0.002, truth=self.truth)
+        self.stats = GuardStats()
+
+    def make(self, *providers, target=0.05):
+        return AdaptiveForeground(
+            list(providers) + [self.direct], self.direct,
+            freshness_target=target, enter_rate=1.0, clock=self.clock,
+            stats=self.stats, samples=8,
+        )
+
+    def test_picks_cheapest_fresh_provider(self):
+        """鮮度目標を満たす中で最も安い方式を選ぶ"""
+        poll = FakeProvider('poll', self.clock, cost=0.000001, max_age=0.025,
+                            background=0.0004, truth=self.truth)
+        notify = FakeProvider('notification', self.clock, cost=0.000001, truth=self.truth)
+        adaptive = self.make(poll, notify)
+        self.assertEqual(adaptive.calibrate(), 'notification')
+        self.assertEqual(adaptive.strategy, 'notification')
+        self.assertEqual(self.stats.info['foreground_strategy'], 'notification')
+        self.assertEqual(notify.started, 2)  # 計測時と採用時
+        measured = self.stats.info['foreground_providers']
+        self.assertAlmostEqual(measured['direct']['check_us'], 2000.0)
+        self.assertAlmostEqual(measured['poll']['staleness_ms'], 25.0)
+
+    def test_rejects_stale_provider(self):
+        """鮮度目標を超える方式は選ばない"""
+        slow_poll = FakeProvider('poll', self.clock, cost=0.000001, max_age=0.2, truth=self.truth)
+        adaptive = self.make(slow_poll, target=0.05)
+        self.assertEqual(adaptive.calibrate(), 'direct')
+
+    def test_rejects_wrong_answers(self):
+        """直接問い合わせと食い違う方式（通知が届かない等）は選ばない"""
+        broken = FakeProvider('notification', self.clock, cost=0.000001, answer=False)
+        adaptive = self.make(broken)
+        self.assertEqual(adaptive.calibrate(), 'direct')
+        self.assertEqual(self.stats.info['foreground_providers']['notification']['mismatches'], 8)
+
+    def test_background_cost_counts(self):
+        """バックグラウンドコストが大きいポーリングより直接問い合わせを選ぶ"""
+        busy_poll = FakeProvider('poll', self.clock, cost=0.000001, max_age=0.01,
+                                 background=0.01, truth=self.truth)
+        adaptive = self.make(busy_poll)
+        self.assertEqual(adaptive.calibrate(), 'direct')
+
+    def test_enter_time_staleness_triggers_switch(self):
+        """Enter時に観測した古さが目標を超えたら再キャリブレーションで切り替える"""
+        poll = FakeProvider('poll', self.clock, cost=0.000001, max_age=0.01, truth=self.truth)
+        poll.age = lambda: 0.5
+        adaptive = self.make(poll)
+        adaptive.current = poll
+        adaptive.is_active()
+        self.assertEqual(adaptive.calibrate(), 'direct')
+        self.assertEqual(poll.stopped, 1)
+
+    def test_staleness_read_while_hook_appends(self):
+        """フックスレッドの追加と重なってコピーに失敗しても、やり直して再キャリブレーションする"""
+        poll = FakeProvider('poll', self.clock, cost=0.000001, max_age=0.01, truth=self.truth)
+        adaptive = self.make(poll)
+        adaptive.current = poll
+
+        class MutatedDeque(deque):
+            failures = 2
+
+            def __iter__(self):
+                if self.failures:
+                    self.failures -= 1
+                    raise RuntimeError('deque mutated during iteration')
+                return super().__iter__()
+
+        adaptive._ages = MutatedDeque([0.001, 0.5], maxlen=8)
+        self.assertEqual(adaptive.calibrate(), 'direct')
+        self.assertEqual(adaptive._ages.failures, 0)
+
+    def test_deterministic(self):
+        """同じ入力なら常に同じ選択と計測値になる"""
+        results = []
+        for _ in range(3):
+            clock = FakeClock()
+            truth = [True]
+            direct = FakeProvider('direct', clock, cost=0.002, truth=truth)
+            poll = FakeProvider('poll', clock, cost=0.00001, max_age=0.02, background=0.0001, truth=truth)
+            stats = GuardStats()
+            adaptive = AdaptiveForeground([poll, direct], direct, clock=clock, stats=stats, samples=4)
+            results.append((adaptive.calibrate(), stats.info['foreground_providers']))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[1], results[2])
+
+
+class TestProviders(unittest.TestCase):
+    """実プロバイダのテストケース"""
+
+    def test_direct_queries_every_time(self):
+        """直接方式は毎回問い合わせる"""
+        calls = []
+        provider = DirectProvider(lambda: calls.append(1) or True)
+        self.assertTrue(provider.is_active())
+        self.assertTrue(provider.is_active())
+        self.assertEqual(len(calls), 2)
+
+    def test_polling_caches_answer(self):
+        """ポーリング方式はキャッシュを返し、古さを報告する"""
+        clock = FakeClock()
+        answers = [True]
+        provider = PollingProvider(lambda: answers[0], interval=0.02, clock=clock)
+        provider.refresh()
+        answers[0] = False
+        self.assertTrue(provider.is_active())
+        clock.now = 0.015
+        self.assertAlmostEqual(provider.age(), 0.015)
+        self.assertAlmostEqual(provider.max_age(), 0.02)
+        provider.refresh()
+        self.assertFalse(provider.is_active())
+
+    def test_polling_thread_lifecycle(self):
+        """ポーリングスレッドを開始・停止できる"""
+        provider = PollingProvider(lambda: True, interval=0.001)
+        provider.start()
+        self.assertTrue(provider.is_active())
+        provider.stop()
+
+
+class FakeApp:
+    """NSRunningApplicationの代わり"""
+
+    def __init__(self, pid):
+        self.pid = pid
+
+    def processIdentifier(self):
+        return self.pid
+
+    def localizedName(self):
+        return 'Google Chrome'
+
+
+class MacNotificationsTestCase(unittest.TestCase):
+    """NSWorkspaceの通知とAXObserverを差し替えたテストの土台"""
+
+    def setUp(self):
+        self.blocks = {}
+        center = MagicMock(name='center')
+        center.addObserverForName_object_queue_usingBlock_.side_effect = \
+            lambda name, obj, queue, block: self.blocks.setdefault(name, block)
+        workspace = MagicMock(name='workspace')
+        workspace.notificationCenter.return_value = center
+        workspace.frontmostApplication.return_value = FakeApp(10)
+        self.callbacks = {}
+        self.services = MagicMock(name='ApplicationServices')
+        self.services.AXObserverCreate.side_effect = self.create_observer
+        modules = {
+            'AppKit': types.SimpleNamespace(
+                NSWorkspace=types.SimpleNamespace(sharedWorkspace=lambda: workspace),
+                NSWorkspaceDidActivateApplicationNotification='activate',
+            ),
+            'ApplicationServices': self.services,
+            'CoreFoundation': MagicMock(name='CoreFoundation'),
+            'objc': types.SimpleNamespace(callbackFor=lambda signature: (lambda func: func)),
+        }
+        patcher = patch.dict(sys.modules, modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_observer(self, pid, callback, refcon):
+        self.callbacks[pid] = callback
+        return 0, f'observer-{pid}'
+
+    def activate(self, pid):
+        self.blocks['activate'](types.SimpleNamespace(
+            userInfo=lambda: {'NSWorkspaceApplicationKey': FakeApp(pid)}))
+
+
+class TestNotificationProvider(MacNotificationsTestCase):
+    """NotificationProvider（変化時のみ判定）のテストケース"""
+
+    def setUp(self):
+        super().setUp()
+        self.answers = [False]
+        self.queries = []
+        self.provider = NotificationProvider(run_loop_available=True, query=self.query)
+
+    def query(self):
+        self.queries.append(1)
+        return self.answers[0]
+
+    def test_queries_only_on_change(self):
+        """判定はアプリ切り替えとタイトル変化のときだけで、is_activeは問い合わせない"""
+        self.provider.start()
+        self.assertEqual(len(self.queries), 1)
+        self.answers[0] = True
+        for _ in range(5):
+            self.assertFalse(self.provider.is_active())
+        self.assertEqual(len(self.queries), 1)
+
+        self.callbacks[10](None, None, 'AXTitleChanged', None)
+        self.assertTrue(self.provider.is_active())
+        self.assertEqual(len(self.queries), 2)
+
+        self.answers[0] = False
+        self.activate(20)
+        self.assertFalse(self.provider.is_active())
+        self.assertEqual(len(self.queries), 3)
+        self.assertEqual([call.args[0] for call in self.services.AXObserverCreate.call_args_list], [10, 20])
+        self.provider.stop()
+
+    def test_observes_title_and_window_changes(self):
+        """前面アプリのタイトル・フォーカスウィンドウの変化を購読する"""
+        self.provider.start()
+        names = {call.args[2] for call in self.services.AXObserverAddNotification.call_args_list}
+        self.assertEqual(names, {'AXTitleChanged', 'AXFocusedWindowChanged', 'AXMainWindowChanged'})
+
+
+class TestFrontWindowCache(MacNotificationsTestCase):
+    """FrontWindowCache（前面ウィンドウのキャッシュ）のテストケース"""
+
+    def setUp(self):
+        super().setUp()
+        self.windows = {10: (101, 'Discord | #general | Server - Google Chrome'), 20: (201, '#dev - Discord')}
+        self.queries = []
+        self.stats = GuardStats()
+        self.cache = FrontWindowCache(self.query, run_loop_available=True, stats=self.stats)
+        patcher = patch('utils.foreground.IS_MAC', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def query(self, pid):
+        self.queries.append(pid)
+        return self.windows[pid]
+
+    def test_scans_once_until_change(self):
+        """ウィンドウ一覧の走査はタイトル変化・アプリ切り替えまで1回だけ"""
+        self.cache.start()
+        for _ in range(5):
+            self.assertEqual(self.cache.lookup(10), (101, 'Discord | #general | Server - Google Chrome'))
+        self.assertEqual(self.queries, [10])
+        self.assertEqual(self.stats.counters['front_window_hits'], 4)
+
+        self.windows[10] = (101, 'Inbox - Google Chrome')
+        self.callbacks[10](None, None, 'AXTitleChanged', None)
+        self.assertEqual(self.cache.lookup(10), (101, 'Inbox - Google Chrome'))
+
+        self.activate(20)
+        self.assertEqual(self.cache.lookup(20), (201, '#dev - Discord'))
+        self.assertEqual(self.queries, [10, 10, 20])
+        self.cache.stop()
+
+    def test_change_during_query_is_not_cached(self):
+        """問い合わせ中に変化が届いたら結果をキャッシュしない"""
+        self.cache.start()
+
+        def racing_query(pid):
+            self.queries.append(pid)
+            self.cache.invalidate()
+            return self.windows[pid]
+
+        self.cache.query = racing_query
+        self.cache.lookup(10)
+        self.cache.lookup(10)
+        self.assertEqual(self.queries, [10, 10])
+
+    def test_no_run_loop_queries_every_time(self):
+        """通知を受け取れなければキャッシュしない"""
+        cache = FrontWindowCache(self.query, run_loop_available=False)
+        cache.start()
+        self.assertFalse(cache.caching)
+        cache.lookup(10)
+        cache.lookup(10)
+        self.assertEqual(self.queries, [10, 10])
+
+
+if __name__ == '__main__':
+    unittest.main()
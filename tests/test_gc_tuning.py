@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+GC調整のテスト
+"""
+
+import unittest
+import gc
+import os
+import sys
+from unittest.mock import ANY, MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import gc_tuning
+from utils.gc_tuning import GCPauseRecorder, freeze_heap, thaw_heap, tune_thresholds, prepare_hook_gc
+from utils.stats import GuardStats
+
+
+class TestGCTuning(unittest.TestCase):
+    """GC調整のテストケース"""
+
+    def setUp(self):
+        self.thresholds = gc.get_threshold()
+        self.stats = GuardStats()
+
+    def tearDown(self):
+        gc.set_threshold(*self.thresholds)
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+
+    def test_recorder_records_collections(self):
+        """gc.callbacks経由で世代ごとの停止時間を記録する"""
+        recorder = GCPauseRecorder(self.stats)
+        recorder.install()
+        try:
+            gc.collect(0)
+            gc.collect(2)
+        finally:
+            recorder.uninstall()
+        timings = self.stats.snapshot()['timings']
+        self.assertGreaterEqual(timings['gc_gen0']['count'], 1)
+        self.assertGreaterEqual(timings['gc_gen2']['count'], 1)
+        self.assertNotIn(recorder._callback, gc.callbacks)
+
+    def test_long_pauses_are_traced(self):
+        """閾値を超える停止はトレースに残る"""
+        recorder = GCPauseRecorder(self.stats)
+        with patch.object(gc_tuning, 'TRACE_PAUSE_SECONDS', 0.0):
+            recorder.install()
+            try:
+                gc.collect(1)
+            finally:
+                recorder.uninstall()
+        events = [entry for entry in self.stats.trace_snapshot() if entry['event'] == 'gc_pause']
+        self.assertTrue(events)
+        self.assertIn('pause_us', events[0])
+
+    def test_install_is_idempotent(self):
+        """二重登録しない"""
+        recorder = GCPauseRecorder(self.stats)
+        recorder.install()
+        recorder.install()
+        self.assertEqual(gc.callbacks.count(recorder._callback), 1)
+        recorder.uninstall()
+        recorder.uninstall()
+        self.assertFalse(recorder.installed)
+
+    def test_tune_thresholds_returns_previous(self):
+        """閾値を変更し、以前の値を返す"""
+        previous = tune_thresholds((1234, 5, 6))
+        self.assertEqual(previous, self.thresholds)
+        self.assertEqual(gc.get_threshold(), (1234, 5, 6))
+
+    @unittest.skipUnless(hasattr(gc, 'freeze'), "gc.freeze requires Python 3.7+")
+    def test_prepare_hook_gc(self):
+        """凍結・閾値調整・記録開始をまとめて行う"""
+        recorder = prepare_hook_gc(self.stats)
+        try:
+            self.assertTrue(recorder.installed)
+            self.assertGreater(self.stats.counters['gc_frozen_objects'], 0)
+            self.assertEqual(gc.get_threshold(), gc_tuning.HOOK_GC_THRESHOLDS)
+            self.assertGreater(gc.get_freeze_count(), 0)
+        finally:
+            recorder.uninstall()
+
+    @unittest.skipUnless(hasattr(gc, 'freeze'), "gc.freeze requires Python 3.7+")
+    def test_freeze_heap(self):
+        """生存オブジェクトを永続世代へ移す"""
+        self.assertGreater(freeze_heap(), 0)
+
+    @unittest.skipUnless(hasattr(gc, 'freeze'), "gc.freeze requires Python 3.7+")
+    def test_thaw_reclaims_replaced_cycles(self):
+        """凍結中に不要になった循環参照も、解凍後は回収される"""
+        import weakref
+
+        class Node:
+            pass
+
+        node = Node()
+        node.self = node
+        ref = weakref.ref(node)
+        freeze_heap()
+        del node
+        gc.collect()
+        self.assertIsNotNone(ref())
+        thaw_heap()
+        gc.collect()
+        self.assertIsNone(ref())
+        self.assertEqual(gc.get_freeze_count(), 0)
+
+    @unittest.skipUnless(hasattr(gc, 'freeze'), "gc.freeze requires Python 3.7+")
+    def test_uninstall_restores_process_state(self):
+        """停止時に以前の閾値に戻し、自分で凍結した分だけ解凍する"""
+        gc.set_threshold(1234, 5, 6)
+        recorder = prepare_hook_gc(self.stats)
+        self.assertEqual(gc.get_threshold(), gc_tuning.HOOK_GC_THRESHOLDS)
+        recorder.uninstall()
+        self.assertEqual(gc.get_threshold(), (1234, 5, 6))
+        self.assertEqual(gc.get_freeze_count(), 0)
+
+    @unittest.skipUnless(hasattr(gc, 'freeze'), "gc.freeze requires Python 3.7+")
+    def test_foreign_freeze_is_left_alone(self):
+        """他で凍結済みなら凍結も解凍もしない"""
+        frozen = freeze_heap()
+        recorder = prepare_hook_gc(self.stats)
+        recorder.uninstall()
+        self.assertEqual(gc.get_freeze_count(), frozen)
+
+    def test_record_only(self):
+        """凍結・閾値調整なしで停止時間だけ記録する（アプリと同居するとき）"""
+        gc.set_threshold(1234, 5, 6)
+        recorder = prepare_hook_gc(self.stats, thresholds=None, freeze=False)
+        try:
+            self.assertTrue(recorder.installed)
+            self.assertEqual(gc.get_threshold(), (1234, 5, 6))
+            if hasattr(gc, 'get_freeze_count'):
+                self.assertEqual(gc.get_freeze_count(), 0)
+        finally:
+            recorder.uninstall()
+        self.assertEqual(gc.get_threshold(), (1234, 5, 6))
+
+
+
+class TestGuardGCTuning(unittest.TestCase):
+    """DiscordSendGuardのGC調整のテストケース"""
+
+    def run_guard(self, owns_process):
+        from discord_send_guard import DiscordSendGuard
+        guard = DiscordSendGuard()
+        guard.apply_config({'ime_awareness': False, 'flight_recorder': False,
+                            'foreground_strategy': 'direct', 'raise_priority': False})
+        guard.owns_process = owns_process
+        with patch.object(guard, '_create_listener', return_value=MagicMock()), \
+                patch('discord_send_guard.prepare_hook_gc', wraps=prepare_hook_gc) as prepare:
+            guard.start()
+        return prepare
+
+    def test_owned_process_is_tuned(self):
+        """CLI・分離したプロセスでは凍結と閾値調整を行う"""
+        self.run_guard(owns_process=True).assert_called_once_with(ANY)
+
+    def test_shared_process_only_records(self):
+        """メニューバーアプリ内ではプロセス全体のGC設定を変えない"""
+        self.run_guard(owns_process=False).assert_called_once_with(ANY, thresholds=None, freeze=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+フック分離プロセスのテスト
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.hook_process import HookProcess, RemoteStats, StatsPublisher
+from utils.stats import GuardStats, SharedStatsBlock
+
+
+class _Pipe:
+    """パイプの送信側の代わり: 送られたメッセージを残す"""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+
+def _fake_hook(conn, stats_conn, stats_buffer, config):
+    """pynputを使わない子プロセス: 受信したコマンドを統計に記録する"""
+    stats = GuardStats()
+    publisher = StatsPublisher(stats, SharedStatsBlock(stats_buffer), stats_conn)
+    stats.incr('enter_send', 1 if config.get('debug') else 0)
+    publisher.publish()
+    while True:
+        command, value = conn.recv()
+        if command == 'stop':
+            break
+        if command == 'config':
+            stats.incr('enter_send', 1 if value.get('debug') else 0)
+        elif command == 'enabled':
+            stats.incr('enter_passthrough' if value else 'enter_converted')
+            stats.incr('enter_shed')
+            stats.set_info('enabled', value)
+            stats.trace('enabled', value=value)
+        publisher.publish()
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestSharedStatsBlock(unittest.TestCase):
+    """SharedStatsBlockのテストケース"""
+
+    def test_round_trip(self):
+        """書き込んだ全カウンターとタイミングを同じ形式で読み出せる"""
+        stats = GuardStats()
+        stats.incr('enter_converted', 7)
+        stats.incr('window_cache_hits', 3)
+        stats.observe('on_press', 0.000010)
+        stats.observe('on_press', 0.000030)
+        block = SharedStatsBlock(bytearray(SharedStatsBlock.SIZE))
+        block.publish(stats)
+        snapshot = block.read()
+        self.assertEqual(snapshot['counters'], {'enter_converted': 7, 'window_cache_hits': 3})
+        self.assertEqual(snapshot['timings']['on_press']['count'], 2)
+        self.assertAlmostEqual(snapshot['timings']['on_press']['avg_us'], 20.0, places=3)
+        self.assertAlmostEqual(snapshot['timings']['on_press']['max_us'], 30.0, places=3)
+        self.assertGreaterEqual(snapshot['uptime'], 0.0)
+
+    def test_only_changes_are_written(self):
+        """変わったカウンターだけ書き、何も変わらなければブロックに触れない"""
+        stats = GuardStats()
+        stats.incr('a')
+        stats.incr('b')
+        block = SharedStatsBlock(bytearray(SharedStatsBlock.SIZE))
+        self.assertEqual(block.publish(stats), 2)
+        self.assertEqual(block.publish(stats), 0)
+        stats.incr('b')
+        self.assertEqual(block.publish(stats), 1)
+        stats.reset()
+        stats.incr('c')
+        block.publish(stats)
+        self.assertEqual(block.read()['counters'], {'a': 0, 'b': 0, 'c': 1})
+
+    def test_full_block_keeps_working(self):
+        """スロットが足りなければ溢れた名前だけ載せない"""
+        stats = GuardStats()
+        for index in range(SharedStatsBlock.COUNTER_SLOTS + 5):
+            stats.incr(f'counter_{index}')
+        block = SharedStatsBlock(bytearray(SharedStatsBlock.SIZE))
+        with self.assertLogs('utils.stats', 'WARNING'):
+            block.publish(stats)
+        self.assertEqual(len(block.read()['counters']), SharedStatsBlock.COUNTER_SLOTS)
+
+    def test_empty_block(self):
+        """未書き込みのブロックは空"""
+        snapshot = SharedStatsBlock(bytearray(SharedStatsBlock.SIZE)).read()
+        self.assertEqual(snapshot['counters'], {})
+        self.assertEqual(snapshot['uptime'], 0.0)
+
+
+class TestRemoteStats(unittest.TestCase):
+    """StatsPublisherとRemoteStatsのテストケース"""
+
+    def test_round_trip(self):
+        """カウンターは共有メモリ、情報と決定トレースは差分だけパイプで届く"""
+        stats = GuardStats()
+        buffer = bytearray(SharedStatsBlock.SIZE)
+        pipe = _Pipe()
+        publisher = StatsPublisher(stats, SharedStatsBlock(buffer), pipe)
+        remote = RemoteStats(SharedStatsBlock(buffer))
+
+        stats.incr('enter_converted', 7)
+        stats.set_info('foreground_strategy', 'notification')
+        stats.trace('enter', action='converted')
+        publisher.publish()
+        stats.incr('enter_converted')
+        stats.trace('enter', action='passthrough')
+        publisher.publish()
+        self.assertTrue(publisher.publish())
+        # 3回目は何も変わっていないので送らない。2回目は新しいトレースだけ
+        self.assertEqual(len(pipe.sent), 2)
+        self.assertEqual(pipe.sent[1], ({}, [], [stats.trace_snapshot()[-1]]))
+        for message in pipe.sent:
+            remote.update(*message)
+
+        snapshot = remote.snapshot()
+        self.assertEqual(snapshot['counters'], {'enter_converted': 8})
+        self.assertEqual(snapshot['info'], {'foreground_strategy': 'notification'})
+        self.assertEqual([entry['action'] for entry in remote.trace_snapshot()], ['converted', 'passthrough'])
+
+    def test_trace_since_skips_dropped_entries(self):
+        """バッファから落ちた古いトレースは送らない"""
+        stats = GuardStats(trace_size=3)
+        for index in range(5):
+            stats.trace('enter', index=index)
+        total, entries = stats.trace_since(0)
+        self.assertEqual((total, [entry['index'] for entry in entries]), (5, [2, 3, 4]))
+        stats.trace('enter', index=5)
+        self.assertEqual([entry['index'] for entry in stats.trace_since(total)[1]], [5])
+
+    def test_empty(self):
+        """開始前は空の統計を返す"""
+        snapshot = RemoteStats().snapshot()
+        self.assertEqual(snapshot['counters'], {})
+        self.assertEqual(snapshot['uptime'], 0.0)
+
+
+class TestHookImports(unittest.TestCase):
+    """フックプロセスが読み込むモジュールのテストケース"""
+
+    def test_guard_import_is_minimal(self):
+        """ガードの読み込みでGUIやnumpy、既定で無効な機能のモジュールを読み込まない"""
+        import subprocess
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        code = ("import sys, discord_send_guard; "
+                "print(' '.join(sorted(m for m in sys.modules if m.split('.')[0] in "
+                "('numpy', 'rumps', 'tkinter', 'app', 'gui') or m in ('utils.activation', 'utils.lookahead'))))")
+        env = dict(os.environ, PYNPUT_BACKEND=os.environ.get('PYNPUT_BACKEND', 'dummy'))
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, env=env,
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), '')
+
+
+class TestHookProcess(unittest.TestCase):
+    """HookProcessのテストケース"""
+
+    def test_config_commands_and_stats(self):
+        """設定とコマンドがパイプで届き、統計は共有メモリとパイプで返る"""
+        hook = HookProcess({'debug': True}, target=_fake_hook)
+        runner = threading.Thread(target=hook.start)
+        runner.start()
+        try:
+            self.assertTrue(_wait_for(lambda: hook.stats.snapshot()['counters'].get('enter_send') == 1))
+            self.assertTrue(hook.running)
+            self.assertNotEqual(hook.pid, os.getpid())
+
+            hook.apply_config({'debug': True})
+            hook.enabled = False
+            self.assertFalse(hook.enabled)
+            self.assertTrue(_wait_for(lambda: hook.stats.snapshot()['counters'].get('enter_converted') == 1))
+            self.assertEqual(hook.stats.snapshot()['counters']['enter_send'], 2)
+            self.assertEqual(hook.stats.snapshot()['counters']['enter_shed'], 1)
+            self.assertEqual(hook.stats.snapshot()['info'], {'enabled': False})
+            self.assertEqual(hook.stats.trace_snapshot()[-1]['value'], False)
+        finally:
+            hook.stop()
+            runner.join(timeout=10)
+        self.assertFalse(hook.running)
+        self.assertFalse(runner.is_alive())
+
+    def test_stop_before_start_is_noop(self):
+        """開始前のstop()は何もしない"""
+        hook = HookProcess({}, target=_fake_hook)
+        hook.stop()
+        hook.apply_config({'debug': False})
+        self.assertFalse(hook.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
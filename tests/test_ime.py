@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+IME変換状態の追跡のテスト
+"""
+
+import unittest
+import os
+import sys
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.ime import (
+    CompositionTracker, InputSourceWatcher, is_ime_source,
+    KEY_CHAR, KEY_BACKSPACE, KEY_ESCAPE, KEY_OTHER,
+)
+
+KOTOERI = 'com.apple.inputmethod.Kotoeri.RomajiTyping.Japanese'
+KOTOERI_ROMAN = 'com.apple.inputmethod.Kotoeri.RomajiTyping.Roman'
+US = 'com.apple.keylayout.US'
+
+
+class TestIsImeSource(unittest.TestCase):
+    """入力ソース判定のテストケース"""
+
+    def test_sources(self):
+        """変換するIMEのみTrue"""
+        self.assertTrue(is_ime_source(KOTOERI))
+        self.assertTrue(is_ime_source('com.google.inputmethod.Japanese.base'))
+        self.assertTrue(is_ime_source('windows.ime.0411.native'))
+        self.assertFalse(is_ime_source(KOTOERI_ROMAN))
+        self.assertFalse(is_ime_source(US))
+        self.assertFalse(is_ime_source('windows.ime.0411.direct'))
+        self.assertFalse(is_ime_source(''))
+
+
+class TestCompositionTracker(unittest.TestCase):
+    """CompositionTrackerのテストケース（スクリプト化したイベント列）"""
+
+    def setUp(self):
+        self.tracker = CompositionTracker()
+        self.tracker.set_input_source(KOTOERI)
+
+    def play(self, *kinds):
+        for kind in kinds:
+            self.tracker.on_key(kind)
+
+    def test_enter_confirms_composition(self):
+        """入力中のEnterは確定として通し、次のEnterは通常扱い"""
+        self.play(KEY_CHAR, KEY_CHAR, KEY_OTHER)  # にほ + 変換
+        self.assertTrue(self.tracker.enter_confirms_composition())
+        self.assertFalse(self.tracker.enter_confirms_composition())
+        self.assertEqual(self.tracker.stats.counters['ime_confirms'], 1)
+
+    def test_backspace_to_empty_ends_composition(self):
+        """Backspaceで入力を消し切ったら変換終了"""
+        self.play(KEY_CHAR, KEY_CHAR, KEY_BACKSPACE, KEY_BACKSPACE)
+        self.assertFalse(self.tracker.composing)
+        self.play(KEY_CHAR, KEY_CHAR, KEY_BACKSPACE)
+        self.assertTrue(self.tracker.composing)
+
+    def test_escape_cancels(self):
+        """Escapeで変換取り消し"""
+        self.play(KEY_CHAR, KEY_ESCAPE)
+        self.assertFalse(self.tracker.enter_confirms_composition())
+
+    def test_keys_outside_composition(self):
+        """変換外のBackspace等は状態を変えない"""
+        self.play(KEY_BACKSPACE, KEY_OTHER, KEY_ESCAPE)
+        self.assertFalse(self.tracker.composing)
+        self.assertEqual(self.tracker.pending, 0)
+
+    def test_direct_input_source(self):
+        """英数モードや通常キーボードでは変換扱いしない"""
+        self.tracker.set_input_source(KOTOERI_ROMAN)
+        self.play(KEY_CHAR, KEY_CHAR)
+        self.assertFalse(self.tracker.enter_confirms_composition())
+
+    def test_source_change_ends_composition(self):
+        """入力ソースが変わったら変換状態を捨てる"""
+        self.play(KEY_CHAR)
+        self.tracker.set_input_source(US)
+        self.assertFalse(self.tracker.composing)
+        self.assertEqual(self.tracker.stats.info['input_source'], US)
+
+    def test_backend_flag_takes_over(self):
+        """バックエンドの変換フラグがあればキー推定より優先"""
+        self.tracker.set_composing(False)
+        self.play(KEY_CHAR)
+        self.assertFalse(self.tracker.enter_confirms_composition())
+        self.tracker.set_composing(True)
+        self.assertTrue(self.tracker.enter_confirms_composition())
+        self.tracker.set_composing(False)
+        self.assertFalse(self.tracker.enter_confirms_composition())
+
+
+class TestInputSourceWatcher(unittest.TestCase):
+    """InputSourceWatcherのテストケース"""
+
+    def test_poll_updates_tracker(self):
+        """読み取った入力ソースを反映"""
+        sources = [US]
+        tracker = CompositionTracker()
+        watcher = InputSourceWatcher(tracker, read=lambda: sources[0])
+        watcher.poll()
+        self.assertFalse(tracker.ime_active)
+        sources[0] = KOTOERI
+        watcher.poll()
+        self.assertTrue(tracker.ime_active)
+
+
+if __name__ == '__main__':
+    unittest.main()
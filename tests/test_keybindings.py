@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+キーバインド（コード→動作の表）のテスト
+"""
+
+import itertools
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.config import (
+    compile_keybindings, parse_chord, primary_modifier, KeybindingError, DEFAULT_CONFIG,
+    BINDABLE_KEYS, KEY_ACTIONS, MODIFIER_STATES, ACTION_NEWLINE, ACTION_SEND, ACTION_PASS,
+    MOD_SHIFT, MOD_CTRL, MOD_ALT, MOD_CMD,
+)
+
+MODIFIERS = (('shift', MOD_SHIFT), ('ctrl', MOD_CTRL), ('alt', MOD_ALT), ('cmd', MOD_CMD))
+
+
+def chord_for(mask, key):
+    """マスクとキー名からコード文字列を作る"""
+    return '+'.join([name for name, bit in MODIFIERS if mask & bit] + [key])
+
+
+def reference_lookup(spec, is_mac, key_id, mask):
+    """表を使わない素朴な判定（比較用）"""
+    primary = primary_modifier(is_mac)
+    for chord, action in spec.items():
+        if parse_chord(chord, primary) == (mask, key_id):
+            return action
+    return ACTION_PASS if mask & primary else ACTION_NEWLINE
+
+
+class TestKeybindings(unittest.TestCase):
+    """compile_keybindingsのテストケース"""
+
+    def test_defaults_keep_classic_behavior(self):
+        """既定ではEnterは改行、主修飾キー+Enterは送信（そのまま通す）"""
+        for is_mac, primary in ((True, MOD_CMD), (False, MOD_CTRL)):
+            bindings = compile_keybindings(DEFAULT_CONFIG['keybindings'], is_mac)
+            for mask in range(MODIFIER_STATES):
+                with self.subTest(is_mac=is_mac, mask=mask):
+                    expected = ACTION_PASS if mask & primary else ACTION_NEWLINE
+                    self.assertEqual(bindings.lookup(0, mask), expected)
+
+    def test_every_single_binding(self):
+        """すべてのキー・修飾キーの組み合わせ・動作で、表が素朴な判定と一致"""
+        keys = sorted(set(BINDABLE_KEYS.values()))
+        names = {key_id: name for name, key_id in BINDABLE_KEYS.items()}
+        for is_mac, key_id, mask, action in itertools.product(
+                (True, False), keys, range(MODIFIER_STATES), KEY_ACTIONS):
+            spec = {chord_for(mask, names[key_id]): action}
+            bindings = compile_keybindings(spec, is_mac)
+            with self.subTest(is_mac=is_mac, spec=spec):
+                for other_key, other_mask in itertools.product(keys, range(MODIFIER_STATES)):
+                    self.assertEqual(bindings.lookup(other_key, other_mask),
+                                     reference_lookup(spec, is_mac, other_key, other_mask))
+
+    def test_full_table(self):
+        """全コードを割り当てた表（キーが複数の表）が素朴な判定と一致"""
+        keys = {'enter': 0, 'space': 1}
+        spec = {}
+        for index, (key_id, mask) in enumerate(itertools.product((0, 1), range(MODIFIER_STATES))):
+            key = 'enter' if key_id == 0 else 'space'
+            spec[chord_for(mask, key)] = KEY_ACTIONS[index % len(KEY_ACTIONS)]
+        bindings = compile_keybindings(spec, is_mac=False, keys=keys)
+        for key_id, mask in itertools.product((0, 1), range(MODIFIER_STATES)):
+            expected = next((action for chord, action in spec.items()
+                             if parse_chord(chord, MOD_CTRL, keys) == (mask, key_id)), None)
+            self.assertEqual(bindings.lookup(key_id, mask), expected)
+
+    def test_numpad_enter_is_rejected(self):
+        """テンキーのEnterは区別できないので割り当てられない（黙って無視しない）"""
+        with self.assertRaisesRegex(KeybindingError, 'kp_enter'):
+            compile_keybindings({'kp_enter': 'send'}, is_mac=False)
+        self.assertEqual(set(BINDABLE_KEYS.values()), {0})
+
+    def test_parse_chord(self):
+        """修飾キーの別名・大文字・空白・modを解釈"""
+        self.assertEqual(parse_chord('Alt + Enter', MOD_CMD), (MOD_ALT, 0))
+        self.assertEqual(parse_chord('option+shift+return', MOD_CMD), (MOD_ALT | MOD_SHIFT, 0))
+        self.assertEqual(parse_chord('mod+enter', MOD_CMD), (MOD_CMD, 0))
+        self.assertEqual(parse_chord('mod+enter', MOD_CTRL), (MOD_CTRL, 0))
+        self.assertEqual(parse_chord('control+space', MOD_CMD, {'enter': 0, 'space': 1}), (MOD_CTRL, 1))
+
+    def test_invalid_specs(self):
+        """不正な指定はKeybindingError（ValueError）"""
+        for spec in ({'hyper+enter': 'send'}, {'alt+space': 'send'}, {'alt++enter': 'send'},
+                     {'shift+shift+enter': 'send'}, {'enter': 'explode'},
+                     {'ctrl+enter': 'send', 'control+enter': 'pass'}, ['enter']):
+            with self.subTest(spec=spec), self.assertRaises(KeybindingError):
+                compile_keybindings(spec, is_mac=False)
+        self.assertTrue(issubclass(KeybindingError, ValueError))
+
+    def test_mod_conflict_is_platform_specific(self):
+        """modとcmdの重複はmacだけ衝突"""
+        spec = {'mod+enter': 'pass', 'cmd+enter': 'send'}
+        with self.assertRaises(KeybindingError):
+            compile_keybindings(spec, is_mac=True)
+        bindings = compile_keybindings(spec, is_mac=False)
+        self.assertEqual(bindings.lookup(0, MOD_CMD), ACTION_SEND)
+
+    def test_config_load_falls_back_on_invalid_spec(self):
+        """設定ファイルの不正なキーバインドは既定値に戻す"""
+        import json
+        import tempfile
+        from pathlib import Path
+        from utils import config as config_module
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'config.json'
+            path.write_text(json.dumps({'keybindings': {'hyper+enter': 'send'}}))
+            with patch.object(config_module, 'CONFIG_DIR', Path(tmp)), \
+                 patch.object(config_module, 'CONFIG_FILE', path):
+                config = config_module.Config()
+            self.assertEqual(config.get('keybindings'), DEFAULT_CONFIG['keybindings'])
+
+    def test_config_does_not_share_defaults(self):
+        """既定値から作った設定を書き換えても既定値は変わらない"""
+        import tempfile
+        from pathlib import Path
+        from utils import config as config_module
+        expected = dict(DEFAULT_CONFIG['keybindings'])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'config.json'
+            with patch.object(config_module, 'CONFIG_DIR', Path(tmp)), \
+                 patch.object(config_module, 'CONFIG_FILE', path):
+                config = config_module.Config()
+                config.get('keybindings')['alt+enter'] = 'send'
+                config.reset()
+                config.get('keybindings')['alt+enter'] = 'send'
+        self.assertEqual(DEFAULT_CONFIG['keybindings'], expected)
+
+
+class TestGuardKeybindings(unittest.TestCase):
+    """DiscordSendGuardへのキーバインド反映のテストケース"""
+
+    def setUp(self):
+        from discord_send_guard import DiscordSendGuard
+        self.guard = DiscordSendGuard()
+        self.guard.keyboard_controller = MagicMock()
+
+    def test_apply_config_compiles_bindings(self):
+        """設定のキーバインドを反映し、不正なら既定値"""
+        self.guard.apply_config({'keybindings': {'alt+enter': 'send'}})
+        self.assertEqual(self.guard.keybindings.lookup(0, MOD_ALT), ACTION_SEND)
+        self.guard.apply_config({'keybindings': {'alt+enter': 'explode'}})
+        self.assertEqual(self.guard.keybindings.lookup(0, MOD_ALT), ACTION_NEWLINE)
+
+    def test_send_plain_enter_lifts_modifiers(self):
+        """送信は押されている修飾キーを離してからEnterを送り、元に戻す"""
+        from discord_send_guard import MODIFIER_KEYS, Key
+        self.guard.modifier_mask = MOD_ALT | MOD_SHIFT
+        self.guard._send_plain_enter()
+        calls = self.guard.keyboard_controller.method_calls
+        self.assertEqual([name for name, _, _ in calls],
+                         ['release', 'release', 'press', 'release', 'press', 'press'])
+        self.assertEqual(calls[2][1], (Key.enter,))
+        self.assertEqual({calls[0][1][0], calls[1][1][0]},
+                         {MODIFIER_KEYS[MOD_ALT][0], MODIFIER_KEYS[MOD_SHIFT][0]})
+
+    @patch('discord_send_guard.DiscordSendGuard.is_discord_active', return_value=True)
+    def test_send_binding_replaces_enter_at_hook(self, mock_discord_active):
+        """修飾キー付きの送信は元のEnterをフックで破棄し、Enterは注入した1回だけ"""
+        import discord_send_guard as dsg
+        with patch.object(dsg, 'Key', MagicMock(name='Key')), \
+                patch.dict(dsg.MODIFIER_KEYS, {bit: (MagicMock(name=f'mod{bit}'),) for bit in dsg.MODIFIER_KEYS}):
+            self.guard.apply_config({'keybindings': {'alt+enter': 'send'}, 'ime_awareness': False})
+            alt = dsg.MODIFIER_KEYS[MOD_ALT][0]
+            self.assertTrue(self.guard._hook_press(alt))
+            self.assertEqual(self.guard._darwin_intercept(12, 'alt'), 'alt')
+            enter = dsg.Key.enter
+            self.assertTrue(self.guard._hook_press(enter))
+            self.assertIsNone(self.guard._darwin_intercept(10, 'alt-enter'))
+        presses = [call.args[0] for call in self.guard.keyboard_controller.press.call_args_list]
+        self.assertEqual(presses.count(enter), 1)
+        self.assertEqual(self.guard.stats.counters['enter_send'], 1)
+
+    def test_injected_events_are_ignored(self):
+        """合成イベントは修飾キー状態も統計も変えない"""
+        from discord_send_guard import Key
+        self.assertTrue(self.guard.on_press(Key.enter, True))
+        self.assertTrue(self.guard.on_release(Key.enter, True))
+        self.assertEqual(self.guard.modifier_mask, 0)
+        self.assertNotIn('on_press', self.guard.stats.timings)
+        self.guard.keyboard_controller.press.assert_not_called()
+
+    def test_modifier_pressed_follows_mask(self):
+        """modifier_pressedは主修飾キーのビット"""
+        with patch('discord_send_guard.IS_MAC', False):
+            self.guard.modifier_mask = MOD_ALT
+            self.assertFalse(self.guard.modifier_pressed)
+            self.guard.modifier_pressed = True
+            self.assertEqual(self.guard.modifier_mask, MOD_ALT | MOD_CTRL)
+            self.guard.modifier_pressed = False
+            self.assertEqual(self.guard.modifier_mask, MOD_ALT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Enterの先読み（Enter直後の修飾キーの競合解決）のテスト
+"""
+
+import threading
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.lookahead import EnterLookahead, MAX_WINDOW
+from utils.timer_wheel import TimerWheel, VirtualClock
+from utils.stats import GuardStats
+from utils.config import MOD_CMD, MOD_SHIFT
+
+TICK = 0.001
+
+
+class TestEnterLookahead(unittest.TestCase):
+    """EnterLookahead（仮想時計の合成イベント列）のテストケース"""
+
+    def setUp(self):
+        self.clock = VirtualClock(50.0)
+        self.stats = GuardStats()
+        self.wheel = TimerWheel(tick=TICK, slots=64, clock=self.clock, stats=self.stats)
+        self.resolved = []  # (Enterからの経過秒, mask)
+        self.lookahead = EnterLookahead(self.wheel, 0.03, self.on_resolve, self.stats)
+        self.enter_at = None
+
+    def on_resolve(self, mask):
+        self.resolved.append((round(self.clock() - self.enter_at, 6), mask))
+
+    def play(self, events, until=0.2):
+        """(時刻, 種類, mask)の列を1ms刻みで再生"""
+        events = sorted(events)
+        t = 0.0
+        while t <= until + 1e-9:
+            while events and events[0][0] <= t + 1e-9:
+                _, kind, mask = events.pop(0)
+                if kind == 'enter':
+                    self.enter_at = self.clock()
+                    self.lookahead.hold(mask)
+                elif kind == 'modifier' and self.lookahead.pending and mask & MOD_CMD:
+                    self.lookahead.resolve_now(mask)
+                elif kind == 'key' and self.lookahead.pending:
+                    self.lookahead.resolve_now(reason='flushed')
+            self.clock.advance(TICK)
+            self.wheel.advance()
+            t += TICK
+
+    def test_modifier_within_window_upgrades(self):
+        """Enterの5ms後のCmdで送信として即確定"""
+        self.play([(0.0, 'enter', 0), (0.005, 'modifier', MOD_CMD)])
+        self.assertEqual(self.resolved, [(0.005, MOD_CMD)])
+        self.assertEqual(self.stats.counters['lookahead_upgraded'], 1)
+
+    def test_modifier_after_window_is_too_late(self):
+        """窓を過ぎたCmdは無関係（Enterは押下時のまま確定）"""
+        self.play([(0.0, 'enter', 0), (0.045, 'modifier', MOD_CMD)])
+        self.assertEqual(len(self.resolved), 1)
+        delay, mask = self.resolved[0]
+        self.assertEqual(mask, 0)
+        self.assertLessEqual(delay, 0.03)
+        self.assertEqual(self.stats.counters['lookahead_expired'], 1)
+
+    def test_latency_is_bounded_by_window(self):
+        """修飾キーが来なくても確定は窓の長さ以内"""
+        for start in (0.0, 0.0004, 0.0009):
+            with self.subTest(start=start):
+                self.resolved.clear()
+                self.clock.advance(start)
+                self.play([(0.0, 'enter', MOD_SHIFT)], until=0.05)
+                self.assertEqual(len(self.resolved), 1)
+                self.assertLessEqual(self.resolved[0][0], 0.03)
+                self.assertGreaterEqual(self.resolved[0][0], 0.03 - 2 * TICK)
+        self.assertLessEqual(self.stats.snapshot()['timings']['lookahead_delay']['max_us'], 30000)
+
+    def test_other_key_flushes_immediately(self):
+        """他のキーが来たら順序を保つため保留中のEnterを先に確定"""
+        self.play([(0.0, 'enter', 0), (0.002, 'key', 0)])
+        self.assertEqual(self.resolved, [(0.002, 0)])
+
+    def test_second_enter_flushes_first(self):
+        """保留中に次のEnterが来たら前のEnterを確定してから保留"""
+        self.play([(0.0, 'enter', 0), (0.01, 'enter', 0)])
+        self.assertEqual(len(self.resolved), 2)
+        self.assertEqual(self.stats.counters['lookahead_flushed'], 1)
+        self.assertEqual(self.stats.counters['lookahead_held'], 2)
+
+    def test_window_is_clamped(self):
+        """窓の長さは上限で打ち切り"""
+        self.assertEqual(EnterLookahead(self.wheel, 5.0, self.on_resolve).window, MAX_WINDOW)
+
+    def test_resolved_exactly_once_under_race(self):
+        """タイマーとキー入力が競合しても確定は1回だけ"""
+        wheel = TimerWheel(tick=0.001)
+        resolved = []
+        lookahead = EnterLookahead(wheel, 0.002, resolved.append)
+        wheel.start()
+        try:
+            for _ in range(200):
+                lookahead.hold(0)
+                threading.Event().wait(0.0015)
+                lookahead.resolve_now(MOD_CMD)
+            lookahead.resolve_now()
+            threading.Event().wait(0.01)
+        finally:
+            wheel.stop()
+        self.assertEqual(len(resolved), 200)
+
+
+class TestGuardLookahead(unittest.TestCase):
+    """DiscordSendGuardの先読み設定のテストケース"""
+
+    def setUp(self):
+        from discord_send_guard import DiscordSendGuard
+        self.guard = DiscordSendGuard()
+        self.guard.keyboard_controller = MagicMock()
+
+    def test_disabled_by_default(self):
+        """既定では先読みなし（変換段は即時変換）"""
+        self.assertIsNone(self.guard.lookahead)
+        self.assertEqual(self.guard._transform_enter('newline', 0), ('converted', False))
+
+    def test_newline_is_held_and_resolved(self):
+        """有効時は改行になるEnterを保留し、確定時に変換"""
+        self.guard.apply_config({'enter_lookahead_ms': 20})
+        self.assertEqual(self.guard.lookahead.window, 0.02)
+        self.assertEqual(self.guard._transform_enter_lookahead('newline', 0), ('held', False))
+        self.guard.keyboard_controller.press.assert_not_called()
+        self.assertTrue(self.guard.lookahead.resolve_now())
+        self.assertEqual(self.guard.stats.counters['enter_converted'], 1)
+        self.guard.keyboard_controller.pressed.assert_called_once()
+
+    def test_upgrade_to_send_injects_enter(self):
+        """主修飾キーが来たら（元のEnterは止めてあるので）Enterを送る"""
+        from discord_send_guard import Key
+        self.guard._resolve_held_enter(MOD_CMD | 2)
+        self.guard.keyboard_controller.press.assert_called_with(Key.enter)
+        self.assertEqual(self.guard.stats.counters['enter_send'], 1)
+
+    def test_config_change_flushes_held_enter(self):
+        """設定変更時に保留中のEnterを確定"""
+        self.guard.apply_config({'enter_lookahead_ms': 20})
+        self.guard._transform_enter_lookahead('newline', 0)
+        self.guard.apply_config({'enter_lookahead_ms': 0})
+        self.assertIsNone(self.guard.lookahead)
+        self.assertEqual(self.guard.stats.counters['enter_converted'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Enter処理のパイプライン（段の融合）のテスト
+"""
+
+import itertools
+import threading
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.pipeline import Stage, fuse, run_unfused, PipelineError, FILTER, CLASSIFY, TRANSFORM, OBSERVE
+
+
+class TestFuse(unittest.TestCase):
+    """fuseのテストケース"""
+
+    def setUp(self):
+        self.calls = []
+
+    def filter_stage(self, name, result):
+        def stage(mask):
+            self.calls.append(name)
+            return result
+        return Stage(name, FILTER, stage)
+
+    def transform(self, action, mask):
+        self.calls.append(('transform', action, mask))
+        return ('converted', False) if action == 'newline' else ('send', True)
+
+    def observer(self, name):
+        return Stage(name, OBSERVE, lambda outcome, mask: self.calls.append((name, outcome)))
+
+    def test_runs_filters_in_order_then_transform(self):
+        """フィルタを順に通過したら分類・変換し、全観測段に結果を渡す"""
+        fused = fuse([
+            self.filter_stage('a', None), self.filter_stage('b', None),
+            Stage('classify', CLASSIFY, lambda mask: 'newline'),
+            Stage('transform', TRANSFORM, self.transform),
+            self.observer('o1'), self.observer('o2'),
+        ])
+        self.assertFalse(fused(3))
+        self.assertEqual(self.calls, ['a', 'b', ('transform', 'newline', 3),
+                                      ('o1', 'converted'), ('o2', 'converted')])
+        self.assertEqual(fused.stages, ('a', 'b', 'classify', 'transform', 'o1', 'o2'))
+
+    def test_filter_short_circuits(self):
+        """フィルタが結果を返したら以降の段は実行せず、元のEnterを通す"""
+        fused = fuse([
+            self.filter_stage('a', 'passthrough'), self.filter_stage('b', None),
+            Stage('transform', TRANSFORM, self.transform), self.observer('o'),
+        ])
+        self.assertTrue(fused(0))
+        self.assertEqual(self.calls, ['a', ('o', 'passthrough')])
+
+    def test_without_classify(self):
+        """分類段がなければ変換段にはNoneを渡す"""
+        fused = fuse([Stage('transform', TRANSFORM, self.transform)])
+        self.assertTrue(fused(0))
+        self.assertEqual(self.calls, [('transform', None, 0)])
+
+    def test_matches_reference_interpreter(self):
+        """有効な段のどの組み合わせでも逐次実行と同じ結果"""
+        options = [
+            self.filter_stage('f1', None), self.filter_stage('f2', 'channel_off'),
+            Stage('classify', CLASSIFY, lambda mask: 'send' if mask else 'newline'),
+            self.observer('o'),
+        ]
+        transform = Stage('transform', TRANSFORM, self.transform)
+        for enabled in itertools.product((False, True), repeat=len(options)):
+            stages = [stage for stage, on in zip(options, enabled) if on] + [transform]
+            for mask in (0, 8):
+                with self.subTest(stages=[s.name for s in stages], mask=mask):
+                    self.calls.clear()
+                    fused_result = fuse(stages)(mask)
+                    fused_calls = list(self.calls)
+                    self.calls.clear()
+                    self.assertEqual(fused_result, run_unfused(stages, mask)[1])
+                    self.assertEqual(fused_calls, self.calls)
+
+    def test_invalid_pipelines(self):
+        """変換段がない・重複・不明な種類はPipelineError"""
+        transform = Stage('transform', TRANSFORM, self.transform)
+        classify = Stage('classify', CLASSIFY, lambda mask: 'send')
+        for stages in ([], [transform, transform], [classify, classify, transform],
+                       [Stage('x', 'explode', None), transform]):
+            with self.subTest(stages=stages), self.assertRaises(PipelineError):
+                fuse(stages)
+
+
+class TestGuardPipeline(unittest.TestCase):
+    """DiscordSendGuardのパイプライン構成のテストケース"""
+
+    def setUp(self):
+        from discord_send_guard import DiscordSendGuard
+        self.guard = DiscordSendGuard()
+        self.guard.keyboard_controller = MagicMock()
+
+    def test_only_enabled_stages_are_fused(self):
+        """設定で無効な機能の段は含まれない"""
+        self.guard.apply_config({'ime_awareness': False, 'decision_trace': False})
+        self.assertEqual(self.guard.enter_pipeline.stages,
+                         ('discord_active', 'keybindings', 'convert', 'stats', 'repeat_state'))
+        self.guard.apply_config({'channel_rules': [{'pattern': '#code'}], 'debug': True})
+        self.assertEqual(self.guard.enter_pipeline.stages,
+                         ('ime_confirm', 'discord_active', 'channel_rules', 'keybindings',
+                          'convert', 'stats', 'trace', 'repeat_state', 'debug_log'))
+        self.assertEqual(self.guard.stats.info['enter_pipeline'], list(self.guard.enter_pipeline.stages))
+
+    def test_focus_tracker_adds_stage(self):
+        """フォーカス追跡の開始・終了で段を組み直す"""
+        self.guard.focus = MagicMock()
+        self.assertIn('composer', self.guard.enter_pipeline.stages)
+        self.guard.focus = None
+        self.assertNotIn('composer', self.guard.enter_pipeline.stages)
+
+    @patch('discord_send_guard.DiscordSendGuard.is_discord_active', return_value=False)
+    def test_outcome_recorded(self, mock_discord_active):
+        """Discord以外ではEnterを通して統計に記録"""
+        self.assertTrue(self.guard.enter_pipeline(0))
+        self.assertEqual(self.guard.stats.counters['enter_passthrough'], 1)
+
+    @patch('discord_send_guard.DiscordSendGuard.is_discord_active', return_value=True)
+    def test_rebuild_while_running(self, mock_discord_active):
+        """別スレッドで設定を変えても処理中のEnterは常にどちらかの構成で完了する"""
+        errors = []
+        stop = threading.Event()
+
+        def press():
+            while not stop.is_set():
+                try:
+                    self.guard.enter_pipeline(8)
+                except Exception as e:  # pragma: no cover - 失敗時のみ
+                    errors.append(e)
+
+        thread = threading.Thread(target=press)
+        thread.start()
+        for i in range(200):
+            self.guard.apply_config({'decision_trace': bool(i % 2),
+                                     'channel_rules': [{'pattern': '#a'}] if i % 3 else []})
+        stop.set()
+        thread.join()
+        self.assertEqual(errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+バージョン間の差分リプレイのテスト
+"""
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import utils.state_machine
+from utils import replay_diff
+from utils.config import DEFAULT_CONFIG
+from utils.flight_recorder import FlightRecorder
+from utils.replay_diff import (
+    ROOT, Engine, GuardEngine, Event, ReplayError, diff_replay, jsonl_events, recorder_events, synthetic_events,
+    write_jsonl,
+)
+
+KEYBINDINGS = DEFAULT_CONFIG['keybindings']
+
+
+class TestDiffReplay(unittest.TestCase):
+    """2つのバージョンを並べて実行するテストケース"""
+
+    @classmethod
+    def setUpClass(cls):
+        # オートリピートを改行ではなく通常の改行として扱う改変版
+        cls.tmp = tempfile.mkdtemp()
+        shutil.copytree(ROOT / 'utils', Path(cls.tmp) / 'utils',
+                        ignore=shutil.ignore_patterns('__pycache__'))
+        path = Path(cls.tmp) / 'utils' / 'state_machine.py'
+        source = path.read_text(encoding='utf-8')
+        changed = source.replace('ACT_DROP, ACT_REPEAT_NEWLINE,', 'ACT_DROP, ACT_NEWLINE,', 1)
+        assert changed != source
+        path.write_text(changed, encoding='utf-8')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_versions_are_isolated(self):
+        """各バージョンは別のモジュールで、読み込み済みのutilsは置き換わらない"""
+        current = Engine.load(str(ROOT), 'current')
+        changed = Engine.load(self.tmp, 'changed')
+        self.assertIsNot(current.state_machine, changed.state_machine)
+        self.assertIsNot(current.state_machine, utils.state_machine)
+        self.assertIs(sys.modules['utils.state_machine'], utils.state_machine)
+        self.assertEqual(changed.action_name(4), 'newline')
+
+    def test_same_version_has_no_differences(self):
+        """同じバージョン同士では差分なし、両方のスループットを計測"""
+        engine = Engine.load(str(ROOT))
+        report = diff_replay(engine, Engine.load(str(ROOT)), synthetic_events(20000), KEYBINDINGS, chunk=1000)
+        self.assertEqual((report.events, report.differences), (20000, 0))
+        self.assertGreater(report.seconds_a, 0)
+        self.assertGreater(report.seconds_b, 0)
+
+    def test_differences_are_reported_with_context(self):
+        """差分は全件数え、表示分は直前のイベント付き（チャンク境界をまたぐ）"""
+        events = [Event(0.0, 0, True, True)] + [Event(0.001 * i, 0, True, True) for i in range(1, 10)]
+        report = diff_replay(Engine.load(str(ROOT), 'a'), Engine.load(self.tmp, 'b'), iter(events), KEYBINDINGS,
+                             chunk=4, context=3, max_differences=5)
+        self.assertEqual(report.differences, 9)
+        self.assertEqual(len(report.shown), 5)
+        self.assertEqual(report.pairs, {('repeat_newline', 'newline'): 9})
+        difference = report.shown[4]
+        self.assertEqual(difference.index, 5)
+        self.assertEqual(difference.context, tuple(events[2:5]))
+        self.assertEqual(report.shown[0].context, (events[0],))
+
+    def test_modifier_mask_in_report(self):
+        """差分の行には押下中の修飾キーを残す"""
+        events = [Event(0.0, 1, True, True), Event(0.1, 0, True, True), Event(0.2, 0, True, True)]
+        report = diff_replay(Engine.load(str(ROOT)), Engine.load(self.tmp), events, KEYBINDINGS, chunk=2)
+        self.assertEqual([d.index for d in report.shown], [2])
+        self.assertEqual(report.shown[0].mask, utils.state_machine.KEY_MODIFIER_BITS[1])
+
+    def test_missing_version(self):
+        """状態機械のないバージョンや存在しないリビジョンはReplayError"""
+        with self.assertRaises(ReplayError):
+            Engine.load('no-such-revision')
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ReplayError):
+                Engine.load(tmp)
+
+
+class TestGuardReplay(unittest.TestCase):
+    """ガード全体（on_press/on_release）を並べて実行するテストケース"""
+
+    @classmethod
+    def setUpClass(cls):
+        # 改行の置き換えで元のEnterも通してしまう改変版（状態機械の外の変更）
+        cls.tmp = tempfile.mkdtemp()
+        shutil.copytree(ROOT / 'utils', Path(cls.tmp) / 'utils',
+                        ignore=shutil.ignore_patterns('__pycache__'))
+        source = (ROOT / 'discord_send_guard.py').read_text(encoding='utf-8')
+        changed = source.replace("return 'converted', False", "return 'converted', True", 1)
+        assert changed != source
+        (Path(cls.tmp) / 'discord_send_guard.py').write_text(changed, encoding='utf-8')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_outcomes(self):
+        """Enterの結果は、元のキーを通したかと注入した改行・送信"""
+        step = GuardEngine.load(str(ROOT)).stepper(KEYBINDINGS, is_mac=True)
+        self.assertEqual(step(0.0, 0, True, True), 'newline')
+        self.assertEqual(step(0.1, 0, False, True), 'none')
+        self.assertEqual(step(0.2, 4, True, True), 'none')
+        self.assertEqual(step(0.3, 0, True, True), 'pass')
+        self.assertEqual(step(0.4, 0, False, True), 'none')
+        self.assertEqual(step(0.5, 4, False, True), 'none')
+        self.assertEqual(step(0.6, 0, True, False), 'pass')
+        # 差し替えたKeyは読み込んだバージョンのモジュールだけ
+        import discord_send_guard
+        engine = GuardEngine.load(str(ROOT))
+        self.assertIsNot(engine.module, discord_send_guard)
+        self.assertIsNot(discord_send_guard.Key, engine.keys)
+
+    def test_same_version_has_no_differences(self):
+        """同じバージョン同士では差分なし"""
+        report = diff_replay(GuardEngine.load(str(ROOT)), GuardEngine.load(str(ROOT)),
+                             synthetic_events(5000), KEYBINDINGS, chunk=1000)
+        self.assertEqual((report.events, report.differences), (5000, 0))
+
+    def test_change_outside_state_machine_is_reported(self):
+        """状態機械の外（変換の段）の変更も差分になる"""
+        report = diff_replay(GuardEngine.load(str(ROOT), 'a'), GuardEngine.load(self.tmp, 'b'),
+                             synthetic_events(5000), KEYBINDINGS)
+        self.assertGreater(report.differences, 0)
+        self.assertEqual(set(report.pairs), {('newline', 'pass+newline')})
+
+    def test_revision_without_state_machine(self):
+        """状態機械より前のリビジョンもガードとして比較できる"""
+        revision = subprocess.run(
+            ['git', '-C', str(ROOT), 'log', '--format=%H', '-1', '--grep', r'^\[user-043\] Protect'],
+            capture_output=True, text=True).stdout.strip()
+        if not revision:
+            self.skipTest('revision not in this history')
+        with self.assertRaises(ReplayError):
+            Engine.load(revision)
+        report = diff_replay(GuardEngine.load(revision), GuardEngine.load(str(ROOT)),
+                             synthetic_events(2000), KEYBINDINGS)
+        self.assertEqual(report.events, 2000)
+
+    def test_engines_must_match(self):
+        """状態機械とガードは比較しない"""
+        with self.assertRaises(ReplayError):
+            diff_replay(Engine.load(str(ROOT)), GuardEngine.load(str(ROOT)), [], KEYBINDINGS)
+
+
+class TestSafeExtract(unittest.TestCase):
+    """tarfileのdataフィルターがないPythonでの展開のテストケース"""
+
+    def archive(self):
+        """安全なメンバーと、外へ出る・デバイスのメンバーを混ぜたtar"""
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode='w') as tar:
+            def add(name, kind=tarfile.REGTYPE, linkname='', data=b''):
+                info = tarfile.TarInfo(name)
+                info.type, info.linkname, info.size = kind, linkname, len(data)
+                tar.addfile(info, io.BytesIO(data) if data else None)
+            add('utils/state_machine.py', data=b'x = 1\n')
+            add('utils/link.py', tarfile.SYMTYPE, 'state_machine.py')
+            add('/tmp/absolute.py', data=b'x')
+            add('utils/../../escape.py', data=b'x')
+            add('utils/out.py', tarfile.SYMTYPE, '../../outside')
+            add('utils/etc.py', tarfile.SYMTYPE, '/etc/passwd')
+            add('utils/hard.py', tarfile.LNKTYPE, '../outside')
+            add('utils/tty', tarfile.CHRTYPE)
+        buffer.seek(0)
+        return tarfile.open(fileobj=buffer)
+
+    def test_unsafe_members_are_skipped(self):
+        """フィルターがなければ自前で検査し、安全なメンバーだけ展開する"""
+        with tempfile.TemporaryDirectory() as tmp, self.archive() as tar, \
+                patch.object(replay_diff, 'HAS_DATA_FILTER', False):
+            replay_diff._extract(tar, Path(tmp))
+            extracted = sorted(str(p.relative_to(tmp)) for p in Path(tmp).rglob('*'))
+            self.assertEqual(extracted, ['utils', 'utils/link.py', 'utils/state_machine.py'])
+            self.assertEqual((Path(tmp) / 'utils' / 'link.py').read_text(), 'x = 1\n')
+
+    def test_revision_without_data_filter(self):
+        """フィルターがなくてもgitリビジョンを読み込める"""
+        with patch.object(replay_diff, 'HAS_DATA_FILTER', False), \
+                replay_diff.source_tree('HEAD') as directory:
+            self.assertTrue((directory / 'utils' / 'state_machine.py').is_file())
+
+
+class TestStreams(unittest.TestCase):
+    """入力ストリームのテストケース"""
+
+    def test_jsonl_round_trip(self):
+        """JSON linesに保存したストリームはgzipでもそのまま読み戻せる"""
+        events = list(synthetic_events(500, seed=3))
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ('keys.jsonl', 'keys.jsonl.gz'):
+                path = Path(tmp) / name
+                self.assertEqual(write_jsonl(iter(events), path), 500)
+                self.assertEqual(list(jsonl_events(path)), events)
+            path = Path(tmp) / 'bad.jsonl'
+            path.write_text('{"t": 0, "key": "space", "down": true}\n', encoding='utf-8')
+            with self.assertRaises(ReplayError):
+                list(jsonl_events(path))
+
+    def test_recorder_foreground_from_decision(self):
+        """Enterの押下は直後の判定記録のフォアグラウンドで再生"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'flight.rec'
+            recorder = FlightRecorder(path, slots=64)
+            recorder.open()
+            recorder.key(0, True, 0)
+            recorder.decision('converted', 0)
+            recorder.key(0, False, 0)
+            recorder.key(0, True, 0)
+            recorder.decision('passthrough', 0)
+            recorder.key(0, False, 0)
+            recorder.close()
+            events = list(recorder_events(path))
+        self.assertEqual([(e.key, e.down, e.discord) for e in events],
+                         [(0, True, True), (0, False, True), (0, True, False), (0, False, False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+スレッド優先度のテスト
+"""
+
+import unittest
+import os
+import sys
+import threading
+from unittest.mock import Mock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import scheduling
+from utils.scheduling import raise_thread_priority, UNCHANGED
+
+
+def _in_thread(func):
+    """別スレッドで実行して結果を返す（テストプロセス本体の優先度を変えない）"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+@unittest.skipUnless(scheduling.IS_LINUX, "Linux only")
+class TestLinuxPriority(unittest.TestCase):
+    """Linuxでの優先度変更のテストケース"""
+
+    def test_returns_a_policy(self):
+        """何らかのポリシー名を返す（権限がなければunchanged）"""
+        policy = _in_thread(raise_thread_priority)
+        self.assertTrue(policy.startswith(('sched-rr', 'nice')) or policy == UNCHANGED)
+
+    def test_falls_back_to_nice(self):
+        """リアルタイムスケジューリングが拒否されたらniceを試す"""
+        with patch('os.sched_setscheduler', side_effect=PermissionError), \
+             patch('os.getpriority', return_value=0), \
+             patch('os.setpriority') as setpriority:
+            policy = raise_thread_priority()
+        self.assertEqual(policy, f'nice{scheduling.LINUX_NICE}')
+        setpriority.assert_called_once_with(os.PRIO_PROCESS, 0, scheduling.LINUX_NICE)
+
+    def test_unchanged_without_permission(self):
+        """権限がなければ何も変えずにunchangedを返す"""
+        with patch('os.sched_setscheduler', side_effect=PermissionError), \
+             patch('os.getpriority', return_value=0), \
+             patch('os.setpriority', side_effect=PermissionError):
+            self.assertEqual(raise_thread_priority(), UNCHANGED)
+
+
+class TestOtherPlatforms(unittest.TestCase):
+    """macOS/Windows経路のテストケース（ctypesをモック）"""
+
+    def test_mac_qos(self):
+        """macOSではQoS user-interactiveを設定する"""
+        libc = Mock()
+        libc.pthread_set_qos_class_self_np.return_value = 0
+        with patch.object(scheduling, 'IS_MAC', True), \
+             patch.object(scheduling, 'IS_LINUX', False), \
+             patch('ctypes.CDLL', return_value=libc):
+            self.assertEqual(raise_thread_priority(), 'qos-user-interactive')
+        libc.pthread_set_qos_class_self_np.assert_called_once_with(
+            scheduling.QOS_CLASS_USER_INTERACTIVE, 0)
+
+    def test_windows_thread_priority(self):
+        """WindowsではSetThreadPriorityを呼ぶ"""
+        windll = Mock()
+        windll.kernel32.SetThreadPriority.return_value = 1
+        with patch.object(scheduling, 'IS_WINDOWS', True), \
+             patch.object(scheduling, 'IS_LINUX', False), \
+             patch.object(scheduling, 'IS_MAC', False), \
+             patch('ctypes.windll', windll, create=True):
+            self.assertEqual(raise_thread_priority(), 'thread-priority-highest')
+
+    def test_errors_fall_back(self):
+        """例外が起きてもunchangedで続行する"""
+        with patch.object(scheduling, 'IS_MAC', True), \
+             patch('ctypes.CDLL', side_effect=OSError("no libc")):
+            self.assertEqual(raise_thread_priority(), UNCHANGED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+多重起動防止のテスト
+"""
+
+import unittest
+import os
+import sys
+import signal
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from utils.control import ControlServer, HAS_UNIX_SOCKETS
+from utils.single_instance import InstanceLock, acquire_or_hand_off, hand_off
+
+
+class TestInstanceLock(unittest.TestCase):
+    """InstanceLockのテストケース"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.lock_path = Path(self.tmpdir.name) / "instance.lock"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_second_lock_fails_while_held(self):
+        """保持中のロックは二重に取得できない"""
+        first = InstanceLock(self.lock_path)
+        second = InstanceLock(self.lock_path)
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        self.assertEqual(second.holder_pid(), os.getpid())
+        first.release()
+        self.assertTrue(second.acquire())
+        second.release()
+
+    def test_stale_pid_is_recovered(self):
+        """クラッシュしたプロセスのPIDが残っていても取得できる"""
+        self.lock_path.write_text("999999\n")
+        with InstanceLock(self.lock_path) as lock:
+            self.assertTrue(lock.acquire())
+            self.assertEqual(lock.holder_pid(), os.getpid())
+
+    @unittest.skipIf(sys.platform == 'win32', "uses SIGKILL")
+    def test_lock_released_when_holder_is_killed(self):
+        """ロック保持プロセスが強制終了されるとロックは解放される"""
+        code = (
+            "import sys, time; sys.path.insert(0, sys.argv[1])\n"
+            "from utils.single_instance import InstanceLock\n"
+            "lock = InstanceLock(sys.argv[2]); assert lock.acquire()\n"
+            "print('locked', flush=True); time.sleep(60)\n"
+        )
+        child = subprocess.Popen(
+            [sys.executable, '-c', code, ROOT, str(self.lock_path)],
+            stdout=subprocess.PIPE
+        )
+        try:
+            self.assertEqual(child.stdout.readline().strip(), b'locked')
+            lock = InstanceLock(self.lock_path)
+            self.assertFalse(lock.acquire())
+            os.kill(child.pid, signal.SIGKILL)
+            child.wait(timeout=5)
+            self.assertTrue(lock.acquire())
+            lock.release()
+        finally:
+            if child.poll() is None:
+                child.kill()
+            child.stdout.close()
+
+
+@unittest.skipUnless(HAS_UNIX_SOCKETS, "Unix domain sockets required")
+class TestHandOff(unittest.TestCase):
+    """起動中インスタンスへの引き継ぎのテストケース"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.lock_path = Path(self.tmpdir.name) / "instance.lock"
+        self.socket_path = Path(self.tmpdir.name) / "control.sock"
+        self.received = []
+        self.server = ControlServer(
+            {'show-settings': lambda args: self.received.append('show-settings')},
+            path=self.socket_path
+        )
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+    def test_second_launch_forwards_intent(self):
+        """2つ目の起動は意図を転送してNoneを返す"""
+        first = acquire_or_hand_off('show-settings', self.lock_path, self.socket_path)
+        self.assertIsNotNone(first)
+        self.assertEqual(self.received, [])
+
+        second = acquire_or_hand_off('show-settings', self.lock_path, self.socket_path)
+        self.assertIsNone(second)
+        self.assertEqual(self.received, ['show-settings'])
+        first.release()
+
+    def test_rejected_intent_is_not_retried(self):
+        """エラー応答（未対応のコマンド）は接続失敗と違い、再試行せずにすぐ諦める"""
+        started = time.monotonic()
+        self.assertFalse(hand_off('toggle', self.socket_path, timeout=5.0))
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_rejected_intent_falls_back(self):
+        """CLIのガードのように設定画面がなければ、代わりのコマンドを送る"""
+        self.server.stop()
+        received = []
+        self.server = ControlServer({'enable': lambda args: received.append('enable')}, path=self.socket_path)
+        self.server.start()
+        self.assertTrue(hand_off('show-settings', self.socket_path, timeout=5.0, fallback='enable'))
+        self.assertEqual(received, ['enable'])
+
+    def test_hand_off_times_out_without_server(self):
+        """応答しないインスタンスにはタイムアウトする"""
+        self.server.stop()
+        self.assertFalse(hand_off('toggle', self.socket_path, timeout=0.05))
+
+
+if __name__ == '__main__':
+    unittest.main()
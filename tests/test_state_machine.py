@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+純粋な状態機械とNumPyの一括評価のテスト
+"""
+
+import enum
+import itertools
+import random
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.config import compile_keybindings, DEFAULT_CONFIG, MODIFIER_STATES, MOD_SHIFT, MOD_CMD
+from utils.state_machine import (
+    GuardMachine, binding_codes, run_batch,
+    KEY_ENTER, KEY_SHIFT, KEY_CMD, KEY_OTHER,
+    ACT_NONE, ACT_DECIDE, ACT_PASSTHROUGH, ACT_PASS, ACT_SEND, ACT_NEWLINE,
+    ACT_REPEAT_NEWLINE, ACT_DROP, ACT_SHED,
+)
+from utils import state_machine
+
+DISCORD = 7
+
+
+def default_codes(spec=None, is_mac=True):
+    table = compile_keybindings(spec or DEFAULT_CONFIG['keybindings'], is_mac).table
+    return binding_codes(table[:MODIFIER_STATES])
+
+
+def random_stream(rng, count):
+    """修飾キー・Enter・その他のキーと前面アプリがランダムに混ざったイベント列"""
+    t = 0.0
+    events = []
+    for _ in range(count):
+        t += rng.choice((0.0, 0.001, 0.01, 0.03, 0.2))
+        key_id = rng.choice((KEY_ENTER, KEY_ENTER, KEY_ENTER, KEY_SHIFT, 2, 3, KEY_CMD, KEY_OTHER))
+        events.append((t, key_id, rng.random() < 0.6, rng.choice((DISCORD, DISCORD, 1, 2))))
+    return events
+
+
+def step_all(events, codes, **kwargs):
+    machine = GuardMachine(codes, **kwargs)
+    return [machine.step(t, key_id, down, app == DISCORD) for t, key_id, down, app in events]
+
+
+class TestGuardMachine(unittest.TestCase):
+    """GuardMachineのテストケース"""
+
+    def setUp(self):
+        self.machine = GuardMachine(default_codes())
+
+    def test_binding_codes(self):
+        """既定のキーバインド: Enter単体は改行、Cmd+Enterはそのまま送信"""
+        codes = default_codes()
+        self.assertEqual(codes[0], ACT_NEWLINE)
+        self.assertEqual(codes[MOD_CMD], ACT_PASS)
+        self.assertEqual(codes[MOD_SHIFT], ACT_NEWLINE)
+        self.assertEqual(default_codes({'shift+enter': 'send'})[MOD_SHIFT], ACT_SEND)
+
+    def test_chords(self):
+        """修飾キーの状態でEnterの動作が決まる"""
+        m = self.machine
+        self.assertEqual(m.step(0, KEY_ENTER, True, True), ACT_NEWLINE)
+        self.assertEqual(m.step(0, KEY_ENTER, False, True), ACT_NONE)
+        m.step(0, KEY_CMD, True, True)
+        self.assertEqual(m.step(0, KEY_ENTER, True, True), ACT_PASS)
+        m.step(0, KEY_ENTER, False, True)
+        self.assertEqual(m.step(0, KEY_ENTER, True, False), ACT_PASSTHROUGH)
+
+    def test_autorepeat_reuses_first_decision(self):
+        """離さずに続く押下は最初の押下の判定を再利用（前面アプリは見ない）"""
+        m = self.machine
+        self.assertEqual(m.step(0, KEY_ENTER, True, True), ACT_NEWLINE)
+        self.assertEqual(m.step(0.03, KEY_ENTER, True, False), ACT_REPEAT_NEWLINE)
+        m.step(0.05, KEY_ENTER, False, True)
+        self.assertEqual(m.step(0.1, KEY_ENTER, True, False), ACT_PASSTHROUGH)
+        self.assertEqual(m.step(0.13, KEY_ENTER, True, True), ACT_PASSTHROUGH)
+
+    def test_repeat_of_send_is_dropped(self):
+        """注入した送信のリピートは捨てる"""
+        m = GuardMachine(default_codes({'shift+enter': 'send'}))
+        m.step(0, KEY_SHIFT, True, True)
+        self.assertEqual(m.step(0, KEY_ENTER, True, True), ACT_SEND)
+        self.assertEqual(m.step(0.03, KEY_ENTER, True, True), ACT_DROP)
+
+    def test_rate_limit(self):
+        """上限を超えた押下は捨て、その連続押下のリピートも捨てる"""
+        m = GuardMachine(default_codes(), rate=10, burst=2)
+        actions = []
+        for i in range(4):
+            actions.append(m.step(i * 0.001, KEY_ENTER, True, True))
+            m.step(i * 0.001, KEY_ENTER, False, True)
+        self.assertEqual(actions, [ACT_NEWLINE, ACT_NEWLINE, ACT_SHED, ACT_SHED])
+        self.assertEqual(m.step(0.2, KEY_ENTER, True, True), ACT_NEWLINE)
+        m.step(0.2, KEY_ENTER, False, True)
+        m.step(0.2, KEY_ENTER, True, True)
+        self.assertEqual(m.step(0.2, KEY_ENTER, True, True), ACT_SHED)
+
+    def test_fresh_press_without_repeat_tracking(self):
+        """リピート追跡が無効なら毎回判定する"""
+        m = GuardMachine(default_codes(), track_repeats=False)
+        self.assertEqual(m.on_enter_down(0), ACT_DECIDE)
+        self.assertEqual(m.on_enter_down(0.03), ACT_DECIDE)
+
+    def test_invalid_codes(self):
+        """動作コードの数が合わなければValueError"""
+        with self.assertRaises(ValueError):
+            GuardMachine([ACT_NEWLINE])
+
+
+@unittest.skipIf(not state_machine.HAS_NUMPY, "numpy is not installed")
+class TestRunBatch(unittest.TestCase):
+    """run_batchのテストケース"""
+
+    def check(self, events, codes, **kwargs):
+        expected = step_all(events, codes, **kwargs)
+        columns = list(zip(*events)) if events else [[], [], [], []]
+        actual = run_batch(*columns, discord_app_ids=[DISCORD], codes=codes, **kwargs)
+        self.assertEqual(actual.tolist(), expected)
+
+    def test_randomized_streams_match_machine(self):
+        """ランダムなイベント列で逐次実行と一括評価の結果が一致する"""
+        rng = random.Random(44)
+        specs = (None, {'shift+enter': 'send', 'mod+enter': 'newline'}, {'enter': 'send'})
+        for seed, spec, is_mac, limit, track in itertools.product(
+                range(5), specs, (True, False), ((0, 0), (20, 5), (100, 1)), (True, False)):
+            codes = default_codes(spec, is_mac)
+            events = random_stream(rng, rng.randint(0, 400))
+            with self.subTest(seed=seed, spec=spec, is_mac=is_mac, limit=limit, track=track):
+                self.check(events, codes, rate=limit[0], burst=limit[1], track_repeats=track)
+
+    def test_empty_stream(self):
+        """空のイベント列"""
+        self.check([], default_codes())
+
+
+class FakeKey(enum.Enum):
+    """区別できるキー（dummyバックエンドのKeyはすべて等しくなる）"""
+    enter = 'enter'
+    shift = 'shift'
+    ctrl = 'ctrl'
+    alt = 'alt'
+    cmd = 'cmd'
+    char = 'char'
+
+
+# イベント列のキーID → ライブのフックに届くキー
+LIVE_KEYS = {KEY_ENTER: FakeKey.enter, KEY_SHIFT: FakeKey.shift, 2: FakeKey.ctrl, 3: FakeKey.alt,
+             KEY_CMD: FakeKey.cmd, KEY_OTHER: FakeKey.char}
+
+
+@unittest.skipIf(not state_machine.HAS_NUMPY, "numpy is not installed")
+class TestLivePathMatchesBatch(unittest.TestCase):
+    """ライブのフック（on_press/on_release）と一括評価の結果が一致するかのテストケース"""
+
+    def setUp(self):
+        import discord_send_guard as dsg
+        patcher = patch.multiple(dsg, Key=FakeKey, MODIFIER_KEYS={
+            dsg.MOD_SHIFT: (FakeKey.shift,), dsg.MOD_CTRL: (FakeKey.ctrl,),
+            dsg.MOD_ALT: (FakeKey.alt,), dsg.MOD_CMD: (FakeKey.cmd,),
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.dsg = dsg
+
+    def run_live(self, events, config, is_mac):
+        """イベントをガードのフックに流し、Enterの押下ごとに外から見えた動作を返す"""
+        with patch.object(self.dsg, 'IS_MAC', is_mac):
+            guard = self.dsg.DiscordSendGuard()
+            guard.keyboard_controller = MagicMock()
+            guard.apply_config(config)
+            guard.coalescer = MagicMock()
+            now, app = [0.0], [None]
+            guard.scheduler.clock = lambda: now[0]
+            actions = []
+            run_start = ACT_NONE
+            with patch.object(self.dsg.DiscordSendGuard, 'is_discord_active',
+                              side_effect=lambda: app[0] == DISCORD):
+                for t, key_id, down, frontmost in events:
+                    now[0], app[0] = t, frontmost
+                    key = LIVE_KEYS[key_id]
+                    if not down:
+                        guard.on_release(key)
+                        actions.append(ACT_NONE)
+                        continue
+                    before = dict(guard.stats.counters)
+                    guard.coalescer.reset_mock()
+                    passes = guard.on_press(key)
+                    if key is not FakeKey.enter:
+                        actions.append(ACT_NONE)
+                        continue
+                    changed = {name for name, value in guard.stats.counters.items()
+                               if value != before.get(name, 0)}
+                    if 'enter_shed' in changed:
+                        action = ACT_SHED
+                    elif 'enter_repeats' in changed:
+                        if guard.coalescer.queue_newline.called:
+                            action = ACT_REPEAT_NEWLINE
+                        elif not passes:
+                            action = ACT_DROP
+                        else:
+                            # 通したリピートは連続押下の最初の判定（DiscordのPASSか、外のPASSTHROUGH）
+                            action = run_start
+                    elif 'enter_converted' in changed:
+                        action = ACT_NEWLINE
+                    elif 'enter_passthrough' in changed:
+                        action = ACT_PASSTHROUGH
+                    else:
+                        self.assertIn('enter_send', changed)
+                        action = ACT_PASS if passes else ACT_SEND
+                    if not changed & {'enter_shed', 'enter_repeats'}:
+                        run_start = action
+                    actions.append(action)
+        return actions
+
+    def test_randomized_streams_match_live_path(self):
+        """ランダムなイベント列でライブのフックと一括評価の結果が一致する"""
+        rng = random.Random(44)
+        specs = (None, {'shift+enter': 'send', 'mod+enter': 'newline'}, {'enter': 'send'})
+        limits = ((True, 0, 0), (True, 20, 5), (True, 100, 1), (False, 0, 0))
+        for seed, spec, is_mac, (storm, rate, burst) in itertools.product(
+                range(3), specs, (True, False), limits):
+            events = random_stream(rng, rng.randint(0, 300))
+            config = {'ime_awareness': False, 'storm_protection': storm,
+                      'enter_rate_limit': rate, 'enter_burst': burst}
+            if spec:
+                config['keybindings'] = spec
+            with self.subTest(seed=seed, spec=spec, is_mac=is_mac, storm=storm, rate=rate):
+                actual = self.run_live(events, config, is_mac)
+                columns = list(zip(*events)) if events else [[], [], [], []]
+                expected = run_batch(*columns, discord_app_ids=[DISCORD], codes=default_codes(spec, is_mac),
+                                     rate=rate, burst=burst, track_repeats=storm)
+                self.assertEqual(actual, expected.tolist())
+
+
+class TestGuardMatchesMachine(unittest.TestCase):
+    """ライブのパイプラインと状態機械の判定が一致するかのテストケース"""
+
+    def setUp(self):
+        from discord_send_guard import DiscordSendGuard
+        self.guard = DiscordSendGuard()
+        self.guard.keyboard_controller = MagicMock()
+
+    def test_all_masks(self):
+        """全ての修飾キーの組み合わせ×前面アプリで同じ判定"""
+        outcome_actions = {'converted': ACT_NEWLINE, 'passthrough': ACT_PASSTHROUGH}
+        for spec in (None, {'shift+enter': 'send', 'ctrl+enter': 'newline'}):
+            config = {'ime_awareness': False}
+            if spec:
+                config['keybindings'] = spec
+            self.guard.apply_config(config)
+            for mask, discord in itertools.product(range(MODIFIER_STATES), (True, False)):
+                with self.subTest(spec=spec, mask=mask, discord=discord), \
+                        patch('discord_send_guard.DiscordSendGuard.is_discord_active', return_value=discord):
+                    self.guard.machine.mask = mask
+                    passes = self.guard.enter_pipeline(mask)
+                    self.guard.machine.enter_down = False
+                    expected = self.guard.machine.decide(discord)
+                    outcome = self.guard.stats.trace_buffer[-1]['action']
+                    if outcome == 'send':
+                        actual = ACT_PASS if passes else ACT_SEND
+                    else:
+                        actual = outcome_actions[outcome]
+                    self.assertEqual(actual, expected)
+                    # 観測段が記録したリピート用の判定も一致する
+                    self.assertEqual(self.guard.machine.run_action, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
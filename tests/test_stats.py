@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+統計（GuardStats）のテスト
+"""
+
+import unittest
+import os
+import sys
+import threading
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.stats import GuardStats
+
+THREADS = 8
+ITERATIONS = 20000
+
+
+class TestGuardStats(unittest.TestCase):
+    """GuardStatsのテストケース"""
+
+    def setUp(self):
+        interval = sys.getswitchinterval()
+        # スレッドの切り替えを頻繁にして、読み書きの競合を起こしやすくする
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        self.stats = GuardStats()
+
+    def run_threads(self, target):
+        threads = [threading.Thread(target=target, args=(index,)) for index in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_concurrent_increments_are_not_lost(self):
+        """複数スレッドからのincr/observeで回数を取りこぼさない"""
+        def work(index):
+            for _ in range(ITERATIONS):
+                self.stats.incr('enter_send')
+                self.stats.observe('on_press', 1e-6)
+
+        self.run_threads(work)
+        self.assertEqual(self.stats.counters['enter_send'], THREADS * ITERATIONS)
+        self.assertEqual(self.stats.timings['on_press'][0], THREADS * ITERATIONS)
+
+    def test_snapshot_during_writes(self):
+        """書き込み中のsnapshot()が例外にならない"""
+        errors = []
+
+        def work(index):
+            for number in range(ITERATIONS // 10):
+                if index == 0:
+                    try:
+                        self.stats.snapshot()
+                    except RuntimeError as e:
+                        errors.append(e)
+                else:
+                    self.stats.incr(f'counter_{index}_{number}')
+                    self.stats.set_info(f'info_{index}_{number}', number)
+
+        self.run_threads(work)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.stats.snapshot()['counters']), (THREADS - 1) * (ITERATIONS // 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+オートリピート・連打対策のテスト
+"""
+
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.storm import NewlineCoalescer
+from utils.timer_wheel import TimerWheel, VirtualClock
+from utils.stats import GuardStats
+
+
+class TestNewlineCoalescer(unittest.TestCase):
+    """NewlineCoalescerのテストケース"""
+
+    def setUp(self):
+        self.clock = VirtualClock()
+        self.stats = GuardStats()
+        self.wheel = TimerWheel(tick=0.005, clock=self.clock)
+        self.injected = []
+        self.coalescer = NewlineCoalescer(self.wheel, self.injected.append, stats=self.stats)
+
+    def test_repeats_are_coalesced(self):
+        """リピートの改行はまとめて1回の注入になる"""
+        for _ in range(5):
+            self.coalescer.queue_newline()
+        self.assertEqual(self.injected, [])
+        self.clock.advance(0.04)
+        self.wheel.advance()
+        self.assertEqual(self.injected, [5])
+        self.assertEqual(self.stats.counters['enter_coalesced'], 4)
+        self.assertEqual(self.stats.counters['newline_batches'], 1)
+
+    def test_flush_without_queue(self):
+        """キューが空なら何も注入しない"""
+        self.assertFalse(self.coalescer.flush())
+        self.assertEqual(self.injected, [])
+
+    def test_flush_now_cancels_timer(self):
+        """すぐにflushすると注入してタイマーは取り消す（後で二重に注入しない）"""
+        self.coalescer.queue_newline()
+        self.coalescer.queue_newline()
+        self.assertTrue(self.coalescer.flush())
+        self.clock.advance(0.04)
+        self.wheel.advance()
+        self.assertEqual(self.injected, [2])
+
+
+class TestGuardStorm(unittest.TestCase):
+    """DiscordSendGuardの連打対策のテストケース"""
+
+    def setUp(self):
+        from discord_send_guard import DiscordSendGuard
+        self.guard = DiscordSendGuard()
+        self.guard.keyboard_controller = MagicMock()
+        self.guard.apply_config({'ime_awareness': False})
+
+    def press(self, t):
+        """ガードのon_pressと同じ順序でEnterの押下を処理"""
+        from utils.state_machine import ACT_DECIDE
+        action = self.guard.machine.on_enter_down(t)
+        if action == ACT_DECIDE:
+            return self.guard.enter_pipeline(self.guard.modifier_mask)
+        return self.guard._apply_repeat(action)
+
+    def test_config(self):
+        """設定で無効化・上限の変更ができる"""
+        self.guard.apply_config({'enter_rate_limit': 5, 'enter_burst': 2})
+        self.assertEqual(self.guard.machine.rate, 5)
+        self.assertEqual(self.guard.machine.burst, 2)
+        self.assertIn('repeat_state', self.guard.enter_pipeline.stages)
+        self.guard.apply_config({'storm_protection': False})
+        self.assertEqual(self.guard.machine.rate, 0)
+        self.assertFalse(self.guard.machine.track_repeats)
+        self.assertNotIn('repeat_state', self.guard.enter_pipeline.stages)
+
+    @patch('discord_send_guard.DiscordSendGuard.is_discord_active', return_value=True)
+    def test_held_enter_queries_once(self, mock_discord_active):
+        """押しっぱなしのEnterは最初の1回だけ判定し、リピートは改行をまとめて注入"""
+        self.assertFalse(self.press(0.0))
+        for i in range(1, 6):
+            self.assertFalse(self.press(i * 0.01))
+        self.assertEqual(mock_discord_active.call_count, 1)
+        self.assertEqual(self.guard.stats.counters['enter_repeats'], 5)
+        self.guard.coalescer.flush()
+        self.assertEqual(self.guard.stats.counters['enter_converted'], 6)
+
+    @patch('discord_send_guard.DiscordSendGuard.is_discord_active', return_value=False)
+    def test_repeat_reuses_passthrough(self, mock_discord_active):
+        """最初の押下がDiscord外なら、リピートもそのまま通す"""
+        self.assertTrue(self.press(0.0))
+        self.assertTrue(self.press(0.01))
+        self.assertEqual(mock_discord_active.call_count, 1)
+
+    @patch('discord_send_guard.DiscordSendGuard.is_discord_active', return_value=True)
+    def test_storm_is_shed(self, mock_discord_active):
+        """100HzのEnterは上限を超えた分を捨てる（送信も改行もしない）"""
+        results = []
+        for i in range(200):
+            results.append(self.press(i * 0.01))
+            self.guard.machine.on_enter_up()
+        shed = self.guard.stats.counters['enter_shed']
+        self.assertLessEqual(200 - shed, 20 + 40 * 2 + 1)
+        self.assertGreater(shed, 0)
+        self.assertNotIn(True, results)
+
+    def test_repeats_and_shed_are_dropped_by_hook(self):
+        """リピートの改行と上限超過のEnterは、フックで元のEnterを破棄してリスナーは動き続ける"""
+        import discord_send_guard as dsg
+        with patch.object(dsg, 'Key', MagicMock(name='Key')), \
+                patch.object(dsg.DiscordSendGuard, 'is_discord_active', return_value=True):
+            key = dsg.Key.enter
+            self.guard.apply_config({'ime_awareness': False, 'enter_rate_limit': 1, 'enter_burst': 3})
+            events = []
+            for i in range(6):
+                self.assertTrue(self.guard._hook_press(key))
+                events.append(self.guard._darwin_intercept(10, f'enter-{i}'))
+            self.assertEqual(events, [None] * 6)
+            self.assertEqual(self.guard.stats.counters['enter_repeats'], 2)
+            self.assertEqual(self.guard.stats.counters['enter_shed'], 3)
+            self.guard.coalescer.flush()
+        # 最初の押下とリピート2回だけが改行になる（上限超過の分は何も注入しない）
+        self.assertEqual(self.guard.stats.counters['enter_converted'], 3)
+
+    def test_typed_key_does_not_overtake_repeat_newlines(self):
+        """まとめ待ちの改行がある間に打った文字は、改行を注入した後に送り直す"""
+        import discord_send_guard as dsg
+        order = []
+        self.guard._inject_newlines = lambda count: order.append(f'newlines {count}')
+        self.guard.coalescer.inject_newlines = self.guard._inject_newlines
+        with patch.object(dsg, 'Key', MagicMock(name='Key')), \
+                patch.object(dsg.DiscordSendGuard, 'is_discord_active', return_value=True):
+            enter, char = dsg.Key.enter, MagicMock(name='a')
+            self.guard.apply_config({'ime_awareness': False})
+            for _ in range(3):
+                self.guard._hook_press(enter)
+                self.guard._take_disposition()
+            self.guard._hook_release(enter)
+            self.guard._hook_press(char)
+            order.append('a')
+            self.assertEqual(self.guard._take_disposition(), dsg.EVENT_REPLAY)
+            # 何も待っていなければそのまま通す
+            self.guard._hook_press(char)
+            self.assertEqual(self.guard._take_disposition(), dsg.EVENT_PASS)
+        self.assertEqual(order, ['newlines 2', 'a'])
+
+    def test_batch_injection_holds_shift_once(self):
+        """まとめた改行はShiftを1回だけ押して注入"""
+        from discord_send_guard import Key
+        self.guard._inject_newlines(3)
+        self.guard.keyboard_controller.pressed.assert_called_once_with(Key.shift)
+        self.assertEqual(self.guard.keyboard_controller.press.call_count, 3)
+        self.assertEqual(self.guard.stats.counters['enter_converted'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+キー単位の抑制（macOSのイベントタップ・Windowsの低レベルフック）のテスト
+
+on_pressがFalseを返したイベントはリスナーを止めずに破棄され、保留中のEnterを
+確定させたキーは、確定で注入したEnterより後に届くよう送り直される。
+"""
+
+import enum
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import discord_send_guard as dsg
+from discord_send_guard import DiscordSendGuard
+
+
+class FakeKey(enum.Enum):
+    """区別できるキー（dummyバックエンドのKeyはすべて等しくなる）"""
+    enter = 'enter'
+    shift = 'shift'
+    ctrl = 'ctrl'
+    alt = 'alt'
+    cmd = 'cmd'
+    backspace = 'backspace'
+    esc = 'esc'
+    char = 'char'
+
+
+# Windowsの仮想キー
+VK = {0x0D: FakeKey.enter, 0xA2: FakeKey.ctrl, 0xA0: FakeKey.shift, 0x41: FakeKey.char}
+VK_RETURN, VK_LCONTROL, VK_A = 0x0D, 0xA2, 0x41
+WM_KEYUP = 0x0101
+
+
+class Suppressed(Exception):
+    """SystemHook.SuppressExceptionの代わり"""
+
+
+class FakeWin32Listener:
+    """フィルタから使うpynputのwin32リスナーの部分"""
+
+    def __init__(self):
+        self.stopped = False
+
+    def _event_to_key(self, msg, vk):
+        return VK[vk]
+
+    def suppress_event(self):
+        raise Suppressed()
+
+    def stop(self):
+        self.stopped = True
+
+
+class SuppressionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.multiple(dsg, Key=FakeKey, MODIFIER_KEYS={
+            dsg.MOD_SHIFT: (FakeKey.shift,), dsg.MOD_CTRL: (FakeKey.ctrl,),
+            dsg.MOD_ALT: (FakeKey.alt,), dsg.MOD_CMD: (FakeKey.cmd,),
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.guard = DiscordSendGuard()
+        self.guard.apply_config({'ime_awareness': False, 'foreground_strategy': 'direct'})
+        # 注入と再投稿の順序を1本の記録で見る
+        self.calls = []
+        controller = MagicMock()
+        controller.press.side_effect = lambda key: self.calls.append(('press', key))
+        self.guard.keyboard_controller = controller
+        self.guard._query_discord_active = lambda: True
+
+
+class TestDarwinIntercept(SuppressionTestCase):
+    """macOSのイベントタップ（on_pressの直後に呼ばれる）のテストケース"""
+
+    def test_converted_enter_is_dropped(self):
+        """改行に変換したEnterはタップで破棄し、リスナーは止めない"""
+        self.assertTrue(self.guard._hook_press(FakeKey.enter))
+        self.assertIsNone(self.guard._darwin_intercept(10, 'enter-event'))
+        self.assertIn(('press', FakeKey.enter), self.calls)
+        self.assertEqual(self.guard.stats.counters['enter_converted'], 1)
+
+    def test_other_events_pass(self):
+        """通す判定のEnter・他のキー・解放はそのまま返す"""
+        self.guard.on_press(FakeKey.ctrl)  # 主修飾キー（macOS以外）
+        self.assertTrue(self.guard._hook_press(FakeKey.enter))
+        self.assertEqual(self.guard._darwin_intercept(10, 'ctrl-enter'), 'ctrl-enter')
+        self.guard._hook_press(FakeKey.char)
+        self.assertEqual(self.guard._darwin_intercept(10, 'a'), 'a')
+        self.guard._hook_press(FakeKey.enter)
+        self.guard._hook_release(FakeKey.enter)
+        self.assertEqual(self.guard._darwin_intercept(11, 'enter-up'), 'enter-up')
+
+    def test_disposition_is_consumed(self):
+        """コールバックが呼ばれないイベントに前の判定を持ち越さない"""
+        self.guard._hook_press(FakeKey.enter)
+        self.assertIsNone(self.guard._darwin_intercept(10, 'enter'))
+        self.assertEqual(self.guard._darwin_intercept(14, 'system'), 'system')
+
+    def test_flushing_key_is_reposted_after_held_enter(self):
+        """保留中のEnterを確定させたキーは、確定の注入の後に投稿し直す"""
+        self.guard.apply_config({'ime_awareness': False, 'foreground_strategy': 'direct',
+                                 'enter_lookahead_ms': 30})
+        quartz = MagicMock()
+        quartz.CGEventPost.side_effect = lambda tap, event: self.calls.append(('post', event))
+        self.guard._hook_press(FakeKey.enter)
+        self.assertIsNone(self.guard._darwin_intercept(10, 'enter'))
+        self.assertEqual(self.calls, [])
+        self.guard._hook_press(FakeKey.char)
+        with patch.dict(sys.modules, {'Quartz': quartz}):
+            self.assertIsNone(self.guard._darwin_intercept(10, 'a'))
+        self.assertEqual(self.calls, [('press', FakeKey.enter), ('post', 'a')])
+        # 投稿し直すイベントは自プロセスの合成イベント（判定に使われない）
+        quartz.CGEventSetIntegerValueField.assert_called_once_with(
+            'a', quartz.kCGEventSourceUnixProcessID, os.getpid())
+        self.assertEqual(self.guard.stats.counters['lookahead_flushed'], 1)
+
+
+class TestWin32EventFilter(SuppressionTestCase):
+    """Windowsの低レベルフックのフィルタ（同期的に判定）のテストケース"""
+
+    def setUp(self):
+        super().setUp()
+        self.guard.listener = FakeWin32Listener()
+
+    def event(self, vk, msg=dsg.WM_KEYDOWN, flags=0):
+        return msg, SimpleNamespace(vkCode=vk, flags=flags)
+
+    def test_converted_enter_is_suppressed(self):
+        """変換したEnterはsuppress_event()で破棄"""
+        with self.assertRaises(Suppressed):
+            self.guard._win32_event_filter(*self.event(VK_RETURN))
+        self.assertIn(('press', FakeKey.enter), self.calls)
+
+    def test_modifier_state_is_synchronous(self):
+        """修飾キーもフィルタ内で処理するので、直後のCtrl+Enterは通る"""
+        self.assertFalse(self.guard._win32_event_filter(*self.event(VK_LCONTROL)))
+        self.assertFalse(self.guard._win32_event_filter(*self.event(VK_RETURN)))
+        self.assertEqual(self.guard.stats.counters['enter_send'], 1)
+        self.assertFalse(self.guard._win32_event_filter(*self.event(VK_LCONTROL, WM_KEYUP)))
+        self.assertEqual(self.guard.modifier_mask, 0)
+
+    def test_injected_events_are_ignored(self):
+        """注入したイベントは判定せず、そのまま届ける"""
+        self.assertFalse(self.guard._win32_event_filter(*self.event(VK_RETURN, flags=dsg.LLKHF_INJECTED)))
+        self.assertEqual(self.calls, [])
+        self.assertNotIn('on_press', self.guard.stats.timings)
+
+    def test_flushing_key_is_reinjected_after_held_enter(self):
+        """保留中のEnterを確定させたキーは破棄し、確定の注入の後に注入し直す"""
+        self.guard.apply_config({'ime_awareness': False, 'foreground_strategy': 'direct',
+                                 'enter_lookahead_ms': 30})
+        with self.assertRaises(Suppressed):
+            self.guard._win32_event_filter(*self.event(VK_RETURN))
+        self.assertEqual(self.calls, [])
+        with self.assertRaises(Suppressed):
+            self.guard._win32_event_filter(*self.event(VK_A))
+        self.assertEqual(self.calls, [('press', FakeKey.enter), ('press', dsg.KeyCode.from_vk(VK_A))])
+
+    def test_ctrl_c_stops_listener(self):
+        """Ctrl+Cの解放でリスナーを止める（on_releaseのFalse）"""
+        with patch.object(dsg.KeyCode, 'from_char', return_value=FakeKey.char):
+            self.guard._win32_event_filter(*self.event(VK_LCONTROL))
+            self.guard._win32_event_filter(*self.event(VK_A))
+            self.guard._win32_event_filter(*self.event(VK_A, WM_KEYUP))
+        self.assertTrue(self.guard.listener.stopped)
+
+
+class TestListenerCreation(unittest.TestCase):
+    """リスナーの作成とバックエンドの選択のテストケース"""
+
+    def test_listener_uses_per_event_suppression(self):
+        """全体の抑制はせず、イベントタップとフィルタを渡す"""
+        guard = DiscordSendGuard()
+        guard.raise_priority = False
+        with patch.object(dsg.keyboard, 'Listener') as listener_class:
+            guard._create_listener()
+        kwargs = listener_class.call_args.kwargs
+        self.assertFalse(kwargs['suppress'])
+        self.assertEqual(kwargs['on_press'], guard._hook_press)
+        self.assertEqual(kwargs['darwin_intercept'], guard._darwin_intercept)
+        self.assertEqual(kwargs['win32_event_filter'], guard._win32_event_filter)
+
+    def test_pynput_backend_needs_suppression(self):
+        """キー単位で止められないプラットフォームではpynputのガードを作らない"""
+        with patch.multiple(dsg, IS_MAC=False, IS_WINDOWS=False):
+            with self.assertRaises(RuntimeError):
+                dsg.create_guard('pynput')
+        with patch.object(dsg, 'IS_WINDOWS', True):
+            self.assertIsInstance(dsg.create_guard('pynput'), DiscordSendGuard)
+
+
+if __name__ == '__main__':
+    unittest.main()
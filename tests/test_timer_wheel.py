@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+タイミングホイール（遅延動作用タイマー）のテスト
+"""
+
+import random
+import threading
+import unittest
+import os
+import sys
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.timer_wheel import TimerWheel, VirtualClock
+from utils.stats import GuardStats
+
+
+class TestTimerWheel(unittest.TestCase):
+    """TimerWheel（仮想時計）のテストケース"""
+
+    def setUp(self):
+        self.clock = VirtualClock(100.0)
+        self.stats = GuardStats()
+        self.wheel = TimerWheel(tick=0.01, slots=8, clock=self.clock, stats=self.stats)
+        self.fired = []
+
+    def step(self, seconds):
+        self.clock.advance(seconds)
+        return self.wheel.advance()
+
+    def test_fires_at_deadline_not_before(self):
+        """期限の前には発火せず、期限後の最初のtickで発火"""
+        self.wheel.schedule(0.035, self.fired.append, 'a')
+        self.step(0.03)
+        self.assertEqual(self.fired, [])
+        self.step(0.01)
+        self.assertEqual(self.fired, ['a'])
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_cancel(self):
+        """キャンセルしたタイマーは発火しない。二重キャンセルはFalse"""
+        timer = self.wheel.schedule(0.02, self.fired.append, 'a')
+        self.assertTrue(timer.pending)
+        self.assertTrue(self.wheel.cancel(timer))
+        self.assertFalse(self.wheel.cancel(timer))
+        self.step(1.0)
+        self.assertEqual(self.fired, [])
+        self.assertEqual(self.stats.counters['timers_cancelled'], 1)
+
+    def test_beyond_one_rotation(self):
+        """1周（8tick）より先のタイマーは自分の周回まで待つ"""
+        self.wheel.schedule(0.25, self.fired.append, 'far')
+        self.wheel.schedule(0.05, self.fired.append, 'near')
+        for _ in range(24):
+            self.step(0.01)
+        self.assertEqual(self.fired, ['near'])
+        self.step(0.01)
+        self.assertEqual(self.fired, ['near', 'far'])
+
+    def test_catch_up_fires_in_deadline_order(self):
+        """長く止まった後は期限順にまとめて発火"""
+        for delay in (0.5, 0.02, 0.13, 0.07):
+            self.wheel.schedule(delay, self.fired.append, delay)
+        self.assertEqual(self.step(2.0), 4)
+        self.assertEqual(self.fired, [0.02, 0.07, 0.13, 0.5])
+
+    def test_zero_delay_fires_on_next_tick(self):
+        """遅延0は次のtickで発火"""
+        self.wheel.schedule(0, self.fired.append, 'now')
+        self.assertEqual(self.wheel.advance(), 0)
+        self.step(0.01)
+        self.assertEqual(self.fired, ['now'])
+
+    def test_randomized_against_reference(self):
+        """ランダムな登録・キャンセルで、期限を過ぎたものだけがちょうど1回発火"""
+        rng = random.Random(1)
+        timers = {}
+        for i in range(2000):
+            timers[i] = self.wheel.schedule(rng.uniform(0, 0.5), self.fired.append, i)
+        cancelled = set(rng.sample(range(2000), 500))
+        for i in cancelled:
+            self.wheel.cancel(timers[i])
+        deadlines = {i: timers[i].deadline for i in timers}
+        while len(self.wheel):
+            self.step(rng.choice((0.003, 0.01, 0.04)))
+            now = self.clock()
+            self.assertTrue(all(deadlines[i] <= now for i in self.fired))
+        self.assertEqual(sorted(self.fired), sorted(set(range(2000)) - cancelled))
+
+    def test_callback_errors_are_contained(self):
+        """コールバックの例外は記録して他のタイマーは続行"""
+        def fail():
+            raise RuntimeError('boom')
+        self.wheel.schedule(0.01, fail)
+        self.wheel.schedule(0.01, self.fired.append, 'ok')
+        self.step(0.02)
+        self.assertEqual(self.fired, ['ok'])
+        self.assertEqual(self.stats.counters['timer_errors'], 1)
+        self.assertEqual(self.stats.counters['timers_fired'], 2)
+
+
+class TestTimerWheelThread(unittest.TestCase):
+    """実時計のスレッドのテストケース"""
+
+    def test_thread_fires_and_stops(self):
+        """スレッドが期限後に発火し、停止できる"""
+        wheel = TimerWheel(tick=0.002)
+        done = threading.Event()
+        wheel.start()
+        try:
+            wheel.schedule(0.02, done.set)
+            self.assertTrue(done.wait(1.0))
+        finally:
+            wheel.stop()
+        self.assertIsNone(wheel._thread)
+
+    def test_earlier_timer_wakes_sleeping_thread(self):
+        """遠いタイマーで眠っていても、近いタイマーの登録で起きる"""
+        wheel = TimerWheel(tick=0.002, slots=1024)
+        done = threading.Event()
+        wheel.start()
+        try:
+            wheel.schedule(1.5, lambda: None)
+            wheel.schedule(0.01, done.set)
+            self.assertTrue(done.wait(0.5))
+        finally:
+            wheel.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
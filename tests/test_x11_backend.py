@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+X11バックエンドのテスト
+"""
+
+import unittest
+import os
+import sys
+import time
+import shutil
+import threading
+import subprocess
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backends import x11_backend
+from backends.x11_backend import ActiveWindowTracker, X11Guard, HAS_XLIB
+
+DISCORD_WINDOW = 0x400001
+EDITOR_WINDOW = 0x500001
+BROWSER_WINDOW = 0x600001
+
+
+class TestActiveWindowTracker(unittest.TestCase):
+    """ActiveWindowTrackerのテストケース"""
+
+    def setUp(self):
+        self.windows = {
+            DISCORD_WINDOW: (('discord', 'discord'), 1234),
+            EDITOR_WINDOW: (('gedit', 'Gedit'), 5678),
+            BROWSER_WINDOW: (('Navigator', 'firefox'), 9012),
+        }
+        self.titles = {
+            DISCORD_WINDOW: '#general | Server - Discord',
+            EDITOR_WINDOW: 'discord-notes.md - gedit',
+            BROWSER_WINDOW: 'Discord | #general | Server — Mozilla Firefox',
+        }
+        self.resolved = []
+
+        def resolve(window_id):
+            self.resolved.append(window_id)
+            return self.windows.get(window_id, ((), None))
+
+        self.tracker = ActiveWindowTracker(resolve, lookup_process=lambda pid: '',
+                                           title=lambda window_id: self.titles.get(window_id, ''))
+
+    def test_discord_window_matches(self):
+        """WM_CLASSがDiscordならアクティブと判定"""
+        self.assertTrue(self.tracker.on_active_window(DISCORD_WINDOW))
+        self.assertTrue(self.tracker.is_active)
+
+    def test_resolves_once_per_focus_change(self):
+        """同じウィンドウへの通知では再解決しない"""
+        self.tracker.on_active_window(DISCORD_WINDOW)
+        self.tracker.on_active_window(DISCORD_WINDOW)
+        self.tracker.on_active_window(EDITOR_WINDOW)
+        self.assertEqual(self.resolved, [DISCORD_WINDOW, EDITOR_WINDOW])
+        self.assertFalse(self.tracker.is_active)
+        self.assertEqual(self.tracker.stats.counters['focus_changes'], 2)
+
+    def test_pid_fallback(self):
+        """WM_CLASSがなくてもプロセス名で判定"""
+        self.windows[DISCORD_WINDOW] = ((), 1234)
+        self.tracker.lookup_process = lambda pid: 'discord' if pid == 1234 else ''
+        self.tracker.on_active_window(DISCORD_WINDOW)
+        self.assertTrue(self.tracker.is_active)
+
+    def test_title_mentioning_discord_does_not_match(self):
+        """タイトルや名前に"discord"を含むだけの他アプリは対象外"""
+        self.tracker.on_active_window(EDITOR_WINDOW)
+        self.assertFalse(self.tracker.is_active)
+        self.windows[EDITOR_WINDOW] = (('discord-notes', 'Discord-notes'), 5678)
+        self.tracker.on_active_window(0)
+        self.tracker.on_active_window(EDITOR_WINDOW)
+        self.assertFalse(self.tracker.is_active)
+
+    def test_browser_tab_follows_title(self):
+        """ブラウザはDiscordのタブの間だけアクティブ"""
+        self.tracker.on_active_window(BROWSER_WINDOW)
+        self.assertTrue(self.tracker.is_active)
+        self.titles[BROWSER_WINDOW] = 'Discord - Google Search — Mozilla Firefox'
+        self.assertTrue(self.tracker.on_title_change(BROWSER_WINDOW))
+        self.assertFalse(self.tracker.is_active)
+        self.assertEqual(self.resolved, [BROWSER_WINDOW, BROWSER_WINDOW])
+
+    def test_title_change_of_other_window_is_ignored(self):
+        """前面でないウィンドウのタイトル変更は無視"""
+        self.tracker.on_active_window(DISCORD_WINDOW)
+        self.assertFalse(self.tracker.on_title_change(EDITOR_WINDOW))
+        self.assertTrue(self.tracker.is_active)
+
+    def test_no_active_window(self):
+        """フォーカスなしは非アクティブ"""
+        self.tracker.on_active_window(DISCORD_WINDOW)
+        self.assertTrue(self.tracker.on_active_window(0))
+        self.assertFalse(self.tracker.is_active)
+
+    def test_vanished_window(self):
+        """解決できないウィンドウは非アクティブ"""
+        self.tracker.on_active_window(0x999)
+        self.assertFalse(self.tracker.is_active)
+
+
+@unittest.skipUnless(HAS_XLIB, "requires python-xlib")
+class TestX11GuardConfig(unittest.TestCase):
+    """X11Guard.apply_configのテストケース"""
+
+    def test_unsupported_settings_are_reported(self):
+        """反映できない設定は警告し、statsに残す"""
+        from utils.stats import GuardStats
+        guard = X11Guard.__new__(X11Guard)
+        guard.stats = GuardStats()
+        with self.assertLogs(x11_backend.logger, 'WARNING') as logs:
+            guard.apply_config({'keybindings': {'enter': 'send'}, 'ime_awareness': False})
+        self.assertEqual(guard.stats.info['ignored_settings'], ['ime_awareness', 'keybindings'])
+        self.assertIn('ime_awareness, keybindings', logs.output[0])
+
+    def test_raise_priority_is_supported(self):
+        """raise_priorityは反映できる設定"""
+        from utils.stats import GuardStats
+        guard = X11Guard.__new__(X11Guard)
+        guard.stats = GuardStats()
+        guard.apply_config({'raise_priority': False})
+        self.assertFalse(guard.raise_priority)
+        self.assertEqual(guard.stats.info['ignored_settings'], [])
+
+
+def _xvfb_available():
+    return HAS_XLIB and shutil.which('Xvfb') is not None
+
+
+@unittest.skipUnless(_xvfb_available(), "requires python-xlib and Xvfb")
+class TestX11GuardUnderXvfb(unittest.TestCase):
+    """Xvfb上のダミーDiscordウィンドウでのエンドツーエンドテスト"""
+
+    @classmethod
+    def setUpClass(cls):
+        read_fd, write_fd = os.pipe()
+        cls.xvfb = subprocess.Popen(
+            ['Xvfb', '-displayfd', str(write_fd), '-screen', '0', '640x480x24', '-nolisten', 'tcp'],
+            pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        os.close(write_fd)
+        with os.fdopen(read_fd) as f:
+            cls.display_name = f':{f.readline().strip()}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.xvfb.terminate()
+        cls.xvfb.wait()
+
+    def setUp(self):
+        from Xlib import X, display as xdisplay
+
+        self.X = X
+        self.client = xdisplay.Display(self.display_name)
+        self.root = self.client.screen().root
+        self.discord = self.make_window('discord')
+        self.editor = self.make_window('gedit')
+
+        self.guard = X11Guard(self.display_name)
+        self.runner = threading.Thread(target=self.guard.start, daemon=True)
+        self.runner.start()
+        self.wait_for(lambda: self.guard.running)
+
+    def tearDown(self):
+        self.guard.stop()
+        self.runner.join(timeout=5)
+        self.guard.close()
+        self.client.close()
+
+    def make_window(self, wm_class):
+        X = self.X
+        window = self.root.create_window(
+            0, 0, 100, 100, 0, self.client.screen().root_depth,
+            event_mask=X.KeyPressMask | X.KeyReleaseMask,
+        )
+        window.set_wm_class(wm_class, wm_class)
+        window.map()
+        self.client.sync()
+        return window
+
+    def activate(self, window):
+        # No window manager under Xvfb: play its part
+        X = self.X
+        window.set_input_focus(X.RevertToParent, X.CurrentTime)
+        self.root.change_property(
+            self.client.intern_atom('_NET_ACTIVE_WINDOW'),
+            self.client.intern_atom('WINDOW'), 32, [window.id],
+        )
+        self.client.sync()
+
+    def wait_for(self, predicate, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                self.fail("timed out")
+            time.sleep(0.005)
+
+    def press_enter(self):
+        from Xlib import XK
+        from Xlib.ext import xtest
+
+        X = self.X
+        keycode = self.client.keysym_to_keycode(XK.XK_Return)
+        xtest.fake_input(self.client, X.KeyPress, keycode)
+        xtest.fake_input(self.client, X.KeyRelease, keycode)
+        self.client.sync()
+
+        deadline = time.monotonic() + 2.0
+        while time.monotonic() < deadline:
+            while self.client.pending_events():
+                event = self.client.next_event()
+                if event.type == X.KeyPress and event.detail == keycode:
+                    return event
+            time.sleep(0.005)
+        self.fail("Enter never reached the focused window")
+
+    def test_enter_converted_in_discord(self):
+        """Discordウィンドウでは単体のEnterがShift付きで届く"""
+        self.activate(self.discord)
+        self.wait_for(lambda: self.guard.grabbed)
+        event = self.press_enter()
+        self.assertTrue(event.state & self.X.ShiftMask)
+        self.assertEqual(event.window, self.discord.id)
+        self.assertEqual(self.guard.stats.counters['enter_converted'], 1)
+
+    def test_enter_untouched_elsewhere(self):
+        """他のウィンドウでは掴まずそのまま届く"""
+        self.activate(self.discord)
+        self.wait_for(lambda: self.guard.grabbed)
+        self.activate(self.editor)
+        self.wait_for(lambda: not self.guard.grabbed)
+        event = self.press_enter()
+        self.assertFalse(event.state & self.X.ShiftMask)
+        self.assertNotIn('enter_converted', self.guard.stats.counters)
+
+    def test_disable_releases_grab(self):
+        """無効化するとグラブを外す"""
+        self.activate(self.discord)
+        self.wait_for(lambda: self.guard.grabbed)
+        self.guard.enabled = False
+        self.wait_for(lambda: not self.guard.grabbed)
+        event = self.press_enter()
+        self.assertFalse(event.state & self.X.ShiftMask)
+
+
+if __name__ == '__main__':
+    unittest.main()
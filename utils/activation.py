@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Scoped activation for Discord Send Guard
+Installs the keyboard interception only while a target app is frontmost,
+driven by foreground-change events
+"""
+
+import time
+import threading
+import logging
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+ACTIVE = 'active'
+PASSIVE = 'passive'
+
+
+class ScopedActivation:
+    """
+    Two-state machine switching a hook backend on foreground changes
+
+    The backend must provide install() and uninstall(). While PASSIVE the
+    hook is not installed, so typing in other apps costs nothing.
+    """
+
+    def __init__(self, backend, matcher: Callable[[str], bool], stats=None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize state machine
+
+        Args:
+            backend: Object with install()/uninstall()
+            matcher: Returns True if the given app should be guarded
+            stats: GuardStats for install/uninstall latency and mode times
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.backend = backend
+        self.matcher = matcher
+        self.stats = stats
+        self.clock = clock
+        self.state = PASSIVE
+        self._entered_at = clock()
+        self._mode_seconds: Dict[str, float] = {ACTIVE: 0.0, PASSIVE: 0.0}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def active(self) -> bool:
+        """Whether the interception is installed"""
+        return self.state == ACTIVE
+
+    def on_foreground(self, app: str):
+        """
+        Handle a foreground-change event
+
+        Args:
+            app: Name of the new frontmost app
+        """
+        with self._lock:
+            if self._closed:
+                return
+            wanted = ACTIVE if self.matcher(app) else PASSIVE
+            if wanted != self.state:
+                self._transition(wanted)
+
+    def shutdown(self):
+        """Uninstall the hook and ignore further events"""
+        with self._lock:
+            if self.state == ACTIVE:
+                self._transition(PASSIVE)
+            self._account()
+            self._closed = True
+
+    def mode_times(self) -> Dict[str, float]:
+        """
+        Get the time spent in each mode
+
+        Returns:
+            Mapping of mode to seconds, including the current stretch
+        """
+        with self._lock:
+            times = dict(self._mode_seconds)
+            if not self._closed:
+                times[self.state] += self.clock() - self._entered_at
+            return times
+
+    def _account(self):
+        now = self.clock()
+        self._mode_seconds[self.state] += now - self._entered_at
+        self._entered_at = now
+        if self.stats:
+            for mode, seconds in self._mode_seconds.items():
+                self.stats.set(f'time_{mode}_ms', int(seconds * 1000))
+
+    def _transition(self, state: str):
+        started = time.perf_counter()
+        try:
+            if state == ACTIVE:
+                self.backend.install()
+            else:
+                self.backend.uninstall()
+        except Exception as e:
+            logger.error(f"Failed to switch hook to {state}: {e}")
+            if self.stats:
+                self.stats.incr('activation_errors')
+            return
+        elapsed = time.perf_counter() - started
+
+        self._account()
+        self.state = state
+        if self.stats:
+            action = 'install' if state == ACTIVE else 'uninstall'
+            self.stats.incr(f'activation_{action}s')
+            self.stats.observe(f'activation_{action}', elapsed)
+        logger.debug(f"Scoped activation: {state} ({elapsed * 1e6:.0f} us)")
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Window classification for Discord Send Guard
+
+Decides whether a frontmost window is Discord: the desktop app, or
+discord.com open in a browser tab. Classification looks at the app or
+executable name, the window title and (for browsers, when available) the
+URL, and is cached per window and title (or URL, when the title cannot
+be read) so repeated Enters in the same window cost one dictionary lookup.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Lower-cased app names (macOS) and executable names (Windows) of browsers
+BROWSER_APPS = frozenset((
+    'google chrome', 'google chrome canary', 'chromium', 'safari', 'safari technology preview',
+    'firefox', 'firefox developer edition', 'microsoft edge', 'brave browser', 'arc',
+    'opera', 'vivaldi', 'orion', 'zen browser',
+    'chrome.exe', 'msedge.exe', 'firefox.exe', 'brave.exe', 'opera.exe', 'vivaldi.exe',
+))
+
+# Desktop Discord builds
+DISCORD_APPS = frozenset((
+    'discord', 'discord ptb', 'discord canary', 'discord development',
+    'discord.exe', 'discordptb.exe', 'discordcanary.exe', 'discorddevelopment.exe',
+))
+
+# X11 WM_CLASS parts and Linux process names -> the app names above
+LINUX_APP_NAMES = {
+    'discord': 'discord', 'discordptb': 'discord ptb', 'discord-ptb': 'discord ptb',
+    'discordcanary': 'discord canary', 'discord-canary': 'discord canary',
+    'google-chrome': 'google chrome', 'google-chrome-stable': 'google chrome', 'chrome': 'google chrome',
+    'chromium': 'chromium', 'chromium-browser': 'chromium',
+    'firefox': 'firefox', 'firefox-esr': 'firefox', 'firefox-bin': 'firefox',
+    'brave-browser': 'brave browser', 'brave': 'brave browser',
+    'microsoft-edge': 'microsoft edge', 'msedge': 'microsoft edge',
+    'vivaldi-stable': 'vivaldi', 'vivaldi-bin': 'vivaldi', 'opera': 'opera',
+}
+
+DISCORD_HOSTS = frozenset((
+    'discord.com', 'ptb.discord.com', 'canary.discord.com', 'discordapp.com',
+    'www.discord.com', 'www.discordapp.com',
+))
+
+# "... - Google Chrome", "... — Mozilla Firefox", "... - Personal - Microsoft​ Edge"
+BROWSER_TITLE_SUFFIX = re.compile(
+    r'\s+[-—–]\s+(?:google chrome|chromium|mozilla firefox|firefox|brave|opera|vivaldi|safari'
+    r'|(?:[^-—–]+\s+[-—–]\s+)?microsoft\u200b? edge)$',
+    re.IGNORECASE,
+)
+
+# Separators between title segments ("Discord | #general | Server")
+TITLE_SEPARATOR = re.compile(r'\s+[|\-—–]\s+')
+
+# Windows Discord shows an unread badge in the title: "(3) Discord | ..."
+UNREAD_PREFIX = re.compile(r'^(?:\(\d+\+?\)|•)\s*')
+
+DEFAULT_CACHE_SIZE = 256
+
+
+def is_discord_url(url: Optional[str]) -> bool:
+    """
+    Check whether a URL is the Discord web client
+
+    Args:
+        url: Page URL
+
+    Returns:
+        True for discord.com/channels/... (and the app/login pages)
+    """
+    if not url:
+        return False
+    parts = urlsplit(url)
+    if parts.hostname not in DISCORD_HOSTS:
+        return False
+    return parts.path.startswith(('/channels/', '/app', '/activity'))
+
+
+def is_discord_title(title: str) -> bool:
+    """
+    Check whether a window title is Discord's own document title
+
+    Discord titles put a "Discord" segment first or last, with a channel
+    ("#general") or DM ("@user") segment beside it; searches and articles
+    that merely mention Discord do not match.
+
+    Args:
+        title: Window title (browser suffix included or not)
+
+    Returns:
+        True if the title was set by the Discord client
+    """
+    title = UNREAD_PREFIX.sub('', BROWSER_TITLE_SUFFIX.sub('', title.strip()))
+    segments = [segment.strip() for segment in TITLE_SEPARATOR.split(title) if segment.strip()]
+    if not segments:
+        return False
+    lowered = [segment.lower() for segment in segments]
+    if lowered[0] != 'discord' and lowered[-1] != 'discord':
+        return False
+    if len(segments) == 1:
+        return True
+    return any(segment[0] in '#@' for segment in segments)
+
+
+def may_host_discord(name: str) -> bool:
+    """
+    Check whether a frontmost app could be showing Discord
+
+    Used where only the app name (macOS) or window title (Windows) is
+    known: browsers qualify because any tab could be Discord, so the
+    per-Enter check has to decide.
+
+    Args:
+        name: Lower-cased app name or window title
+
+    Returns:
+        True for Discord and for browsers
+    """
+    return 'discord' in name or name in BROWSER_APPS or BROWSER_TITLE_SUFFIX.search(name) is not None
+
+
+def linux_app_name(names: Iterable[str]) -> str:
+    """
+    Name an X11 window's app the way classify_window() expects
+
+    Args:
+        names: WM_CLASS instance and class, then the owner's process name
+
+    Returns:
+        The first name that maps to a known app, else the first non-empty
+        name lower-cased ('' if there is none)
+    """
+    fallback = ''
+    for name in names:
+        name = name.lower()
+        known = LINUX_APP_NAMES.get(name)
+        if known:
+            return known
+        fallback = fallback or name
+    return fallback
+
+
+def classify_window(app: str, title: str, url: Optional[str] = None) -> bool:
+    """
+    Decide whether a window belongs to Discord
+
+    Args:
+        app: Lower-cased app or executable name ('' if unknown)
+        title: Window title
+        url: Page URL for browser windows, if known
+
+    Returns:
+        True for the Discord desktop app or a Discord browser tab
+    """
+    if app in DISCORD_APPS:
+        return True
+    if app in BROWSER_APPS:
+        if url:
+            return is_discord_url(url)
+        return is_discord_title(title)
+    if not app:
+        # Unknown owner: fall back to the title alone
+        return 'discord' in title.lower()
+    return False
+
+
+class WindowClassifier:
+    """
+    Bounded per-window LRU cache of classify_window() results
+
+    The key is (window, title): a tab switch or navigation changes the
+    title and forces a re-classification; anything else is a cache hit
+    that needs no app, process or accessibility lookup. Without the
+    Screen Recording permission browser titles are empty, so the caller
+    passes the tab's URL and the key becomes (window, title, url).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, stats=None):
+        """
+        Args:
+            max_entries: Maximum number of cached windows
+            stats: GuardStats for hit/miss counters
+        """
+        self.max_entries = max_entries
+        self.stats = stats
+        self._cache: 'OrderedDict[Hashable, bool]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def classify(self, window: Hashable, title: str,
+                 describe: Callable[[], Tuple[str, Optional[str]]],
+                 url: Optional[str] = None) -> bool:
+        """
+        Classify a window, using the cache when the title is unchanged
+
+        Args:
+            window: Stable window identity (pid, window number, HWND, ...)
+            title: Window title
+            describe: Returns (lower-cased app or executable name, URL or
+                None); only called on a miss
+            url: Page URL already known to the caller; part of the key, so
+                tabs with an unreadable title are told apart
+
+        Returns:
+            True if the window is Discord
+        """
+        key = (window, title) if url is None else (window, title, url)
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+        if result is not None:
+            if self.stats:
+                self.stats.incr('window_cache_hits')
+            return result
+
+        app, described_url = describe()
+        result = classify_window(app, title, url or described_url)
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        if self.stats:
+            self.stats.incr('window_cache_misses')
+            self.stats.trace('window_classified', app=app, discord=result)
+        return result
+
+    def clear(self):
+        """Drop all cached classifications"""
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+
+def front_window_mac(pid: int) -> Tuple[Optional[int], str]:
+    """
+    macOS: frontmost on-screen window of a process from the window server
+
+    Window titles need the Screen Recording permission; without it the
+    title is empty and browser windows fall back to the URL.
+
+    Args:
+        pid: Owner process ID
+
+    Returns:
+        (window number or None, title)
+    """
+    try:
+        import Quartz
+    except ImportError:
+        return None, ''
+    windows = Quartz.CGWindowListCopyWindowInfo(
+        Quartz.kCGWindowListOptionOnScreenOnly | Quartz.kCGWindowListExcludeDesktopElements,
+        Quartz.kCGNullWindowID,
+    ) or []
+    for info in windows:
+        if info.get('kCGWindowOwnerPID') == pid and info.get('kCGWindowLayer') == 0:
+            return info.get('kCGWindowNumber'), info.get('kCGWindowName') or ''
+    return None, ''
+
+
+def browser_url_mac(pid: int) -> Optional[str]:
+    """
+    macOS: URL of a browser's focused window through accessibility
+
+    Args:
+        pid: Browser process ID
+
+    Returns:
+        URL, or None if the browser does not expose it
+    """
+    try:
+        import ApplicationServices as AS
+    except ImportError:
+        return None
+    app = AS.AXUIElementCreateApplication(pid)
+    err, window = AS.AXUIElementCopyAttributeValue(app, AS.kAXFocusedWindowAttribute, None)
+    if err != 0 or window is None:
+        return None
+    err, document = AS.AXUIElementCopyAttributeValue(window, 'AXDocument', None)
+    return str(document) if err == 0 and document else None
+
+
+def window_exe_name(hwnd: int) -> str:
+    """
+    Windows: executable name of the process owning a window
+
+    Args:
+        hwnd: Window handle
+
+    Returns:
+        Lower-cased executable file name, or '' if unknown
+    """
+    try:
+        import ctypes
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+    except (ImportError, AttributeError):
+        return ''
+    pid = wintypes.DWORD()
+    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    handle = kernel32.OpenProcess(0x1000, False, pid.value)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return ''
+    try:
+        size = wintypes.DWORD(260)
+        buffer = ctypes.create_unicode_buffer(size.value)
+        if not kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+            return ''
+        return buffer.value.rsplit('\\', 1)[-1].lower()
+    finally:
+        kernel32.CloseHandle(handle)
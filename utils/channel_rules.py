@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Per-channel rules for Discord Send Guard
+
+Discord's window title names the channel and server ("#code-paste |
+Acme - Discord"), so channels can opt out of the guard with title
+patterns. All patterns are compiled once into a single non-capturing
+alternation (which the regex engine optimizes into a shared prefix scan)
+that rejects non-matching titles in one pass; only a hit walks the rules
+in priority order. The title is only matched when it changes and the
+resolved action is kept for the Enter path.
+"""
+
+import re
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ACTION_GUARD = 'guard'
+ACTION_OFF = 'off'
+ACTIONS = (ACTION_GUARD, ACTION_OFF)
+
+# Prefix marking a pattern as a regular expression instead of a glob
+REGEX_PREFIX = 're:'
+
+
+class RuleError(ValueError):
+    """Invalid channel rule"""
+
+
+def pattern_to_regex(pattern: str) -> str:
+    """
+    Translate a rule pattern into a regex fragment
+
+    Plain patterns match anywhere in the title, case-insensitively, with
+    "*" as a wildcard; "re:..." patterns are used as they are.
+
+    Args:
+        pattern: Rule pattern
+
+    Returns:
+        Regex source
+    """
+    if pattern.startswith(REGEX_PREFIX):
+        return pattern[len(REGEX_PREFIX):]
+    return '.*'.join(re.escape(part) for part in pattern.split('*'))
+
+
+class ChannelRules:
+    """
+    Ordered title rules resolved to an action per title change
+
+    The first matching rule wins; titles matching no rule get the default
+    action. `action` is a plain attribute for the hot path.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, str]] = (), default: str = ACTION_GUARD,
+                 stats=None):
+        """
+        Compile rules
+
+        Args:
+            rules: (pattern, action) pairs in priority order
+            default: Action when no rule matches
+            stats: GuardStats for evaluation counters
+
+        Raises:
+            RuleError: If an action is unknown or a pattern does not compile
+        """
+        if default not in ACTIONS:
+            raise RuleError(f"Unknown action: {default}")
+        self.rules: List[Tuple[str, str]] = list(rules)
+        self.default = default
+        self.stats = stats
+        self._regex, self._separate = self._compile(self.rules)
+        self.title: Optional[str] = None
+        self.rule_index: Optional[int] = None
+        self.action = default
+
+    @staticmethod
+    def _compile(rules):
+        if not rules:
+            return None, []
+        alternatives = []
+        separate = []
+        for pattern, action in rules:
+            if action not in ACTIONS:
+                raise RuleError(f"Unknown action for {pattern!r}: {action}")
+            fragment = pattern_to_regex(pattern)
+            try:
+                separate.append(re.compile(fragment, re.IGNORECASE))
+            except re.error as e:
+                raise RuleError(f"Invalid pattern {pattern!r}: {e}")
+            # Capturing wrappers would defeat the alternation optimizer
+            alternatives.append(f'(?:{fragment})')
+        try:
+            regex = re.compile('|'.join(alternatives), re.IGNORECASE)
+        except re.error as e:
+            raise RuleError(f"Invalid rules: {e}")
+        return regex, separate
+
+    @classmethod
+    def from_config(cls, entries: Iterable[Dict[str, Any]], stats=None) -> 'ChannelRules':
+        """
+        Build rules from the channel_rules config list
+
+        Args:
+            entries: [{"pattern": "...", "action": "off"}, ...]
+            stats: GuardStats for evaluation counters
+
+        Returns:
+            ChannelRules instance
+        """
+        rules = []
+        for entry in entries or ():
+            if not isinstance(entry, dict) or 'pattern' not in entry:
+                raise RuleError(f"Rule must be an object with a pattern: {entry!r}")
+            rules.append((str(entry['pattern']), entry.get('action', ACTION_OFF)))
+        return cls(rules, stats=stats)
+
+    def match(self, title: str) -> Optional[int]:
+        """
+        Find the first rule matching a title
+
+        Args:
+            title: Window title
+
+        Returns:
+            Rule index, or None
+        """
+        if self._regex is None:
+            return None
+        if self._regex.search(title) is None:
+            return None
+        for index, regex in enumerate(self._separate):
+            if regex.search(title):
+                return index
+        return None
+
+    def on_title(self, title: str) -> str:
+        """
+        Resolve the action for the current Discord window title
+
+        Args:
+            title: Window title
+
+        Returns:
+            Action for the title (cached until the title changes)
+        """
+        if title == self.title:
+            return self.action
+        self.title = title
+        self.rule_index = self.match(title)
+        self.action = self.default if self.rule_index is None else self.rules[self.rule_index][1]
+        if self.stats:
+            self.stats.incr('channel_rule_evaluations')
+            self.stats.trace('channel_rule', rule=self.rule_index, action=self.action)
+        return self.action
+
+    def __bool__(self):
+        return bool(self.rules)
@@ -4,10 +4,13 @@ Configuration management for Discord Send Guard
 Handles reading/writing config.json in ~/.discord-send-guard/
 """
 
+import copy
 import json
 import os
+import platform
+import threading
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,17 +25,208 @@ DEFAULT_CONFIG = {
     "autostart": False,
     "debug": False,
     "first_run": True,
+    "isolate_hook": False,
+    "gc_tuning": True,
+    "raise_priority": True,
+    "scoped_activation": False,
+    "foreground_strategy": "auto",
+    "freshness_target_ms": 50,
+    "ime_awareness": True,
+    "composer_only": True,
+    "channel_rules": [],
+    "keybindings": {"enter": "newline", "mod+enter": "pass"},
+    "decision_trace": True,
+    "enter_lookahead_ms": 0,
+    "storm_protection": True,
+    "enter_rate_limit": 40,
+    "enter_burst": 20,
+    "flight_recorder": True,
+    "flight_recorder_slots": 65536,
 }
 
+# Settings read by the app or CLI rather than by the guard engine
+APP_SETTINGS = frozenset(("enabled", "autostart", "first_run", "isolate_hook"))
+
+
+def ignored_settings(config, supported: Iterable[str]) -> List[str]:
+    """
+    Find engine settings a backend cannot honour
+
+    Args:
+        config: Config instance or dict
+        supported: Engine settings the backend applies
+
+    Returns:
+        Sorted names of settings changed from their defaults that the
+        backend would silently ignore
+    """
+    supported = set(supported)
+    return sorted(
+        key for key, default in DEFAULT_CONFIG.items()
+        if key not in APP_SETTINGS and key not in supported and config.get(key, default) != default
+    )
+
+
+# Keybinding actions for an Enter chord in Discord
+ACTION_NEWLINE = "newline"  # Replace with Shift+Enter
+ACTION_SEND = "send"  # Replace with a plain Enter (held modifiers lifted)
+ACTION_PASS = "pass"  # Leave the key untouched
+KEY_ACTIONS = (ACTION_NEWLINE, ACTION_SEND, ACTION_PASS)
+
+# Modifier bits of a chord mask
+MOD_SHIFT = 1
+MOD_CTRL = 2
+MOD_ALT = 4
+MOD_CMD = 8
+MODIFIER_STATES = 16  # Number of distinct modifier masks
+
+MODIFIER_NAMES = {
+    "shift": MOD_SHIFT,
+    "ctrl": MOD_CTRL, "control": MOD_CTRL,
+    "alt": MOD_ALT, "option": MOD_ALT, "opt": MOD_ALT,
+    "cmd": MOD_CMD, "command": MOD_CMD, "meta": MOD_CMD, "super": MOD_CMD, "win": MOD_CMD,
+}
+
+# Keys a chord can end in, by key id. The numpad Enter is not bindable on
+# its own: the hook cannot tell it from Enter on every platform (pynput
+# reports both as Key.enter on Windows), so such a binding would never fire
+BINDABLE_KEYS = {"enter": 0, "return": 0}
+ENTER_KEY_ID = 0
+
+
+class KeybindingError(ValueError):
+    """Invalid keybinding spec"""
+
+
+def primary_modifier(is_mac: bool = None) -> int:
+    """
+    Get the bit "mod" stands for: Cmd on macOS, Ctrl elsewhere
+
+    Args:
+        is_mac: Override platform detection
+
+    Returns:
+        Modifier bit
+    """
+    if is_mac is None:
+        is_mac = platform.system() == "Darwin"
+    return MOD_CMD if is_mac else MOD_CTRL
+
+
+def parse_chord(chord: str, primary: int, keys: Mapping[str, int] = BINDABLE_KEYS) -> Tuple[int, int]:
+    """
+    Parse a chord such as "alt+enter" or "mod+shift+enter"
+
+    Args:
+        chord: Modifier names and a key name joined by "+"
+        primary: Bit that "mod" stands for
+        keys: Key name -> key id
+
+    Returns:
+        (modifier mask, key id)
+
+    Raises:
+        KeybindingError: If a name is unknown or the chord is malformed
+    """
+    parts = [part.strip().lower() for part in chord.split("+")]
+    if not all(parts):
+        raise KeybindingError(f"Malformed chord: {chord!r}")
+    *modifiers, key = parts
+    if key not in keys:
+        raise KeybindingError(f"Unknown key {key!r} in {chord!r}")
+    mask = 0
+    for name in modifiers:
+        bit = primary if name == "mod" else MODIFIER_NAMES.get(name)
+        if bit is None:
+            raise KeybindingError(f"Unknown modifier {name!r} in {chord!r}")
+        if mask & bit:
+            raise KeybindingError(f"Repeated modifier {name!r} in {chord!r}")
+        mask |= bit
+    return mask, keys[key]
+
+
+class KeyBindings:
+    """
+    Compiled keybindings: a flat action table indexed by (key id, modifier mask)
+
+    lookup() is one list index regardless of how many bindings exist.
+    """
+
+    __slots__ = ("table",)
+
+    def __init__(self, table):
+        self.table = table
+
+    def lookup(self, key_id: int, mask: int) -> str:
+        """
+        Get the action for a chord
+
+        Args:
+            key_id: Key id from BINDABLE_KEYS
+            mask: Currently held modifier bits
+
+        Returns:
+            Action name
+        """
+        return self.table[key_id * MODIFIER_STATES + mask]
+
+
+def compile_keybindings(spec: Mapping[str, str], is_mac: bool = None,
+                        keys: Mapping[str, int] = BINDABLE_KEYS) -> KeyBindings:
+    """
+    Validate and compile a keybinding spec
+
+    Chords not in the spec keep the classic behavior: Enter with the
+    primary modifier passes, any other Enter becomes a newline.
+
+    Args:
+        spec: Chord -> action
+        is_mac: Override platform detection for "mod"
+        keys: Key name -> key id
+
+    Returns:
+        KeyBindings
+
+    Raises:
+        KeybindingError: On unknown names or actions, or two chords that
+            resolve to the same keys with different actions
+    """
+    if not isinstance(spec, Mapping):
+        raise KeybindingError("keybindings must be an object of chord -> action")
+    primary = primary_modifier(is_mac)
+    key_count = max(keys.values()) + 1
+    table = [
+        ACTION_PASS if mask & primary else ACTION_NEWLINE
+        for _ in range(key_count) for mask in range(MODIFIER_STATES)
+    ]
+    bound: Dict[int, str] = {}
+    for chord, action in spec.items():
+        if action not in KEY_ACTIONS:
+            raise KeybindingError(f"Unknown action {action!r} for {chord!r}")
+        mask, key_id = parse_chord(chord, primary, keys)
+        index = key_id * MODIFIER_STATES + mask
+        if index in bound and bound[index] != action:
+            raise KeybindingError(f"Conflicting bindings for {chord!r}")
+        bound[index] = action
+        table[index] = action
+    return KeyBindings(table)
+
 
 class Config:
     """Configuration manager"""
 
-    def __init__(self):
-        """Initialize configuration"""
-        self.config_dir = CONFIG_DIR
-        self.config_file = CONFIG_FILE
+    def __init__(self, config_file: Optional[Path] = None):
+        """
+        Initialize configuration
+
+        Args:
+            config_file: Config file (defaults to ~/.discord-send-guard/config.json)
+        """
+        self.config_file = Path(config_file) if config_file else CONFIG_FILE
+        self.config_dir = self.config_file.parent
         self._config: Dict[str, Any] = {}
+        # load/save/set run on the menu bar, settings and control threads
+        self._lock = threading.RLock()
         self._ensure_config_dir()
         self.load()
 
@@ -49,34 +243,47 @@ class Config:
         Returns:
             Configuration dictionary
         """
-        if not self.config_file.exists():
-            logger.info("Config file not found, creating default config")
-            self._config = DEFAULT_CONFIG.copy()
-            self.save()
-            return self._config
-
-        try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                self._config = json.load(f)
-            logger.info("Configuration loaded successfully")
-
-            # Merge with defaults to handle new config keys
-            for key, value in DEFAULT_CONFIG.items():
-                if key not in self._config:
-                    self._config[key] = value
-
-            return self._config
-        except Exception as e:
-            logger.error(f"Failed to load config: {e}")
-            self._config = DEFAULT_CONFIG.copy()
-            return self._config
+        with self._lock:
+            if not self.config_file.exists():
+                logger.info("Config file not found, creating default config")
+                self._config = copy.deepcopy(DEFAULT_CONFIG)
+                self.save()
+                return self._config
+
+            try:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    self._config = json.load(f)
+                logger.info("Configuration loaded successfully")
+
+                # Merge with defaults to handle new config keys
+                for key, value in DEFAULT_CONFIG.items():
+                    if key not in self._config:
+                        self._config[key] = copy.deepcopy(value)
+
+                try:
+                    compile_keybindings(self._config["keybindings"])
+                except KeybindingError as e:
+                    logger.error(f"Invalid keybindings, using defaults: {e}")
+                    self._config["keybindings"] = dict(DEFAULT_CONFIG["keybindings"])
+
+                return self._config
+            except Exception as e:
+                logger.error(f"Failed to load config: {e}")
+                self._config = copy.deepcopy(DEFAULT_CONFIG)
+                return self._config
 
     def save(self):
         """Save configuration to file"""
         try:
             self._ensure_config_dir()
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self._config, f, indent=2, ensure_ascii=False)
+            with self._lock:
+                data = json.dumps(self._config, indent=2, ensure_ascii=False)
+                # Replace the file in one rename, so a concurrent load() never
+                # reads a half-written config and falls back to the defaults
+                tmp = self.config_file.with_name(self.config_file.name + ".tmp")
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp, self.config_file)
             logger.info("Configuration saved successfully")
         except Exception as e:
             logger.error(f"Failed to save config: {e}")
@@ -103,8 +310,9 @@ class Config:
             key: Configuration key
             value: Configuration value
         """
-        self._config[key] = value
-        self.save()
+        with self._lock:
+            self._config[key] = value
+            self.save()
 
     def update(self, updates: Dict[str, Any]):
         """
@@ -113,13 +321,15 @@ class Config:
         Args:
             updates: Dictionary of updates
         """
-        self._config.update(updates)
-        self.save()
+        with self._lock:
+            self._config.update(updates)
+            self.save()
 
     def reset(self):
         """Reset configuration to defaults"""
-        self._config = DEFAULT_CONFIG.copy()
-        self.save()
+        with self._lock:
+            self._config = copy.deepcopy(DEFAULT_CONFIG)
+            self.save()
         logger.info("Configuration reset to defaults")
 
     @property
@@ -162,6 +372,16 @@ class Config:
         """Set first run status"""
         self.set("first_run", value)
 
+    @property
+    def isolate_hook(self) -> bool:
+        """Get whether the keyboard hook runs in its own process"""
+        return self._config.get("isolate_hook", False)
+
+    @isolate_hook.setter
+    def isolate_hook(self, value: bool):
+        """Set whether the keyboard hook runs in its own process"""
+        self.set("isolate_hook", value)
+
 
 # Global config instance
 _config_instance = None
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Local control socket for Discord Send Guard
+Serves a line-delimited command protocol on a Unix domain socket
+
+Protocol:
+    request:  "<command> [arg ...]\\n"
+    response: "ok <json>\\n" or "error <message>\\n"
+
+A connection may send any number of requests. Commands are handled on the
+server thread, never on the keyboard listener thread.
+"""
+
+import os
+import json
+import socket
+import selectors
+import threading
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional
+
+from utils.config import CONFIG_DIR
+
+logger = logging.getLogger(__name__)
+
+# Default socket location
+DEFAULT_SOCKET_PATH = CONFIG_DIR / "control.sock"
+
+# Longest accepted request line
+MAX_LINE = 4096
+
+HAS_UNIX_SOCKETS = hasattr(socket, 'AF_UNIX')
+
+# Commands understood by the guard
+COMMANDS = ('enable', 'disable', 'toggle', 'reload', 'stats', 'trace', 'health', 'show-settings')
+
+Handler = Callable[[List[str]], Any]
+
+
+class ControlError(Exception):
+    """Raised when a control request fails"""
+
+
+class ControlRejected(ControlError):
+    """Raised when the guard answered a request with an error (e.g. an unknown command)"""
+
+
+class _Connection:
+    """Per-client buffers"""
+
+    __slots__ = ('sock', 'inbuf', 'outbuf')
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.inbuf = b''
+        self.outbuf = b''
+
+
+class ControlServer:
+    """Non-blocking Unix domain socket server running on its own thread"""
+
+    def __init__(self, handlers: Dict[str, Handler], path: Optional[Path] = None):
+        """
+        Initialize control server
+
+        Args:
+            handlers: Mapping of command name to handler. A handler receives
+                the command arguments and returns a JSON-serializable result.
+            path: Socket path (defaults to ~/.discord-send-guard/control.sock)
+        """
+        self.handlers = dict(handlers)
+        self.path = Path(path) if path else DEFAULT_SOCKET_PATH
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._listen_sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake_r: Optional[socket.socket] = None
+        self._wake_w: Optional[socket.socket] = None
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        """Whether the server thread is serving requests"""
+        return self._running
+
+    def start(self) -> bool:
+        """
+        Bind the socket and start serving
+
+        Returns:
+            True if the server started, False otherwise
+        """
+        if self._running:
+            return True
+        if not HAS_UNIX_SOCKETS:
+            logger.warning("Unix domain sockets not available, control socket disabled")
+            return False
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._remove_stale_socket()
+
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(str(self.path))
+            os.chmod(self.path, 0o600)
+            sock.listen(16)
+            sock.setblocking(False)
+        except OSError as e:
+            logger.error(f"Failed to start control socket: {e}")
+            return False
+
+        self._listen_sock = sock
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(sock, selectors.EVENT_READ, None)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, 'wake')
+
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name='control-server', daemon=True)
+        self._thread.start()
+        logger.info(f"Control socket listening at {self.path}")
+        return True
+
+    def stop(self):
+        """Stop serving and remove the socket file"""
+        if not self._running:
+            return
+        self._running = False
+        try:
+            self._wake_w.send(b'x')
+        except OSError:
+            pass
+        if self._thread:
+            self._thread.join(timeout=2)
+        self._thread = None
+        logger.info("Control socket stopped")
+
+    def _remove_stale_socket(self):
+        """Remove a socket file left behind by a dead process"""
+        if not self.path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.path))
+        except OSError:
+            self.path.unlink()
+            logger.info(f"Removed stale control socket: {self.path}")
+            return
+        finally:
+            probe.close()
+        raise OSError(f"Control socket already in use: {self.path}")
+
+    def _serve(self):
+        """Selector loop"""
+        try:
+            while self._running:
+                for key, events in self._selector.select():
+                    if key.data == 'wake':
+                        continue
+                    if key.data is None:
+                        self._accept()
+                        continue
+                    conn = key.data
+                    if events & selectors.EVENT_READ:
+                        self._read(conn)
+                    if events & selectors.EVENT_WRITE and conn.sock.fileno() != -1:
+                        self._write(conn)
+        except Exception as e:
+            logger.error(f"Control server error: {e}")
+        finally:
+            self._shutdown()
+
+    def _shutdown(self):
+        """Close all sockets"""
+        for key in list(self._selector.get_map().values()):
+            key.fileobj.close()
+        self._selector.close()
+        self._wake_w.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+        self._running = False
+
+    def _accept(self):
+        try:
+            sock, _ = self._listen_sock.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        self._selector.register(sock, selectors.EVENT_READ, _Connection(sock))
+
+    def _close(self, conn: _Connection):
+        try:
+            self._selector.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        conn.sock.close()
+
+    def _read(self, conn: _Connection):
+        try:
+            data = conn.sock.recv(MAX_LINE)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._close(conn)
+            return
+        if not data:
+            self._close(conn)
+            return
+
+        conn.inbuf += data
+        while b'\n' in conn.inbuf:
+            line, conn.inbuf = conn.inbuf.split(b'\n', 1)
+            conn.outbuf += self.dispatch(line.decode('utf-8', 'replace'))
+        if len(conn.inbuf) > MAX_LINE:
+            conn.outbuf += b'error request too long\n'
+            conn.inbuf = b''
+        if conn.outbuf:
+            self._write(conn)
+
+    def _write(self, conn: _Connection):
+        try:
+            sent = conn.sock.send(conn.outbuf)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._close(conn)
+            return
+        conn.outbuf = conn.outbuf[sent:]
+        events = selectors.EVENT_READ
+        if conn.outbuf:
+            events |= selectors.EVENT_WRITE
+        self._selector.modify(conn.sock, events, conn)
+
+    def dispatch(self, line: str) -> bytes:
+        """
+        Handle a single request line
+
+        Args:
+            line: Request line without the trailing newline
+
+        Returns:
+            Encoded response line
+        """
+        parts = line.strip().split()
+        if not parts:
+            return b'error empty request\n'
+
+        command, args = parts[0].lower(), parts[1:]
+        handler = self.handlers.get(command)
+        if handler is None:
+            return f"error unknown command: {command}\n".encode('utf-8')
+
+        try:
+            result = handler(args)
+            payload = json.dumps(result, separators=(',', ':'), default=str)
+        except Exception as e:
+            logger.error(f"Control command '{command}' failed: {e}")
+            message = str(e).replace('\n', ' ')
+            return f"error {message}\n".encode('utf-8')
+        return f"ok {payload}\n".encode('utf-8')
+
+
+def send_command(command: str, args: Optional[List[str]] = None,
+                 path: Optional[Path] = None, timeout: float = 2.0) -> Any:
+    """
+    Send one command to a running guard
+
+    Args:
+        command: Command name
+        args: Command arguments
+        path: Socket path (defaults to ~/.discord-send-guard/control.sock)
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Decoded result of the command
+
+    Raises:
+        ControlError: If the guard is unreachable or did not answer
+        ControlRejected: If the guard answered with an error
+    """
+    path = Path(path) if path else DEFAULT_SOCKET_PATH
+    if not HAS_UNIX_SOCKETS:
+        raise ControlError("Unix domain sockets not available on this platform")
+
+    request = ' '.join([command] + list(args or [])) + '\n'
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+        sock.sendall(request.encode('utf-8'))
+        response = b''
+        while not response.endswith(b'\n'):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+    except OSError as e:
+        raise ControlError(f"Cannot reach guard at {path}: {e}")
+    finally:
+        sock.close()
+
+    status, _, body = response.decode('utf-8').rstrip('\n').partition(' ')
+    if status == 'error':
+        raise ControlRejected(body)
+    if status != 'ok':
+        raise ControlError(body or "no response")
+    return json.loads(body)
+
+
+def guard_handlers(guard, reload_config: Callable[[], Any],
+                   set_enabled: Optional[Callable[[bool], Any]] = None,
+                   get_enabled: Optional[Callable[[], bool]] = None) -> Dict[str, Handler]:
+    """
+    Build the standard command handlers for a guard
+
+    Args:
+        guard: DiscordSendGuard instance
+        reload_config: Called for the "reload" command
+        set_enabled: Called with True/False for "enable"/"disable"/"toggle"
+            (defaults to setting guard.enabled)
+        get_enabled: Returns the current enabled state
+            (defaults to reading guard.enabled)
+
+    Returns:
+        Mapping of command name to handler
+    """
+    if set_enabled is None:
+        def set_enabled(value: bool):
+            guard.enabled = value
+
+    if get_enabled is None:
+        def get_enabled() -> bool:
+            return guard.enabled
+
+    def enable(args):
+        set_enabled(True)
+        return {"enabled": True}
+
+    def disable(args):
+        set_enabled(False)
+        return {"enabled": False}
+
+    def toggle(args):
+        enabled = not get_enabled()
+        set_enabled(enabled)
+        return {"enabled": enabled}
+
+    def reload(args):
+        reload_config()
+        return {"reloaded": True}
+
+    def stats(args):
+        return guard.stats.snapshot()
+
+    def trace(args):
+        entries = guard.stats.trace_snapshot()
+        if args and int(args[0]) > 0:
+            entries = entries[-int(args[0]):]
+        return entries
+
+    def health(args):
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "running": guard.running,
+            "enabled": get_enabled(),
+            "priority": getattr(guard, 'priority_policy', None),
+            "foreground": guard.stats.snapshot().get('info', {}).get('foreground_strategy'),
+        }
+
+    return {
+        "enable": enable,
+        "disable": disable,
+        "toggle": toggle,
+        "reload": reload,
+        "stats": stats,
+        "trace": trace,
+        "health": health,
+    }
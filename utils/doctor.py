@@ -0,0 +1,676 @@
+#!/usr/bin/env python3
+"""
+Environment profiling for Discord Send Guard (the ``doctor`` command)
+
+Measures the costs that decide how responsive the guard is on this
+machine: the foreground-app query made for every fresh Enter, key
+injection, the permission check, the time until the keyboard hook is
+live, the import time of each dependency and config load/save. Results
+are ranked by cost and written to JSON for attaching to support tickets.
+
+Every probe is a context manager that prepares what it measures and
+yields one call. The runner times each call, unless the call timed
+itself and returns SelfTimed (imports are timed inside a fresh
+interpreter, the hook from start() until it is live). The probes reach
+the platform only through Facilities; fake_probes() runs the same probe
+bodies against FakeFacilities, whose stand-ins advance a fake clock by
+fixed costs, so the whole command runs deterministically on Linux CI
+without a display, input devices or macOS frameworks.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, ContextManager, Dict, Iterator, List, NamedTuple, Optional
+
+from utils.config import CONFIG_DIR, CONFIG_FILE, Config
+
+# Default report location
+REPORT_FILE = CONFIG_DIR / "doctor.json"
+
+# Project root, so a fresh interpreter can import the guard itself
+ROOT = Path(__file__).resolve().parent.parent
+
+# Imported by the guard, the menu bar app or a backend on some platform
+DEPENDENCIES = (
+    "pynput", "Xlib", "evdev", "AppKit", "Quartz", "ApplicationServices",
+    "win32gui", "rumps", "tkinter", "PIL", "numpy",
+)
+
+Call = Callable[[], object]
+
+
+class ProbeUnavailable(Exception):
+    """The measured facility does not exist here (platform, permission or package)"""
+
+
+class SelfTimed(NamedTuple):
+    """Returned by a call that measured itself; the runner records this instead of its own timing"""
+    seconds: float
+
+
+class Probe(NamedTuple):
+    """One measurement"""
+    name: str
+    category: str
+    setup: Callable[[], ContextManager[Call]]
+    repeat: int
+    clock: Callable[[], float] = time.perf_counter
+
+
+class ProbeResult(NamedTuple):
+    """Summary of one probe (durations in seconds)"""
+    name: str
+    category: str
+    status: str  # 'ok', 'unavailable' or 'error'
+    n: int = 0
+    median: float = 0.0
+    p90: float = 0.0
+    max: float = 0.0
+    detail: str = ""
+
+    def as_dict(self) -> dict:
+        result = {"name": self.name, "category": self.category, "status": self.status, "n": self.n}
+        if self.status == "ok":
+            for field in ("median", "p90", "max"):
+                result[f"{field}_ms"] = round(getattr(self, field) * 1e3, 4)
+        if self.detail:
+            result["detail"] = self.detail
+        return result
+
+
+def run_probe(probe: Probe, repeat: Optional[int] = None) -> ProbeResult:
+    """
+    Run one probe
+
+    Args:
+        probe: Probe to run
+        repeat: Calls to measure (defaults to probe.repeat)
+
+    Returns:
+        ProbeResult; failures are reported in the result, never raised
+    """
+    repeat = max(repeat or probe.repeat, 1)
+    samples = []
+    try:
+        with probe.setup() as call:
+            for _ in range(repeat):
+                started = probe.clock()
+                measured = call()
+                elapsed = probe.clock() - started
+                samples.append(measured.seconds if isinstance(measured, SelfTimed) else elapsed)
+    except ProbeUnavailable as e:
+        return ProbeResult(probe.name, probe.category, "unavailable", detail=str(e))
+    except Exception as e:
+        return ProbeResult(probe.name, probe.category, "error", len(samples), detail=f"{type(e).__name__}: {e}")
+    samples.sort()
+    return ProbeResult(
+        probe.name, probe.category, "ok", len(samples),
+        median=samples[len(samples) // 2],
+        p90=samples[min(len(samples) - 1, int(len(samples) * 0.9))],
+        max=samples[-1],
+    )
+
+
+def rank(results: List[ProbeResult]) -> List[ProbeResult]:
+    """Measured probes by median cost (highest first), then the unavailable and failed ones"""
+    measured = sorted((r for r in results if r.status == "ok"), key=lambda r: r.median, reverse=True)
+    return measured + [r for r in results if r.status != "ok"]
+
+
+def run_doctor(probes: List[Probe], repeat: Optional[int] = None,
+               progress: Optional[Callable[[Probe], None]] = None) -> List[ProbeResult]:
+    """
+    Run probes one after another and rank them
+
+    Args:
+        probes: Probes to run
+        repeat: Override every probe's repeat count
+        progress: Called before each probe
+
+    Returns:
+        Ranked results
+    """
+    results = []
+    for probe in probes:
+        if progress:
+            progress(probe)
+        results.append(run_probe(probe, repeat))
+    return rank(results)
+
+
+def environment(backend: str) -> Dict[str, str]:
+    """Facts about the machine that go into the report"""
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "executable": sys.executable,
+        "backend": backend,
+        "display": os.environ.get("WAYLAND_DISPLAY") and "wayland" or os.environ.get("DISPLAY") and "x11" or "",
+    }
+
+
+def format_report(results: List[ProbeResult], meta: Dict[str, str]) -> str:
+    """Ranked table, one line per probe"""
+    lines = [f"Discord Send Guard doctor ({meta.get('platform')}, Python {meta.get('python')}, "
+             f"backend {meta.get('backend')})", "",
+             f"{'rank':>4}  {'probe':<28} {'median':>10} {'p90':>10} {'max':>10} {'n':>5}  status"]
+    for index, result in enumerate(results, 1):
+        if result.status == "ok":
+            lines.append(f"{index:>4}  {result.name:<28} {_ms(result.median):>10} {_ms(result.p90):>10} "
+                         f"{_ms(result.max):>10} {result.n:>5}  ok")
+        else:
+            lines.append(f"{index:>4}  {result.name:<28} {'-':>10} {'-':>10} {'-':>10} {result.n:>5}  "
+                         f"{result.status}: {result.detail}")
+    return "\n".join(lines)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1e3:.3f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+def write_report(results: List[ProbeResult], meta: Dict[str, str], path: Optional[Path] = None) -> Path:
+    """
+    Write the ranked report as JSON
+
+    Args:
+        results: Ranked results
+        meta: environment() facts
+        path: Output file (defaults to ~/.discord-send-guard/doctor.json)
+
+    Returns:
+        Path written
+    """
+    path = Path(path) if path else REPORT_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {"generated": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "meta": meta,
+              "probes": [result.as_dict() for result in results]}
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+# Real probes
+
+
+class Facilities:
+    """
+    What the real probes reach for on this machine
+
+    Probes take the platform name, clock, packages and OS calls from here
+    instead of importing them, so FakeFacilities can run the same probe
+    bodies against stand-ins.
+    """
+
+    clock = staticmethod(time.perf_counter)
+    sleep = staticmethod(time.sleep)
+
+    def __init__(self):
+        self.system = platform.system()
+        self.frozen = getattr(sys, "frozen", False)
+
+    def env(self, name: str) -> str:
+        return os.environ.get(name, "")
+
+    def can_write(self, path: str) -> bool:
+        return os.access(path, os.W_OK)
+
+    def can_read(self, path: str) -> bool:
+        return os.access(path, os.R_OK)
+
+    def input_devices(self) -> List[str]:
+        """Event device paths under /dev/input"""
+        if not os.path.isdir("/dev/input"):
+            return []
+        return [os.path.join("/dev/input", name) for name in os.listdir("/dev/input") if name.startswith("event")]
+
+    def python(self, code: str) -> subprocess.CompletedProcess:
+        """Run code in a fresh interpreter from the project root"""
+        return subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+
+    def guard_module(self):
+        import discord_send_guard
+        return discord_send_guard
+
+    def evdev_backend(self):
+        from backends import evdev_backend
+        return evdev_backend
+
+    def x11_backend(self):
+        from backends import x11_backend
+        return x11_backend
+
+    def uinput(self, capabilities: dict, name: str):
+        import evdev
+        return evdev.UInput(capabilities, name=name)
+
+    def xlib(self):
+        """Xlib's X, XK, Display and xtest"""
+        from Xlib import X, XK, display as xdisplay
+        from Xlib.ext import xtest
+        return SimpleNamespace(X=X, XK=XK, Display=xdisplay.Display, xtest=xtest)
+
+    def accessibility_check(self) -> Callable[[], bool]:
+        from utils.permissions import check_accessibility_permission
+        return check_accessibility_permission
+
+    def admin_check(self) -> Callable[[], bool]:
+        import ctypes
+        return ctypes.windll.shell32.IsUserAnAdmin
+
+
+@contextmanager
+def _foreground_query(backend: str, system: Facilities) -> Iterator[Call]:
+    if backend in ("x11", "evdev"):
+        query = system.evdev_backend().x11_discord_active()
+        if query is None:
+            raise ProbeUnavailable("no X display to query the active window")
+        yield query
+        return
+    if system.system not in ("Darwin", "Windows"):
+        raise ProbeUnavailable(f"no foreground query for {system.system} with {backend}")
+    guard = _pynput(system).DiscordSendGuard()
+    yield guard._query_discord_active
+
+
+def _pynput(system: Facilities):
+    module = system.guard_module()
+    if module.PYNPUT_IMPORT_ERROR is not None:
+        raise ProbeUnavailable(f"pynput not available: {module.PYNPUT_IMPORT_ERROR}")
+    return module
+
+
+@contextmanager
+def _injection(backend: str, system: Facilities) -> Iterator[Call]:
+    # A lone Shift press/release: the cheapest event that types nothing
+    if backend == "evdev":
+        evdev_backend = system.evdev_backend()
+        if not evdev_backend.HAS_EVDEV or not system.can_write("/dev/uinput"):
+            raise ProbeUnavailable("evdev or a writable /dev/uinput is missing")
+        ev_key, shift = evdev_backend.EV_KEY, evdev_backend.KEY_LEFTSHIFT
+        device = system.uinput({ev_key: [shift]}, "discord-send-guard-doctor")
+        try:
+            def inject():
+                device.write(ev_key, shift, 1)
+                device.write(ev_key, shift, 0)
+                device.syn()
+            yield inject
+        finally:
+            device.close()
+        return
+    if backend == "x11":
+        try:
+            xlib = system.xlib()
+            client = xlib.Display()
+        except Exception as e:
+            raise ProbeUnavailable(f"no X display: {e}")
+        try:
+            shift = client.keysym_to_keycode(xlib.XK.XK_Shift_L)
+
+            def inject():
+                xlib.xtest.fake_input(client, xlib.X.KeyPress, shift)
+                xlib.xtest.fake_input(client, xlib.X.KeyRelease, shift)
+                client.sync()
+            yield inject
+        finally:
+            client.close()
+        return
+    module = _pynput(system)
+    controller = module.Controller()
+
+    def inject():
+        controller.press(module.Key.shift)
+        controller.release(module.Key.shift)
+    yield inject
+
+
+@contextmanager
+def _permission_check(backend: str, system: Facilities) -> Iterator[Call]:
+    if system.system == "Darwin":
+        yield system.accessibility_check()
+    elif system.system == "Linux" and backend == "evdev":
+        def check():
+            return system.can_write("/dev/uinput") and any(system.can_read(d) for d in system.input_devices())
+        yield check
+    elif system.system == "Windows":
+        yield system.admin_check()
+    else:
+        raise ProbeUnavailable(f"no permission check for {system.system} with {backend}")
+
+
+@contextmanager
+def _listener_start(backend: str, system: Facilities) -> Iterator[Call]:
+    if backend == "evdev":
+        evdev_backend = system.evdev_backend()
+        if not evdev_backend.HAS_EVDEV:
+            raise ProbeUnavailable("evdev not available")
+
+        def start():
+            # Enumerating and opening the keyboards is the start-up cost; nothing is grabbed
+            for device in evdev_backend.find_keyboards():
+                device.close()
+        yield start
+        return
+    if backend == "x11":
+        x11_backend = system.x11_backend()
+        if not x11_backend.HAS_XLIB or not system.env("DISPLAY"):
+            raise ProbeUnavailable("python-xlib or an X display is missing")
+
+        def start():
+            guard = x11_backend.X11Guard()
+            runner = threading.Thread(target=guard.start, daemon=True)
+            started = system.clock()
+            runner.start()
+            while not guard.running and runner.is_alive():
+                system.sleep(0.0005)
+            elapsed = system.clock() - started
+            guard.stop()
+            runner.join(5)
+            guard.close()
+            return SelfTimed(elapsed)
+        yield start
+        return
+    keyboard = _pynput(system).keyboard
+
+    def start():
+        listener = keyboard.Listener(on_press=lambda key: None)
+        started = system.clock()
+        listener.start()
+        listener.wait()
+        elapsed = system.clock() - started
+        listener.stop()
+        listener.join(5)
+        return SelfTimed(elapsed)
+    yield start
+
+
+IMPORT_CODE = "import time; t = time.perf_counter(); import {0}; print(time.perf_counter() - t)"
+
+
+@contextmanager
+def _import_time(module: str, system: Facilities) -> Iterator[Call]:
+    if system.frozen:
+        raise ProbeUnavailable("bundled app has no separate interpreter")
+    code = IMPORT_CODE.format(module)
+
+    def measure():
+        # Timed inside the fresh interpreter, without its start-up
+        done = system.python(code)
+        if done.returncode != 0:
+            if "ModuleNotFoundError" in done.stderr or "ImportError" in done.stderr:
+                raise ProbeUnavailable("not installed")
+            raise RuntimeError(done.stderr.strip().splitlines()[-1] if done.stderr.strip() else "import failed")
+        return SelfTimed(float(done.stdout.strip().splitlines()[-1]))
+    yield measure
+
+
+@contextmanager
+def _config_load(config_file: Path) -> Iterator[Call]:
+    if not config_file.exists():
+        raise ProbeUnavailable(f"{config_file} does not exist")
+    config = Config(config_file)
+    yield config.load
+
+
+@contextmanager
+def _config_save(directory: Path) -> Iterator[Call]:
+    # Same directory (and file system) as the real config, but never the real file
+    directory.mkdir(parents=True, exist_ok=True)
+    probe_file = directory / "doctor-probe.json"
+    config = Config(probe_file)
+    try:
+        if CONFIG_FILE.exists():
+            config.update(dict(Config(CONFIG_FILE).load()))
+        yield config.save
+    finally:
+        for path in (probe_file, probe_file.with_name(probe_file.name + ".tmp")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def real_probes(backend: str, system: Optional[Facilities] = None) -> List[Probe]:
+    """
+    Probes against this machine
+
+    Args:
+        backend: Resolved backend ('pynput', 'evdev' or 'x11')
+        system: Facilities the probes use (defaults to this machine's)
+
+    Returns:
+        Probes in the order they run
+    """
+    system = system or Facilities()
+    probes = [
+        Probe("foreground query", "foreground", lambda: _foreground_query(backend, system), 200),
+        Probe("key injection", "injection", lambda: _injection(backend, system), 50),
+        Probe("permission check", "permission", lambda: _permission_check(backend, system), 20),
+        Probe("listener start", "listener", lambda: _listener_start(backend, system), 3),
+        Probe("config load", "config", lambda: _config_load(CONFIG_FILE), 50),
+        Probe("config save", "config", lambda: _config_save(CONFIG_DIR), 20),
+        Probe("import discord_send_guard", "import", lambda: _import_time("discord_send_guard", system), 3),
+    ]
+    probes += [Probe(f"import {module}", "import", lambda module=module: _import_time(module, system), 3)
+               for module in DEPENDENCIES]
+    return probes
+
+
+# Fakes for CI: fixed costs on a fake clock, so the report and its ranking are deterministic
+
+FAKE_COSTS = {
+    "foreground query": 0.0004,
+    "key injection": 0.00015,
+    "permission check": 0.002,
+    "listener start": 0.03,
+}
+
+# Import times reported by the fake interpreter; other dependencies cost FAKE_IMPORT_COST
+FAKE_IMPORT_COSTS = {"discord_send_guard": 0.12, "numpy": 0.08, "pynput": 0.045}
+FAKE_IMPORT_COST = 0.01
+FAKE_MISSING = frozenset(("rumps",))
+
+
+class FakeFacilities(Facilities):
+    """
+    Stand-ins for every facility the real probes use
+
+    Each measured operation advances the fake clock by its FAKE_COSTS
+    entry and is appended to calls, so tests can check what a probe body
+    did. Defaults to macOS, where the pynput probes all apply.
+    """
+
+    def __init__(self, system: str = "Darwin", costs: Optional[Dict[str, float]] = None,
+                 import_costs: Optional[Dict[str, float]] = None, missing=FAKE_MISSING,
+                 pynput_error: Optional[Exception] = None):
+        self.system = system
+        self.frozen = False
+        self.costs = dict(FAKE_COSTS, **(costs or {}))
+        self.import_costs = dict(FAKE_IMPORT_COSTS, **(import_costs or {}))
+        self.missing = frozenset(missing)
+        self.pynput_error = pynput_error
+        self.now = 0.0
+        self.calls: List[str] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+    def spend(self, probe: str, call: str):
+        """Record a call that costs what probe measures"""
+        self.calls.append(call)
+        self.now += self.costs[probe]
+
+    def env(self, name: str) -> str:
+        return ":0" if name == "DISPLAY" else ""
+
+    def can_write(self, path: str) -> bool:
+        return True
+
+    def can_read(self, path: str) -> bool:
+        return True
+
+    def input_devices(self) -> List[str]:
+        return ["/dev/input/event0"]
+
+    def python(self, code: str) -> subprocess.CompletedProcess:
+        module = code.split("; import ", 1)[1].split(";", 1)[0]
+        self.calls.append(f"import {module}")
+        if module in self.missing:
+            return subprocess.CompletedProcess([], 1, "", f"ModuleNotFoundError: No module named '{module}'")
+        return subprocess.CompletedProcess([], 0, f"{self.import_costs.get(module, FAKE_IMPORT_COST)}\n", "")
+
+    def guard_module(self):
+        fake = self
+
+        class Guard:
+            def _query_discord_active(self):
+                fake.spend("foreground query", "query foreground")
+                return True
+
+        class Controller:
+            def press(self, key):
+                fake.calls.append(f"press {key}")
+
+            def release(self, key):
+                fake.spend("key injection", f"release {key}")
+
+        class Listener:
+            def __init__(self, on_press):
+                self.on_press = on_press
+
+            def start(self):
+                fake.calls.append("listener start")
+
+            def wait(self):
+                fake.spend("listener start", "listener live")
+
+            def stop(self):
+                fake.calls.append("listener stop")
+
+            def join(self, timeout=None):
+                pass
+
+        return SimpleNamespace(PYNPUT_IMPORT_ERROR=self.pynput_error, DiscordSendGuard=Guard,
+                               Controller=Controller, Key=SimpleNamespace(shift="shift"),
+                               keyboard=SimpleNamespace(Listener=Listener))
+
+    def evdev_backend(self):
+        fake = self
+
+        class Keyboard:
+            def close(self):
+                fake.calls.append("keyboard close")
+
+        def find_keyboards():
+            fake.spend("listener start", "find keyboards")
+            return [Keyboard()]
+
+        def x11_discord_active():
+            return lambda: fake.spend("foreground query", "query foreground") or True
+
+        return SimpleNamespace(HAS_EVDEV=True, EV_KEY=0x01, KEY_LEFTSHIFT=42,
+                               find_keyboards=find_keyboards, x11_discord_active=x11_discord_active)
+
+    def x11_backend(self):
+        fake = self
+
+        class X11Guard:
+            def __init__(self):
+                self.running = False
+                self.stopped = threading.Event()
+
+            def start(self):
+                fake.spend("listener start", "x11 guard start")
+                self.running = True
+                self.stopped.wait(5)
+
+            def stop(self):
+                fake.calls.append("x11 guard stop")
+                self.stopped.set()
+
+            def close(self):
+                fake.calls.append("x11 guard close")
+
+        return SimpleNamespace(HAS_XLIB=True, X11Guard=X11Guard)
+
+    def uinput(self, capabilities: dict, name: str):
+        fake = self
+
+        class Device:
+            def write(self, kind, code, value):
+                fake.calls.append(f"write {code}={value}")
+
+            def syn(self):
+                fake.spend("key injection", "syn")
+
+            def close(self):
+                fake.calls.append("uinput close")
+
+        self.calls.append(f"uinput {name}")
+        return Device()
+
+    def xlib(self):
+        fake = self
+
+        class Display:
+            def keysym_to_keycode(self, keysym):
+                return 50
+
+            def sync(self):
+                fake.spend("key injection", "x sync")
+
+            def close(self):
+                fake.calls.append("display close")
+
+        def fake_input(client, kind, keycode):
+            fake.calls.append(f"xtest {kind} {keycode}")
+
+        return SimpleNamespace(X=SimpleNamespace(KeyPress=2, KeyRelease=3), XK=SimpleNamespace(XK_Shift_L=0xffe1),
+                               Display=Display, xtest=SimpleNamespace(fake_input=fake_input))
+
+    def accessibility_check(self) -> Callable[[], bool]:
+        return lambda: self.spend("permission check", "accessibility check") or True
+
+    def admin_check(self) -> Callable[[], bool]:
+        return lambda: self.spend("permission check", "admin check") or True
+
+
+def fake_probes(directory: Optional[Path] = None, system: Optional[FakeFacilities] = None) -> List[Probe]:
+    """
+    Deterministic probes for CI
+
+    The real probe bodies for the pynput backend run against
+    FakeFacilities and its clock; one import reports a missing package.
+    Config load/save run the real code, really timed, against a
+    temporary directory (or the given one).
+
+    Args:
+        directory: Where the config probes write
+        system: Fake facilities (defaults to a fake macOS)
+
+    Returns:
+        Probes in the order they run
+    """
+    system = system or FakeFacilities()
+    probes = [probe._replace(clock=system.clock)
+              for probe in real_probes("pynput", system) if probe.category != "config"]
+
+    @contextmanager
+    def config_probe(save: bool) -> Iterator[Call]:
+        with tempfile.TemporaryDirectory(dir=directory) as tmp:
+            config = Config(Path(tmp) / "config.json")
+            yield config.save if save else config.load
+
+    probes.append(Probe("config load", "config", lambda: config_probe(False), 5))
+    probes.append(Probe("config save", "config", lambda: config_probe(True), 5))
+    return probes
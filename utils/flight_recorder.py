@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped flight recorder for Discord Send Guard
+
+Every key event and Enter decision is written as a fixed-size record into
+a preallocated ring file (~/.discord-send-guard/flight.rec) through a
+shared memory map. Records hold only metadata - timestamp, key class
+(enter, a modifier or "other"), modifier mask, Discord/other foreground
+and the decision - never characters. Writes go to the page cache, so the
+last events survive a crash of the guard; a restarted recorder continues
+after the newest record instead of wiping the ring.
+
+read_records() decodes a copy of the ring while the guard keeps writing.
+Each slot carries its sequence number at both ends: a slot overwritten or
+torn mid-read is discarded rather than decoded as garbage.
+"""
+
+import itertools
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from utils.config import CONFIG_DIR
+from utils.state_machine import (
+    KEY_ENTER, KEY_OTHER, KEY_MODIFIER_BITS, ACT_REPEAT_NEWLINE, ACT_DROP, ACT_PASS, ACT_PASSTHROUGH, ACT_SHED,
+)
+
+# Default ring file location
+RECORDER_FILE = CONFIG_DIR / "flight.rec"
+
+DEFAULT_SLOTS = 65536
+
+MAGIC = b"DSGFLT\x00\x01"
+VERSION = 1
+HEADER = struct.Struct("<8sIII")
+HEADER_SIZE = 64
+# seq, time, kind, key class, modifier mask, outcome, foreground, seq check
+RECORD = struct.Struct("<QdBBBBH6xI")
+_RECORD_SIZE = RECORD.size
+_pack_into = RECORD.pack_into
+_now = time.time
+
+# Record kinds
+KIND_DOWN = 1
+KIND_UP = 2
+KIND_DECISION = 3
+KIND_NAMES = {KIND_DOWN: "down", KIND_UP: "up", KIND_DECISION: "decision"}
+
+# Key classes are the state machine's key ids, so a ring can be replayed
+KEY_NAMES = ("enter", "shift", "ctrl", "alt", "cmd", "other")
+KEY_CLASS_ENTER = KEY_ENTER
+KEY_CLASS_BY_BIT = {bit: key_id for key_id, bit in enumerate(KEY_MODIFIER_BITS) if bit}
+KEY_CLASS_BY_BIT[0] = KEY_OTHER
+
+# Foreground at the time of the record
+FG_UNKNOWN = 0
+FG_DISCORD = 1
+FG_OTHER = 2
+FOREGROUND_NAMES = ("unknown", "discord", "other")
+
+# Decision outcomes (pipeline outcomes, then autorepeat/rate-limit actions)
+OUTCOMES = (
+    "none", "passthrough", "converted", "send", "held", "ime_confirm",
+    "outside_composer", "channel_off", "repeat_newline", "repeat_drop", "repeat_pass", "shed",
+)
+OUTCOME_CODES = {name: code for code, name in enumerate(OUTCOMES)}
+OUTCOME_UNKNOWN = 255
+
+# Machine actions of autorepeats and shed Enters
+REPEAT_OUTCOMES = {
+    ACT_REPEAT_NEWLINE: OUTCOME_CODES["repeat_newline"],
+    ACT_DROP: OUTCOME_CODES["repeat_drop"],
+    ACT_PASS: OUTCOME_CODES["repeat_pass"],
+    ACT_PASSTHROUGH: OUTCOME_CODES["repeat_pass"],
+    ACT_SHED: OUTCOME_CODES["shed"],
+}
+
+
+class RecorderError(ValueError):
+    """Ring file missing or not a flight recorder file"""
+
+
+class Record(NamedTuple):
+    """One decoded flight recorder entry"""
+    seq: int
+    t: float
+    kind: str
+    key: str
+    mask: int
+    outcome: str
+    foreground: str
+
+    def as_dict(self) -> dict:
+        return self._asdict()
+
+
+def _file_size(slots: int) -> int:
+    return HEADER_SIZE + slots * RECORD.size
+
+
+class FlightRecorder:
+    """Writes fixed-size records into a memory-mapped ring file"""
+
+    def __init__(self, path: Optional[Path] = None, slots: int = DEFAULT_SLOTS):
+        """
+        Args:
+            path: Ring file (defaults to ~/.discord-send-guard/flight.rec)
+            slots: Records kept; rounded up to a power of two
+        """
+        if slots < 1:
+            raise ValueError("slots must be positive")
+        self.path = Path(path) if path else RECORDER_FILE
+        self.slots = 1 << (slots - 1).bit_length()
+        self.foreground = FG_UNKNOWN
+        self._map: Optional[mmap.mmap] = None
+        self._seq = itertools.count(1)
+        self._slot_mask = self.slots - 1
+
+    @property
+    def is_open(self) -> bool:
+        return self._map is not None
+
+    def open(self):
+        """Map the ring file, creating or resizing it if needed"""
+        if self._map is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        size = _file_size(self.slots)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fresh = os.fstat(fd).st_size != size
+            if not fresh:
+                fresh = os.read(fd, HEADER.size) != HEADER.pack(MAGIC, VERSION, RECORD.size, self.slots)
+            if fresh:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        if fresh:
+            HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, self.slots)
+            newest = 0
+        else:
+            newest = _newest_seq(self._map[:], self.slots)
+        self._seq = itertools.count(newest + 1)
+
+    def close(self):
+        """Flush and unmap the ring file"""
+        if self._map is None:
+            return
+        ring, self._map = self._map, None
+        ring.flush()
+        ring.close()
+
+    def write(self, kind: int, key: int, mask: int, outcome: int = 0, foreground: int = FG_UNKNOWN):
+        """
+        Append one record (safe from several threads)
+
+        Args:
+            kind: KIND_* value
+            key: Key class (state machine KEY_* id)
+            mask: Modifier mask
+            outcome: Index into OUTCOMES
+            foreground: FG_* value
+        """
+        ring = self._map
+        if ring is None:
+            return
+        seq = next(self._seq)
+        _pack_into(ring, HEADER_SIZE + ((seq - 1) & self._slot_mask) * _RECORD_SIZE,
+                   seq, _now(), kind, key, mask, outcome, foreground, seq & 0xFFFFFFFF)
+
+    def key(self, key: int, down: bool, mask: int):
+        """Record a key-down or key-up with the last known foreground (hook thread)"""
+        ring = self._map
+        if ring is None:
+            return
+        seq = next(self._seq)
+        _pack_into(ring, HEADER_SIZE + ((seq - 1) & self._slot_mask) * _RECORD_SIZE,
+                   seq, _now(), KIND_DOWN if down else KIND_UP, key, mask, 0, self.foreground,
+                   seq & 0xFFFFFFFF)
+
+    def decision(self, outcome: str, mask: int):
+        """
+        Pipeline observer: record the outcome of a decided Enter
+
+        Args:
+            outcome: Pipeline outcome ('converted', 'passthrough', ...)
+            mask: Modifier mask of the Enter
+        """
+        if outcome == "passthrough":
+            self.foreground = FG_OTHER
+        elif outcome != "ime_confirm":
+            self.foreground = FG_DISCORD
+        self.write(KIND_DECISION, KEY_ENTER, mask, OUTCOME_CODES.get(outcome, OUTCOME_UNKNOWN),
+                   self.foreground)
+
+    def repeat(self, action: int, mask: int):
+        """Record an autorepeat or shed Enter by its state machine action"""
+        self.write(KIND_DECISION, KEY_ENTER, mask, REPEAT_OUTCOMES.get(action, OUTCOME_UNKNOWN),
+                   self.foreground)
+
+
+def _newest_seq(data: bytes, slots: int) -> int:
+    """Highest valid sequence number in a ring image (0 if empty)"""
+    body = memoryview(data)[HEADER_SIZE:HEADER_SIZE + slots * RECORD.size]
+    return max((fields[0] for slot, fields in enumerate(RECORD.iter_unpack(body))
+                if fields[0] and fields[7] == fields[0] & 0xFFFFFFFF and (fields[0] - 1) % slots == slot),
+               default=0)
+
+
+def _decode(data: bytes, slots: int) -> List[Record]:
+    """Decode the valid slots of a ring image, oldest first"""
+    records = []
+    body = memoryview(data)[HEADER_SIZE:HEADER_SIZE + slots * RECORD.size]
+    for slot, (seq, t, kind, key, mask, outcome, foreground, check) in enumerate(RECORD.iter_unpack(body)):
+        if seq == 0 or check != seq & 0xFFFFFFFF or (seq - 1) % slots != slot or kind not in KIND_NAMES:
+            continue
+        records.append(Record(
+            seq, t, KIND_NAMES[kind],
+            KEY_NAMES[key] if key < len(KEY_NAMES) else str(key),
+            mask,
+            OUTCOMES[outcome] if outcome < len(OUTCOMES) else "unknown",
+            FOREGROUND_NAMES[foreground] if foreground < len(FOREGROUND_NAMES) else "unknown",
+        ))
+    records.sort(key=lambda record: record.seq)
+    return records
+
+
+def read_records(path: Optional[Path] = None, last: Optional[int] = None) -> List[Record]:
+    """
+    Decode the ring file without disturbing a running recorder
+
+    Args:
+        path: Ring file (defaults to ~/.discord-send-guard/flight.rec)
+        last: Only return the newest N records
+
+    Returns:
+        Records, oldest first
+
+    Raises:
+        RecorderError: If the file is missing or not a flight recorder file
+    """
+    path = Path(path) if path else RECORDER_FILE
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER_SIZE:
+                raise RecorderError(f"{path} is not a flight recorder file")
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as ring:
+                data = ring[:]
+    except OSError as e:
+        raise RecorderError(f"Cannot read {path}: {e}") from e
+    magic, version, record_size, slots = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size or size != _file_size(slots):
+        raise RecorderError(f"{path} is not a flight recorder file")
+    records = _decode(data, slots)
+    if last is not None:
+        records = records[-last:] if last > 0 else []
+    return records
+
+
+def format_record(record: Record) -> str:
+    """One human-readable line per record"""
+    stamp = time.strftime("%H:%M:%S", time.localtime(record.t)) + f"{record.t % 1:.6f}"[1:]
+    line = f"{record.seq:>10} {stamp} {record.kind:<8} {record.key:<6} mask={record.mask:<2}"
+    if record.kind == "decision":
+        line += f" {record.outcome:<16} fg={record.foreground}"
+    return line
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Focused-element awareness for Discord Send Guard
+
+Only Discord's message box should turn Enter into a newline; search and
+the quick switcher need a plain Enter. Querying the focused accessibility
+element costs milliseconds, so FocusTracker caches the focused element's
+role and identifier from focus-change notifications and answers the Enter
+path from that cache.
+
+Classification fails safe: only elements positively recognised as search
+or the quick switcher get a plain Enter, so a relabelled composer (or a
+locale without a known label) keeps the guard on.
+"""
+
+import time
+import threading
+import logging
+from typing import Callable, Optional, Sequence
+
+from utils.stats import GuardStats
+
+logger = logging.getLogger(__name__)
+
+# Roles only single-line search inputs have
+NON_COMPOSER_ROLES = ('AXSearchField', 'AXComboBox')
+
+# Identifiers containing, or accessible labels starting with, these belong
+# to inputs where Enter must stay a plain Enter ("Search", "Quick switcher").
+# Labels are matched by prefix so a channel such as "#research" still counts
+# as the composer ("Message #research")
+NON_COMPOSER_MARKERS = ('search', 'quick switcher', 'quick-switcher', '検索', 'クイックスイッチャー')
+
+# How often the cache is cross-checked against a direct query
+AUDIT_INTERVAL = 5.0
+
+
+class FocusedElement:
+    """Role and identifying attributes of a focused UI element"""
+
+    __slots__ = ('role', 'identifier', 'label')
+
+    def __init__(self, role: str = '', identifier: str = '', label: str = ''):
+        self.role = role
+        self.identifier = identifier
+        self.label = label
+
+    def __eq__(self, other):
+        return (isinstance(other, FocusedElement)
+                and (self.role, self.identifier, self.label) == (other.role, other.identifier, other.label))
+
+    def __repr__(self):
+        return f"FocusedElement(role={self.role!r}, identifier={self.identifier!r})"
+
+
+def is_message_composer(element: Optional[FocusedElement],
+                        markers: Sequence[str] = NON_COMPOSER_MARKERS) -> bool:
+    """
+    Check whether an element may be Discord's message composer
+
+    Args:
+        element: Focused element, or None if unknown
+        markers: Lower-cased identifier substrings / label prefixes of
+            elements that are not the composer
+
+    Returns:
+        False only for elements recognised as search or the quick switcher
+    """
+    if element is None:
+        # Unknown focus (no accessibility permission, app not found)
+        return True
+    if element.role in NON_COMPOSER_ROLES:
+        return False
+    identifier = element.identifier.lower()
+    label = element.label.lower()
+    return not any(marker in identifier or label.startswith(marker) for marker in markers)
+
+
+class AXProvider:
+    """
+    Source of focused-element information
+
+    focused_element() is a direct (slow) query; subscribe() registers a
+    callback invoked with the new element on every focus change and
+    returns False if notifications are unavailable.
+    """
+
+    def available(self) -> bool:
+        return True
+
+    def focused_element(self) -> Optional[FocusedElement]:
+        raise NotImplementedError
+
+    def subscribe(self, callback: Callable[[Optional[FocusedElement]], None]) -> bool:
+        raise NotImplementedError
+
+    def unsubscribe(self):
+        pass
+
+
+class FakeAXProvider(AXProvider):
+    """Scripted provider for tests and platforms without accessibility APIs"""
+
+    def __init__(self, element: Optional[FocusedElement] = None, notifications: bool = True):
+        """
+        Args:
+            element: Initially focused element
+            notifications: Whether subscribe() succeeds
+        """
+        self.element = element
+        self.notifications = notifications
+        self.queries = 0
+        self._callback = None
+
+    def focused_element(self) -> Optional[FocusedElement]:
+        self.queries += 1
+        return self.element
+
+    def subscribe(self, callback) -> bool:
+        if not self.notifications:
+            return False
+        self._callback = callback
+        return True
+
+    def unsubscribe(self):
+        self._callback = None
+
+    def focus(self, element: Optional[FocusedElement], notify: bool = True):
+        """
+        Move focus, optionally without delivering the notification
+
+        Args:
+            element: Newly focused element
+            notify: Deliver the focus-change notification
+        """
+        self.element = element
+        if notify and self._callback:
+            self._callback(element)
+
+
+class MacAXProvider(AXProvider):
+    """
+    macOS: AXObserver on Discord's focused-element notifications
+
+    The observer source is added to the main run loop, so notifications
+    only arrive in the menu bar app process. Electron apps expose their
+    accessibility tree only after AXManualAccessibility is set. The
+    observer is bound to one process, so it is re-bound when Discord is
+    launched again and dropped when it quits.
+    """
+
+    def __init__(self, matcher: Callable[[str], bool], run_loop_available: bool = False):
+        """
+        Args:
+            matcher: Returns True for the target app name
+            run_loop_available: Whether a main run loop delivers notifications
+        """
+        self.matcher = matcher
+        self.run_loop_available = run_loop_available
+        self._pid = None
+        self._observer = None
+        self._on_focus = None
+        self._workspace_observers = []
+
+    def available(self) -> bool:
+        try:
+            import ApplicationServices  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _target_pid(self) -> Optional[int]:
+        if self._workspace_observers:
+            # Kept current by the launch/terminate notifications
+            return self._pid
+        from AppKit import NSWorkspace
+        for app in NSWorkspace.sharedWorkspace().runningApplications():
+            if self.matcher((app.localizedName() or '').lower()):
+                return app.processIdentifier()
+        return None
+
+    def _app_element(self, pid: Optional[int] = None):
+        import ApplicationServices as AS
+        if pid is None:
+            pid = self._target_pid()
+        if pid is None:
+            return None, None
+        app = AS.AXUIElementCreateApplication(pid)
+        AS.AXUIElementSetAttributeValue(app, 'AXManualAccessibility', True)
+        return pid, app
+
+    @staticmethod
+    def _describe(element) -> Optional[FocusedElement]:
+        import ApplicationServices as AS
+
+        def attribute(name):
+            err, value = AS.AXUIElementCopyAttributeValue(element, name, None)
+            return str(value) if err == 0 and value is not None else ''
+
+        if element is None:
+            return None
+        return FocusedElement(
+            role=attribute(AS.kAXRoleAttribute),
+            identifier=attribute('AXDOMIdentifier') or attribute(AS.kAXIdentifierAttribute),
+            label=attribute(AS.kAXDescriptionAttribute) or attribute('AXPlaceholderValue'),
+        )
+
+    def focused_element(self) -> Optional[FocusedElement]:
+        import ApplicationServices as AS
+        _, app = self._app_element()
+        if app is None:
+            return None
+        err, element = AS.AXUIElementCopyAttributeValue(app, AS.kAXFocusedUIElementAttribute, None)
+        return self._describe(element) if err == 0 else None
+
+    def subscribe(self, callback) -> bool:
+        if not self.run_loop_available:
+            return False
+        import objc
+        import ApplicationServices as AS
+        from AppKit import (NSWorkspace, NSWorkspaceDidLaunchApplicationNotification,
+                            NSWorkspaceDidTerminateApplicationNotification)
+
+        @objc.callbackFor(AS.AXObserverCreate)
+        def on_focus(observer, element, notification, refcon):
+            callback(self._describe(element))
+
+        def on_launch(notification):
+            app = notification.userInfo()['NSWorkspaceApplicationKey']
+            if self.matcher((app.localizedName() or '').lower()):
+                self._bind(app.processIdentifier())
+                # The new window's focus is not known yet: keep the guard on
+                callback(None)
+
+        def on_terminate(notification):
+            app = notification.userInfo()['NSWorkspaceApplicationKey']
+            if app.processIdentifier() == self._pid:
+                self._unbind()
+                self._pid = None
+                callback(None)
+
+        self._on_focus = on_focus  # Keep the callback alive as long as the observer
+        self._pid = self._target_pid()
+        center = NSWorkspace.sharedWorkspace().notificationCenter()
+        self._workspace_observers = [
+            center.addObserverForName_object_queue_usingBlock_(name, None, None, block)
+            for name, block in ((NSWorkspaceDidLaunchApplicationNotification, on_launch),
+                                (NSWorkspaceDidTerminateApplicationNotification, on_terminate))
+        ]
+        if self._pid is not None:
+            self._bind(self._pid)
+        return True
+
+    def _bind(self, pid: int):
+        """Attach the focus observer to a Discord process (replacing any previous one)"""
+        import ApplicationServices as AS
+        from CoreFoundation import CFRunLoopAddSource, CFRunLoopGetMain, kCFRunLoopDefaultMode
+
+        self._unbind()
+        self._pid = pid
+        _, app = self._app_element(pid)
+        err, observer = AS.AXObserverCreate(pid, self._on_focus, None)
+        if err != 0:
+            logger.debug(f"AXObserverCreate failed for pid {pid}: {err}")
+            return
+        AS.AXObserverAddNotification(observer, app, AS.kAXFocusedUIElementChangedNotification, None)
+        CFRunLoopAddSource(CFRunLoopGetMain(), AS.AXObserverGetRunLoopSource(observer), kCFRunLoopDefaultMode)
+        self._observer = observer
+
+    def _unbind(self):
+        if self._observer is None:
+            return
+        from CoreFoundation import CFRunLoopRemoveSource, CFRunLoopGetMain, kCFRunLoopDefaultMode
+        import ApplicationServices as AS
+        CFRunLoopRemoveSource(CFRunLoopGetMain(), AS.AXObserverGetRunLoopSource(self._observer),
+                              kCFRunLoopDefaultMode)
+        self._observer = None
+
+    def unsubscribe(self):
+        if self._workspace_observers:
+            from AppKit import NSWorkspace
+            center = NSWorkspace.sharedWorkspace().notificationCenter()
+            for observer in self._workspace_observers:
+                center.removeObserver_(observer)
+            self._workspace_observers = []
+        self._unbind()
+        self._on_focus = None
+        self._pid = None
+
+
+class FocusTracker:
+    """
+    Cached "is the message composer focused" flag
+
+    While notifications are flowing every Enter is a cache hit; without
+    them (or after invalidate()) the next Enter pays one direct query.
+    Cache age at each Enter is recorded as the focus_cache_age timing and
+    a background audit compares the cache with a direct query to measure
+    how often it is wrong.
+    """
+
+    def __init__(self, provider: AXProvider, stats: Optional[GuardStats] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 markers: Sequence[str] = NON_COMPOSER_MARKERS):
+        """
+        Initialize tracker
+
+        Args:
+            provider: Focused-element source
+            stats: GuardStats for hit/miss counters and cache age
+            clock: Monotonic clock (injectable for tests)
+            markers: Markers of elements that are not the composer
+        """
+        self.provider = provider
+        self.stats = stats or GuardStats()
+        self.clock = clock
+        self.markers = tuple(marker.lower() for marker in markers)
+        self.element: Optional[FocusedElement] = None
+        self.composer = False
+        self.valid = False
+        self.subscribed = False
+        self.updated_at = clock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, audit_interval: Optional[float] = AUDIT_INTERVAL):
+        """
+        Subscribe to focus changes and prime the cache
+
+        Args:
+            audit_interval: Seconds between background audits (None disables)
+        """
+        self.subscribed = self.provider.subscribe(self.on_focus_changed)
+        self.stats.set_info('focus_notifications', self.subscribed)
+        self.on_focus_changed(self.provider.focused_element())
+        if audit_interval:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run_audits, args=(audit_interval,), name='focus-audit', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Unsubscribe and stop auditing"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.provider.unsubscribe()
+        self.subscribed = False
+
+    def on_focus_changed(self, element: Optional[FocusedElement]):
+        """
+        Focus-change notification handler
+
+        Args:
+            element: Newly focused element
+        """
+        self.element = element
+        self.composer = self._classify(element)
+        self.updated_at = self.clock()
+        # Without notifications the answer is only good for this one Enter
+        self.valid = self.subscribed
+        self.stats.incr('focus_updates')
+
+    def invalidate(self):
+        """Force the next check to query directly (e.g. after an app switch)"""
+        self.valid = False
+
+    def is_message_composer(self) -> bool:
+        """
+        Hot path: whether the message composer has focus
+
+        Returns:
+            Cached flag, refreshed by a direct query on a miss
+        """
+        if self.valid:
+            self.stats.incr('focus_cache_hits')
+            self.stats.observe('focus_cache_age', self.clock() - self.updated_at)
+            return self.composer
+        self.stats.incr('focus_cache_misses')
+        started = time.perf_counter()
+        self.on_focus_changed(self.provider.focused_element())
+        self.stats.observe('focus_query', time.perf_counter() - started)
+        return self.composer
+
+    def audit(self) -> bool:
+        """
+        Compare the cached answer with a direct query
+
+        Returns:
+            True if the cache was correct
+        """
+        if not self.valid:
+            return True
+        element = self.provider.focused_element()
+        self.stats.incr('focus_audits')
+        if self._classify(element) != self.composer:
+            self.stats.incr('focus_audit_mismatches')
+            self.stats.trace('focus_stale', age_ms=round((self.clock() - self.updated_at) * 1e3, 1))
+            self.on_focus_changed(element)
+            return False
+        return True
+
+    def _classify(self, element: Optional[FocusedElement]) -> bool:
+        return is_message_composer(element, self.markers)
+
+    def hit_rate(self) -> float:
+        """Fraction of checks answered from the cache"""
+        hits = self.stats.counters.get('focus_cache_hits', 0)
+        total = hits + self.stats.counters.get('focus_cache_misses', 0)
+        return hits / total if total else 0.0
+
+    def _run_audits(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.audit()
+            except Exception as e:
+                logger.debug(f"Focus audit failed: {e}")
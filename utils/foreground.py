@@ -0,0 +1,726 @@
+#!/usr/bin/env python3
+"""
+Foreground application tracking for Discord Send Guard
+Queries the frontmost app and turns changes into events
+"""
+
+import time
+import platform
+import threading
+import logging
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from utils.browser import DISCORD_APPS, front_window_mac, is_discord_title
+
+logger = logging.getLogger(__name__)
+
+IS_MAC = platform.system() == 'Darwin'
+IS_WINDOWS = platform.system() == 'Windows'
+
+# Poll interval of the fallback watcher
+DEFAULT_POLL_INTERVAL = 0.1
+
+
+def frontmost_app_name() -> str:
+    """
+    Get the name of the frontmost application (window title on Windows)
+
+    Returns:
+        Lower-cased name, or "" if unknown
+    """
+    try:
+        if IS_MAC:
+            from AppKit import NSWorkspace
+            active_app = NSWorkspace.sharedWorkspace().activeApplication()
+            return active_app.get('NSApplicationName', '').lower()
+        if IS_WINDOWS:
+            import win32gui
+            return win32gui.GetWindowText(win32gui.GetForegroundWindow()).lower()
+    except Exception as e:
+        logger.error(f"Error checking active window: {e}")
+    return ''
+
+
+def is_discord_app(name: str) -> bool:
+    """
+    Check whether a frontmost app name belongs to Discord
+
+    Args:
+        name: Lower-cased app name or window title
+
+    Returns:
+        True for a Discord app name or a title set by the Discord client
+    """
+    return name in DISCORD_APPS or is_discord_title(name)
+
+
+class ForegroundWatcher:
+    """Polls the frontmost app on its own thread and reports changes"""
+
+    def __init__(self, on_change: Callable[[str], None],
+                 query: Callable[[], str] = frontmost_app_name,
+                 interval: float = DEFAULT_POLL_INTERVAL):
+        """
+        Initialize watcher
+
+        Args:
+            on_change: Called with the new app name whenever it changes
+                (and once at start)
+            query: Returns the current frontmost app name
+            interval: Poll interval in seconds
+        """
+        self.on_change = on_change
+        self.query = query
+        self.interval = interval
+        self.current: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start polling"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.poll()
+        self._thread = threading.Thread(target=self._run, name='foreground-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def poll(self):
+        """Query once and report a change if there is one"""
+        name = self.query()
+        if name != self.current:
+            self.current = name
+            self.on_change(name)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Foreground watcher error: {e}")
+
+
+class ActivationWatcher:
+    """
+    macOS: reports app activations from NSWorkspace notifications
+
+    Same interface as ForegroundWatcher, but the change is reported as soon
+    as the app is activated instead of up to one poll interval later.
+    Notifications are delivered on the main run loop, so this only works in
+    the menu bar app process.
+    """
+
+    def __init__(self, on_change: Callable[[str], None], run_loop_available: bool = False):
+        """
+        Initialize watcher
+
+        Args:
+            on_change: Called with the new app name on every activation
+                (and once at start)
+            run_loop_available: Whether a main run loop delivers notifications
+        """
+        self.on_change = on_change
+        self.run_loop_available = run_loop_available
+        self._observer = None
+
+    def available(self) -> bool:
+        """Whether notifications can be delivered here"""
+        if not (IS_MAC and self.run_loop_available):
+            return False
+        try:
+            import AppKit  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def start(self):
+        """Report the current app and subscribe to activations"""
+        if self._observer is not None:
+            return
+        from AppKit import NSWorkspace, NSWorkspaceDidActivateApplicationNotification
+
+        def on_activate(notification):
+            app = notification.userInfo()['NSWorkspaceApplicationKey']
+            self.on_change((app.localizedName() or '').lower())
+
+        self.on_change(frontmost_app_name())
+        self._observer = NSWorkspace.sharedWorkspace().notificationCenter().addObserverForName_object_queue_usingBlock_(
+            NSWorkspaceDidActivateApplicationNotification, None, None, on_activate
+        )
+
+    def stop(self):
+        """Unsubscribe"""
+        if self._observer is not None:
+            from AppKit import NSWorkspace
+            NSWorkspace.sharedWorkspace().notificationCenter().removeObserver_(self._observer)
+            self._observer = None
+
+
+# ---------------------------------------------------------------------------
+# Foreground providers and runtime calibration
+# ---------------------------------------------------------------------------
+
+# Default freshness target: the answer used at Enter time may be at most this old
+DEFAULT_FRESHNESS_TARGET = 0.05
+
+# Expected Enter presses per second, used to weigh per-check cost against
+# background cost
+DEFAULT_ENTER_RATE = 0.5
+
+# Calls made per provider during calibration
+CALIBRATION_SAMPLES = 32
+
+# Seconds between periodic recalibrations
+RECALIBRATE_INTERVAL = 300.0
+
+# Enter-time staleness samples kept for recalibration
+STALENESS_SAMPLES = 64
+
+# Attempts at copying the staleness samples while the hook thread appends
+SNAPSHOT_RETRIES = 5
+
+
+class ForegroundProvider:
+    """Answers "is a target app frontmost?" with some cost/freshness trade-off"""
+
+    name = 'provider'
+
+    def available(self) -> bool:
+        """Whether the provider can run here"""
+        return True
+
+    def start(self):
+        """Begin tracking (subscribe or start polling)"""
+
+    def stop(self):
+        """Stop tracking"""
+
+    def is_active(self) -> bool:
+        """Current answer; called on the key callback thread"""
+        raise NotImplementedError
+
+    def age(self) -> float:
+        """Seconds since the answer was last known to be current"""
+        return 0.0
+
+    def max_age(self) -> float:
+        """Worst-case staleness by construction (e.g. the poll interval)"""
+        return 0.0
+
+    def background_cost(self) -> float:
+        """Seconds of work spent per second outside the key callback"""
+        return 0.0
+
+
+class DirectProvider(ForegroundProvider):
+    """Queries the OS on every check: always fresh, costs a query per Enter"""
+
+    name = 'direct'
+
+    def __init__(self, query: Callable[[], bool]):
+        """
+        Args:
+            query: Returns True if a target app is frontmost
+        """
+        self.query = query
+
+    def is_active(self) -> bool:
+        return self.query()
+
+
+class PollingProvider(ForegroundProvider):
+    """Refreshes a cached answer on a background thread"""
+
+    name = 'poll'
+
+    def __init__(self, query: Callable[[], bool], interval: float = DEFAULT_POLL_INTERVAL,
+                 clock: Callable[[], float] = time.perf_counter):
+        """
+        Args:
+            query: Returns True if a target app is frontmost
+            interval: Poll interval in seconds
+            clock: Clock used for ages and query cost
+        """
+        self.query = query
+        self.interval = interval
+        self.clock = clock
+        self._active = False
+        self._updated = 0.0
+        self._query_cost = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name='foreground-poll', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def refresh(self):
+        """Query once and update the cache"""
+        started = self.clock()
+        self._active = self.query()
+        self._updated = self.clock()
+        self._query_cost = self._updated - started
+
+    def is_active(self) -> bool:
+        return self._active
+
+    def age(self) -> float:
+        return self.clock() - self._updated
+
+    def max_age(self) -> float:
+        return self.interval + self._query_cost
+
+    def background_cost(self) -> float:
+        return self._query_cost / self.interval
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Foreground poll error: {e}")
+
+
+class WindowChangeObserver:
+    """
+    macOS: AXObserver for title and focused-window changes of one app
+
+    A browser tab switch or a Discord channel switch changes the window
+    title, so this is enough to re-evaluate the foreground only on change.
+    The observer source is added to the main run loop.
+    """
+
+    NOTIFICATIONS = ('AXTitleChanged', 'AXFocusedWindowChanged', 'AXMainWindowChanged')
+
+    def __init__(self, on_change: Callable[[], None]):
+        """
+        Args:
+            on_change: Called (on the main thread) after every change
+        """
+        self.on_change = on_change
+        self._observer = None
+        self._callback = None
+
+    def watch(self, pid: Optional[int]):
+        """
+        Observe another app (replacing the current one)
+
+        Args:
+            pid: Process ID of the frontmost app, or None to stop observing
+        """
+        self.stop()
+        if pid is None:
+            return
+        import objc
+        import ApplicationServices as AS
+        from CoreFoundation import CFRunLoopAddSource, CFRunLoopGetMain, kCFRunLoopDefaultMode
+
+        @objc.callbackFor(AS.AXObserverCreate)
+        def on_notification(observer, element, notification, refcon):
+            self.on_change()
+
+        err, observer = AS.AXObserverCreate(pid, on_notification, None)
+        if err != 0:
+            logger.debug(f"AXObserverCreate failed for pid {pid}: {err}")
+            return
+        app = AS.AXUIElementCreateApplication(pid)
+        for name in self.NOTIFICATIONS:
+            AS.AXObserverAddNotification(observer, app, name, None)
+        CFRunLoopAddSource(CFRunLoopGetMain(), AS.AXObserverGetRunLoopSource(observer), kCFRunLoopDefaultMode)
+        self._observer = observer
+        self._callback = on_notification  # Keep the callback alive as long as the observer
+
+    def stop(self):
+        """Stop observing"""
+        if self._observer is None:
+            return
+        import ApplicationServices as AS
+        from CoreFoundation import CFRunLoopRemoveSource, CFRunLoopGetMain, kCFRunLoopDefaultMode
+        CFRunLoopRemoveSource(CFRunLoopGetMain(), AS.AXObserverGetRunLoopSource(self._observer),
+                              kCFRunLoopDefaultMode)
+        self._observer = None
+        self._callback = None
+
+
+class FrontWindowCache:
+    """
+    macOS: front window (number, title) per process, kept until a change
+
+    front_window_mac() scans every on-screen window, so under the direct
+    and polling strategies it would run on every Enter or poll. An entry
+    stays valid until an app activation or a title or focused-window change
+    of the frontmost app; without a main run loop those notifications never
+    arrive, so nothing is cached and every lookup queries.
+    """
+
+    def __init__(self, query: Callable[[int], tuple] = front_window_mac,
+                 run_loop_available: bool = False, stats=None):
+        """
+        Args:
+            query: Maps a PID to (window number or None, title)
+            run_loop_available: Whether a main run loop delivers notifications
+            stats: GuardStats for hit/miss counters
+        """
+        self.query = query
+        self.run_loop_available = run_loop_available
+        self.stats = stats
+        self._entries: Dict[int, tuple] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._observer = None
+        self._windows = WindowChangeObserver(self.invalidate)
+
+    @property
+    def caching(self) -> bool:
+        """Whether entries are kept (invalidation notifications are subscribed)"""
+        return self._observer is not None
+
+    def available(self) -> bool:
+        """Whether notifications can be delivered here"""
+        if not (IS_MAC and self.run_loop_available):
+            return False
+        try:
+            import AppKit  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def start(self):
+        """Subscribe to activations and window changes (no-op if unavailable)"""
+        if self._observer is not None or not self.available():
+            return
+        from AppKit import NSWorkspace, NSWorkspaceDidActivateApplicationNotification
+
+        workspace = NSWorkspace.sharedWorkspace()
+
+        def on_activate(notification):
+            app = notification.userInfo()['NSWorkspaceApplicationKey']
+            self.invalidate()
+            self._windows.watch(app.processIdentifier())
+
+        front = workspace.frontmostApplication()
+        self._windows.watch(front.processIdentifier() if front is not None else None)
+        self._observer = workspace.notificationCenter().addObserverForName_object_queue_usingBlock_(
+            NSWorkspaceDidActivateApplicationNotification, None, None, on_activate
+        )
+
+    def stop(self):
+        """Unsubscribe and drop all entries"""
+        if self._observer is not None:
+            from AppKit import NSWorkspace
+            NSWorkspace.sharedWorkspace().notificationCenter().removeObserver_(self._observer)
+            self._observer = None
+        self._windows.stop()
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop all entries (on activation or a window change)"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def lookup(self, pid: int) -> tuple:
+        """
+        Front window of a process, from the cache when still valid
+
+        Args:
+            pid: Owner process ID
+
+        Returns:
+            (window number or None, title)
+        """
+        if self._observer is None:
+            return self.query(pid)
+        with self._lock:
+            entry = self._entries.get(pid)
+            generation = self._generation
+        if entry is not None:
+            if self.stats:
+                self.stats.incr('front_window_hits')
+            return entry
+
+        entry = self.query(pid)
+        with self._lock:
+            # A change that arrived during the query makes the result stale
+            if generation == self._generation:
+                self._entries[pid] = entry
+        if self.stats:
+            self.stats.incr('front_window_misses')
+        return entry
+
+
+class NotificationProvider(ForegroundProvider):
+    """
+    macOS: cached answer updated by NSWorkspace activation notifications
+
+    With a full query (window title, browser tab, channel rules) the answer
+    is re-evaluated on activation and on title or focused-window changes of
+    the frontmost app, so the key callback never queries the window server.
+    Notifications are delivered on the main run loop, so this only works in
+    the menu bar app process.
+    """
+
+    name = 'notification'
+
+    def __init__(self, matcher: Callable[[str], bool] = is_discord_app,
+                 run_loop_available: bool = False, query: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            matcher: Returns True for a target app name (used without query)
+            run_loop_available: Whether a main run loop delivers notifications
+            query: Full foreground check, re-run on every change
+        """
+        self.matcher = matcher
+        self.run_loop_available = run_loop_available
+        self.query = query
+        self._active = False
+        self._observer = None
+        self._windows = WindowChangeObserver(self.refresh) if query is not None else None
+
+    def available(self) -> bool:
+        if not (IS_MAC and self.run_loop_available):
+            return False
+        try:
+            import AppKit  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def start(self):
+        from AppKit import NSWorkspace, NSWorkspaceDidActivateApplicationNotification
+
+        workspace = NSWorkspace.sharedWorkspace()
+
+        def on_activate(notification):
+            app = notification.userInfo()['NSWorkspaceApplicationKey']
+            if self._windows is None:
+                self._active = self.matcher((app.localizedName() or '').lower())
+                return
+            self._windows.watch(app.processIdentifier())
+            self.refresh()
+
+        if self._windows is None:
+            self._active = self.matcher(frontmost_app_name())
+        else:
+            front = workspace.frontmostApplication()
+            self._windows.watch(front.processIdentifier() if front is not None else None)
+            self.refresh()
+        self._observer = workspace.notificationCenter().addObserverForName_object_queue_usingBlock_(
+            NSWorkspaceDidActivateApplicationNotification, None, None, on_activate
+        )
+
+    def stop(self):
+        if self._observer is not None:
+            from AppKit import NSWorkspace
+            NSWorkspace.sharedWorkspace().notificationCenter().removeObserver_(self._observer)
+            self._observer = None
+        if self._windows is not None:
+            self._windows.stop()
+
+    def refresh(self):
+        """Re-run the full query (on a change notification)"""
+        try:
+            self._active = self.query()
+        except Exception as e:
+            logger.error(f"Foreground query error: {e}")
+
+    def is_active(self) -> bool:
+        return self._active
+
+
+class ProviderMeasurement:
+    """Calibration result for one provider"""
+
+    __slots__ = ('name', 'check_cost', 'background_cost', 'staleness', 'mismatches', 'score')
+
+    def __init__(self, name: str, check_cost: float, background_cost: float,
+                 staleness: float, mismatches: int, enter_rate: float):
+        self.name = name
+        self.check_cost = check_cost
+        self.background_cost = background_cost
+        self.staleness = staleness
+        self.mismatches = mismatches
+        # Work per second attributable to the provider
+        self.score = check_cost * enter_rate + background_cost
+
+    def as_dict(self) -> dict:
+        return {
+            "check_us": round(self.check_cost * 1e6, 3),
+            "background_us_per_s": round(self.background_cost * 1e6, 3),
+            "staleness_ms": round(self.staleness * 1e3, 3),
+            "mismatches": self.mismatches,
+        }
+
+
+class AdaptiveForeground:
+    """
+    Picks the cheapest provider that meets a freshness target
+
+    Calibration measures each provider's per-check cost, background cost,
+    and the staleness of its answers (cross-checked against the direct
+    provider). The chosen provider answers is_active() on the hot path.
+    """
+
+    def __init__(self, providers, ground_truth: ForegroundProvider,
+                 freshness_target: float = DEFAULT_FRESHNESS_TARGET,
+                 enter_rate: float = DEFAULT_ENTER_RATE,
+                 clock: Callable[[], float] = time.perf_counter,
+                 stats=None, samples: int = CALIBRATION_SAMPLES):
+        """
+        Args:
+            providers: Candidate providers (ground_truth may be among them)
+            ground_truth: Always-fresh provider used as the reference and fallback
+            freshness_target: Maximum acceptable staleness in seconds
+            enter_rate: Expected Enter presses per second
+            clock: Clock used for all measurements (injectable for tests)
+            stats: GuardStats receiving the choice and measurements
+            samples: Calls per provider during calibration
+        """
+        self.providers = [p for p in providers if p.available()]
+        if ground_truth not in self.providers:
+            self.providers.append(ground_truth)
+        self.ground_truth = ground_truth
+        self.freshness_target = freshness_target
+        self.enter_rate = enter_rate
+        self.clock = clock
+        self.stats = stats
+        self.samples = samples
+        self.current: ForegroundProvider = ground_truth
+        self.measurements: Dict[str, ProviderMeasurement] = {}
+        self._ages = deque(maxlen=STALENESS_SAMPLES)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def strategy(self) -> str:
+        """Name of the provider in use"""
+        return self.current.name
+
+    def is_active(self) -> bool:
+        """Hot path: answer from the chosen provider, noting its staleness"""
+        provider = self.current
+        self._ages.append(provider.age())
+        return provider.is_active()
+
+    def start(self, recalibrate_interval: Optional[float] = RECALIBRATE_INTERVAL):
+        """
+        Calibrate and optionally keep recalibrating on a background thread
+
+        Args:
+            recalibrate_interval: Seconds between recalibrations (None to disable)
+        """
+        self.calibrate()
+        if recalibrate_interval:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(recalibrate_interval,),
+                name='foreground-calibration', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stop recalibrating and stop the chosen provider"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.current.stop()
+
+    def calibrate(self) -> str:
+        """
+        Measure every provider and switch to the best one
+
+        Returns:
+            Name of the chosen provider
+        """
+        observed = self._observed_staleness()
+        measurements = {}
+        for provider in self.providers:
+            if provider is not self.current:
+                provider.start()
+            try:
+                measurements[provider.name] = self._measure(provider)
+            finally:
+                if provider is not self.current:
+                    provider.stop()
+
+        # Staleness actually seen at Enter time counts against the current provider
+        current = measurements.get(self.current.name)
+        if current and observed > current.staleness:
+            current.staleness = observed
+
+        candidates = [
+            m for m in measurements.values()
+            if m.staleness <= self.freshness_target and m.mismatches == 0
+        ]
+        best_name = min(candidates, key=lambda m: (m.score, m.name)).name if candidates \
+            else self.ground_truth.name
+        best = next(p for p in self.providers if p.name == best_name)
+
+        if best is not self.current:
+            best.start()
+            previous, self.current = self.current, best
+            previous.stop()
+            logger.info(f"Foreground strategy: {best.name}")
+        self.measurements = measurements
+        self._ages.clear()
+
+        if self.stats:
+            self.stats.incr('foreground_calibrations')
+            self.stats.set_info('foreground_strategy', best.name)
+            self.stats.set_info('foreground_providers', {
+                name: m.as_dict() for name, m in measurements.items()
+            })
+        return best.name
+
+    def _observed_staleness(self) -> float:
+        """Largest staleness seen at Enter time; the hook thread appends without a lock meanwhile"""
+        for _ in range(SNAPSHOT_RETRIES):
+            try:
+                ages = tuple(self._ages)
+            except RuntimeError:
+                # "deque mutated during iteration"
+                continue
+            return max(ages) if ages else 0.0
+        return 0.0
+
+    def _measure(self, provider: ForegroundProvider) -> ProviderMeasurement:
+        total = 0.0
+        staleness = provider.max_age()
+        mismatches = 0
+        for _ in range(self.samples):
+            staleness = max(staleness, provider.age())
+            started = self.clock()
+            answer = provider.is_active()
+            total += self.clock() - started
+            if provider is not self.ground_truth and answer != self.ground_truth.is_active():
+                mismatches += 1
+        return ProviderMeasurement(
+            provider.name, total / self.samples, provider.background_cost(),
+            staleness, mismatches, self.enter_rate
+        )
+
+    def _run(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.calibrate()
+            except Exception as e:
+                logger.error(f"Foreground calibration error: {e}")
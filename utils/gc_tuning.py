@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Garbage collector tuning for the keyboard hook
+Freezes the startup heap, raises collection thresholds and records
+collection pauses into GuardStats
+
+Freezing and thresholds are process-wide, so they are only applied when
+the guard owns the process (the CLI or the isolated hook process); inside
+the menu bar app only the pauses are recorded.
+"""
+
+import gc
+import time
+import logging
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Generation thresholds for the hook. The steady-state heap is tiny, so
+# collections are rare and cheap once the startup objects are frozen.
+HOOK_GC_THRESHOLDS = (10000, 20, 20)
+
+# Pauses longer than this are added to the trace for correlation with
+# slow key callbacks
+TRACE_PAUSE_SECONDS = 0.001
+
+
+class GCPauseRecorder:
+    """Records garbage collection pauses via gc.callbacks"""
+
+    def __init__(self, stats):
+        """
+        Initialize recorder
+
+        Args:
+            stats: GuardStats receiving "gc_gen<N>" timings and "gc_pause" traces
+        """
+        self.stats = stats
+        self._started = 0.0
+        self._installed = False
+        # Process-wide state changed by prepare_hook_gc, undone by uninstall()
+        self.previous_thresholds: Optional[Tuple[int, int, int]] = None
+        self.froze_heap = False
+
+    @property
+    def installed(self) -> bool:
+        """Whether the callback is registered"""
+        return self._installed
+
+    def install(self):
+        """Register the callback"""
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self):
+        """Unregister the callback and restore the thresholds and heap it was prepared with"""
+        if self._installed:
+            try:
+                gc.callbacks.remove(self._callback)
+            except ValueError:
+                pass
+            self._installed = False
+        if self.previous_thresholds is not None:
+            gc.set_threshold(*self.previous_thresholds)
+            self.previous_thresholds = None
+        if self.froze_heap:
+            # Objects frozen at start that have since been replaced (pipelines,
+            # providers) can only be reclaimed once thawed
+            thaw_heap()
+            self.froze_heap = False
+
+    def _callback(self, phase: str, info: dict):
+        if phase == 'start':
+            self._started = time.perf_counter()
+            return
+        pause = time.perf_counter() - self._started
+        generation = info.get('generation', 0)
+        self.stats.observe(f'gc_gen{generation}', pause)
+        if pause >= TRACE_PAUSE_SECONDS:
+            self.stats.trace(
+                'gc_pause',
+                generation=generation,
+                pause_us=round(pause * 1e6, 1),
+                collected=info.get('collected', 0),
+            )
+
+
+def freeze_heap() -> int:
+    """
+    Collect once, then move every surviving object to the permanent generation
+
+    Returns:
+        Number of frozen objects (0 if gc.freeze is unavailable)
+    """
+    gc.collect()
+    if not hasattr(gc, 'freeze'):
+        return 0
+    gc.freeze()
+    return gc.get_freeze_count()
+
+
+def thaw_heap():
+    """
+    Return all frozen objects to the oldest generation
+
+    This unfreezes every object in the process, including ones frozen by
+    someone else; prefer GCPauseRecorder.uninstall(), which only thaws a
+    heap prepare_hook_gc froze.
+    """
+    if hasattr(gc, 'unfreeze'):
+        gc.unfreeze()
+
+
+def tune_thresholds(thresholds: Tuple[int, int, int] = HOOK_GC_THRESHOLDS) -> Tuple[int, int, int]:
+    """
+    Set collection thresholds
+
+    Args:
+        thresholds: New (gen0, gen1, gen2) thresholds
+
+    Returns:
+        Previous thresholds
+    """
+    previous = gc.get_threshold()
+    gc.set_threshold(*thresholds)
+    return previous
+
+
+def prepare_hook_gc(stats, thresholds: Optional[Tuple[int, int, int]] = HOOK_GC_THRESHOLDS,
+                    freeze: bool = True) -> GCPauseRecorder:
+    """
+    Startup phase for the hook: freeze, tune and start recording pauses
+
+    Call after initialization, right before the listener starts. The
+    returned recorder's uninstall() restores the previous thresholds and
+    thaws what was frozen here.
+
+    Args:
+        stats: GuardStats receiving the pause timings
+        thresholds: Thresholds to apply (None keeps the current ones)
+        freeze: Freeze the startup heap. Skipped anyway if something else
+            already froze objects, since thawing would unfreeze those too
+
+    Returns:
+        Installed GCPauseRecorder
+    """
+    recorder = GCPauseRecorder(stats)
+    frozen = 0
+    if freeze and hasattr(gc, 'freeze') and gc.get_freeze_count() == 0:
+        frozen = freeze_heap()
+        recorder.froze_heap = True
+    if thresholds:
+        recorder.previous_thresholds = tune_thresholds(thresholds)
+    recorder.install()
+    stats.set('gc_frozen_objects', frozen)
+    logger.info(f"GC prepared for hook: {frozen} objects frozen, thresholds {gc.get_threshold()}")
+    return recorder
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Run the keyboard hook in a dedicated lightweight process
+
+The child imports only the hook dependencies (discord_send_guard with the
+utils modules its enabled features need, and pynput; not the GUI, AppKit
+app code or numpy), so key callbacks never wait for the GUI process's GIL.
+Config and commands travel over one pipe. Counters and timings are
+mirrored into a fixed-layout shared-memory block that the GUI process
+reads on demand; only changed info entries and new trace entries are
+sent back over a second pipe, so publishing costs the hook process a few
+struct writes per interval, not a pickled snapshot.
+"""
+
+import time
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from utils.stats import DEFAULT_TRACE_SIZE, SharedStatsBlock
+
+logger = logging.getLogger(__name__)
+
+# How often the child publishes its statistics
+STATS_PUBLISH_INTERVAL = 0.25
+
+# How long stop() waits for the child before terminating it
+STOP_TIMEOUT = 2.0
+
+# Config keys forwarded to the hook process
+HOOK_CONFIG_KEYS = (
+    'debug', 'gc_tuning', 'raise_priority', 'scoped_activation',
+    'foreground_strategy', 'freshness_target_ms', 'ime_awareness',
+    'composer_only', 'channel_rules', 'keybindings', 'decision_trace',
+    'enter_lookahead_ms', 'storm_protection', 'enter_rate_limit', 'enter_burst',
+    'flight_recorder', 'flight_recorder_slots',
+)
+
+
+def _hook_config(config) -> Dict[str, Any]:
+    """Extract the hook-relevant subset of a Config or dict"""
+    return {key: config.get(key) for key in HOOK_CONFIG_KEYS if config.get(key) is not None}
+
+
+class StatsPublisher:
+    """Child side of the statistics: the shared block plus info and trace changes over a pipe"""
+
+    def __init__(self, stats, block: SharedStatsBlock, stats_conn):
+        """
+        Args:
+            stats: GuardStats of the hook process
+            block: Shared block the parent reads
+            stats_conn: Child end of the statistics pipe
+        """
+        self.stats = stats
+        self.block = block
+        self.stats_conn = stats_conn
+        self._info: Dict[str, Any] = {}
+        self._trace_seen = 0
+
+    def publish(self) -> bool:
+        """
+        Publish what changed since the last call
+
+        Returns:
+            False if the parent is gone
+        """
+        self.block.publish(self.stats)
+        info = self.stats.copy()[1]
+        changed = {name: value for name, value in info.items()
+                   if name not in self._info or self._info[name] != value}
+        removed = [name for name in self._info if name not in info]
+        self._trace_seen, entries = self.stats.trace_since(self._trace_seen)
+        if not (changed or removed or entries):
+            return True
+        self._info = info
+        try:
+            self.stats_conn.send((changed, removed, entries))
+            return True
+        except (OSError, ValueError):
+            return False
+
+
+def _hook_main(conn, stats_conn, stats_buffer, config: Dict[str, Any]):
+    """
+    Entry point of the hook process
+
+    Args:
+        conn: Child end of the command pipe
+        stats_conn: Child end of the statistics pipe
+        stats_buffer: Shared memory for a SharedStatsBlock
+        config: Initial hook configuration
+    """
+    from discord_send_guard import DiscordSendGuard
+
+    guard = DiscordSendGuard(debug=config.get('debug', False))
+    guard.apply_config(config)
+    stopped = threading.Event()
+    publisher = StatsPublisher(guard.stats, SharedStatsBlock(stats_buffer), stats_conn)
+
+    def read_commands():
+        while not stopped.is_set():
+            try:
+                command, value = conn.recv()
+            except (EOFError, OSError):
+                command, value = 'stop', None
+            if command == 'config':
+                guard.apply_config(value)
+            elif command == 'enabled':
+                guard.enabled = value
+            elif command == 'stop':
+                stopped.set()
+                guard.stop()
+
+    def publish():
+        while not stopped.wait(STATS_PUBLISH_INTERVAL):
+            if not publisher.publish():
+                return
+        publisher.publish()
+
+    threading.Thread(target=read_commands, name='hook-commands', daemon=True).start()
+    publish_thread = threading.Thread(target=publish, name='hook-stats', daemon=True)
+    publish_thread.start()
+
+    try:
+        if not stopped.is_set():
+            guard.start()
+    finally:
+        stopped.set()
+        publish_thread.join(timeout=1)
+
+
+class RemoteStats:
+    """GuardStats-compatible read-only view of the hook process's statistics"""
+
+    def __init__(self, block: Optional[SharedStatsBlock] = None):
+        """
+        Args:
+            block: Shared block written by the hook process (None until it starts)
+        """
+        self.block = block
+        self._info: Dict[str, Any] = {}
+        self._trace = deque(maxlen=DEFAULT_TRACE_SIZE)
+        self._lock = threading.Lock()
+
+    def update(self, changed: Dict[str, Any], removed: List[str], entries: List[Dict[str, Any]]):
+        """Apply info changes and new trace entries received from the hook process"""
+        with self._lock:
+            self._info.update(changed)
+            for name in removed:
+                self._info.pop(name, None)
+            self._trace.extend(entries)
+
+    def snapshot(self) -> Dict[str, Any]:
+        if self.block is None:
+            snapshot = {"uptime": 0.0, "counters": {}, "timings": {}}
+        else:
+            snapshot = self.block.read()
+        with self._lock:
+            snapshot["info"] = dict(self._info)
+        return snapshot
+
+    def trace_snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._trace)
+
+
+class HookProcess:
+    """
+    Thin controller for a DiscordSendGuard running in a child process
+
+    Exposes the same start()/stop()/apply_config()/stats/enabled/running
+    surface as DiscordSendGuard so the GUI can use either.
+    """
+
+    def __init__(self, config, context: Optional[str] = 'spawn', target=None):
+        """
+        Initialize controller
+
+        Args:
+            config: Config instance or dict used for the hook process
+            context: multiprocessing start method. "spawn" keeps the child
+                free of modules the GUI process has already imported.
+            target: Child entry point (for tests)
+        """
+        self._ctx = multiprocessing.get_context(context)
+        self._target = target or _hook_main
+        self._config = _hook_config(config)
+        self._enabled = True
+        self._conn = None
+        self._process = None
+        self._lock = threading.RLock()
+        self.stats = RemoteStats()
+
+    @property
+    def running(self) -> bool:
+        """Whether the hook process is alive"""
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def pid(self) -> Optional[int]:
+        """PID of the hook process"""
+        return self._process.pid if self._process else None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether Enter conversion is enabled in the hook process"""
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enabled = value
+        self._send('enabled', value)
+
+    def start(self):
+        """Start the hook process and block until it exits"""
+        with self._lock:
+            if self.running:
+                logger.warning("Hook process already running")
+                return
+            parent_conn, child_conn = self._ctx.Pipe()
+            stats_reader, stats_writer = self._ctx.Pipe(duplex=False)
+            stats_buffer = self._ctx.RawArray('B', SharedStatsBlock.SIZE)
+            self.stats = RemoteStats(SharedStatsBlock(stats_buffer))
+            self._conn = parent_conn
+            self._process = self._ctx.Process(
+                target=self._target,
+                args=(child_conn, stats_writer, stats_buffer, self._config),
+                name='discord-send-guard-hook',
+                daemon=True,
+            )
+            started = time.perf_counter()
+            self._process.start()
+            child_conn.close()
+            stats_writer.close()
+            if not self._enabled:
+                self._send('enabled', False)
+            logger.info(f"Hook process started (pid {self._process.pid}, "
+                        f"{(time.perf_counter() - started) * 1000:.1f} ms)")
+
+        receiver = threading.Thread(target=self._receive_stats, args=(stats_reader,),
+                                    name='hook-stats-receiver', daemon=True)
+        receiver.start()
+        self._process.join()
+        receiver.join(timeout=STOP_TIMEOUT)
+        stats_reader.close()
+        logger.info(f"Hook process exited with code {self._process.exitcode}")
+
+    def _receive_stats(self, stats_reader):
+        """Apply info and trace updates until the child closes its end"""
+        while True:
+            try:
+                self.stats.update(*stats_reader.recv())
+            except (EOFError, OSError):
+                return
+
+    def stop(self):
+        """Ask the hook process to stop, terminating it if it does not"""
+        process = self._process
+        if process is None or not process.is_alive():
+            return
+        self._send('stop', None)
+        process.join(timeout=STOP_TIMEOUT)
+        if process.is_alive():
+            logger.warning("Hook process did not stop, terminating")
+            process.terminate()
+            process.join(timeout=STOP_TIMEOUT)
+
+    def apply_config(self, config):
+        """
+        Forward configuration to the hook process
+
+        Args:
+            config: Config instance or dict
+        """
+        self._config = _hook_config(config)
+        self._send('config', self._config)
+
+    def _send(self, command: str, value: Any):
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.send((command, value))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Hook process unreachable ({command}): {e}")
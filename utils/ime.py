@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+IME composition awareness
+
+With a Japanese (or other composing) input method, Enter confirms the
+conversion instead of sending. CompositionTracker keeps a cached view of
+the input source and composition state so the Enter path only reads one
+attribute; the state is driven by input-source change notifications, a
+backend-provided composition flag, or the keys the hook already sees.
+"""
+
+import ctypes
+import platform
+import threading
+import logging
+from typing import Callable, Optional
+
+from utils.stats import GuardStats
+
+logger = logging.getLogger(__name__)
+
+IS_MAC = platform.system() == 'Darwin'
+IS_WINDOWS = platform.system() == 'Windows'
+
+# Key kinds fed to CompositionTracker.on_key
+KEY_CHAR = 'char'
+KEY_BACKSPACE = 'backspace'
+KEY_ESCAPE = 'escape'
+KEY_OTHER = 'other'
+
+# Input source IDs of composing input methods contain one of these...
+IME_SOURCE_MARKERS = ('inputmethod', 'windows.ime')
+# ...unless they name the method's direct (non-composing) mode
+DIRECT_MODE_SUFFIXES = ('.roman', '.abc', '.alphanumeric', '.direct')
+
+# How often InputSourceWatcher polls where no notification exists
+SOURCE_POLL_INTERVAL = 0.25
+
+# Windows IMM constants
+WM_IME_CONTROL = 0x0283
+IMC_GETCONVERSIONMODE = 0x0001
+IMC_GETOPENSTATUS = 0x0005
+IME_CMODE_NATIVE = 0x0001
+
+# macOS distributed notification posted when the input source changes
+MAC_SOURCE_CHANGED = 'com.apple.Carbon.TISNotifySelectedKeyboardInputSourceChanged'
+
+
+def is_ime_source(source_id: str) -> bool:
+    """
+    Check whether an input source composes text before committing it
+
+    Args:
+        source_id: Input source ID from read_input_source()
+
+    Returns:
+        True for a composing input method in its composing mode
+    """
+    source_id = source_id.lower()
+    if not any(marker in source_id for marker in IME_SOURCE_MARKERS):
+        return False
+    return not source_id.endswith(DIRECT_MODE_SUFFIXES)
+
+
+class CompositionTracker:
+    """
+    Cached IME state for the Enter path
+
+    Without a backend-provided composition flag, composition is inferred
+    from keystrokes while a composing input source is selected: a printable
+    key opens (or extends) the composition, Backspace shrinks it, Escape
+    cancels it and Enter confirms it.
+    """
+
+    def __init__(self, stats: Optional[GuardStats] = None):
+        """
+        Initialize tracker
+
+        Args:
+            stats: GuardStats for IME counters
+        """
+        self.stats = stats or GuardStats()
+        self.source_id = ''
+        self.ime_active = False
+        self.composing = False
+        self.pending = 0  # Characters typed into the current composition
+        self.authoritative = False  # A backend reports composition directly
+
+    def set_input_source(self, source_id: str):
+        """
+        Handle an input-source change notification
+
+        Args:
+            source_id: New input source ID
+        """
+        if source_id == self.source_id:
+            return
+        self.source_id = source_id
+        self.ime_active = is_ime_source(source_id)
+        if not self.ime_active and not self.authoritative:
+            self._end()
+        self.stats.set_info('input_source', source_id)
+        self.stats.trace('input_source', ime=self.ime_active)
+
+    def set_composing(self, composing: bool):
+        """
+        Backend-provided composition flag (takes over from key inference)
+
+        Args:
+            composing: Whether marked text is currently being composed
+        """
+        self.authoritative = True
+        self.composing = composing
+        self.pending = 0
+
+    def on_key(self, kind: str):
+        """
+        Infer composition from a non-Enter key press
+
+        Args:
+            kind: KEY_CHAR, KEY_BACKSPACE, KEY_ESCAPE or KEY_OTHER
+        """
+        if self.authoritative or not self.ime_active:
+            return
+        if kind == KEY_CHAR:
+            self.composing = True
+            self.pending += 1
+        elif not self.composing:
+            return
+        elif kind == KEY_BACKSPACE:
+            self.pending -= 1
+            if self.pending <= 0:
+                self._end()
+        elif kind == KEY_ESCAPE:
+            self._end()
+
+    def enter_confirms_composition(self) -> bool:
+        """
+        Hot path: called for every Enter press
+
+        Returns:
+            True if this Enter confirms a composition and must pass untouched
+        """
+        if not self.composing:
+            return False
+        if not self.authoritative:
+            self._end()
+        self.stats.incr('ime_confirms')
+        return True
+
+    def _end(self):
+        self.composing = False
+        self.pending = 0
+
+
+def read_input_source() -> str:
+    """
+    Read the current input source ID
+
+    Returns:
+        Platform input source ID, or an empty string if unknown
+    """
+    try:
+        if IS_MAC:
+            return _read_input_source_mac()
+        if IS_WINDOWS:
+            return _read_input_source_windows()
+    except Exception as e:
+        logger.debug(f"Cannot read input source: {e}")
+    return ''
+
+
+def _read_input_source_mac() -> str:
+    # Text Input Source Services must be used on the main thread
+    carbon = ctypes.cdll.LoadLibrary('/System/Library/Frameworks/Carbon.framework/Carbon')
+    cf = ctypes.cdll.LoadLibrary('/System/Library/Frameworks/CoreFoundation.framework/CoreFoundation')
+    carbon.TISCopyCurrentKeyboardInputSource.restype = ctypes.c_void_p
+    carbon.TISGetInputSourceProperty.restype = ctypes.c_void_p
+    carbon.TISGetInputSourceProperty.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+    cf.CFStringGetCString.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_long, ctypes.c_uint32]
+    cf.CFRelease.argtypes = [ctypes.c_void_p]
+
+    source = carbon.TISCopyCurrentKeyboardInputSource()
+    try:
+        key = ctypes.c_void_p.in_dll(carbon, 'kTISPropertyInputSourceID')
+        value = carbon.TISGetInputSourceProperty(source, key)
+        buffer = ctypes.create_string_buffer(256)
+        cf.CFStringGetCString(value, buffer, len(buffer), 0x08000100)  # UTF-8
+        return buffer.value.decode()
+    finally:
+        cf.CFRelease(source)
+
+
+def _read_input_source_windows() -> str:
+    user32 = ctypes.windll.user32
+    imm32 = ctypes.windll.imm32
+    hwnd = user32.GetForegroundWindow()
+    thread_id = user32.GetWindowThreadProcessId(hwnd, None)
+    language = user32.GetKeyboardLayout(thread_id) & 0xFFFF
+
+    ime_window = imm32.ImmGetDefaultIMEWnd(hwnd)
+    if not ime_window:
+        return f'windows.keyboard.{language:04x}'
+    is_open = user32.SendMessageW(ime_window, WM_IME_CONTROL, IMC_GETOPENSTATUS, 0)
+    mode = user32.SendMessageW(ime_window, WM_IME_CONTROL, IMC_GETCONVERSIONMODE, 0)
+    if is_open and mode & IME_CMODE_NATIVE:
+        return f'windows.ime.{language:04x}.native'
+    return f'windows.ime.{language:04x}.direct'
+
+
+class InputSourceWatcher:
+    """
+    Feeds input-source changes into a CompositionTracker
+
+    macOS: distributed notifications on the main run loop (menu bar app
+    only; the CLI reads the source once at start). Windows: the IME open
+    status and conversion mode are polled, since they change without a
+    notification reaching other processes.
+    """
+
+    def __init__(self, tracker: CompositionTracker, run_loop_available: bool = False,
+                 read: Callable[[], str] = read_input_source,
+                 interval: float = SOURCE_POLL_INTERVAL):
+        """
+        Args:
+            tracker: Tracker to update
+            run_loop_available: Whether a main run loop delivers notifications
+            read: Returns the current input source ID
+            interval: Poll interval in seconds
+        """
+        self.tracker = tracker
+        self.run_loop_available = run_loop_available
+        self.read = read
+        self.interval = interval
+        self._observer = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Read the current source and subscribe to changes"""
+        if IS_MAC and self.run_loop_available:
+            # The hook thread is not the main thread; read where TIS allows it
+            from Foundation import NSOperationQueue
+            NSOperationQueue.mainQueue().addOperationWithBlock_(self.poll)
+            self._subscribe_mac()
+            return
+        self.tracker.set_input_source(self.read())
+        if IS_WINDOWS:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='input-source-poll', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Unsubscribe and stop polling"""
+        if self._observer is not None:
+            from Foundation import NSDistributedNotificationCenter
+            NSDistributedNotificationCenter.defaultCenter().removeObserver_(self._observer)
+            self._observer = None
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def poll(self):
+        """Read the source once and update the tracker"""
+        self.tracker.set_input_source(self.read())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def _subscribe_mac(self):
+        from Foundation import NSDistributedNotificationCenter
+
+        def on_change(notification):
+            self.poll()
+
+        self._observer = NSDistributedNotificationCenter.defaultCenter().addObserverForName_object_queue_usingBlock_(
+            MAC_SOURCE_CHANGED, None, None, on_change
+        )
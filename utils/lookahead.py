@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Enter lookahead for Discord Send Guard
+
+Pressing Cmd a few milliseconds after Enter (instead of before) turns a
+send into a newline, because the Enter is decided on its own key-down.
+With a lookahead window the Enter is held instead: a modifier arriving
+within the window resolves it immediately with the new chord, any other
+key flushes it first so typing order is kept, and otherwise a timer on
+the guard's TimerWheel resolves it as it was when the window ends. The
+hook thread never waits, and every held Enter is resolved exactly once.
+"""
+
+import threading
+from typing import Callable, Optional
+
+# Upper bound for the configurable window
+MAX_WINDOW = 0.1
+
+
+class EnterLookahead:
+    """
+    At most one held Enter, resolved by a modifier, another key or a timer
+    """
+
+    def __init__(self, scheduler, window: float, resolve: Callable[[int], None], stats=None):
+        """
+        Args:
+            scheduler: TimerWheel used for the window deadline
+            window: Seconds an Enter may be held (clamped to MAX_WINDOW)
+            resolve: Called with the modifier mask that decides the Enter,
+                on the hook thread or the scheduler thread
+            stats: GuardStats for lookahead counters and the added latency
+        """
+        self.scheduler = scheduler
+        self.window = min(max(window, 0.0), MAX_WINDOW)
+        self.resolve = resolve
+        self.stats = stats
+        self._lock = threading.Lock()
+        self._held = None  # (timer, held_at, mask, token)
+
+    @property
+    def pending(self) -> bool:
+        return self._held is not None
+
+    def hold(self, mask: int):
+        """
+        Hold an Enter until the window ends or resolve_now() is called
+
+        A still-held Enter is resolved first.
+
+        Args:
+            mask: Modifier mask at the Enter key-down
+        """
+        self.resolve_now(reason='flushed')
+        # The wheel fires at the first tick at or after the deadline, so
+        # aim one tick early to keep the window an upper bound
+        delay = max(self.window - self.scheduler.tick, 0.0)
+        held_at = self.scheduler.clock()
+        token = object()
+        with self._lock:
+            timer = self.scheduler.schedule(delay, self._expire, token)
+            self._held = (timer, held_at, mask, token)
+        if self.stats:
+            self.stats.incr('lookahead_held')
+
+    def resolve_now(self, mask: Optional[int] = None, reason: str = 'upgraded') -> bool:
+        """
+        Resolve the held Enter now
+
+        Args:
+            mask: Mask to decide with (None keeps the mask at key-down)
+            reason: 'upgraded' for a modifier, 'flushed' for another key
+
+        Returns:
+            True if an Enter was held
+        """
+        with self._lock:
+            held, self._held = self._held, None
+        if held is None:
+            return False
+        timer, held_at, held_mask, _ = held
+        self.scheduler.cancel(timer)
+        self._finish(held_at, held_mask if mask is None else mask, reason)
+        return True
+
+    def _expire(self, token: object):
+        with self._lock:
+            held = self._held
+            if held is None or held[3] is not token:
+                # Already resolved by a key on the hook thread
+                return
+            self._held = None
+        _, held_at, mask, _ = held
+        self._finish(held_at, mask, 'expired')
+
+    def _finish(self, held_at: float, mask: int, reason: str):
+        if self.stats:
+            self.stats.incr(f'lookahead_{reason}')
+            self.stats.observe('lookahead_delay', self.scheduler.clock() - held_at)
+        self.resolve(mask)
@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+Differential replay of the guard between two versions
+
+Two versions are loaded side by side from git revisions or source trees,
+and the same key-event stream is stepped through both: synthetic, a
+flight recorder ring or a JSON-lines recording. Every event whose outcome
+differs is reported with the events leading up to it, and each version's
+throughput is measured on identical chunks.
+
+Two engines are available:
+
+- GuardEngine drives each version's DiscordSendGuard.on_press/on_release
+  with a fake keyboard controller and a fake foreground, so everything on
+  the Enter path (pipeline stages, keybindings, autorepeat and storm
+  handling, channel and IME filters as configured) is compared, for any
+  revision that has discord_send_guard.py. The outcome of an event is
+  what reaches the app: the original key passed or not, plus the
+  newlines and sends injected while handling it or by timers that fire
+  before the next event.
+- Engine steps only utils/state_machine.py (with the utils/config.py it
+  builds on). It is much faster, but it sees nothing outside the state
+  machine and needs a revision that has one.
+
+Limits of the guard engine: the foreground is the stream's discord flag
+(window titles, browser tabs and channel rules are not replayed), IME
+composition and focus tracking are off, and timers are flushed after
+every event, so the Enter lookahead is replayed off.
+
+Events are read and evaluated in fixed-size chunks, so memory stays
+bounded however long the stream is. Revisions are read with the local
+git, so nothing needs the network, a display or input devices.
+"""
+
+import enum
+import gzip
+import importlib
+import io
+import itertools
+import json
+import random
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Project root (the working tree)
+ROOT = Path(__file__).resolve().parent.parent
+
+# extractall(filter=...) was backported to security releases only
+HAS_DATA_FILTER = hasattr(tarfile, "data_filter")
+
+# Key ids shared by every version of the state machine (and the flight recorder)
+KEY_NAMES = ("enter", "shift", "ctrl", "alt", "cmd", "other")
+KEY_IDS = {name: key_id for key_id, name in enumerate(KEY_NAMES)}
+KEY_ENTER = KEY_IDS["enter"]
+KEY_OTHER = KEY_IDS["other"]
+
+# Modifier bit per key id (the bits of utils.config)
+KEY_MODIFIER_BITS = (0, 1, 2, 4, 8, 0)
+
+# Modules a loaded version brings along; each version gets its own copies
+ISOLATED_MODULES = ("utils", "backends", "discord_send_guard")
+
+# Seconds of replay time the guard engine lets pass after an event, so
+# its timers (coalesced newlines) fire before the next one
+SETTLE_SECONDS = 1.0
+
+DEFAULT_CHUNK = 65536
+DEFAULT_CONTEXT = 8
+
+
+class ReplayError(ValueError):
+    """A version cannot be loaded or a recording cannot be read"""
+
+
+class Event(NamedTuple):
+    """One key event as the state machine sees it"""
+    t: float
+    key: int
+    down: bool
+    discord: bool
+
+
+class Difference(NamedTuple):
+    """An event the two versions decided differently"""
+    index: int
+    event: Event
+    mask: int  # Modifier mask in effect at the event
+    action_a: str
+    action_b: str
+    context: Tuple[Event, ...]  # Events just before, oldest first
+
+
+class ReplayReport(NamedTuple):
+    """Outcome of a differential replay"""
+    events: int
+    differences: int
+    shown: List[Difference]  # The first max_differences differences
+    pairs: Counter  # (action_a, action_b) -> count
+    seconds_a: float
+    seconds_b: float
+
+
+@contextmanager
+def source_tree(source: str, root: Path = ROOT, required: str = "utils/state_machine.py",
+                paths: Tuple[str, ...] = ("utils",)) -> Iterator[Path]:
+    """
+    Directory holding the sources of a version
+
+    Args:
+        source: Source tree (a directory) or a git revision
+        root: Repository for git revisions
+        required: File the version must have
+        paths: Paths extracted from a git revision
+
+    Yields:
+        Directory to import from
+    """
+    path = Path(source)
+    if (path / required).is_file():
+        yield path
+        return
+    try:
+        archive = subprocess.run(
+            ["git", "-C", str(root), "archive", "--format=tar", source, *paths],
+            capture_output=True, check=True, timeout=60,
+        ).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        detail = getattr(e, "stderr", b"") or b""
+        raise ReplayError(f"Cannot read {source!r}: {detail.decode(errors='replace').strip() or e}") from e
+    with tempfile.TemporaryDirectory(prefix="dsg-replay-") as tmp:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            _extract(tar, Path(tmp))
+        if not (Path(tmp) / required).is_file():
+            raise ReplayError(f"{source!r} has no {required}")
+        yield Path(tmp)
+
+
+def _safe_members(tar: tarfile.TarFile, target: Path) -> Iterator[tarfile.TarInfo]:
+    """Members that stay inside target: no absolute paths, "..", escaping links or device files"""
+    target = target.resolve()
+
+    def inside(name: str) -> bool:
+        path = (target / name).resolve()
+        return path == target or target in path.parents
+
+    for member in tar.getmembers():
+        name = member.name
+        if Path(name).is_absolute() or ".." in Path(name).parts or not inside(name):
+            continue
+        if member.isdev():
+            continue
+        if member.issym():
+            link = member.linkname
+            if Path(link).is_absolute() or not inside(str(Path(name).parent / link)):
+                continue
+        elif member.islnk():
+            if Path(member.linkname).is_absolute() or not inside(member.linkname):
+                continue
+        yield member
+
+
+def _extract(tar: tarfile.TarFile, target: Path):
+    """Extract an archive into target, with tarfile's "data" filter where it exists (3.8.17+, 3.11.4+)"""
+    if HAS_DATA_FILTER:
+        tar.extractall(target, filter="data")
+    else:
+        tar.extractall(target, members=list(_safe_members(tar, target)))
+
+
+def _is_isolated(name: str) -> bool:
+    return any(name == prefix or name.startswith(prefix + ".") for prefix in ISOLATED_MODULES)
+
+
+def _import_isolated(directory: Path, modules: Iterable[str]) -> Dict[str, object]:
+    """Import modules from a directory without disturbing the loaded utils package"""
+    saved = {name: sys.modules.pop(name) for name in [name for name in sys.modules if _is_isolated(name)]}
+    sys.path.insert(0, str(directory))
+    try:
+        importlib.invalidate_caches()
+        return {name: importlib.import_module(name) for name in modules}
+    except ImportError as e:
+        raise ReplayError(f"Cannot import {directory}: {e}") from e
+    finally:
+        sys.path.remove(str(directory))
+        for name in [name for name in sys.modules if _is_isolated(name)]:
+            del sys.modules[name]
+        sys.modules.update(saved)
+
+
+class Engine:
+    """One version of the state machine, on its own module objects"""
+
+    kind = "machine"
+
+    def __init__(self, label: str, state_machine, config):
+        """
+        Args:
+            label: Name used in reports
+            state_machine: That version's utils.state_machine module
+            config: That version's utils.config module
+        """
+        self.label = label
+        self.state_machine = state_machine
+        self.config = config
+        self.action_names = tuple(getattr(state_machine, "ACTION_NAMES", ()))
+
+    @classmethod
+    def load(cls, source: str, label: Optional[str] = None, root: Path = ROOT) -> "Engine":
+        """
+        Load a version from a source tree or a git revision
+
+        Args:
+            source: Directory with utils/, or a git revision such as HEAD~3
+            label: Name used in reports (defaults to source)
+            root: Repository for git revisions
+
+        Returns:
+            Engine
+
+        Raises:
+            ReplayError: If the version cannot be read or has no state machine
+        """
+        with source_tree(source, root) as directory:
+            modules = _import_isolated(directory, ("utils.state_machine", "utils.config"))
+        return cls(label or source, modules["utils.state_machine"], modules["utils.config"])
+
+    def stepper(self, keybindings: dict, is_mac: bool = False, rate: float = 0.0, burst: int = 0,
+                track_repeats: bool = True) -> Callable[[float, int, bool, bool], int]:
+        """step(t, key, down, discord) of a fresh machine (see machine())"""
+        return self.machine(keybindings, is_mac, rate, burst, track_repeats).step
+
+    def machine(self, keybindings: dict, is_mac: bool = False, rate: float = 0.0, burst: int = 0,
+                track_repeats: bool = True):
+        """
+        A fresh GuardMachine of this version
+
+        Args:
+            keybindings: keybindings config
+            is_mac: Resolve "mod" to Cmd (True) or Ctrl (False)
+            rate: Enter rate limit per second (0: none)
+            burst: Rate limit burst
+            track_repeats: Reuse the first press's decision for autorepeats
+        """
+        config = self.config
+        table = config.compile_keybindings(keybindings, is_mac).table
+        start = getattr(config, "ENTER_KEY_ID", 0) * config.MODIFIER_STATES
+        codes = self.state_machine.binding_codes(table[start:start + config.MODIFIER_STATES])
+        return self.state_machine.GuardMachine(codes, rate, burst, track_repeats)
+
+    def action_name(self, action: int) -> str:
+        if 0 <= action < len(self.action_names):
+            return self.action_names[action]
+        return str(action)
+
+
+class _Injected:
+    """Fake keyboard controller: records what the guard injects"""
+
+    def __init__(self):
+        self.events: List[Tuple[bool, object]] = []
+
+    def press(self, key):
+        self.events.append((True, key))
+
+    def release(self, key):
+        self.events.append((False, key))
+
+    def tap(self, key):
+        self.press(key)
+        self.release(key)
+
+    @contextmanager
+    def pressed(self, *keys):
+        for key in keys:
+            self.press(key)
+        try:
+            yield
+        finally:
+            for key in reversed(keys):
+                self.release(key)
+
+
+class GuardEngine:
+    """One version of the whole guard (DiscordSendGuard), on its own module objects"""
+
+    kind = "guard"
+
+    def __init__(self, label: str, module):
+        """
+        Args:
+            label: Name used in reports
+            module: That version's discord_send_guard module
+        """
+        if getattr(module, "Key", None) is None:
+            raise ReplayError(f"{label}: the guard needs pynput")
+        self.label = label
+        self.module = module
+        # Distinct keys whatever the pynput backend (the dummy one makes every Key equal)
+        self.keys = enum.Enum("ReplayKey", {name: name for name in module.Key.__members__})
+        module.Key = self.keys
+        if hasattr(module, "MODIFIER_KEY_NAMES"):
+            module.MODIFIER_KEYS = {
+                bit: tuple(getattr(self.keys, name) for name in names if hasattr(self.keys, name))
+                for bit, names in module.MODIFIER_KEY_NAMES.items()
+            }
+        self.key_for = (self.keys.enter, self.keys.shift, self.keys.ctrl, self.keys.alt, self.keys.cmd,
+                        module.KeyCode.from_char("a"))
+
+    @classmethod
+    def load(cls, source: str, label: Optional[str] = None, root: Path = ROOT) -> "GuardEngine":
+        """
+        Load a version from a source tree or a git revision
+
+        Args:
+            source: Directory with discord_send_guard.py, or a git revision
+            label: Name used in reports (defaults to source)
+            root: Repository for git revisions
+
+        Returns:
+            GuardEngine
+
+        Raises:
+            ReplayError: If the version cannot be read or imported
+        """
+        with source_tree(source, root, "discord_send_guard.py", ("utils", "discord_send_guard.py")) as directory:
+            modules = _import_isolated(directory, ("discord_send_guard",))
+        return cls(label or source, modules["discord_send_guard"])
+
+    def stepper(self, keybindings: dict, is_mac: bool = False, rate: float = 0.0, burst: int = 0,
+                track_repeats: bool = True) -> Callable[[float, int, bool, bool], str]:
+        """
+        step(t, key, down, discord) of a fresh guard
+
+        Args:
+            keybindings: keybindings config
+            is_mac: Resolve "mod" to Cmd (True) or Ctrl (False)
+            rate: Enter rate limit per second (0: none)
+            burst: Rate limit burst
+            track_repeats: Autorepeat handling (storm protection) on
+
+        Returns:
+            Callable returning the outcome of each event, e.g. "pass",
+            "newline", "send", "drop" or "none"
+        """
+        if rate and not track_repeats:
+            raise ReplayError("The guard rate-limits only with autorepeat tracking (storm protection) on")
+        module = self.module
+        module.IS_MAC = is_mac
+        guard = module.DiscordSendGuard()
+        injected = _Injected()
+        guard.keyboard_controller = injected
+        now = [0.0]
+        foreground = [True]
+        guard.is_discord_active = lambda: foreground[0]
+        scheduler = getattr(guard, "scheduler", None)
+        if scheduler is not None:
+            # Replay time instead of the wall clock (set before apply_config, which may capture it)
+            scheduler.clock = lambda: now[0]
+            scheduler._current = 0
+        if hasattr(guard, "apply_config"):
+            guard.apply_config({
+                "keybindings": keybindings, "storm_protection": track_repeats,
+                "enter_rate_limit": rate, "enter_burst": burst, "ime_awareness": False,
+                "composer_only": False, "channel_rules": [], "enter_lookahead_ms": 0,
+                "decision_trace": False, "flight_recorder": False, "gc_tuning": False,
+            })
+        keys = self.key_for
+        enter, shift = self.keys.enter, self.keys.shift
+        shifts = frozenset(getattr(module, "MODIFIER_KEYS", {}).get(1, (shift,)))
+        settle = [0.0]
+
+        def step(t: float, key: int, down: bool, discord: bool) -> str:
+            now[0], foreground[0] = t, discord
+            del injected.events[:]
+            if down:
+                passed = guard.on_press(keys[key]) is not False
+            else:
+                guard.on_release(keys[key])
+                passed = False
+            if scheduler is not None and len(scheduler):
+                settle[0] = max(t + SETTLE_SECONDS, settle[0] + scheduler.tick)
+                scheduler.advance(settle[0])
+            outcome = ["pass"] if passed and key == KEY_ENTER else []
+            held_shift = False
+            for pressed, injected_key in injected.events:
+                if injected_key in shifts:
+                    held_shift = pressed
+                elif pressed:
+                    outcome.append(("newline" if held_shift else "send") if injected_key == enter else "key")
+            if outcome:
+                return "+".join(outcome)
+            return "drop" if down and key == KEY_ENTER else "none"
+
+        return step
+
+    def action_name(self, action: str) -> str:
+        return action
+
+
+def synthetic_events(count: int, seed: int = 50) -> Iterator[Event]:
+    """
+    Random typing: Enters alone and in chords, held-Enter autorepeat,
+    other keys and a frontmost app that changes now and then
+
+    Args:
+        count: Events to generate
+        seed: Random seed
+    """
+    rng = random.Random(seed)
+    t = 0.0
+    discord = True
+    produced = 0
+    while produced < count:
+        t += rng.choice((0.0, 0.001, 0.01, 0.03, 0.08, 0.2))
+        if rng.random() < 0.02:
+            discord = not discord
+        roll = rng.random()
+        if roll < 0.55:
+            burst = [(KEY_OTHER, True), (KEY_OTHER, False)]
+        elif roll < 0.75:
+            burst = [(KEY_ENTER, True), (KEY_ENTER, False)]
+        elif roll < 0.95:
+            modifier = rng.randrange(KEY_IDS["shift"], KEY_IDS["cmd"] + 1)
+            burst = [(modifier, True), (KEY_ENTER, True), (KEY_ENTER, False), (modifier, False)]
+        else:
+            burst = [(KEY_ENTER, True)] * rng.randint(3, 30) + [(KEY_ENTER, False)]
+        for key, down in burst:
+            if produced == count:
+                return
+            yield Event(t, key, down, discord)
+            produced += 1
+            t += 0.0005 if key == KEY_ENTER and down else 0.0
+
+
+def recorder_events(path: Path) -> Iterator[Event]:
+    """Key events of a flight recorder ring"""
+    from utils.flight_recorder import read_records, RecorderError
+
+    try:
+        records = read_records(path)
+    except RecorderError as e:
+        raise ReplayError(str(e)) from e
+    # Key records carry the last known foreground; the decision that follows
+    # an Enter key-down carries the one it was decided under
+    discord = True
+    pending = None
+    for record in records:
+        if record.foreground != "unknown":
+            discord = record.foreground == "discord"
+        if record.kind == "decision":
+            if pending is not None:
+                yield pending._replace(discord=discord)
+                pending = None
+            continue
+        if pending is not None:
+            yield pending
+            pending = None
+        if record.kind not in ("down", "up") or record.key not in KEY_IDS:
+            continue
+        event = Event(record.t, KEY_IDS[record.key], record.kind == "down", discord)
+        if event.key == KEY_ENTER and event.down:
+            pending = event
+        else:
+            yield event
+    if pending is not None:
+        yield pending
+
+
+def jsonl_events(path: Path) -> Iterator[Event]:
+    """
+    Stream a JSON-lines recording (gzip if the name ends in .gz)
+
+    One object per line: {"t": 1.5, "key": "enter", "down": true, "discord": true};
+    key is a name from KEY_NAMES or its id.
+    """
+    opener = gzip.open if str(path).endswith(".gz") else open
+    try:
+        with opener(path, "rt", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                    key = item["key"]
+                    key = KEY_IDS[key] if isinstance(key, str) else int(key)
+                    if not 0 <= key < len(KEY_NAMES):
+                        raise ValueError(f"unknown key id {key}")
+                    yield Event(float(item["t"]), key, bool(item["down"]), bool(item.get("discord", True)))
+                except (KeyError, TypeError, ValueError) as e:
+                    raise ReplayError(f"{path}:{number}: invalid event: {e}") from e
+    except OSError as e:
+        raise ReplayError(f"Cannot read {path}: {e}") from e
+
+
+def write_jsonl(events: Iterable[Event], path: Path) -> int:
+    """
+    Save a stream as a JSON-lines recording (gzip if the name ends in .gz)
+
+    Returns:
+        Number of events written
+    """
+    opener = gzip.open if str(path).endswith(".gz") else open
+    written = 0
+    with opener(path, "wt", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps({"t": event.t, "key": KEY_NAMES[event.key], "down": event.down,
+                                "discord": event.discord}) + "\n")
+            written += 1
+    return written
+
+
+def diff_replay(engine_a, engine_b, events: Iterable[Event], keybindings: dict,
+                is_mac: bool = False, rate: float = 0.0, burst: int = 0, track_repeats: bool = True,
+                chunk: int = DEFAULT_CHUNK, context: int = DEFAULT_CONTEXT,
+                max_differences: int = 100) -> ReplayReport:
+    """
+    Step the same stream through two versions and compare every action
+
+    Args:
+        engine_a: First version (Engine or GuardEngine)
+        engine_b: Second version, of the same kind
+        events: Event stream (consumed once, chunk by chunk)
+        keybindings: keybindings config for both versions
+        is_mac: Resolve "mod" to Cmd (True) or Ctrl (False)
+        rate: Enter rate limit per second (0: none)
+        burst: Rate limit burst
+        track_repeats: Reuse the first press's decision for autorepeats
+        chunk: Events evaluated per version at a time
+        context: Events kept before each reported difference
+        max_differences: Differences kept in the report (all are counted)
+
+    Returns:
+        ReplayReport
+
+    Raises:
+        ReplayError: If the engines are of different kinds
+    """
+    if engine_a.kind != engine_b.kind:
+        raise ReplayError(f"Cannot compare a {engine_a.kind} engine with a {engine_b.kind} engine")
+    step_a = engine_a.stepper(keybindings, is_mac, rate, burst, track_repeats)
+    step_b = engine_b.stepper(keybindings, is_mac, rate, burst, track_repeats)
+    bits = KEY_MODIFIER_BITS
+    history: deque = deque(maxlen=context)
+    shown: List[Difference] = []
+    pairs: Counter = Counter()
+    total = differences = 0
+    seconds_a = seconds_b = 0.0
+    mask = 0
+    events = iter(events)
+    perf_counter = time.perf_counter
+
+    while True:
+        batch = list(itertools.islice(events, chunk))
+        if not batch:
+            break
+        started = perf_counter()
+        actions_a = [step_a(t, key, down, discord) for t, key, down, discord in batch]
+        seconds_a += perf_counter() - started
+        started = perf_counter()
+        actions_b = [step_b(t, key, down, discord) for t, key, down, discord in batch]
+        seconds_b += perf_counter() - started
+
+        if actions_a == actions_b:
+            for event in batch:
+                bit = bits[event.key]
+                if bit:
+                    mask = mask | bit if event.down else mask & ~bit
+        else:
+            for i, (event, a, b) in enumerate(zip(batch, actions_a, actions_b)):
+                if a != b:
+                    differences += 1
+                    name_a, name_b = engine_a.action_name(a), engine_b.action_name(b)
+                    pairs[(name_a, name_b)] += 1
+                    if len(shown) < max_differences:
+                        before = list(history) + batch[max(i - context, 0):i]
+                        shown.append(Difference(total + i, event, mask, name_a, name_b,
+                                                tuple(before[-context:] if context else ())))
+                bit = bits[event.key]
+                if bit:
+                    mask = mask | bit if event.down else mask & ~bit
+        history.extend(batch[-context:] if context else ())
+        total += len(batch)
+
+    return ReplayReport(total, differences, shown, pairs, seconds_a, seconds_b)
+
+
+def format_event(index: int, event: Event, mask: Optional[int] = None) -> str:
+    line = (f"#{index:<10} t={event.t:<12.6f} {KEY_NAMES[event.key]:<6} {'down' if event.down else 'up':<4} "
+            f"{'discord' if event.discord else 'other'}")
+    if mask is not None:
+        line += f" mask={mask}"
+    return line
+
+
+def format_difference(difference: Difference, label_a: str, label_b: str) -> str:
+    """The differing event, both actions and the events before it"""
+    lines = [f"{format_event(difference.index, difference.event, difference.mask)}: "
+             f"{label_a}={difference.action_a} {label_b}={difference.action_b}"]
+    first = difference.index - len(difference.context)
+    for offset, event in enumerate(difference.context):
+        lines.append("    " + format_event(first + offset, event))
+    return "\n".join(lines)
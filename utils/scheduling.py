@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Thread priority for the keyboard hook
+Raises the calling thread's scheduling priority where the OS allows it:
+QoS user-interactive on macOS, SCHED_RR or a negative nice on Linux,
+THREAD_PRIORITY_HIGHEST on Windows. Every step falls back quietly.
+"""
+
+import os
+import sys
+import ctypes
+import ctypes.util
+import logging
+
+logger = logging.getLogger(__name__)
+
+IS_MAC = sys.platform == 'darwin'
+IS_WINDOWS = sys.platform == 'win32'
+IS_LINUX = sys.platform.startswith('linux')
+
+# macOS <sys/qos.h>
+QOS_CLASS_USER_INTERACTIVE = 0x21
+
+# Linux real-time priority used when permitted (low end of the RR range)
+LINUX_RR_PRIORITY = 10
+
+# Nice value tried when real-time scheduling is not permitted
+LINUX_NICE = -10
+
+# Windows THREAD_PRIORITY_HIGHEST
+WINDOWS_THREAD_PRIORITY = 2
+
+# Result when nothing could be changed
+UNCHANGED = 'unchanged'
+
+
+def raise_thread_priority() -> str:
+    """
+    Raise the priority of the calling thread
+
+    Returns:
+        Name of the policy that was applied, or "unchanged"
+    """
+    try:
+        if IS_MAC:
+            return _raise_mac()
+        if IS_LINUX:
+            return _raise_linux()
+        if IS_WINDOWS:
+            return _raise_windows()
+    except Exception as e:
+        logger.warning(f"Failed to raise thread priority: {e}")
+    return UNCHANGED
+
+
+def _raise_mac() -> str:
+    libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libSystem.dylib', use_errno=True)
+    result = libc.pthread_set_qos_class_self_np(QOS_CLASS_USER_INTERACTIVE, 0)
+    if result != 0:
+        logger.warning(f"pthread_set_qos_class_self_np failed: {os.strerror(result)}")
+        return UNCHANGED
+    return 'qos-user-interactive'
+
+
+def _raise_linux() -> str:
+    # pid 0 means the calling thread for both calls on Linux
+    try:
+        os.sched_setscheduler(0, os.SCHED_RR, os.sched_param(LINUX_RR_PRIORITY))
+        return f'sched-rr-{LINUX_RR_PRIORITY}'
+    except (PermissionError, AttributeError, OSError):
+        pass
+
+    current = os.getpriority(os.PRIO_PROCESS, 0)
+    for nice in range(LINUX_NICE, current):
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, nice)
+            return f'nice{nice}'
+        except PermissionError:
+            continue
+    logger.info("No permission to raise hook thread priority (needs CAP_SYS_NICE)")
+    return UNCHANGED
+
+
+def _raise_windows() -> str:
+    kernel32 = ctypes.windll.kernel32
+    if not kernel32.SetThreadPriority(kernel32.GetCurrentThread(), WINDOWS_THREAD_PRIORITY):
+        logger.warning("SetThreadPriority failed")
+        return UNCHANGED
+    return 'thread-priority-highest'
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Single-instance enforcement for Discord Send Guard
+The first process takes an OS lock on ~/.discord-send-guard/instance.lock.
+Later launches forward their intent over the control socket and exit.
+"""
+
+import os
+import sys
+import time
+import logging
+from pathlib import Path
+from typing import Optional
+
+from utils.config import CONFIG_DIR
+from utils.control import send_command, ControlError, ControlRejected
+
+logger = logging.getLogger(__name__)
+
+IS_WINDOWS = sys.platform == 'win32'
+
+if IS_WINDOWS:
+    import msvcrt
+else:
+    import fcntl
+
+# Default lock file location
+LOCK_FILE = CONFIG_DIR / "instance.lock"
+
+# How long a second launch waits for the running instance to answer.
+# Covers the gap between the first instance taking the lock and opening its socket.
+HANDOFF_TIMEOUT = 1.0
+HANDOFF_RETRY_INTERVAL = 0.01
+
+# Windows locks a byte range; keep it clear of the PID text so readers still work
+_WINDOWS_LOCK_OFFSET = 1 << 16
+
+
+class InstanceLock:
+    """Exclusive, crash-safe lock file holding the owner's PID"""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize lock
+
+        Args:
+            path: Lock file path (defaults to ~/.discord-send-guard/instance.lock)
+        """
+        self.path = Path(path) if path else LOCK_FILE
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        """Whether this process holds the lock"""
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """
+        Try to take the lock without blocking
+
+        The OS drops the lock when its owner exits, so a lock file left by a
+        crashed process is simply taken over.
+
+        Returns:
+            True if the lock was acquired, False if another process holds it
+        """
+        if self._fd is not None:
+            return True
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self._lock_fd(fd)
+        except OSError:
+            os.close(fd)
+            return False
+
+        previous = self._read_pid(fd)
+        if previous and previous != os.getpid():
+            logger.info(f"Recovered stale instance lock from pid {previous}")
+
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, f"{os.getpid()}\n".encode('ascii'))
+        if not IS_WINDOWS:
+            os.ftruncate(fd, os.lseek(fd, 0, os.SEEK_CUR))
+        self._fd = fd
+        return True
+
+    def release(self):
+        """Release the lock (the file is kept to avoid unlink races)"""
+        if self._fd is None:
+            return
+        try:
+            if IS_WINDOWS:
+                os.lseek(self._fd, _WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        except OSError as e:
+            logger.warning(f"Failed to unlock instance lock: {e}")
+        os.close(self._fd)
+        self._fd = None
+
+    def holder_pid(self) -> Optional[int]:
+        """
+        Read the PID recorded in the lock file
+
+        Returns:
+            PID or None if unknown
+        """
+        try:
+            with open(self.path, 'r', encoding='ascii') as f:
+                return int(f.readline().strip() or 0) or None
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _lock_fd(fd: int):
+        if IS_WINDOWS:
+            os.lseek(fd, _WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    @staticmethod
+    def _read_pid(fd: int) -> Optional[int]:
+        os.lseek(fd, 0, os.SEEK_SET)
+        try:
+            return int(os.read(fd, 32).split(b'\n')[0] or 0) or None
+        except ValueError:
+            return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def hand_off(intent: str, socket_path: Optional[Path] = None,
+             timeout: float = HANDOFF_TIMEOUT, fallback: Optional[str] = None) -> bool:
+    """
+    Forward an intent to the running instance
+
+    Only an unreachable instance is retried; one that answers with an
+    error (e.g. a CLI guard has no settings window) is sent the fallback
+    command instead, or given up on at once.
+
+    Args:
+        intent: Control command to send (e.g. "show-settings", "toggle")
+        socket_path: Control socket path
+        timeout: Total time to keep retrying
+        fallback: Command to send if the instance rejects the intent
+
+    Returns:
+        True if the running instance accepted the command
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            send_command(intent, path=socket_path, timeout=timeout)
+            return True
+        except ControlRejected as e:
+            if fallback is None:
+                logger.warning(f"Running instance rejected '{intent}': {e}")
+                return False
+            logger.info(f"Running instance rejected '{intent}' ({e}), sending '{fallback}'")
+            intent, fallback = fallback, None
+            continue
+        except ControlError as e:
+            if time.monotonic() >= deadline:
+                logger.warning(f"Running instance did not accept '{intent}': {e}")
+                return False
+        time.sleep(HANDOFF_RETRY_INTERVAL)
+
+
+def acquire_or_hand_off(intent: str, lock_path: Optional[Path] = None,
+                        socket_path: Optional[Path] = None,
+                        fallback: Optional[str] = None) -> Optional[InstanceLock]:
+    """
+    Become the single running instance, or hand off to the existing one
+
+    Args:
+        intent: Control command to forward if another instance is running
+        lock_path: Lock file path
+        socket_path: Control socket path
+        fallback: Command to forward if the running instance rejects the intent
+
+    Returns:
+        The held InstanceLock, or None if another instance is running
+        (the caller should exit)
+    """
+    lock = InstanceLock(lock_path)
+    if lock.acquire():
+        return lock
+
+    pid = lock.holder_pid()
+    logger.info(f"Discord Send Guard is already running (pid {pid}), forwarding '{intent}'")
+    hand_off(intent, socket_path, fallback=fallback)
+    return None
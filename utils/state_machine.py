@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Pure guard state machine for Discord Send Guard
+
+The decisions of the Enter path that depend only on the key stream are
+kept here, free of I/O: the held modifier mask, autorepeat runs, the
+Enter rate limit and the keybinding for the chord. Inputs are explicit
+(timestamp, key id, down/up, whether Discord is frontmost), so the same
+transitions drive the live hook (DiscordSendGuard) and offline replay.
+
+run_batch() evaluates whole arrays of events with NumPy and returns the
+same actions as stepping a GuardMachine event by event; only the rate
+limit, which is inherently sequential, walks the Enter key-downs in a
+plain loop.
+"""
+
+import importlib.util
+from typing import Iterable, List, Optional, Sequence
+
+# numpy is only needed for run_batch(); it is imported there so that the
+# hook process, which imports this module, does not pay for it
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+from utils.config import MOD_SHIFT, MOD_CTRL, MOD_ALT, MOD_CMD, MODIFIER_STATES, ACTION_NEWLINE, ACTION_SEND
+
+# Key ids of the event stream
+KEY_ENTER = 0
+KEY_SHIFT = 1
+KEY_CTRL = 2
+KEY_ALT = 3
+KEY_CMD = 4
+KEY_OTHER = 5
+
+# Modifier bit per key id
+KEY_MODIFIER_BITS = (0, MOD_SHIFT, MOD_CTRL, MOD_ALT, MOD_CMD, 0)
+
+# Actions
+ACT_DECIDE = -1  # Live only: a fresh Enter, run the pipeline
+ACT_NONE = 0  # Not an Enter key-down
+ACT_PASSTHROUGH = 1  # Outside Discord (or let through by a filter)
+ACT_PASS = 2  # Chord goes through as it is (e.g. Cmd+Enter sends)
+ACT_SEND = 3  # Replaced with a plain Enter
+ACT_NEWLINE = 4  # Replaced with Shift+Enter
+ACT_REPEAT_NEWLINE = 5  # Autorepeat of a newline (coalesced injection)
+ACT_DROP = 6  # Autorepeat of an injected send or of a dropped Enter
+ACT_SHED = 7  # Over the rate limit, dropped
+ACTION_NAMES = ('none', 'passthrough', 'pass', 'send', 'newline', 'repeat_newline', 'drop', 'shed')
+
+# What an autorepeat does, by the action of the first press of the run
+REPEAT_ACTIONS = (ACT_DROP, ACT_PASSTHROUGH, ACT_PASS, ACT_DROP, ACT_REPEAT_NEWLINE,
+                  ACT_DROP, ACT_DROP, ACT_DROP)
+
+# Pipeline outcomes that replaced the Enter with a newline
+NEWLINE_OUTCOMES = frozenset(('converted', 'held'))
+
+
+def binding_codes(row: Sequence[str]) -> List[int]:
+    """
+    Translate the Enter row of a KeyBindings table into actions per mask
+
+    Args:
+        row: Keybinding action per modifier mask (MODIFIER_STATES entries)
+
+    Returns:
+        Action code per modifier mask
+    """
+    codes = []
+    for mask, action in enumerate(row):
+        if action == ACTION_NEWLINE:
+            codes.append(ACT_NEWLINE)
+        elif action == ACTION_SEND and mask:
+            codes.append(ACT_SEND)
+        else:
+            codes.append(ACT_PASS)
+    return codes
+
+
+class GuardMachine:
+    """
+    Modifier mask, autorepeat runs, rate limit and chord decision
+
+    All methods are pure state transitions on explicit inputs.
+    """
+
+    def __init__(self, codes: Sequence[int], rate: float = 0.0, burst: int = 0,
+                 track_repeats: bool = True):
+        """
+        Args:
+            codes: Action per modifier mask (see binding_codes())
+            rate: Enter key-downs allowed per second (0: no limit)
+            burst: Key-downs allowed at once before the limit applies
+            track_repeats: Reuse the first press's decision for autorepeats
+        """
+        self.mask = 0
+        self.enter_down = False
+        self.run_action = ACT_NONE
+        self.tokens = 0.0
+        self.updated: Optional[float] = None
+        self.configure(codes, rate, burst, track_repeats)
+
+    def configure(self, codes: Sequence[int], rate: float = 0.0, burst: int = 0,
+                  track_repeats: bool = True):
+        """Change the bindings and limits, keeping the key state"""
+        if len(codes) != MODIFIER_STATES:
+            raise ValueError(f"Expected {MODIFIER_STATES} action codes")
+        self.codes = list(codes)
+        self.rate = float(rate)
+        self.burst = burst
+        self.track_repeats = track_repeats
+        self.tokens = float(burst)
+        self.updated = None
+
+    def release_keys(self):
+        """Forget held keys (their key-ups go unseen while nothing listens)"""
+        self.mask = 0
+        self.enter_down = False
+
+    def modifier(self, bit: int, down: bool):
+        """Track a modifier key"""
+        if down:
+            self.mask |= bit
+        else:
+            self.mask &= ~bit
+
+    def admit(self, t: float) -> bool:
+        """
+        Token-bucket rate limit
+
+        Args:
+            t: Event timestamp in seconds
+
+        Returns:
+            False if the key-down is over the limit
+        """
+        if self.rate <= 0:
+            return True
+        if self.updated is None:
+            tokens = float(self.burst)
+        else:
+            tokens = min(float(self.burst), self.tokens + (t - self.updated) * self.rate)
+        self.updated = t
+        if tokens < 1.0:
+            self.tokens = tokens
+            return False
+        self.tokens = tokens - 1.0
+        return True
+
+    def on_enter_down(self, t: float) -> int:
+        """
+        Enter key-down before the Discord check
+
+        Args:
+            t: Event timestamp in seconds
+
+        Returns:
+            ACT_SHED, an autorepeat action, or ACT_DECIDE for a fresh press
+        """
+        repeat = self.enter_down
+        self.enter_down = True
+        if not self.admit(t):
+            if not repeat:
+                self.run_action = ACT_SHED
+            return ACT_SHED
+        if repeat and self.track_repeats:
+            return REPEAT_ACTIONS[self.run_action]
+        return ACT_DECIDE
+
+    def on_enter_up(self):
+        """Enter key-up"""
+        self.enter_down = False
+
+    def decide(self, discord: bool) -> int:
+        """
+        Decide a fresh Enter
+
+        Args:
+            discord: Discord is frontmost
+
+        Returns:
+            Action for the current chord
+        """
+        action = self.codes[self.mask] if discord else ACT_PASSTHROUGH
+        self.run_action = action
+        return action
+
+    def record(self, outcome: str, mask: int):
+        """
+        Pipeline observer: remember the live pipeline's decision for repeats
+
+        Args:
+            outcome: Pipeline outcome ('converted', 'send', 'passthrough', ...)
+            mask: Modifier mask of the decided Enter
+        """
+        if outcome in NEWLINE_OUTCOMES:
+            self.run_action = ACT_NEWLINE
+        elif outcome == 'send':
+            self.run_action = self.codes[mask]
+        else:
+            self.run_action = ACT_PASSTHROUGH
+
+    def step(self, t: float, key_id: int, down: bool, discord: bool) -> int:
+        """
+        Apply one event
+
+        Args:
+            t: Timestamp in seconds
+            key_id: KEY_* id
+            down: Key-down (True) or key-up (False)
+            discord: Discord is frontmost
+
+        Returns:
+            Action (ACT_NONE for anything but an Enter key-down)
+        """
+        bit = KEY_MODIFIER_BITS[key_id]
+        if bit:
+            self.modifier(bit, down)
+            return ACT_NONE
+        if key_id != KEY_ENTER:
+            return ACT_NONE
+        if not down:
+            self.on_enter_up()
+            return ACT_NONE
+        action = self.on_enter_down(t)
+        if action == ACT_DECIDE:
+            action = self.decide(discord)
+        return action
+
+
+def _last_value(np, flags, values, initial):
+    """For each position, the value at the last position where flags is set (inclusive)"""
+    index = np.where(flags, np.arange(len(flags)), -1)
+    np.maximum.accumulate(index, out=index)
+    return np.where(index >= 0, values[np.maximum(index, 0)], initial)
+
+
+def run_batch(timestamps, key_ids, downs, app_ids, discord_app_ids: Iterable[int],
+              codes: Sequence[int], rate: float = 0.0, burst: int = 0,
+              track_repeats: bool = True):
+    """
+    Evaluate an event stream from a fresh GuardMachine
+
+    Args:
+        timestamps: float seconds per event
+        key_ids: KEY_* id per event
+        downs: True for key-down, False for key-up
+        app_ids: Frontmost app id per event
+        discord_app_ids: App ids that count as Discord
+        codes: Action per modifier mask (see binding_codes())
+        rate: Enter rate limit per second (0: no limit)
+        burst: Rate limit burst
+        track_repeats: Reuse the first press's decision for autorepeats
+
+    Returns:
+        int8 array of actions, identical to GuardMachine.step() per event
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("run_batch() requires numpy")
+    import numpy as np
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    key_ids = np.asarray(key_ids, dtype=np.int64)
+    downs = np.asarray(downs, dtype=bool)
+    discord = np.isin(np.asarray(app_ids), np.fromiter(discord_app_ids, dtype=np.int64))
+    actions = np.zeros(len(key_ids), dtype=np.int8)
+
+    # Modifier mask in effect at every event
+    mask = np.zeros(len(key_ids), dtype=np.int64)
+    for key_id, bit in enumerate(KEY_MODIFIER_BITS):
+        if bit:
+            held = _last_value(np, key_ids == key_id, downs, False)
+            mask |= np.where(held, bit, 0)
+
+    is_enter = key_ids == KEY_ENTER
+    enter_index = np.flatnonzero(is_enter)
+    enter_downs = downs[enter_index]
+    # An Enter key-down is a repeat if the previous Enter event was a key-down
+    previous_down = np.concatenate(([False], enter_downs[:-1]))
+    down_index = enter_index[enter_downs]
+    repeat = previous_down[enter_downs]
+
+    admitted = np.ones(len(down_index), dtype=bool)
+    if rate > 0:
+        tokens, updated = float(burst), None
+        rate, burst_f = float(rate), float(burst)
+        for i, t in enumerate(timestamps[down_index].tolist()):
+            if updated is not None:
+                tokens = min(burst_f, tokens + (t - updated) * rate)
+            updated = t
+            if tokens < 1.0:
+                admitted[i] = False
+            else:
+                tokens -= 1.0
+
+    codes = np.asarray(codes, dtype=np.int8)
+    fresh_action = np.where(discord[down_index], codes[mask[down_index]], ACT_PASSTHROUGH).astype(np.int8)
+    if not track_repeats:
+        repeat = np.zeros(len(down_index), dtype=bool)
+    first = ~repeat
+    # Action of the first press of each run (a shed first press starts a dropped run)
+    run_start = np.where(admitted, fresh_action, ACT_SHED).astype(np.int8)
+    run_action = _last_value(np, first, run_start, ACT_NONE).astype(np.int8)
+    repeat_action = np.asarray(REPEAT_ACTIONS, dtype=np.int8)[run_action]
+
+    result = np.where(first, fresh_action, repeat_action)
+    result = np.where(admitted, result, ACT_SHED)
+    actions[down_index] = result
+    return actions
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Runtime statistics for Discord Send Guard
+Counters, latency summaries and a bounded decision trace
+"""
+
+import time
+import struct
+import logging
+import itertools
+import threading
+from collections import deque
+from typing import Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Number of trace entries kept by default
+DEFAULT_TRACE_SIZE = 256
+
+
+class GuardStats:
+    """Counters, latency summaries and a bounded trace of guard decisions"""
+
+    def __init__(self, trace_size: int = DEFAULT_TRACE_SIZE):
+        """
+        Initialize statistics
+
+        Args:
+            trace_size: Maximum number of trace entries to keep
+        """
+        self.started_at = time.time()
+        self.counters: Dict[str, int] = {}
+        # Non-numeric facts such as the chosen strategy
+        self.info: Dict[str, Any] = {}
+        # name -> [count, total seconds, max seconds]
+        self.timings: Dict[str, list] = {}
+        self.trace_buffer = deque(maxlen=trace_size)
+        # Entries ever traced, so readers can ask for only the new ones
+        self.trace_total = 0
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1):
+        """
+        Increment a counter
+
+        Args:
+            name: Counter name
+            amount: Increment
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set(self, name: str, value: int):
+        """
+        Set a counter to an absolute value
+
+        Args:
+            name: Counter name
+            value: New value
+        """
+        with self._lock:
+            self.counters[name] = value
+
+    def set_info(self, name: str, value: Any):
+        """
+        Record a non-numeric fact (e.g. the active strategy)
+
+        Args:
+            name: Info name
+            value: JSON-serializable value
+        """
+        with self._lock:
+            self.info[name] = value
+
+    def observe(self, name: str, seconds: float):
+        """
+        Record a duration
+
+        Args:
+            name: Timing name
+            seconds: Duration in seconds
+        """
+        with self._lock:
+            entry = self.timings.get(name)
+            if entry is None:
+                entry = self.timings[name] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+    def trace(self, event: str, **fields):
+        """
+        Append an entry to the trace buffer
+
+        Only key classes and decisions belong here, never typed characters.
+
+        Args:
+            event: Event name
+            **fields: Extra fields for the entry
+        """
+        fields['t'] = time.time()
+        fields['event'] = event
+        with self._lock:
+            self.trace_buffer.append(fields)
+            self.trace_total += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a copy of the current statistics
+
+        Returns:
+            Dictionary with uptime, counters and timing summaries
+        """
+        counters, info, timings = self.copy()
+        return {
+            "uptime": time.time() - self.started_at,
+            "counters": counters,
+            "info": info,
+            "timings": {
+                name: {
+                    "count": count,
+                    "avg_us": (total / count * 1e6) if count else 0.0,
+                    "max_us": peak * 1e6,
+                }
+                for name, (count, total, peak) in timings.items()
+            },
+        }
+
+    def copy(self) -> Tuple[Dict[str, int], Dict[str, Any], Dict[str, tuple]]:
+        """
+        Get consistent copies of the raw counters, info and timings
+
+        Returns:
+            (counters, info, timings as name -> (count, total, max seconds))
+        """
+        with self._lock:
+            return (dict(self.counters), dict(self.info),
+                    {name: tuple(entry) for name, entry in self.timings.items()})
+
+    def trace_snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Get a copy of the trace buffer
+
+        Returns:
+            List of trace entries, oldest first
+        """
+        with self._lock:
+            return list(self.trace_buffer)
+
+    def trace_since(self, seen: int) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Get the trace entries added after an earlier call
+
+        Args:
+            seen: trace_total returned by the previous call (0 at first)
+
+        Returns:
+            (new trace_total, entries added since, oldest first; entries
+            that already fell out of the buffer are skipped)
+        """
+        with self._lock:
+            total = self.trace_total
+            size = len(self.trace_buffer)
+            entries = list(itertools.islice(self.trace_buffer, size - min(total - seen, size), None))
+        return total, entries
+
+    def reset(self):
+        """Reset all counters, timings and the trace"""
+        with self._lock:
+            self.counters = {}
+            self.info = {}
+            self.timings = {}
+            self.trace_buffer.clear()
+            self.started_at = time.time()
+
+
+class SharedStatsBlock:
+    """
+    Fixed-layout counters and timings in shared memory
+
+    Written by the hook process and read by the GUI process. Each counter
+    and timing has a slot holding its name, so every name the guard uses
+    is mirrored without a registry; a slot is claimed the first time its
+    name is published and keeps it. A sequence number that is odd while a
+    write is in progress lets readers retry instead of taking a lock.
+    """
+
+    COUNTER_SLOTS = 128
+    TIMING_SLOTS = 32
+    NAME_SIZE = 48
+
+    _HEADER = struct.Struct('<QdII')  # sequence, started_at, counter and timing slots in use
+    _COUNTER = struct.Struct(f'<{NAME_SIZE}sq')  # name, value
+    _TIMING = struct.Struct(f'<{NAME_SIZE}sqdd')  # name, count, total seconds, max seconds
+    _TIMINGS_OFFSET = _HEADER.size + COUNTER_SLOTS * _COUNTER.size
+    SIZE = _TIMINGS_OFFSET + TIMING_SLOTS * _TIMING.size
+
+    def __init__(self, buffer):
+        """
+        Args:
+            buffer: Writable buffer of at least SIZE bytes
+                (e.g. a multiprocessing RawArray)
+        """
+        self.buffer = memoryview(buffer).cast('B')
+        # Writer side only: name -> slot, and the values last written
+        self._counter_slots: Dict[str, int] = {}
+        self._timing_slots: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {}
+        self._timings: Dict[str, tuple] = {}
+        self._started_at = None
+        self._full = False
+
+    def publish(self, stats: 'GuardStats') -> int:
+        """
+        Write the counters and timings that changed since the last call
+
+        Args:
+            stats: Source statistics
+
+        Returns:
+            Number of slots written (0 leaves the block untouched)
+        """
+        counters, _, timings = stats.copy()
+        # Counters gone after a reset read as zero
+        changed_counters = {name: value for name, value in counters.items() if self._counters.get(name) != value}
+        changed_counters.update((name, 0) for name in self._counters if name not in counters and self._counters[name])
+        changed_timings = {name: value for name, value in timings.items() if self._timings.get(name) != value}
+        changed_timings.update((name, (0, 0.0, 0.0)) for name in self._timings
+                               if name not in timings and self._timings[name][0])
+        if not changed_counters and not changed_timings and stats.started_at == self._started_at:
+            return 0
+
+        seq = self._HEADER.unpack_from(self.buffer, 0)[0]
+        self._HEADER.pack_into(self.buffer, 0, seq + 1, stats.started_at,
+                               len(self._counter_slots), len(self._timing_slots))
+        written = 0
+        for name, value in changed_counters.items():
+            slot = self._slot(self._counter_slots, name, self.COUNTER_SLOTS)
+            if slot is not None:
+                self._COUNTER.pack_into(self.buffer, self._HEADER.size + slot * self._COUNTER.size,
+                                        name.encode()[:self.NAME_SIZE], value)
+                self._counters[name] = value
+                written += 1
+        for name, value in changed_timings.items():
+            slot = self._slot(self._timing_slots, name, self.TIMING_SLOTS)
+            if slot is not None:
+                self._TIMING.pack_into(self.buffer, self._TIMINGS_OFFSET + slot * self._TIMING.size,
+                                       name.encode()[:self.NAME_SIZE], *value)
+                self._timings[name] = value
+                written += 1
+        self._started_at = stats.started_at
+        self._HEADER.pack_into(self.buffer, 0, seq + 2, stats.started_at,
+                               len(self._counter_slots), len(self._timing_slots))
+        return written
+
+    def _slot(self, slots: Dict[str, int], name: str, limit: int):
+        slot = slots.get(name)
+        if slot is None:
+            if len(slots) >= limit:
+                if not self._full:
+                    self._full = True
+                    logger.warning(f"Shared statistics block is full, {name!r} is not mirrored")
+                return None
+            slot = slots[name] = len(slots)
+        return slot
+
+    def read(self, retries: int = 100) -> Dict[str, Any]:
+        """
+        Read a consistent snapshot in GuardStats.snapshot() format (without info)
+
+        Args:
+            retries: Attempts before giving up on a torn read
+
+        Returns:
+            Statistics dictionary
+        """
+        for _ in range(retries):
+            seq, started_at, counter_count, timing_count = self._HEADER.unpack_from(self.buffer, 0)
+            if seq % 2:
+                continue
+            counter_values = [self._COUNTER.unpack_from(self.buffer, self._HEADER.size + slot * self._COUNTER.size)
+                              for slot in range(counter_count)]
+            timing_values = [self._TIMING.unpack_from(self.buffer, self._TIMINGS_OFFSET + slot * self._TIMING.size)
+                             for slot in range(timing_count)]
+            if self._HEADER.unpack_from(self.buffer, 0)[0] == seq:
+                break
+        else:
+            raise RuntimeError("Shared statistics are being rewritten too often to read")
+
+        return {
+            "uptime": (time.time() - started_at) if started_at else 0.0,
+            "counters": {name.rstrip(b'\0').decode(errors='replace'): value for name, value in counter_values},
+            "timings": {
+                name.rstrip(b'\0').decode(errors='replace'): {
+                    "count": count,
+                    "avg_us": (total / count * 1e6) if count else 0.0,
+                    "max_us": peak * 1e6,
+                }
+                for name, count, total, peak in timing_values
+            },
+        }
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Autorepeat and input-storm protection for Discord Send Guard
+
+Holding Enter, a stuck key or a macro tool can produce dozens of Enter
+key-downs per second. The pure side of the protection lives in
+GuardMachine (utils/state_machine.py): autorepeats are detected from
+key-downs without a key-up in between and reuse the decision of the first
+press, and a token bucket drops Enters over the rate limit (neither sent
+nor converted, which can never send a message by accident).
+
+This module does the I/O side: newlines for autorepeats are counted and
+injected in one batch from the scheduler thread, with Shift held once,
+instead of a four-event Shift+Enter from inside the hook callback each
+time.
+"""
+
+import threading
+from typing import Callable
+
+DEFAULT_RATE = 40.0  # Enters per second
+DEFAULT_BURST = 20
+
+# Repeat newlines arriving within this window are injected together
+COALESCE_WINDOW = 0.03
+
+
+class NewlineCoalescer:
+    """Batches autorepeat newlines into one injection on the scheduler thread"""
+
+    def __init__(self, scheduler, inject_newlines: Callable[[int], None], stats=None):
+        """
+        Args:
+            scheduler: TimerWheel that runs the batched injection
+            inject_newlines: Injects N newlines (Shift held once)
+            stats: GuardStats for coalescing counters
+        """
+        self.scheduler = scheduler
+        self.inject_newlines = inject_newlines
+        self.stats = stats
+        self._queued = 0
+        self._flush_timer = None
+        self._lock = threading.Lock()
+        # Held from taking the queue to the end of the injection, so a
+        # flush from the hook waits for one already running on the timer
+        self._inject_lock = threading.Lock()
+
+    def queue_newline(self):
+        """Add a newline to the next batched injection"""
+        with self._lock:
+            self._queued += 1
+            if self._flush_timer is not None:
+                if self.stats:
+                    self.stats.incr('enter_coalesced')
+                return
+            self._flush_timer = self.scheduler.schedule(COALESCE_WINDOW, self.flush)
+
+    def flush(self) -> bool:
+        """
+        Inject the queued newlines now
+
+        Runs on the scheduler thread when the window ends, and on the hook
+        thread before any other key, so typed text never overtakes them.
+
+        Returns:
+            True if newlines were injected
+        """
+        with self._inject_lock:
+            with self._lock:
+                count, self._queued = self._queued, 0
+                timer, self._flush_timer = self._flush_timer, None
+            if timer is not None:
+                # No-op when called by the timer itself
+                self.scheduler.cancel(timer)
+            if not count:
+                return False
+            if self.stats:
+                self.stats.incr('newline_batches')
+            self.inject_newlines(count)
+            return True
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Hashed timing wheel for Discord Send Guard
+
+Delayed key actions (lookahead windows, double-Enter, long-press) need
+timers that are cheap to arm and disarm from the keyboard hook. A
+TimerWheel keeps timers in a ring of slots hashed by expiry tick, so
+schedule() and cancel() are O(1) dict operations under a short lock, and
+a single thread fires due timers at tick granularity. Callbacks run on
+that thread, never on the hook thread.
+
+The clock is time.monotonic by default; pass a VirtualClock and call
+advance() directly to drive the wheel deterministically in tests.
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tick length in seconds and number of slots (one rotation = 1.28s)
+DEFAULT_TICK = 0.005
+DEFAULT_SLOTS = 256
+
+
+class VirtualClock:
+    """Manually advanced clock for deterministic tests"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        """Move the clock forward"""
+        self.now += seconds
+
+
+class Timer:
+    """Handle of a scheduled callback"""
+
+    __slots__ = ('deadline', 'expires', 'callback', 'args', 'slot')
+
+    def __init__(self, deadline: float, expires: int, callback: Callable, args: tuple):
+        self.deadline = deadline
+        self.expires = expires  # Tick at which the timer fires
+        self.callback = callback
+        self.args = args
+        self.slot: Optional[dict] = None  # Owning slot while pending
+
+    @property
+    def pending(self) -> bool:
+        return self.slot is not None
+
+    def __lt__(self, other: 'Timer') -> bool:
+        return self.deadline < other.deadline
+
+
+class TimerWheel:
+    """
+    Timers hashed into a ring of slots by expiry tick
+
+    Each slot is a dict used as an insertion-ordered set, so arming and
+    cancelling a timer never searches. Timers further away than one
+    rotation share a slot with nearer ones and are skipped until their
+    own tick comes round.
+    """
+
+    def __init__(self, tick: float = DEFAULT_TICK, slots: int = DEFAULT_SLOTS,
+                 clock: Callable[[], float] = time.monotonic, stats=None):
+        """
+        Args:
+            tick: Granularity in seconds; timers fire at the first tick
+                boundary at or after their deadline
+            slots: Number of slots in the ring
+            clock: Monotonic time source
+            stats: GuardStats for timer counters and lateness
+        """
+        self.tick = tick
+        self.clock = clock
+        self.stats = stats
+        self._slots = [{} for _ in range(slots)]
+        self._current = math.floor(clock() / tick)  # Last processed tick
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._wake_tick: Optional[int] = None  # Tick the thread sleeps until (None: idle)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def __len__(self):
+        return self._pending
+
+    def schedule(self, delay: float, callback: Callable, *args) -> Timer:
+        """
+        Arm a timer
+
+        Args:
+            delay: Seconds from now
+            callback: Called with *args on the wheel thread
+            *args: Callback arguments
+
+        Returns:
+            Timer handle for cancel()
+        """
+        deadline = self.clock() + max(delay, 0.0)
+        expires = math.ceil(deadline / self.tick)
+        with self._lock:
+            if expires <= self._current:
+                expires = self._current + 1
+            timer = Timer(deadline, expires, callback, args)
+            slot = self._slots[expires % len(self._slots)]
+            slot[timer] = None
+            timer.slot = slot
+            self._pending += 1
+            if self._thread is not None and (self._wake_tick is None or expires < self._wake_tick):
+                self._wake.notify()
+        if self.stats:
+            self.stats.incr('timers_scheduled')
+        return timer
+
+    def cancel(self, timer: Timer) -> bool:
+        """
+        Disarm a timer
+
+        Args:
+            timer: Handle from schedule()
+
+        Returns:
+            True if the timer was pending, False if it already fired or
+            was cancelled
+        """
+        with self._lock:
+            slot = timer.slot
+            if slot is None:
+                return False
+            del slot[timer]
+            timer.slot = None
+            self._pending -= 1
+        if self.stats:
+            self.stats.incr('timers_cancelled')
+        return True
+
+    def advance(self, now: Optional[float] = None) -> int:
+        """
+        Fire every timer due at or before now
+
+        Timers due in the same call fire in deadline order.
+
+        Args:
+            now: Current time (defaults to the clock)
+
+        Returns:
+            Number of timers fired
+        """
+        if now is None:
+            now = self.clock()
+        target = math.floor(now / self.tick)
+        due = []
+        with self._lock:
+            if target <= self._current:
+                return 0
+            if self._pending:
+                # After a long gap every slot is visited once
+                steps = min(target - self._current, len(self._slots))
+                for step in range(1, steps + 1):
+                    slot = self._slots[(self._current + step) % len(self._slots)]
+                    if not slot:
+                        continue
+                    for timer in [t for t in slot if t.expires <= target]:
+                        del slot[timer]
+                        timer.slot = None
+                        due.append(timer)
+                    if len(due) == self._pending:
+                        break
+                self._pending -= len(due)
+            self._current = target
+        if len(due) > 1:
+            due.sort()
+        for timer in due:
+            self._fire(timer, now)
+        return len(due)
+
+    def _fire(self, timer: Timer, now: float):
+        if self.stats:
+            self.stats.incr('timers_fired')
+            self.stats.observe('timer_lateness', max(now - timer.deadline, 0.0))
+        try:
+            timer.callback(*timer.args)
+        except Exception as e:
+            logger.error(f"Timer callback failed: {e}")
+            if self.stats:
+                self.stats.incr('timer_errors')
+
+    def _next_tick(self) -> Optional[int]:
+        """Tick of the nearest non-empty slot (None when idle); call under the lock"""
+        if not self._pending:
+            return None
+        count = len(self._slots)
+        for step in range(1, count + 1):
+            slot = self._slots[(self._current + step) % count]
+            if slot:
+                return self._current + step
+        return self._current + count
+
+    def start(self):
+        """Start the wheel thread (real clock only)"""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='timer-wheel', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the wheel thread; pending timers stay armed"""
+        thread = self._thread
+        if thread is None:
+            return
+        with self._lock:
+            self._stopping = True
+            self._wake.notify()
+        thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._stopping:
+                    return
+                self._wake_tick = self._next_tick()
+                if self._wake_tick is None:
+                    self._wake.wait()
+                else:
+                    timeout = self._wake_tick * self.tick - self.clock()
+                    if timeout > 0:
+                        self._wake.wait(timeout)
+                self._wake_tick = None
+                if self._stopping:
+                    return
+            self.advance()
+